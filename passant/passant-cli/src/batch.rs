@@ -0,0 +1,73 @@
+use std::fs::File;
+use std::io::{self, BufRead, BufReader, BufWriter, Write};
+use std::path::Path;
+
+use anyhow::Context;
+use passant_core::{RewriteEngine, StatementReader};
+use serde_json::json;
+
+#[derive(Debug, Default, PartialEq, Eq)]
+pub struct BatchSummary {
+    pub rewritten: usize,
+    pub failed: usize,
+}
+
+/// Rewrite every statement of `queries` (a path, or `-` for stdin) and write one JSON
+/// object per statement to `out` (a path, or stdout when absent). Statements are read and
+/// written one at a time, so memory use does not grow with the input. A statement that
+/// fails to parse, or whose policies cannot be enforced, gets an `error` field and does not
+/// stop the batch.
+pub fn run(
+    engine: &RewriteEngine,
+    queries: &Path,
+    out: Option<&Path>,
+) -> anyhow::Result<BatchSummary> {
+    let input: Box<dyn BufRead> = if queries == Path::new("-") {
+        Box::new(io::stdin().lock())
+    } else {
+        let file =
+            File::open(queries).with_context(|| format!("failed to open {}", queries.display()))?;
+        Box::new(BufReader::new(file))
+    };
+    let mut output: Box<dyn Write> = match out {
+        Some(path) => {
+            Box::new(BufWriter::new(File::create(path).with_context(|| {
+                format!("failed to create {}", path.display())
+            })?))
+        }
+        None => Box::new(BufWriter::new(io::stdout().lock())),
+    };
+
+    let mut summary = BatchSummary::default();
+    for (index, sql) in StatementReader::new(input).enumerate() {
+        let sql = sql.with_context(|| format!("failed to read {}", queries.display()))?;
+        let rewritten = engine
+            .rewrite(&sql)
+            .map_err(|err| err.to_string())
+            .and_then(|explanation| {
+                explanation
+                .chosen
+                .enforced_sql()
+                .map(|rewritten| {
+                    json!({"rewritten_sql": rewritten, "strategy": explanation.chosen.strategy})
+                })
+                .map_err(|reason| format!("cannot enforce policies: {reason}"))
+            });
+        let record = match rewritten {
+            Ok(mut record) => {
+                summary.rewritten += 1;
+                record["index"] = json!(index);
+                record["sql"] = json!(sql);
+                record
+            }
+            Err(error) => {
+                summary.failed += 1;
+                json!({"index": index, "sql": sql, "error": error})
+            }
+        };
+        serde_json::to_writer(&mut output, &record)?;
+        output.write_all(b"\n")?;
+    }
+    output.flush()?;
+    Ok(summary)
+}
@@ -1,6 +1,15 @@
+mod batch;
+mod policies;
+mod serve;
+
+use std::path::PathBuf;
+use std::sync::RwLock;
+
 use anyhow::Context;
 use clap::{Parser, Subcommand};
-use passant_core::{PassantPlanner, PolicyIr, Resolution, parse_query_to_ir};
+use passant_core::{
+    DEFAULT_CACHE_SIZE, PassantPlanner, PolicyIr, Resolution, RewriteEngine, parse_query_to_ir,
+};
 
 #[derive(Debug, Parser)]
 #[command(name = "passant")]
@@ -14,9 +23,14 @@ struct Cli {
 enum Commands {
     Rewrite {
         sql: String,
+        /// JSONL file of policies to enforce, one object per line.
+        #[arg(long)]
+        policies: Option<PathBuf>,
     },
     Explain {
         sql: String,
+        #[arg(long)]
+        policies: Option<PathBuf>,
     },
     Plan {
         sql: String,
@@ -29,20 +43,44 @@ enum Commands {
         #[arg(long)]
         constraint: String,
     },
+    /// Rewrite every statement of a SQL file, writing one JSON object per statement.
+    Batch {
+        #[arg(long)]
+        policies: Option<PathBuf>,
+        /// `;`-separated SQL statements, or `-` for stdin.
+        #[arg(long)]
+        queries: PathBuf,
+        /// Output JSONL path; defaults to stdout.
+        #[arg(long)]
+        out: Option<PathBuf>,
+    },
+    /// Answer newline-delimited JSON requests on stdin/stdout, or on a Unix socket.
+    Serve {
+        #[arg(long)]
+        policies: Option<PathBuf>,
+        #[arg(long)]
+        socket: Option<PathBuf>,
+        #[arg(long, default_value_t = DEFAULT_CACHE_SIZE)]
+        cache_size: usize,
+    },
 }
 
 fn main() -> anyhow::Result<()> {
     let cli = Cli::parse();
     match cli.command {
-        Commands::Rewrite { sql } => {
-            let ir = parse_query_to_ir(&sql).context("failed to parse SQL")?;
-            let result = PassantPlanner::new().plan_query(&ir, &[]);
-            println!("{}", result.chosen.rewritten_sql);
+        Commands::Rewrite { sql, policies } => {
+            let engine = load_engine(policies, 0)?;
+            let explanation = engine.rewrite(&sql).context("failed to parse SQL")?;
+            let rewritten = explanation
+                .chosen
+                .enforced_sql()
+                .map_err(|reason| anyhow::anyhow!("cannot enforce policies: {reason}"))?;
+            println!("{rewritten}");
         }
-        Commands::Explain { sql } => {
-            let ir = parse_query_to_ir(&sql).context("failed to parse SQL")?;
-            let explanation = PassantPlanner::new().explain_rewrite(&ir, &[]);
-            println!("{}", serde_json::to_string_pretty(&explanation)?);
+        Commands::Explain { sql, policies } => {
+            let engine = load_engine(policies, 0)?;
+            let explanation = engine.rewrite(&sql).context("failed to parse SQL")?;
+            println!("{}", serde_json::to_string_pretty(explanation.as_ref())?);
         }
         Commands::Plan { sql } => {
             let ir = parse_query_to_ir(&sql).context("failed to parse SQL")?;
@@ -64,6 +102,44 @@ fn main() -> anyhow::Result<()> {
             };
             println!("{}", serde_json::to_string_pretty(&policy)?);
         }
+        Commands::Batch {
+            policies,
+            queries,
+            out,
+        } => {
+            let engine = load_engine(policies, DEFAULT_CACHE_SIZE)?;
+            let summary = batch::run(&engine, &queries, out.as_deref())?;
+            eprintln!(
+                "rewrote {} statement(s), {} failed",
+                summary.rewritten, summary.failed
+            );
+        }
+        Commands::Serve {
+            policies,
+            socket,
+            cache_size,
+        } => {
+            let engine = load_engine(policies, cache_size)?;
+            match socket {
+                #[cfg(unix)]
+                Some(path) => serve::serve_socket(engine, &path)?,
+                #[cfg(not(unix))]
+                Some(_) => anyhow::bail!("--socket is only supported on Unix"),
+                None => serve::serve_stream(
+                    &RwLock::new(engine),
+                    std::io::stdin().lock(),
+                    std::io::stdout().lock(),
+                )?,
+            }
+        }
     }
     Ok(())
 }
+
+fn load_engine(policies: Option<PathBuf>, cache_size: usize) -> anyhow::Result<RewriteEngine> {
+    let mut engine = RewriteEngine::new(cache_size);
+    if let Some(path) = policies {
+        policies::load_policies(&path, &mut engine)?;
+    }
+    Ok(engine)
+}
@@ -0,0 +1,62 @@
+use std::fs::File;
+use std::io::{BufRead, BufReader};
+use std::path::Path;
+
+use anyhow::{Context, anyhow};
+use passant_core::{PolicyIr, RewriteEngine};
+use serde::Deserialize;
+
+/// A DFC policy as written in a policies JSONL file or a `register_policy` request, using
+/// the same fields as `passant.compat.DFCPolicy`.
+#[derive(Debug, Deserialize)]
+#[serde(deny_unknown_fields)]
+pub struct PolicySpec {
+    #[serde(default)]
+    pub sources: Vec<String>,
+    #[serde(default)]
+    pub sink: Option<String>,
+    #[serde(default)]
+    pub sink_alias: Option<String>,
+    pub constraint: String,
+    #[serde(default = "default_on_fail")]
+    pub on_fail: String,
+    #[serde(default)]
+    pub description: Option<String>,
+}
+
+fn default_on_fail() -> String {
+    "REMOVE".to_string()
+}
+
+impl PolicySpec {
+    pub fn into_policy(self) -> anyhow::Result<PolicyIr> {
+        Ok(PolicyIr::CompatDfc {
+            sources: self.sources,
+            sink: self.sink,
+            sink_alias: self.sink_alias,
+            constraint: self.constraint,
+            on_fail: self.on_fail.parse().map_err(|err: String| anyhow!(err))?,
+            description: self.description,
+        })
+    }
+}
+
+/// Register every policy in a JSONL file (one `PolicySpec` per line; blank lines are
+/// skipped). Returns the number of policies registered.
+pub fn load_policies(path: &Path, engine: &mut RewriteEngine) -> anyhow::Result<usize> {
+    let file = File::open(path).with_context(|| format!("failed to open {}", path.display()))?;
+    let mut count = 0;
+    for (index, line) in BufReader::new(file).lines().enumerate() {
+        let line = line.with_context(|| format!("failed to read {}", path.display()))?;
+        if line.trim().is_empty() {
+            continue;
+        }
+        let location = || format!("{}:{}", path.display(), index + 1);
+        let spec: PolicySpec = serde_json::from_str(&line).with_context(location)?;
+        engine
+            .register_policy(spec.into_policy().with_context(location)?)
+            .with_context(location)?;
+        count += 1;
+    }
+    Ok(count)
+}
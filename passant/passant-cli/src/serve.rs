@@ -0,0 +1,133 @@
+use std::io::{BufRead, Write};
+use std::sync::RwLock;
+
+use passant_core::{PolicyId, RewriteEngine};
+use serde::Deserialize;
+use serde_json::{Value, json};
+
+use crate::policies::PolicySpec;
+
+/// One newline-delimited JSON request. `id` is echoed back so clients can pipeline.
+#[derive(Debug, Deserialize)]
+struct Envelope {
+    #[serde(default)]
+    id: Value,
+    #[serde(flatten)]
+    request: Request,
+}
+
+#[derive(Debug, Deserialize)]
+#[serde(tag = "op", rename_all = "snake_case")]
+enum Request {
+    Rewrite { sql: String },
+    Explain { sql: String },
+    RegisterPolicy { policy: PolicySpec },
+    DeletePolicy { policy_id: PolicyId },
+    CacheInfo,
+}
+
+/// Answer requests read from `reader` until EOF, one JSON response line per request line.
+/// Responses are `{"id": ..., "ok": true, "result": ...}` or
+/// `{"id": ..., "ok": false, "error": "..."}`.
+pub fn serve_stream(
+    engine: &RwLock<RewriteEngine>,
+    reader: impl BufRead,
+    mut writer: impl Write,
+) -> std::io::Result<()> {
+    for line in reader.lines() {
+        let line = line?;
+        if line.trim().is_empty() {
+            continue;
+        }
+        serde_json::to_writer(&mut writer, &respond(engine, &line))?;
+        writer.write_all(b"\n")?;
+        writer.flush()?;
+    }
+    Ok(())
+}
+
+/// Accept connections on a Unix socket, serving each on its own thread against one
+/// shared engine.
+#[cfg(unix)]
+pub fn serve_socket(engine: RewriteEngine, path: &std::path::Path) -> anyhow::Result<()> {
+    use std::io::BufReader;
+    use std::os::unix::net::UnixListener;
+    use std::sync::Arc;
+
+    use anyhow::Context;
+
+    let listener =
+        UnixListener::bind(path).with_context(|| format!("failed to bind {}", path.display()))?;
+    let engine = Arc::new(RwLock::new(engine));
+    for stream in listener.incoming() {
+        let stream = stream.context("failed to accept connection")?;
+        let engine = Arc::clone(&engine);
+        std::thread::spawn(move || {
+            let reader = match stream.try_clone() {
+                Ok(reader) => BufReader::new(reader),
+                Err(err) => {
+                    eprintln!("passant serve: {err}");
+                    return;
+                }
+            };
+            if let Err(err) = serve_stream(&engine, reader, stream) {
+                eprintln!("passant serve: {err}");
+            }
+        });
+    }
+    Ok(())
+}
+
+fn respond(engine: &RwLock<RewriteEngine>, line: &str) -> Value {
+    let envelope = match serde_json::from_str::<Envelope>(line) {
+        Ok(envelope) => envelope,
+        Err(err) => {
+            let id = serde_json::from_str::<Value>(line)
+                .ok()
+                .and_then(|value| value.get("id").cloned())
+                .unwrap_or(Value::Null);
+            return json!({"id": id, "ok": false, "error": format!("invalid request: {err}")});
+        }
+    };
+    match handle(engine, envelope.request) {
+        Ok(result) => json!({"id": envelope.id, "ok": true, "result": result}),
+        Err(err) => json!({"id": envelope.id, "ok": false, "error": format!("{err:#}")}),
+    }
+}
+
+fn handle(engine: &RwLock<RewriteEngine>, request: Request) -> anyhow::Result<Value> {
+    // Every mutation is a single registry call, so a panic on another
+    // connection cannot leave the engine half-updated and a poisoned lock is still usable.
+    let read = || {
+        engine
+            .read()
+            .unwrap_or_else(|poisoned| poisoned.into_inner())
+    };
+    let write = || {
+        engine
+            .write()
+            .unwrap_or_else(|poisoned| poisoned.into_inner())
+    };
+    Ok(match request {
+        Request::Rewrite { sql } => {
+            let explanation = read().rewrite(&sql)?;
+            let rewritten = explanation
+                .chosen
+                .enforced_sql()
+                .map_err(|reason| anyhow::anyhow!("cannot enforce policies: {reason}"))?;
+            json!({
+                "rewritten_sql": rewritten,
+                "strategy": explanation.chosen.strategy,
+            })
+        }
+        Request::Explain { sql } => serde_json::to_value(read().rewrite(&sql)?.as_ref())?,
+        Request::RegisterPolicy { policy } => {
+            let policy = policy.into_policy()?;
+            json!({"policy_id": write().register_policy(policy)?})
+        }
+        Request::DeletePolicy { policy_id } => {
+            json!({"deleted": write().delete_policy(policy_id)})
+        }
+        Request::CacheInfo => serde_json::to_value(read().cache_stats())?,
+    })
+}
@@ -0,0 +1,220 @@
+use std::ops::ControlFlow;
+
+use sqlparser::ast::{Expr, ObjectName, Query, Visit, Visitor};
+
+use crate::ir::ExprRef;
+use crate::rewrite::{COUNT_AGGREGATES, VALUE_AGGREGATES};
+
+/// Aggregates that are neither count-like nor evaluate to their argument over one row.
+const OTHER_AGGREGATES: &[&str] = &[
+    "approx_quantile",
+    "arg_max",
+    "arg_min",
+    "argmax",
+    "argmin",
+    "array_agg",
+    "bitstring_agg",
+    "corr",
+    "count_if",
+    "countif",
+    "covar_pop",
+    "covar_samp",
+    "entropy",
+    "favg",
+    "fsum",
+    "histogram",
+    "kahan_sum",
+    "kurtosis",
+    "list",
+    "max_by",
+    "min_by",
+    "regr_avgx",
+    "regr_avgy",
+    "regr_intercept",
+    "regr_r2",
+    "regr_slope",
+    "regr_sxx",
+    "regr_sxy",
+    "regr_syy",
+    "reservoir_quantile",
+    "skewness",
+    "sumkahan",
+];
+
+/// Whether `name` (case-insensitive) is an aggregate function.
+pub fn is_aggregate_function(name: &str) -> bool {
+    let name = name.to_ascii_lowercase();
+    [COUNT_AGGREGATES, VALUE_AGGREGATES, OTHER_AGGREGATES]
+        .iter()
+        .any(|names| names.contains(&name.as_str()))
+}
+
+/// Lower an expression into IR, recording what it references in a single AST walk.
+///
+/// Aggregates, columns and qualifiers are collected from the expression's own scope:
+/// subqueries inside it only set `has_subquery`, since their aggregates and columns
+/// belong to the subquery. Window functions are not aggregates.
+pub fn analyze_expr(expr: &Expr) -> ExprRef {
+    let mut analysis = ExprAnalysis::default();
+    let _ = expr.visit(&mut analysis);
+    ExprRef {
+        sql: expr.to_string(),
+        has_aggregate: analysis.has_aggregate,
+        has_subquery: analysis.has_subquery,
+        columns: analysis.columns,
+        tables: analysis.tables,
+    }
+}
+
+#[derive(Default)]
+struct ExprAnalysis {
+    depth: usize,
+    has_aggregate: bool,
+    has_subquery: bool,
+    columns: Vec<String>,
+    tables: Vec<String>,
+}
+
+impl Visitor for ExprAnalysis {
+    type Break = ();
+
+    fn pre_visit_query(&mut self, _query: &Query) -> ControlFlow<()> {
+        self.depth += 1;
+        self.has_subquery = true;
+        ControlFlow::Continue(())
+    }
+
+    fn post_visit_query(&mut self, _query: &Query) -> ControlFlow<()> {
+        self.depth -= 1;
+        ControlFlow::Continue(())
+    }
+
+    fn pre_visit_expr(&mut self, expr: &Expr) -> ControlFlow<()> {
+        if self.depth > 0 {
+            return ControlFlow::Continue(());
+        }
+        match expr {
+            Expr::Function(function) => {
+                if function.over.is_none() && is_aggregate_function(&function.name.to_string()) {
+                    self.has_aggregate = true;
+                }
+            }
+            Expr::Identifier(ident) => push_distinct(&mut self.columns, ident.value.as_str()),
+            Expr::CompoundIdentifier(parts) => {
+                let lowered = parts
+                    .iter()
+                    .map(|part| part.value.to_ascii_lowercase())
+                    .collect::<Vec<_>>();
+                push_distinct(&mut self.columns, &lowered.join("."));
+                if let Some((_, qualifier)) = lowered.split_last() {
+                    if !qualifier.is_empty() {
+                        push_distinct(&mut self.tables, &qualifier.join("."));
+                    }
+                }
+            }
+            _ => {}
+        }
+        ControlFlow::Continue(())
+    }
+}
+
+fn push_distinct(values: &mut Vec<String>, value: &str) {
+    let value = value.to_ascii_lowercase();
+    if !values.contains(&value) {
+        values.push(value);
+    }
+}
+
+/// Tables a statement or query references, named by `relation_name` and without the CTEs
+/// it defines. Each name appears once.
+#[derive(Debug, Clone, Default, PartialEq, Eq)]
+pub struct StatementTables {
+    /// Every table the statement references, at any depth.
+    pub all: Vec<String>,
+    /// Tables read inside a CTE or a subquery rather than directly by the root query.
+    pub nested: Vec<String>,
+}
+
+/// Names of the tables a query reads at any depth, as given by `relation_name`, without the
+/// CTEs it defines. Each name appears once.
+pub fn query_tables(query: &Query) -> Vec<String> {
+    let mut collector = RelationCollector::default();
+    let _ = query.visit(&mut collector);
+    collector.tables(|_| true)
+}
+
+/// The tables a statement or query references, split by whether its root query reads them
+/// directly.
+pub fn statement_tables(node: &impl Visit) -> StatementTables {
+    let mut collector = RelationCollector::default();
+    let _ = node.visit(&mut collector);
+    StatementTables {
+        all: collector.tables(|_| true),
+        // The root query is depth 1; CTE bodies and subqueries are nested below it.
+        nested: collector.tables(|depth| depth > 1),
+    }
+}
+
+/// The table an object name refers to, as policy sources and sinks name it: the last
+/// identifier, unquoted and lowercased, so `"T"` and `main.t` both match a policy on `t`.
+pub fn relation_name(name: &ObjectName) -> String {
+    name.0
+        .last()
+        .map_or_else(String::new, |ident| ident.value.to_ascii_lowercase())
+}
+
+#[derive(Default)]
+struct RelationCollector {
+    depth: usize,
+    ctes: Vec<String>,
+    /// Each relation with the number of queries enclosing it, and whether it was
+    /// schema-qualified (and so cannot name a CTE).
+    relations: Vec<(String, usize, bool)>,
+}
+
+impl RelationCollector {
+    fn tables(&self, at_depth: impl Fn(usize) -> bool) -> Vec<String> {
+        let mut tables: Vec<String> = Vec::new();
+        for (relation, depth, qualified) in &self.relations {
+            let is_cte = !qualified
+                && self
+                    .ctes
+                    .iter()
+                    .any(|cte| cte.eq_ignore_ascii_case(relation));
+            let seen = tables
+                .iter()
+                .any(|table| table.eq_ignore_ascii_case(relation));
+            if at_depth(*depth) && !is_cte && !seen {
+                tables.push(relation.clone());
+            }
+        }
+        tables
+    }
+}
+
+impl Visitor for RelationCollector {
+    type Break = ();
+
+    fn pre_visit_query(&mut self, query: &Query) -> ControlFlow<()> {
+        self.depth += 1;
+        if let Some(with) = &query.with {
+            self.ctes.extend(
+                with.cte_tables
+                    .iter()
+                    .map(|cte| cte.alias.name.value.clone()),
+            );
+        }
+        ControlFlow::Continue(())
+    }
+
+    fn post_visit_query(&mut self, _query: &Query) -> ControlFlow<()> {
+        self.depth -= 1;
+        ControlFlow::Continue(())
+    }
+
+    fn pre_visit_relation(&mut self, relation: &ObjectName) -> ControlFlow<()> {
+        self.relations
+            .push((relation_name(relation), self.depth, relation.0.len() > 1));
+        ControlFlow::Continue(())
+    }
+}
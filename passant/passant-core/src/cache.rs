@@ -0,0 +1,184 @@
+use std::collections::{BTreeMap, HashMap};
+use std::hash::{DefaultHasher, Hash, Hasher};
+use std::sync::atomic::{AtomicU64, Ordering};
+use std::sync::{Arc, Mutex};
+
+use serde::{Deserialize, Serialize};
+
+use crate::explain::RewriteExplanation;
+
+/// Rewrites kept by a default-constructed cache.
+pub const DEFAULT_CACHE_SIZE: usize = 1024;
+
+/// Independent LRU shards, so concurrent rewrites rarely contend on the same lock.
+const SHARDS: usize = 16;
+
+#[derive(Debug, Clone, Copy, PartialEq, Eq, Serialize, Deserialize)]
+pub struct CacheStats {
+    pub hits: u64,
+    pub misses: u64,
+    pub entries: usize,
+    pub capacity: usize,
+}
+
+/// A concurrent LRU cache of rewrite results, keyed by SQL text and the generation of
+/// the policy registry the rewrite was planned against.
+///
+/// Entries for an older generation are never returned, so registering or deleting a
+/// policy invalidates the cache without clearing it; stale entries age out. Capacity is
+/// split evenly across shards, so eviction is per shard and only approximately LRU
+/// overall. A capacity of zero disables caching.
+#[derive(Debug)]
+pub struct RewriteCache {
+    shards: Vec<Mutex<Shard>>,
+    shard_capacity: usize,
+    hits: AtomicU64,
+    misses: AtomicU64,
+}
+
+#[derive(Debug, Default)]
+struct Shard {
+    entries: HashMap<u64, Entry>,
+    /// Last-use tick to key, oldest first.
+    recency: BTreeMap<u64, u64>,
+    tick: u64,
+}
+
+#[derive(Debug)]
+struct Entry {
+    sql: String,
+    generation: u64,
+    value: Arc<RewriteExplanation>,
+    tick: u64,
+}
+
+impl Default for RewriteCache {
+    fn default() -> Self {
+        Self::new(DEFAULT_CACHE_SIZE)
+    }
+}
+
+impl RewriteCache {
+    pub fn new(capacity: usize) -> Self {
+        Self {
+            shards: (0..SHARDS).map(|_| Mutex::default()).collect(),
+            shard_capacity: capacity.div_ceil(SHARDS),
+            hits: AtomicU64::new(0),
+            misses: AtomicU64::new(0),
+        }
+    }
+
+    /// Return the cached rewrite of `sql` at `generation`, or compute and cache it.
+    /// The shard lock is not held while `compute` runs, so two threads missing on the
+    /// same query may both compute it.
+    pub fn get_or_try_insert<E>(
+        &self,
+        sql: &str,
+        generation: u64,
+        compute: impl FnOnce() -> Result<RewriteExplanation, E>,
+    ) -> Result<Arc<RewriteExplanation>, E> {
+        if self.shard_capacity == 0 {
+            return compute().map(Arc::new);
+        }
+        let key = cache_key(sql, generation);
+        let shard = &self.shards[key as usize % SHARDS];
+        if let Some(value) = lock(shard).get(key, sql, generation) {
+            self.hits.fetch_add(1, Ordering::Relaxed);
+            return Ok(value);
+        }
+        self.misses.fetch_add(1, Ordering::Relaxed);
+
+        let value = Arc::new(compute()?);
+        lock(shard).insert(
+            key,
+            sql,
+            generation,
+            Arc::clone(&value),
+            self.shard_capacity,
+        );
+        Ok(value)
+    }
+
+    pub fn clear(&self) {
+        for shard in &self.shards {
+            *lock(shard) = Shard::default();
+        }
+    }
+
+    pub fn stats(&self) -> CacheStats {
+        CacheStats {
+            hits: self.hits.load(Ordering::Relaxed),
+            misses: self.misses.load(Ordering::Relaxed),
+            entries: self
+                .shards
+                .iter()
+                .map(|shard| lock(shard).entries.len())
+                .sum(),
+            capacity: self.shard_capacity * SHARDS,
+        }
+    }
+}
+
+impl Shard {
+    fn get(&mut self, key: u64, sql: &str, generation: u64) -> Option<Arc<RewriteExplanation>> {
+        let tick = self.next_tick();
+        let entry = self
+            .entries
+            .get_mut(&key)
+            .filter(|entry| entry.generation == generation && entry.sql == sql)?;
+        self.recency.remove(&entry.tick);
+        self.recency.insert(tick, key);
+        entry.tick = tick;
+        Some(Arc::clone(&entry.value))
+    }
+
+    fn insert(
+        &mut self,
+        key: u64,
+        sql: &str,
+        generation: u64,
+        value: Arc<RewriteExplanation>,
+        capacity: usize,
+    ) {
+        let tick = self.next_tick();
+        if let Some(previous) = self.entries.remove(&key) {
+            self.recency.remove(&previous.tick);
+        }
+        while self.entries.len() >= capacity {
+            let Some((_, oldest)) = self.recency.pop_first() else {
+                break;
+            };
+            self.entries.remove(&oldest);
+        }
+        self.recency.insert(tick, key);
+        self.entries.insert(
+            key,
+            Entry {
+                sql: sql.to_string(),
+                generation,
+                value,
+                tick,
+            },
+        );
+    }
+
+    fn next_tick(&mut self) -> u64 {
+        self.tick += 1;
+        self.tick
+    }
+}
+
+fn cache_key(sql: &str, generation: u64) -> u64 {
+    let mut hasher = DefaultHasher::new();
+    sql.hash(&mut hasher);
+    generation.hash(&mut hasher);
+    hasher.finish()
+}
+
+/// A panic while holding a shard lock cannot leave an entry half-written, so a poisoned
+/// lock is still safe to use.
+fn lock(shard: &Mutex<Shard>) -> std::sync::MutexGuard<'_, Shard> {
+    shard
+        .lock()
+        .unwrap_or_else(|poisoned| poisoned.into_inner())
+}
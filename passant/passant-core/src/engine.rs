@@ -0,0 +1,69 @@
+use std::sync::Arc;
+
+use crate::cache::{CacheStats, DEFAULT_CACHE_SIZE, RewriteCache};
+use crate::explain::RewriteExplanation;
+use crate::parser::{ParseArtifact, ParseError};
+use crate::planner::PassantPlanner;
+use crate::policy::PolicyIr;
+use crate::registry::{PolicyId, PolicyRegistry, RegistryError};
+
+/// A long-lived rewriter: a planner, a registry of parsed policies and a cache of rewrites
+/// planned against them. Rewriting takes `&self` and is safe to share across threads;
+/// changing policies takes `&mut self`.
+#[derive(Debug)]
+pub struct RewriteEngine {
+    planner: PassantPlanner,
+    registry: PolicyRegistry,
+    cache: RewriteCache,
+}
+
+impl Default for RewriteEngine {
+    fn default() -> Self {
+        Self::new(DEFAULT_CACHE_SIZE)
+    }
+}
+
+impl RewriteEngine {
+    /// `cache_size` bounds the number of cached rewrites; 0 disables the cache.
+    pub fn new(cache_size: usize) -> Self {
+        Self {
+            planner: PassantPlanner::new(),
+            registry: PolicyRegistry::new(),
+            cache: RewriteCache::new(cache_size),
+        }
+    }
+
+    pub fn planner(&self) -> &PassantPlanner {
+        &self.planner
+    }
+
+    pub fn registry(&self) -> &PolicyRegistry {
+        &self.registry
+    }
+
+    pub fn register_policy(&mut self, policy: PolicyIr) -> Result<PolicyId, RegistryError> {
+        self.registry.register(policy)
+    }
+
+    pub fn delete_policy(&mut self, id: PolicyId) -> bool {
+        self.registry.delete(id)
+    }
+
+    /// Plan `sql` against the registered policies, reusing the cached plan when the same
+    /// SQL was planned against the current policy set.
+    pub fn rewrite(&self, sql: &str) -> Result<Arc<RewriteExplanation>, ParseError> {
+        self.cache
+            .get_or_try_insert(sql, self.registry.generation(), || {
+                let artifact = ParseArtifact::from_sql(sql)?;
+                Ok(self.planner.explain_registered(&artifact, &self.registry))
+            })
+    }
+
+    pub fn cache_stats(&self) -> CacheStats {
+        self.cache.stats()
+    }
+
+    pub fn clear_cache(&self) {
+        self.cache.clear();
+    }
+}
@@ -1,13 +1,35 @@
 use serde::{Deserialize, Serialize};
 
+/// An expression from the parsed query with what it references precomputed from the AST
+/// (see `analysis::analyze_expr`). Flags and references cover the expression's own scope,
+/// not subqueries nested inside it.
 #[derive(Debug, Clone, PartialEq, Eq, Serialize, Deserialize)]
 pub struct ExprRef {
     pub sql: String,
+    /// Whether an aggregate function (not a window function) appears in the expression.
+    #[serde(default)]
+    pub has_aggregate: bool,
+    #[serde(default)]
+    pub has_subquery: bool,
+    /// Distinct column references, lowercased and qualified as written.
+    #[serde(default)]
+    pub columns: Vec<String>,
+    /// Distinct table qualifiers of column references, lowercased.
+    #[serde(default)]
+    pub tables: Vec<String>,
 }
 
 impl ExprRef {
+    /// An expression known only by its SQL text, such as a wildcard projection; nothing
+    /// about what it references is recorded.
     pub fn new(sql: impl Into<String>) -> Self {
-        Self { sql: sql.into() }
+        Self {
+            sql: sql.into(),
+            has_aggregate: false,
+            has_subquery: false,
+            columns: Vec::new(),
+            tables: Vec::new(),
+        }
     }
 }
 
@@ -19,8 +41,23 @@ pub struct ProjectionItem {
 
 #[derive(Debug, Clone, PartialEq, Eq, Serialize, Deserialize)]
 pub struct TableRef {
+    /// For a named table, its `relation_name`; for a subquery, its SQL.
     pub name: String,
     pub alias: Option<String>,
+    /// Whether this is a subquery in FROM rather than a named table.
+    #[serde(default)]
+    pub derived: bool,
+    /// For a subquery, the tables it reads at any depth, with CTE references resolved to
+    /// the tables the CTE reads.
+    #[serde(default)]
+    pub sources: Vec<String>,
+}
+
+#[derive(Debug, Clone, PartialEq, Eq, Serialize, Deserialize)]
+pub struct CteRef {
+    pub name: String,
+    /// Tables the CTE reads at any depth, with references to earlier CTEs resolved.
+    pub sources: Vec<String>,
 }
 
 #[derive(Debug, Clone, PartialEq, Eq, Serialize, Deserialize)]
@@ -52,7 +89,7 @@ pub struct PassantSelect {
     pub group_by: Vec<ExprRef>,
     pub order_by: Vec<ExprRef>,
     pub limit: Option<ExprRef>,
-    pub ctes: Vec<String>,
+    pub ctes: Vec<CteRef>,
     pub is_distinct: bool,
     pub raw_sql: String,
 }
@@ -68,12 +105,67 @@ impl PassantSelect {
         visible
     }
 
+    pub fn source_tables(&self) -> Vec<String> {
+        self.from
+            .iter()
+            .flat_map(|from_item| from_item.tables.iter().map(|table| table.name.clone()))
+            .collect()
+    }
+
+    /// Whether the query reads through CTEs or FROM-clause subqueries, so policy columns
+    /// would have to be threaded through them.
+    pub fn has_nested_sources(&self) -> bool {
+        !self.ctes.is_empty()
+            || self
+                .from
+                .iter()
+                .flat_map(|from_item| &from_item.tables)
+                .any(|table| table.derived)
+    }
+
+    /// Tables read only through CTEs or FROM-clause subqueries, whose policy columns would
+    /// have to be threaded out to the root SELECT. Each name appears once.
+    pub fn nested_sources(&self) -> Vec<String> {
+        let derived = self
+            .from
+            .iter()
+            .flat_map(|from_item| &from_item.tables)
+            .filter(|table| table.derived)
+            .flat_map(|table| &table.sources);
+        let mut sources: Vec<String> = Vec::new();
+        for source in self.ctes.iter().flat_map(|cte| &cte.sources).chain(derived) {
+            if !sources.iter().any(|seen| seen.eq_ignore_ascii_case(source)) {
+                sources.push(source.clone());
+            }
+        }
+        sources
+    }
+
     pub fn is_aggregation(&self) -> bool {
         !self.group_by.is_empty()
+            || self.projection.iter().any(|item| item.expr.has_aggregate)
             || self
-                .projection
-                .iter()
-                .any(|item| contains_aggregate(&item.expr.sql))
+                .having
+                .as_ref()
+                .is_some_and(|having| having.has_aggregate)
+    }
+
+    /// Distinct columns referenced by the projection, WHERE, GROUP BY and HAVING.
+    pub fn referenced_columns(&self) -> Vec<String> {
+        let exprs = self
+            .projection
+            .iter()
+            .map(|item| &item.expr)
+            .chain(&self.where_clause)
+            .chain(&self.group_by)
+            .chain(&self.having);
+        let mut columns: Vec<String> = Vec::new();
+        for column in exprs.flat_map(|expr| &expr.columns) {
+            if !columns.contains(column) {
+                columns.push(column.clone());
+            }
+        }
+        columns
     }
 }
 
@@ -109,19 +201,3 @@ impl QueryIr {
         }
     }
 }
-
-fn contains_aggregate(sql: &str) -> bool {
-    let upper = sql.to_ascii_uppercase();
-    [
-        "COUNT(",
-        "SUM(",
-        "AVG(",
-        "MIN(",
-        "MAX(",
-        "ARRAY_AGG(",
-        "BOOL_AND(",
-        "BOOL_OR(",
-    ]
-    .iter()
-    .any(|needle| upper.contains(needle))
-}
@@ -1,13 +1,26 @@
+pub mod analysis;
+pub mod cache;
+pub mod engine;
 pub mod explain;
 pub mod ir;
 pub mod optimizer;
 pub mod parser;
 pub mod planner;
 pub mod policy;
+pub mod registry;
+pub mod rewrite;
+pub mod script;
 
+pub use analysis::{
+    StatementTables, analyze_expr, is_aggregate_function, query_tables, relation_name,
+    statement_tables,
+};
+pub use cache::{CacheStats, DEFAULT_CACHE_SIZE, RewriteCache};
+pub use engine::RewriteEngine;
 pub use explain::{ExplainStep, RewriteExplanation};
 pub use ir::{
-    Assignment, ExprRef, FromItem, JoinRef, PassantSelect, ProjectionItem, QueryIr, TableRef,
+    Assignment, CteRef, ExprRef, FromItem, JoinRef, PassantSelect, ProjectionItem, QueryIr,
+    TableRef,
 };
 pub use optimizer::{CandidatePlan, RewriteOptimizer, RewriteStrategy};
 pub use parser::{ParseArtifact, ParseError, parse_query, parse_query_to_ir};
@@ -15,3 +28,6 @@ pub use planner::{ChosenPlan, PassantPlanner, PlanQueryResult, ScopeInfo};
 pub use policy::{
     AggregateDfcPolicy, FlowGuardPolicy, FlowGuardPolicyKind, PolicyIr, PolicyScope, Resolution,
 };
+pub use registry::{PolicyId, PolicyRegistry, RegisteredPolicy, RegistryError};
+pub use rewrite::{RewriteError, SpliceTarget, splice_policies, splice_predicates};
+pub use script::StatementReader;
@@ -2,6 +2,7 @@ use serde::{Deserialize, Serialize};
 
 use crate::planner::ScopeInfo;
 use crate::policy::{PolicyIr, Resolution};
+use crate::rewrite::is_spliceable;
 
 #[derive(Debug, Clone, Copy, PartialEq, Eq, Serialize, Deserialize)]
 pub enum RewriteStrategy {
@@ -16,7 +17,6 @@ pub enum RewriteStrategy {
 #[derive(Debug, Clone, PartialEq, Eq, Serialize, Deserialize)]
 pub struct CandidatePlan {
     pub strategy: RewriteStrategy,
-    pub score: i32,
     pub reasons: Vec<String>,
     pub applied_policies: Vec<String>,
 }
@@ -25,13 +25,15 @@ pub struct CandidatePlan {
 pub struct RewriteOptimizer;
 
 impl RewriteOptimizer {
+    /// Candidate strategies for the query, most preferred first. Only the root strategies
+    /// (`RootFilter`, `AggregateInline`) rewrite the query, so they lead whenever every
+    /// applicable policy can be spliced; the others are listed for explain output.
     pub fn rank_candidates(&self, scope: &ScopeInfo, policies: &[PolicyIr]) -> Vec<CandidatePlan> {
         let mut candidates = Vec::new();
 
         if policies.is_empty() {
             candidates.push(CandidatePlan {
                 strategy: RewriteStrategy::CompatibilityFallback,
-                score: 0,
                 reasons: vec!["No applicable policies".to_string()],
                 applied_policies: Vec::new(),
             });
@@ -42,42 +44,34 @@ impl RewriteOptimizer {
             .iter()
             .map(|p| p.name().to_string())
             .collect::<Vec<_>>();
-        if scope.is_aggregation {
+        let mut push = |strategy, reason: &str| {
             candidates.push(CandidatePlan {
-                strategy: RewriteStrategy::AggregateInline,
-                score: 15 + scope.propagated_column_count as i32,
-                reasons: vec![
-                    "Query aggregates results; inline aggregate enforcement is possible".into(),
-                ],
+                strategy,
+                reasons: vec![reason.to_string()],
                 applied_policies: policy_names.clone(),
             });
-        } else {
-            candidates.push(CandidatePlan {
-                strategy: RewriteStrategy::RootFilter,
-                score: 10 + scope.propagated_column_count as i32,
-                reasons: vec!["Root-local filtering preserves original query shape".into()],
-                applied_policies: policy_names.clone(),
-            });
-        }
+        };
 
-        if scope.requires_projection_propagation {
-            candidates.push(CandidatePlan {
-                strategy: RewriteStrategy::ProjectionPropagation,
-                score: 40 + scope.propagated_column_count as i32 * 5,
-                reasons: vec![
-                    "Missing policy inputs must be exposed through a subquery or CTE".into(),
-                ],
-                applied_policies: policy_names.clone(),
-            });
+        // Root strategies splice predicates into the query, which only enforces REMOVE and
+        // KILL policies; anything else needs the compatibility path.
+        let spliceable = policies.iter().all(is_spliceable);
+        if spliceable && scope.is_aggregation {
+            push(
+                RewriteStrategy::AggregateInline,
+                "Query aggregates results; inline aggregate enforcement is possible",
+            );
+        } else if spliceable {
+            push(
+                RewriteStrategy::RootFilter,
+                "Root-local filtering preserves original query shape",
+            );
         }
 
         if scope.has_sink_mapping {
-            candidates.push(CandidatePlan {
-                strategy: RewriteStrategy::SinkMappedRewrite,
-                score: 20,
-                reasons: vec!["Sink-side references can be remapped to output assignments".into()],
-                applied_policies: policy_names.clone(),
-            });
+            push(
+                RewriteStrategy::SinkMappedRewrite,
+                "Sink-side references can be remapped to output assignments",
+            );
         }
 
         if policies
@@ -85,22 +79,23 @@ impl RewriteOptimizer {
             .any(|policy| matches!(policy.resolution(), Resolution::Invalidate))
             && scope.has_finalize_capable_sink
         {
-            candidates.push(CandidatePlan {
-                strategy: RewriteStrategy::FinalizeAggregate,
-                score: 35,
-                reasons: vec!["Aggregate invalidation can be deferred to finalize metadata".into()],
-                applied_policies: policy_names.clone(),
-            });
+            push(
+                RewriteStrategy::FinalizeAggregate,
+                "Aggregate invalidation can be deferred to finalize metadata",
+            );
         }
 
-        candidates.push(CandidatePlan {
-            strategy: RewriteStrategy::CompatibilityFallback,
-            score: 100,
-            reasons: vec!["Legacy-compatible fallback preserves output stability".into()],
-            applied_policies: policy_names,
-        });
+        if scope.requires_projection_propagation {
+            push(
+                RewriteStrategy::ProjectionPropagation,
+                "Missing policy inputs must be exposed through a subquery or CTE",
+            );
+        }
 
-        candidates.sort_by_key(|candidate| candidate.score);
+        push(
+            RewriteStrategy::CompatibilityFallback,
+            "Legacy-compatible fallback preserves output stability",
+        );
         candidates
     }
 }
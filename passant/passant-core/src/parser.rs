@@ -6,8 +6,10 @@ use sqlparser::dialect::DuckDbDialect;
 use sqlparser::parser::Parser;
 use thiserror::Error;
 
+use crate::analysis::{analyze_expr, query_tables, relation_name};
 use crate::ir::{
-    Assignment, ExprRef, FromItem, JoinRef, PassantSelect, ProjectionItem, QueryIr, TableRef,
+    Assignment, CteRef, ExprRef, FromItem, JoinRef, PassantSelect, ProjectionItem, QueryIr,
+    TableRef,
 };
 
 #[derive(Debug, Error)]
@@ -37,25 +39,26 @@ pub fn parse_query(sql: &str) -> Result<Statement, ParseError> {
 
 pub fn parse_query_to_ir(sql: &str) -> Result<QueryIr, ParseError> {
     let statement = parse_query(sql)?;
-    lower_statement(statement, sql)
+    lower_statement(&statement, sql)
 }
 
 impl ParseArtifact {
     pub fn from_sql(sql: &str) -> Result<Self, ParseError> {
         let statement = parse_query(sql)?;
-        let ir = lower_statement(statement.clone(), sql)?;
+        let ir = lower_statement(&statement, sql)?;
         Ok(Self { statement, ir })
     }
 }
 
-fn lower_statement(statement: Statement, raw_sql: &str) -> Result<QueryIr, ParseError> {
+fn lower_statement(statement: &Statement, raw_sql: &str) -> Result<QueryIr, ParseError> {
     match statement {
-        Statement::Query(query) => lower_query(*query, raw_sql),
+        Statement::Query(query) => lower_query(query, raw_sql),
         Statement::Insert(insert) => {
             let source = insert
                 .source
+                .as_deref()
                 .ok_or_else(|| ParseError::Unsupported("insert without source query".into()))?;
-            let source_ir = lower_query(*source, raw_sql)?;
+            let source_ir = lower_query(source, raw_sql)?;
             let select = match source_ir {
                 QueryIr::Select(select) => select,
                 _ => {
@@ -67,10 +70,12 @@ fn lower_statement(statement: Statement, raw_sql: &str) -> Result<QueryIr, Parse
             };
             Ok(QueryIr::InsertSelect {
                 sink: TableRef {
-                    name: insert.table_name.to_string(),
+                    name: relation_name(&insert.table_name),
                     alias: None,
+                    derived: false,
+                    sources: Vec::new(),
                 },
-                columns: insert.columns.into_iter().map(|c| c.value).collect(),
+                columns: insert.columns.iter().map(|c| c.value.clone()).collect(),
                 select: Box::new(select),
                 raw_sql: raw_sql.to_string(),
             })
@@ -83,37 +88,36 @@ fn lower_statement(statement: Statement, raw_sql: &str) -> Result<QueryIr, Parse
             ..
         } => {
             let from_items = from
-                .into_iter()
-                .map(lower_table_with_joins)
+                .iter()
+                .map(|item| lower_table_with_joins(item, &[]))
                 .collect::<Result<Vec<_>, _>>()?;
             Ok(QueryIr::Update {
-                sink: lower_table_factor(table.relation)?,
-                assignments: assignments.into_iter().map(lower_assignment).collect(),
+                sink: lower_table_factor(&table.relation, &[])?,
+                assignments: assignments.iter().map(lower_assignment).collect(),
                 from: from_items,
-                where_clause: selection.map(expr_to_ref),
+                where_clause: selection.as_ref().map(expr_to_ref),
                 raw_sql: raw_sql.to_string(),
             })
         }
         other => Ok(QueryIr::Passthrough {
-            statement_type: statement_kind(&other).to_string(),
+            statement_type: statement_kind(other).to_string(),
             raw_sql: raw_sql.to_string(),
         }),
     }
 }
 
-fn lower_query(query: Query, raw_sql: &str) -> Result<QueryIr, ParseError> {
-    let with = query
-        .with
-        .map(|with| {
-            with.cte_tables
-                .into_iter()
-                .map(|cte| cte.alias.name.value)
-                .collect::<Vec<_>>()
-        })
-        .unwrap_or_default();
+fn lower_query(query: &Query, raw_sql: &str) -> Result<QueryIr, ParseError> {
+    let mut ctes: Vec<CteRef> = Vec::new();
+    for cte in query.with.iter().flat_map(|with| &with.cte_tables) {
+        let sources = resolve_sources(query_tables(&cte.query), &ctes);
+        ctes.push(CteRef {
+            name: cte.alias.name.value.clone(),
+            sources,
+        });
+    }
 
-    let body = match *query.body {
-        SetExpr::Select(select) => *select,
+    let body = match query.body.as_ref() {
+        SetExpr::Select(select) => select.as_ref(),
         other => {
             return Ok(QueryIr::Passthrough {
                 statement_type: format!("query::{other:?}"),
@@ -124,41 +128,37 @@ fn lower_query(query: Query, raw_sql: &str) -> Result<QueryIr, ParseError> {
 
     let order_by = query
         .order_by
-        .into_iter()
+        .iter()
         .map(|expr| ExprRef::new(expr.to_string()))
         .collect();
-    let limit = query.limit.map(expr_to_ref);
+    let limit = query.limit.as_ref().map(expr_to_ref);
 
     Ok(QueryIr::Select(lower_select(
-        body, order_by, limit, with, raw_sql,
+        body, order_by, limit, ctes, raw_sql,
     )?))
 }
 
 fn lower_select(
-    select: Select,
+    select: &Select,
     order_by: Vec<ExprRef>,
     limit: Option<ExprRef>,
-    ctes: Vec<String>,
+    ctes: Vec<CteRef>,
     raw_sql: &str,
 ) -> Result<PassantSelect, ParseError> {
     let from = select
         .from
-        .into_iter()
-        .map(lower_table_with_joins)
+        .iter()
+        .map(|item| lower_table_with_joins(item, &ctes))
         .collect::<Result<Vec<_>, _>>()?;
 
     Ok(PassantSelect {
-        projection: select
-            .projection
-            .into_iter()
-            .map(lower_projection)
-            .collect(),
+        projection: select.projection.iter().map(lower_projection).collect(),
         from,
-        where_clause: select.selection.map(expr_to_ref),
-        having: select.having.map(expr_to_ref),
-        group_by: match select.group_by {
+        where_clause: select.selection.as_ref().map(expr_to_ref),
+        having: select.having.as_ref().map(expr_to_ref),
+        group_by: match &select.group_by {
             sqlparser::ast::GroupByExpr::Expressions(exprs, _) => {
-                exprs.into_iter().map(expr_to_ref).collect()
+                exprs.iter().map(expr_to_ref).collect()
             }
             _ => Vec::new(),
         },
@@ -170,7 +170,7 @@ fn lower_select(
     })
 }
 
-fn lower_projection(item: SelectItem) -> ProjectionItem {
+fn lower_projection(item: &SelectItem) -> ProjectionItem {
     match item {
         SelectItem::UnnamedExpr(expr) => ProjectionItem {
             expr: expr_to_ref(expr),
@@ -178,7 +178,7 @@ fn lower_projection(item: SelectItem) -> ProjectionItem {
         },
         SelectItem::ExprWithAlias { expr, alias } => ProjectionItem {
             expr: expr_to_ref(expr),
-            alias: Some(alias.value),
+            alias: Some(alias.value.clone()),
         },
         other => ProjectionItem {
             expr: ExprRef::new(other.to_string()),
@@ -187,54 +187,94 @@ fn lower_projection(item: SelectItem) -> ProjectionItem {
     }
 }
 
-fn lower_table_with_joins(table: TableWithJoins) -> Result<FromItem, ParseError> {
-    let base = lower_table_factor(table.relation)?;
+fn lower_table_with_joins(table: &TableWithJoins, ctes: &[CteRef]) -> Result<FromItem, ParseError> {
+    let base = lower_table_factor(&table.relation, ctes)?;
+    let relation_sql = match &table.relation {
+        TableFactor::Table { name, .. } => name.to_string(),
+        _ => base.name.clone(),
+    };
+    let mut tables = vec![base.clone()];
     let joins = table
         .joins
-        .into_iter()
-        .map(|join| JoinRef {
-            relation_sql: join.relation.to_string(),
-            condition_sql: join_constraint_sql(&join.join_operator),
+        .iter()
+        .map(|join| {
+            let relation_sql = join.relation.to_string();
+            // Joined tables are visible to policies too; other join factors are kept as SQL.
+            if let Ok(joined) = lower_table_factor(&join.relation, ctes) {
+                tables.push(joined);
+            }
+            JoinRef {
+                relation_sql,
+                condition_sql: join_constraint_sql(&join.join_operator),
+            }
         })
         .collect::<Vec<_>>();
 
     Ok(FromItem {
-        relation_sql: base.name.clone(),
-        alias: base.alias.clone(),
-        tables: vec![base],
+        relation_sql,
+        alias: base.alias,
+        tables,
         joins,
     })
 }
 
-fn lower_table_factor(factor: TableFactor) -> Result<TableRef, ParseError> {
+/// `ctes` are the CTEs in scope, used to resolve the tables a subquery reads.
+fn lower_table_factor(factor: &TableFactor, ctes: &[CteRef]) -> Result<TableRef, ParseError> {
     match factor {
         TableFactor::Table { name, alias, .. } => Ok(TableRef {
-            name: name.to_string(),
-            alias: alias.map(alias_to_name),
+            name: relation_name(name),
+            alias: alias.as_ref().map(alias_to_name),
+            derived: false,
+            sources: Vec::new(),
         }),
         TableFactor::Derived {
             alias, subquery, ..
         } => Ok(TableRef {
             name: format!("({subquery})"),
-            alias: alias.map(alias_to_name),
+            alias: alias.as_ref().map(alias_to_name),
+            derived: true,
+            sources: resolve_sources(query_tables(subquery), ctes),
         }),
         other => Err(ParseError::Unsupported(format!("table factor {other:?}"))),
     }
 }
 
-fn lower_assignment(assignment: SqlAssignment) -> Assignment {
+fn lower_assignment(assignment: &SqlAssignment) -> Assignment {
     Assignment {
         column: assignment.target.to_string(),
-        value: expr_to_ref(assignment.value),
+        value: expr_to_ref(&assignment.value),
     }
 }
 
-fn expr_to_ref(expr: Expr) -> ExprRef {
-    ExprRef::new(expr.to_string())
+fn expr_to_ref(expr: &Expr) -> ExprRef {
+    analyze_expr(expr)
+}
+
+/// Replace references to CTEs in `tables` with the tables those CTEs read.
+fn resolve_sources(tables: Vec<String>, ctes: &[CteRef]) -> Vec<String> {
+    let mut sources: Vec<String> = Vec::new();
+    for table in tables {
+        let resolved = match ctes
+            .iter()
+            .find(|cte| cte.name.eq_ignore_ascii_case(&table))
+        {
+            Some(cte) => cte.sources.clone(),
+            None => vec![table],
+        };
+        for source in resolved {
+            if !sources
+                .iter()
+                .any(|seen| seen.eq_ignore_ascii_case(&source))
+            {
+                sources.push(source);
+            }
+        }
+    }
+    sources
 }
 
-fn alias_to_name(alias: TableAlias) -> String {
-    alias.name.value
+fn alias_to_name(alias: &TableAlias) -> String {
+    alias.name.value.clone()
 }
 
 fn join_constraint_sql(operator: &JoinOperator) -> Option<String> {
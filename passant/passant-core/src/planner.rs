@@ -1,16 +1,29 @@
 use serde::{Deserialize, Serialize};
+use sqlparser::ast::Statement;
 
+use crate::analysis::{StatementTables, statement_tables};
 use crate::explain::{ExplainStep, RewriteExplanation};
-use crate::ir::QueryIr;
+use crate::ir::{PassantSelect, QueryIr};
 use crate::optimizer::{CandidatePlan, RewriteOptimizer, RewriteStrategy};
+use crate::parser::{ParseArtifact, parse_query};
 use crate::policy::PolicyIr;
+use crate::registry::PolicyRegistry;
+use crate::rewrite::{SpliceTarget, policy_columns, splice_policies, splice_predicates};
 
 #[derive(Debug, Clone, PartialEq, Eq, Serialize, Deserialize)]
 pub struct ScopeInfo {
     pub visible_tables: Vec<String>,
+    /// Names of the tables the root SELECT reads directly.
+    pub source_tables: Vec<String>,
     pub is_aggregation: bool,
+    /// Whether policy columns must be threaded through CTEs or FROM-clause subqueries.
     pub requires_projection_propagation: bool,
+    /// Distinct columns referenced by the applicable policies' constraints.
     pub propagated_column_count: usize,
+    /// Applicable policy sources that the query reads inside CTEs or subqueries, whose
+    /// policy columns would have to be threaded out to the root SELECT.
+    #[serde(default)]
+    pub propagation_tables: Vec<String>,
     pub has_sink_mapping: bool,
     pub has_finalize_capable_sink: bool,
 }
@@ -20,6 +33,19 @@ pub struct ChosenPlan {
     pub strategy: RewriteStrategy,
     pub rewritten_sql: String,
     pub finalize_metadata: Vec<String>,
+    /// Why the applicable policies could not be enforced. When set, `rewritten_sql` is the
+    /// unmodified query and must not be run in place of a rewrite; see `enforced_sql`.
+    pub fallback_reason: Option<String>,
+}
+
+impl ChosenPlan {
+    /// The SQL to run, or why the applicable policies could not be enforced.
+    pub fn enforced_sql(&self) -> Result<&str, &str> {
+        match &self.fallback_reason {
+            Some(reason) => Err(reason),
+            None => Ok(&self.rewritten_sql),
+        }
+    }
 }
 
 #[derive(Debug, Clone, PartialEq, Eq, Serialize, Deserialize)]
@@ -40,11 +66,55 @@ impl PassantPlanner {
         Self::default()
     }
 
+    /// Plan a query lowered to IR. The statement is re-parsed from the IR's SQL; use
+    /// `plan_artifact` to reuse an existing parse.
     pub fn plan_query(&self, query: &QueryIr, policies: &[PolicyIr]) -> PlanQueryResult {
-        let scope = self.scope_info(query, policies);
-        let applicable_policies = self.matching_policies(query, policies);
+        let statement = parse_query(query.raw_sql()).ok();
+        self.plan(query, statement.as_ref(), policies)
+    }
+
+    pub fn plan_artifact(
+        &self,
+        artifact: &ParseArtifact,
+        policies: &[PolicyIr],
+    ) -> PlanQueryResult {
+        self.plan(&artifact.ir, Some(&artifact.statement), policies)
+    }
+
+    /// Plan a parsed query against every matching policy in the registry, splicing the
+    /// predicates the registry built at registration instead of re-parsing constraints.
+    pub fn plan_registered(
+        &self,
+        artifact: &ParseArtifact,
+        registry: &PolicyRegistry,
+    ) -> PlanQueryResult {
+        let query = &artifact.ir;
+        let tables = read_tables(query, Some(&artifact.statement));
+        let sink = sink_name(query);
+        let registered = registry.matching(&tables.all, sink.as_deref());
+        let applicable_policies = registered
+            .iter()
+            .map(|registered| registered.policy.clone())
+            .collect::<Vec<_>>();
+        let mut columns = registered
+            .iter()
+            .flat_map(|registered| &registered.columns)
+            .collect::<Vec<_>>();
+        columns.sort_unstable();
+        columns.dedup();
+        let scope = self.scope_info(query, &tables, &applicable_policies, columns.len());
         let candidates = self.optimizer.rank_candidates(&scope, &applicable_policies);
-        let chosen = self.choose_plan(query, &scope, &candidates);
+        let chosen = self.choose_plan(query, &scope, &applicable_policies, &candidates, |target| {
+            let predicates = registered
+                .iter()
+                .map(|registered| registered.predicate(target).cloned())
+                .collect::<Result<Vec<_>, _>>()
+                .map_err(str::to_string)?;
+            let mut statement = artifact.statement.clone();
+            splice_predicates(&mut statement, predicates, target)
+                .map(|()| statement.to_string())
+                .map_err(|err| err.to_string())
+        });
 
         PlanQueryResult {
             scope,
@@ -54,57 +124,67 @@ impl PassantPlanner {
         }
     }
 
-    pub fn explain_rewrite(&self, query: &QueryIr, policies: &[PolicyIr]) -> RewriteExplanation {
-        let result = self.plan_query(query, policies);
-        let mut steps = vec![
-            ExplainStep {
-                stage: "parse".into(),
-                detail: format!("Lowered statement into {:?}", query_variant_name(query)),
-            },
-            ExplainStep {
-                stage: "analyze".into(),
-                detail: format!(
-                    "Visible tables: {}; aggregation={}",
-                    result.scope.visible_tables.join(", "),
-                    result.scope.is_aggregation
-                ),
-            },
-            ExplainStep {
-                stage: "optimize".into(),
-                detail: format!(
-                    "Chose {:?} from {} candidate(s)",
-                    result.chosen.strategy,
-                    result.candidates.len()
-                ),
-            },
-        ];
+    fn plan(
+        &self,
+        query: &QueryIr,
+        statement: Option<&Statement>,
+        policies: &[PolicyIr],
+    ) -> PlanQueryResult {
+        let tables = read_tables(query, statement);
+        let applicable_policies = self.matching_policies(query, &tables, policies);
+        let mut columns = applicable_policies
+            .iter()
+            .flat_map(policy_columns)
+            .collect::<Vec<_>>();
+        columns.sort_unstable();
+        columns.dedup();
+        let scope = self.scope_info(query, &tables, &applicable_policies, columns.len());
+        let candidates = self.optimizer.rank_candidates(&scope, &applicable_policies);
+        let chosen = self.choose_plan(query, &scope, &applicable_policies, &candidates, |target| {
+            statement
+                .cloned()
+                .ok_or_else(|| "statement could not be re-parsed".to_string())
+                .and_then(|mut statement| {
+                    splice_policies(&mut statement, &applicable_policies, target)
+                        .map(|()| statement.to_string())
+                        .map_err(|err| err.to_string())
+                })
+        });
 
-        if result.scope.requires_projection_propagation {
-            steps.push(ExplainStep {
-                stage: "propagation".into(),
-                detail: format!(
-                    "Planner marked {} propagated policy column(s)",
-                    result.scope.propagated_column_count
-                ),
-            });
+        PlanQueryResult {
+            scope,
+            applicable_policies,
+            candidates,
+            chosen,
         }
+    }
 
-        RewriteExplanation {
-            scope: result.scope,
-            candidates: result.candidates,
-            chosen: result.chosen,
-            steps,
-        }
+    pub fn explain_rewrite(&self, query: &QueryIr, policies: &[PolicyIr]) -> RewriteExplanation {
+        explain(query, self.plan_query(query, policies))
     }
 
-    fn matching_policies(&self, query: &QueryIr, policies: &[PolicyIr]) -> Vec<PolicyIr> {
-        let visible = visible_tables(query);
+    /// Explain the plan `plan_registered` chooses for a parsed query.
+    pub fn explain_registered(
+        &self,
+        artifact: &ParseArtifact,
+        registry: &PolicyRegistry,
+    ) -> RewriteExplanation {
+        explain(&artifact.ir, self.plan_registered(artifact, registry))
+    }
+
+    fn matching_policies(
+        &self,
+        query: &QueryIr,
+        tables: &StatementTables,
+        policies: &[PolicyIr],
+    ) -> Vec<PolicyIr> {
+        let sources = &tables.all;
         let sink = sink_name(query);
         policies
             .iter()
             .filter(|policy| {
                 let sources_match = policy.sources().iter().all(|source| {
-                    visible
+                    sources
                         .iter()
                         .any(|table| table.eq_ignore_ascii_case(source))
                 });
@@ -120,19 +200,37 @@ impl PassantPlanner {
             .collect()
     }
 
-    fn scope_info(&self, query: &QueryIr, policies: &[PolicyIr]) -> ScopeInfo {
-        let visible = visible_tables(query);
-        let propagated_column_count = policies
-            .iter()
-            .map(|policy| policy.constraint().matches('.').count())
-            .sum();
-
+    fn scope_info(
+        &self,
+        query: &QueryIr,
+        tables: &StatementTables,
+        policies: &[PolicyIr],
+        propagated_column_count: usize,
+    ) -> ScopeInfo {
+        let select = query_select(query);
+        let mut propagation_tables: Vec<String> = Vec::new();
+        for source in policies.iter().flat_map(PolicyIr::sources) {
+            let nested = tables
+                .nested
+                .iter()
+                .any(|table| table.eq_ignore_ascii_case(source));
+            let seen = propagation_tables
+                .iter()
+                .any(|table| table.eq_ignore_ascii_case(source));
+            if nested && !seen {
+                propagation_tables.push(source.clone());
+            }
+        }
         ScopeInfo {
-            visible_tables: visible,
+            visible_tables: visible_tables(query),
+            source_tables: select
+                .map(PassantSelect::source_tables)
+                .unwrap_or_else(|| source_tables(query)),
             is_aggregation: query_is_aggregation(query),
-            requires_projection_propagation: query.raw_sql().contains("SELECT * FROM (")
-                || query.raw_sql().contains("WITH "),
+            requires_projection_propagation: select
+                .is_some_and(|select| select.has_nested_sources()),
             propagated_column_count,
+            propagation_tables,
             has_sink_mapping: matches!(
                 query,
                 QueryIr::InsertSelect { .. } | QueryIr::Update { .. }
@@ -141,17 +239,45 @@ impl PassantPlanner {
         }
     }
 
+    /// Pick the top-ranked strategy and call `splice` to enforce the applicable policies in
+    /// the root SELECT. Policies that cannot be spliced there (unspliceable resolutions,
+    /// sources read inside CTEs or subqueries, statements without a root SELECT) are not
+    /// enforced: the plan falls back with `fallback_reason` set, so callers refuse to run it.
     fn choose_plan(
         &self,
         query: &QueryIr,
         scope: &ScopeInfo,
+        policies: &[PolicyIr],
         candidates: &[CandidatePlan],
+        splice: impl FnOnce(SpliceTarget) -> Result<String, String>,
     ) -> ChosenPlan {
-        let chosen = candidates
+        let mut chosen = candidates
             .first()
             .map(|candidate| candidate.strategy)
             .unwrap_or(RewriteStrategy::CompatibilityFallback);
 
+        let outcome = if policies.is_empty() {
+            Ok(None)
+        } else if !scope.propagation_tables.is_empty() {
+            Err(format!(
+                "policy sources read inside a CTE or subquery cannot be enforced at the root: {}",
+                scope.propagation_tables.join(", ")
+            ))
+        } else if chosen == RewriteStrategy::AggregateInline {
+            splice(SpliceTarget::Having).map(Some)
+        } else {
+            // Only RootFilter splices successfully here; for any other strategy some policy
+            // is unspliceable and splicing reports which.
+            splice(SpliceTarget::Where).map(Some)
+        };
+        let (body, fallback_reason) = match outcome {
+            Ok(body) => (body, None),
+            Err(reason) => {
+                chosen = RewriteStrategy::CompatibilityFallback;
+                (None, Some(reason))
+            }
+        };
+
         let prefix = match chosen {
             RewriteStrategy::RootFilter => "-- passant: root_filter",
             RewriteStrategy::ProjectionPropagation => "-- passant: projection_propagation",
@@ -167,11 +293,110 @@ impl PassantPlanner {
             Vec::new()
         };
 
+        let body = body.as_deref().unwrap_or_else(|| query.raw_sql());
         ChosenPlan {
             strategy: chosen,
-            rewritten_sql: format!("{prefix}\n{}", query.raw_sql()),
+            rewritten_sql: format!("{prefix}\n{body}"),
             finalize_metadata,
+            fallback_reason,
+        }
+    }
+}
+
+fn explain(query: &QueryIr, result: PlanQueryResult) -> RewriteExplanation {
+    let mut steps = vec![
+        ExplainStep {
+            stage: "parse".into(),
+            detail: format!("Lowered statement into {:?}", query_variant_name(query)),
+        },
+        ExplainStep {
+            stage: "analyze".into(),
+            detail: format!(
+                "Visible tables: {}; aggregation={}",
+                result.scope.visible_tables.join(", "),
+                result.scope.is_aggregation
+            ),
+        },
+        ExplainStep {
+            stage: "optimize".into(),
+            detail: format!(
+                "Chose {:?} from {} candidate(s)",
+                result.chosen.strategy,
+                result.candidates.len()
+            ),
+        },
+    ];
+
+    if let Some(reason) = &result.chosen.fallback_reason {
+        steps.push(ExplainStep {
+            stage: "fallback".into(),
+            detail: reason.clone(),
+        });
+    }
+
+    if result.scope.requires_projection_propagation {
+        steps.push(ExplainStep {
+            stage: "propagation".into(),
+            detail: if result.scope.propagation_tables.is_empty() {
+                format!(
+                    "Planner marked {} propagated policy column(s)",
+                    result.scope.propagated_column_count
+                )
+            } else {
+                format!(
+                    "Planner marked {} propagated policy column(s) read through {}",
+                    result.scope.propagated_column_count,
+                    result.scope.propagation_tables.join(", ")
+                )
+            },
+        });
+    }
+
+    RewriteExplanation {
+        scope: result.scope,
+        candidates: result.candidates,
+        chosen: result.chosen,
+        steps,
+    }
+}
+
+/// The tables a query, INSERT or UPDATE references; for an INSERT, those of its source
+/// query, since the sink is matched separately. Other statements (DDL, DELETE, ...) are
+/// passed through unchanged, so no policy applies to them.
+fn read_tables(query: &QueryIr, statement: Option<&Statement>) -> StatementTables {
+    if let QueryIr::Passthrough { statement_type, .. } = query {
+        if statement_type != "insert" && !statement_type.starts_with("query::") {
+            return StatementTables::default();
+        }
+    }
+    match statement {
+        Some(Statement::Insert(insert)) => insert
+            .source
+            .as_deref()
+            .map(statement_tables)
+            .unwrap_or_default(),
+        Some(statement) => statement_tables(statement),
+        None => StatementTables {
+            all: source_tables(query),
+            nested: query_select(query)
+                .map(PassantSelect::nested_sources)
+                .unwrap_or_default(),
+        },
+    }
+}
+
+fn source_tables(query: &QueryIr) -> Vec<String> {
+    match query {
+        QueryIr::Select(select) => select.source_tables(),
+        QueryIr::InsertSelect { select, .. } => select.source_tables(),
+        QueryIr::Update { sink, from, .. } => {
+            let mut tables = vec![sink.name.clone()];
+            for item in from {
+                tables.extend(item.tables.iter().map(|table| table.name.clone()));
+            }
+            tables
         }
+        QueryIr::Passthrough { .. } => Vec::new(),
     }
 }
 
@@ -204,14 +429,18 @@ fn sink_name(query: &QueryIr) -> Option<String> {
     }
 }
 
-fn query_is_aggregation(query: &QueryIr) -> bool {
+fn query_select(query: &QueryIr) -> Option<&PassantSelect> {
     match query {
-        QueryIr::Select(select) => select.is_aggregation(),
-        QueryIr::InsertSelect { select, .. } => select.is_aggregation(),
-        _ => false,
+        QueryIr::Select(select) => Some(select),
+        QueryIr::InsertSelect { select, .. } => Some(select),
+        _ => None,
     }
 }
 
+fn query_is_aggregation(query: &QueryIr) -> bool {
+    query_select(query).is_some_and(PassantSelect::is_aggregation)
+}
+
 fn query_variant_name(query: &QueryIr) -> &'static str {
     match query {
         QueryIr::Select(_) => "select",
@@ -1,3 +1,5 @@
+use std::str::FromStr;
+
 use serde::{Deserialize, Serialize};
 
 #[derive(Debug, Clone, Copy, PartialEq, Eq, Serialize, Deserialize)]
@@ -9,6 +11,22 @@ pub enum Resolution {
     Llm,
 }
 
+impl FromStr for Resolution {
+    type Err = String;
+
+    /// Parse a resolution as written in policies, e.g. `REMOVE` or `invalidate_message`.
+    fn from_str(value: &str) -> Result<Self, Self::Err> {
+        match value.to_ascii_uppercase().as_str() {
+            "REMOVE" => Ok(Resolution::Remove),
+            "KILL" => Ok(Resolution::Kill),
+            "INVALIDATE" => Ok(Resolution::Invalidate),
+            "INVALIDATE_MESSAGE" => Ok(Resolution::InvalidateMessage),
+            "LLM" => Ok(Resolution::Llm),
+            _ => Err(format!("unknown resolution {value}")),
+        }
+    }
+}
+
 #[derive(Debug, Clone, PartialEq, Eq, Serialize, Deserialize)]
 pub enum FlowGuardPolicyKind {
     Over,
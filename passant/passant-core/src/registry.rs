@@ -0,0 +1,178 @@
+use std::collections::HashMap;
+
+use sqlparser::ast::Expr;
+use thiserror::Error;
+
+use crate::policy::PolicyIr;
+use crate::rewrite::{RewriteError, SpliceTarget, parse_expr, policy_columns, policy_predicate};
+
+pub type PolicyId = u64;
+
+#[derive(Debug, Error)]
+pub enum RegistryError {
+    #[error("invalid policy constraint {constraint:?}: {message}")]
+    Constraint { constraint: String, message: String },
+}
+
+/// A registered policy with its constraint parsed once, at registration.
+#[derive(Debug, Clone)]
+pub struct RegisteredPolicy {
+    pub id: PolicyId,
+    pub policy: PolicyIr,
+    /// Columns the constraint references, reported as `ScopeInfo::propagated_column_count`.
+    pub columns: Vec<String>,
+    /// Predicates for the WHERE and HAVING splice targets, or why the policy cannot be
+    /// spliced (e.g. INVALIDATE policies, or constraints referencing the sink).
+    where_predicate: Result<Expr, String>,
+    having_predicate: Result<Expr, String>,
+}
+
+impl RegisteredPolicy {
+    pub fn predicate(&self, target: SpliceTarget) -> Result<&Expr, &str> {
+        let predicate = match target {
+            SpliceTarget::Where => &self.where_predicate,
+            SpliceTarget::Having => &self.having_predicate,
+        };
+        predicate.as_ref().map_err(String::as_str)
+    }
+}
+
+/// Registered policies indexed by source and sink table, so matching a query only
+/// looks at policies that can apply to it.
+///
+/// A policy with sources is indexed under its first source, since every source must be
+/// present for it to match. A policy without sources is indexed under its sink, and one
+/// with neither applies to every query.
+#[derive(Debug, Default)]
+pub struct PolicyRegistry {
+    policies: HashMap<PolicyId, RegisteredPolicy>,
+    by_source: HashMap<String, Vec<PolicyId>>,
+    by_sink: HashMap<String, Vec<PolicyId>>,
+    unscoped: Vec<PolicyId>,
+    next_id: PolicyId,
+    generation: u64,
+}
+
+impl PolicyRegistry {
+    pub fn new() -> Self {
+        Self::default()
+    }
+
+    pub fn len(&self) -> usize {
+        self.policies.len()
+    }
+
+    pub fn is_empty(&self) -> bool {
+        self.policies.is_empty()
+    }
+
+    /// Incremented whenever a policy is registered or deleted, so cached rewrites can tell
+    /// which policy set they were planned against.
+    pub fn generation(&self) -> u64 {
+        self.generation
+    }
+
+    /// Parse and index a policy, returning the id to delete it with.
+    pub fn register(&mut self, policy: PolicyIr) -> Result<PolicyId, RegistryError> {
+        if !matches!(policy, PolicyIr::NativeFlowGuard(_)) {
+            parse_expr(policy.constraint()).map_err(|err| RegistryError::Constraint {
+                constraint: policy.constraint().to_string(),
+                message: err.to_string(),
+            })?;
+        }
+        let prepare = |target| {
+            policy_predicate(&policy, target).map_err(|err| match err {
+                RewriteError::Constraint { source, .. } => source.to_string(),
+                RewriteError::Unsupported(reason) => reason,
+            })
+        };
+        let where_predicate = prepare(SpliceTarget::Where);
+        let having_predicate = prepare(SpliceTarget::Having);
+        let columns = policy_columns(&policy);
+
+        let id = self.next_id;
+        self.next_id += 1;
+        self.generation += 1;
+        self.index_for(&policy).push(id);
+        self.policies.insert(
+            id,
+            RegisteredPolicy {
+                id,
+                policy,
+                columns,
+                where_predicate,
+                having_predicate,
+            },
+        );
+        Ok(id)
+    }
+
+    /// Remove a policy. Returns false if no policy has this id.
+    pub fn delete(&mut self, id: PolicyId) -> bool {
+        let Some(registered) = self.policies.remove(&id) else {
+            return false;
+        };
+        self.index_for(&registered.policy)
+            .retain(|other| *other != id);
+        self.generation += 1;
+        true
+    }
+
+    pub fn get(&self, id: PolicyId) -> Option<&RegisteredPolicy> {
+        self.policies.get(&id)
+    }
+
+    /// All registered policies, in registration order.
+    pub fn policies(&self) -> Vec<&RegisteredPolicy> {
+        let mut policies = self.policies.values().collect::<Vec<_>>();
+        policies.sort_unstable_by_key(|registered| registered.id);
+        policies
+    }
+
+    /// Policies whose sources are all among `sources` and whose sink, if any, is `sink`,
+    /// in registration order. Table names compare case-insensitively.
+    pub fn matching(&self, sources: &[String], sink: Option<&str>) -> Vec<&RegisteredPolicy> {
+        let sources = sources
+            .iter()
+            .map(|source| source.to_ascii_lowercase())
+            .collect::<Vec<_>>();
+        let sink = sink.map(str::to_ascii_lowercase);
+
+        let mut ids = self.unscoped.clone();
+        for source in &sources {
+            ids.extend(self.by_source.get(source).into_iter().flatten());
+        }
+        if let Some(sink) = &sink {
+            ids.extend(self.by_sink.get(sink).into_iter().flatten());
+        }
+        ids.sort_unstable();
+        ids.dedup();
+
+        ids.into_iter()
+            .filter_map(|id| self.policies.get(&id))
+            .filter(|registered| {
+                let policy = &registered.policy;
+                policy
+                    .sources()
+                    .iter()
+                    .all(|source| sources.contains(&source.to_ascii_lowercase()))
+                    && policy.sink().is_none_or(|policy_sink| {
+                        sink.as_deref()
+                            .is_some_and(|query_sink| query_sink.eq_ignore_ascii_case(policy_sink))
+                    })
+            })
+            .collect()
+    }
+
+    fn index_for(&mut self, policy: &PolicyIr) -> &mut Vec<PolicyId> {
+        if let Some(source) = policy.sources().first() {
+            self.by_source
+                .entry(source.to_ascii_lowercase())
+                .or_default()
+        } else if let Some(sink) = policy.sink() {
+            self.by_sink.entry(sink.to_ascii_lowercase()).or_default()
+        } else {
+            &mut self.unscoped
+        }
+    }
+}
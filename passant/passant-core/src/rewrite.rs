@@ -0,0 +1,319 @@
+use std::collections::HashMap;
+use std::ops::ControlFlow;
+
+use sqlparser::ast::{
+    BinaryOperator, Expr, Function, FunctionArg, FunctionArgExpr, FunctionArguments, Ident, Select,
+    SetExpr, Statement, TableFactor, Value, visit_expressions, visit_expressions_mut,
+};
+use sqlparser::dialect::DuckDbDialect;
+use sqlparser::parser::{Parser, ParserError};
+use sqlparser::tokenizer::Token;
+use thiserror::Error;
+
+use crate::analysis::analyze_expr;
+use crate::policy::{PolicyIr, Resolution};
+
+/// Aggregates that count rows; over a single row they evaluate to 1.
+pub(crate) const COUNT_AGGREGATES: &[&str] =
+    &["count", "count_star", "approx_count_distinct", "regr_count"];
+
+/// Aggregates that, over a single row, evaluate to their first argument.
+pub(crate) const VALUE_AGGREGATES: &[&str] = &[
+    "any_value",
+    "arbitrary",
+    "avg",
+    "bit_and",
+    "bit_or",
+    "bit_xor",
+    "bool_and",
+    "bool_or",
+    "first",
+    "group_concat",
+    "last",
+    "listagg",
+    "max",
+    "mean",
+    "median",
+    "min",
+    "mode",
+    "product",
+    "quantile",
+    "quantile_cont",
+    "quantile_disc",
+    "stddev",
+    "stddev_pop",
+    "stddev_samp",
+    "string_agg",
+    "sum",
+    "var_pop",
+    "var_samp",
+    "variance",
+];
+
+#[derive(Debug, Error)]
+pub enum RewriteError {
+    #[error("invalid policy constraint {constraint:?}: {source}")]
+    Constraint {
+        constraint: String,
+        source: ParserError,
+    },
+    #[error("cannot splice policy into query: {0}")]
+    Unsupported(String),
+}
+
+/// Where a policy predicate is spliced into the root SELECT.
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub enum SpliceTarget {
+    /// WHERE, with aggregates in the constraint lowered to per-row values.
+    Where,
+    /// HAVING, with the constraint's aggregates kept.
+    Having,
+}
+
+/// Whether a policy can be enforced by splicing its constraint into the root SELECT.
+pub fn is_spliceable(policy: &PolicyIr) -> bool {
+    matches!(
+        policy,
+        PolicyIr::CompatDfc {
+            on_fail: Resolution::Remove | Resolution::Kill,
+            ..
+        }
+    )
+}
+
+/// Parse a single SQL expression, rejecting trailing input.
+pub fn parse_expr(sql: &str) -> Result<Expr, ParserError> {
+    let dialect = DuckDbDialect {};
+    let mut parser = Parser::new(&dialect).try_with_sql(sql)?;
+    let expr = parser.parse_expr()?;
+    let next = parser.peek_token();
+    if next.token != Token::EOF {
+        return Err(ParserError::ParserError(format!(
+            "unexpected {} after expression",
+            next.token
+        )));
+    }
+    Ok(expr)
+}
+
+/// Distinct columns a policy constraint references, lowercased and qualified as written.
+/// Constraints that do not parse reference no columns.
+pub fn policy_columns(policy: &PolicyIr) -> Vec<String> {
+    parse_expr(policy.constraint())
+        .map(|expr| analyze_expr(&expr).columns)
+        .unwrap_or_default()
+}
+
+/// Build the predicate enforcing a REMOVE or KILL policy at the given splice target.
+///
+/// The predicate still refers to source tables by name; `splice_policies` requalifies
+/// columns with the aliases used by the query.
+pub fn policy_predicate(policy: &PolicyIr, target: SpliceTarget) -> Result<Expr, RewriteError> {
+    let PolicyIr::CompatDfc {
+        constraint,
+        on_fail,
+        sink,
+        sink_alias,
+        ..
+    } = policy
+    else {
+        return Err(RewriteError::Unsupported(format!(
+            "{} policies are not spliced",
+            policy.name()
+        )));
+    };
+    let invalid = |source| RewriteError::Constraint {
+        constraint: constraint.clone(),
+        source,
+    };
+
+    let mut expr = parse_expr(constraint).map_err(invalid)?;
+    for name in [sink.as_deref(), sink_alias.as_deref()]
+        .into_iter()
+        .flatten()
+    {
+        if references_qualifier(&expr, name) {
+            return Err(RewriteError::Unsupported(format!(
+                "constraint {constraint:?} references sink {name}"
+            )));
+        }
+    }
+    if target == SpliceTarget::Where {
+        lower_aggregates(&mut expr).map_err(invalid)?;
+    }
+    match on_fail {
+        Resolution::Remove => Ok(expr),
+        Resolution::Kill => {
+            parse_expr(&format!("CASE WHEN {expr} THEN true ELSE kill() END")).map_err(invalid)
+        }
+        other => Err(RewriteError::Unsupported(format!(
+            "{other:?} resolution is not spliced"
+        ))),
+    }
+}
+
+/// AND the predicates of `policies` into the WHERE or HAVING clause of the statement's
+/// root SELECT (the query itself, or the source query of an INSERT).
+pub fn splice_policies(
+    statement: &mut Statement,
+    policies: &[PolicyIr],
+    target: SpliceTarget,
+) -> Result<(), RewriteError> {
+    let predicates = policies
+        .iter()
+        .map(|policy| policy_predicate(policy, target))
+        .collect::<Result<Vec<_>, _>>()?;
+    splice_predicates(statement, predicates, target)
+}
+
+/// AND already-built policy predicates (see `policy_predicate`) into the WHERE or HAVING
+/// clause of the statement's root SELECT.
+pub fn splice_predicates(
+    statement: &mut Statement,
+    predicates: impl IntoIterator<Item = Expr>,
+    target: SpliceTarget,
+) -> Result<(), RewriteError> {
+    let select = root_select_mut(statement)
+        .ok_or_else(|| RewriteError::Unsupported("statement has no root SELECT".into()))?;
+    let aliases = table_aliases(select);
+
+    for mut predicate in predicates {
+        requalify_columns(&mut predicate, &aliases);
+        let clause = match target {
+            SpliceTarget::Where => &mut select.selection,
+            SpliceTarget::Having => &mut select.having,
+        };
+        *clause = Some(match clause.take() {
+            Some(existing) => and(existing, predicate),
+            None => predicate,
+        });
+    }
+    Ok(())
+}
+
+fn and(left: Expr, right: Expr) -> Expr {
+    Expr::BinaryOp {
+        left: Box::new(Expr::Nested(Box::new(left))),
+        op: BinaryOperator::And,
+        right: Box::new(Expr::Nested(Box::new(right))),
+    }
+}
+
+fn root_select_mut(statement: &mut Statement) -> Option<&mut Select> {
+    let query = match statement {
+        Statement::Query(query) => query,
+        Statement::Insert(insert) => insert.source.as_mut()?,
+        _ => return None,
+    };
+    match query.body.as_mut() {
+        SetExpr::Select(select) => Some(select.as_mut()),
+        _ => None,
+    }
+}
+
+/// Map lowercase table names in the FROM clause to the alias the query uses for them.
+fn table_aliases(select: &Select) -> HashMap<String, String> {
+    let mut aliases = HashMap::new();
+    let factors = select.from.iter().flat_map(|item| {
+        std::iter::once(&item.relation).chain(item.joins.iter().map(|join| &join.relation))
+    });
+    for factor in factors {
+        if let TableFactor::Table {
+            name,
+            alias: Some(alias),
+            ..
+        } = factor
+        {
+            if let Some(table) = name.0.last() {
+                aliases.insert(table.value.to_ascii_lowercase(), alias.name.value.clone());
+            }
+        }
+    }
+    aliases
+}
+
+fn requalify_columns(expr: &mut Expr, aliases: &HashMap<String, String>) {
+    if aliases.is_empty() {
+        return;
+    }
+    let _ = visit_expressions_mut(expr, |node| {
+        if let Expr::CompoundIdentifier(parts) = node {
+            if parts.len() == 2 {
+                if let Some(alias) = aliases.get(&parts[0].value.to_ascii_lowercase()) {
+                    parts[0] = Ident::new(alias.clone());
+                }
+            }
+        }
+        ControlFlow::<()>::Continue(())
+    });
+}
+
+fn references_qualifier(expr: &Expr, qualifier: &str) -> bool {
+    visit_expressions(expr, |node| match node {
+        Expr::CompoundIdentifier(parts)
+            if parts.len() == 2 && parts[0].value.eq_ignore_ascii_case(qualifier) =>
+        {
+            ControlFlow::Break(())
+        }
+        _ => ControlFlow::Continue(()),
+    })
+    .is_break()
+}
+
+/// Replace aggregates with their value over a single row, as sql_rewriter does for scans:
+/// count-like aggregates become 1, `count_if(c)` becomes `CASE WHEN c THEN 1 ELSE 0 END`,
+/// `array_agg(x)` becomes `[x]` and other aggregates become their argument.
+fn lower_aggregates(expr: &mut Expr) -> Result<(), ParserError> {
+    let flow = visit_expressions_mut(expr, |node| {
+        let Expr::Function(function) = &*node else {
+            return ControlFlow::Continue(());
+        };
+        let name = function.name.to_string().to_ascii_lowercase();
+        let args = function_args(function);
+        let replacement = if COUNT_AGGREGATES.contains(&name.as_str()) {
+            Ok(Some(Expr::Value(Value::Number("1".into(), false))))
+        } else if name == "count_if" || name == "countif" {
+            match args.first() {
+                Some(condition) => {
+                    parse_expr(&format!("CASE WHEN {condition} THEN 1 ELSE 0 END")).map(Some)
+                }
+                None => Ok(None),
+            }
+        } else if name == "array_agg" || name == "list" {
+            match args.first() {
+                Some(value) => parse_expr(&format!("[{value}]")).map(Some),
+                None => Ok(None),
+            }
+        } else if VALUE_AGGREGATES.contains(&name.as_str()) {
+            Ok(args.first().map(|value| (*value).clone()))
+        } else {
+            Ok(None)
+        };
+        match replacement {
+            Ok(Some(lowered)) => {
+                *node = lowered;
+                ControlFlow::Continue(())
+            }
+            Ok(None) => ControlFlow::Continue(()),
+            Err(err) => ControlFlow::Break(err),
+        }
+    });
+    match flow {
+        ControlFlow::Break(err) => Err(err),
+        ControlFlow::Continue(()) => Ok(()),
+    }
+}
+
+fn function_args(function: &Function) -> Vec<&Expr> {
+    match &function.args {
+        FunctionArguments::List(list) => list
+            .args
+            .iter()
+            .filter_map(|arg| match arg {
+                FunctionArg::Unnamed(FunctionArgExpr::Expr(expr)) => Some(expr),
+                _ => None,
+            })
+            .collect(),
+        _ => Vec::new(),
+    }
+}
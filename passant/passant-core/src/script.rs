@@ -0,0 +1,120 @@
+use std::collections::VecDeque;
+use std::io::{self, BufRead};
+
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+enum State {
+    Code,
+    SingleQuoted,
+    DoubleQuoted,
+    LineComment,
+    BlockComment,
+}
+
+/// Streams the `;`-separated statements of a SQL script, one line of input at a time.
+///
+/// Semicolons inside string literals, quoted identifiers and comments do not end a
+/// statement. Statements are yielded trimmed and without their terminating `;`;
+/// fragments that hold only whitespace or comments are skipped.
+pub struct StatementReader<R> {
+    reader: R,
+    line: String,
+    statement: String,
+    has_code: bool,
+    state: State,
+    ready: VecDeque<String>,
+    done: bool,
+}
+
+impl<R: BufRead> StatementReader<R> {
+    pub fn new(reader: R) -> Self {
+        Self {
+            reader,
+            line: String::new(),
+            statement: String::new(),
+            has_code: false,
+            state: State::Code,
+            ready: VecDeque::new(),
+            done: false,
+        }
+    }
+
+    fn scan_line(&mut self) {
+        let line = std::mem::take(&mut self.line);
+        let mut chars = line.chars().peekable();
+        while let Some(ch) = chars.next() {
+            match self.state {
+                State::Code => match ch {
+                    ';' => {
+                        self.finish_statement();
+                        continue;
+                    }
+                    '\'' => self.state = State::SingleQuoted,
+                    '"' => self.state = State::DoubleQuoted,
+                    '-' if chars.peek() == Some(&'-') => self.state = State::LineComment,
+                    '/' if chars.peek() == Some(&'*') => {
+                        self.statement.push(ch);
+                        self.statement.extend(chars.next());
+                        self.state = State::BlockComment;
+                        continue;
+                    }
+                    _ => {}
+                },
+                // A doubled quote is an escaped quote: leaving and re-entering the state
+                // has the same effect.
+                State::SingleQuoted if ch == '\'' => self.state = State::Code,
+                State::DoubleQuoted if ch == '"' => self.state = State::Code,
+                State::LineComment if ch == '\n' => self.state = State::Code,
+                State::BlockComment if ch == '*' && chars.peek() == Some(&'/') => {
+                    self.statement.push(ch);
+                    self.statement.extend(chars.next());
+                    self.state = State::Code;
+                    continue;
+                }
+                _ => {}
+            }
+            if matches!(
+                self.state,
+                State::Code | State::SingleQuoted | State::DoubleQuoted
+            ) && !ch.is_whitespace()
+            {
+                self.has_code = true;
+            }
+            self.statement.push(ch);
+        }
+        self.line = line;
+    }
+
+    fn finish_statement(&mut self) {
+        let statement = std::mem::take(&mut self.statement);
+        if std::mem::take(&mut self.has_code) {
+            self.ready.push_back(statement.trim().to_string());
+        }
+    }
+}
+
+impl<R: BufRead> Iterator for StatementReader<R> {
+    type Item = io::Result<String>;
+
+    fn next(&mut self) -> Option<Self::Item> {
+        loop {
+            if let Some(statement) = self.ready.pop_front() {
+                return Some(Ok(statement));
+            }
+            if self.done {
+                return None;
+            }
+            self.line.clear();
+            match self.reader.read_line(&mut self.line) {
+                Ok(0) => {
+                    self.done = true;
+                    self.finish_statement();
+                }
+                Ok(_) => self.scan_line(),
+                Err(err) => {
+                    self.done = true;
+                    return Some(Err(err));
+                }
+            }
+        }
+    }
+}
@@ -0,0 +1,84 @@
+use std::convert::Infallible;
+
+use passant_core::{
+    ParseArtifact, PassantPlanner, PolicyIr, PolicyRegistry, Resolution, RewriteCache,
+    RewriteExplanation,
+};
+
+fn explain(sql: &str, registry: &PolicyRegistry) -> RewriteExplanation {
+    let artifact = ParseArtifact::from_sql(sql).unwrap();
+    PassantPlanner::new().explain_registered(&artifact, registry)
+}
+
+#[test]
+fn cache_returns_stored_rewrites_until_the_registry_changes() {
+    let cache = RewriteCache::new(64);
+    let mut registry = PolicyRegistry::new();
+    let sql = "SELECT id FROM foo";
+    let rewrite = |registry: &PolicyRegistry| {
+        cache
+            .get_or_try_insert(sql, registry.generation(), || {
+                Ok::<_, Infallible>(explain(sql, registry))
+            })
+            .unwrap()
+            .chosen
+            .rewritten_sql
+            .clone()
+    };
+
+    let unfiltered = rewrite(&registry);
+    assert_eq!(rewrite(&registry), unfiltered);
+    assert_eq!((cache.stats().hits, cache.stats().misses), (1, 1));
+
+    registry
+        .register(PolicyIr::CompatDfc {
+            sources: vec!["foo".to_string()],
+            sink: None,
+            sink_alias: None,
+            constraint: "max(foo.id) > 1".to_string(),
+            on_fail: Resolution::Remove,
+            description: None,
+        })
+        .unwrap();
+    assert!(rewrite(&registry).ends_with("WHERE foo.id > 1"));
+    assert_eq!(cache.stats().misses, 2);
+}
+
+#[test]
+fn cache_evicts_least_recently_used_entries() {
+    let cache = RewriteCache::new(16);
+    let registry = PolicyRegistry::new();
+    let compute = |sql: &str| {
+        cache
+            .get_or_try_insert(sql, 0, || Ok::<_, Infallible>(explain(sql, &registry)))
+            .unwrap();
+    };
+
+    for id in 0..200 {
+        compute(&format!("SELECT {id} FROM foo"));
+    }
+    let stats = cache.stats();
+    assert!(stats.entries <= stats.capacity, "{stats:?}");
+
+    compute("SELECT 199 FROM foo");
+    assert_eq!(cache.stats().hits, 1);
+}
+
+#[test]
+fn zero_capacity_disables_the_cache_and_errors_are_not_cached() {
+    let cache = RewriteCache::new(0);
+    let registry = PolicyRegistry::new();
+    for _ in 0..2 {
+        cache
+            .get_or_try_insert("SELECT 1", 0, || {
+                Ok::<_, Infallible>(explain("SELECT 1", &registry))
+            })
+            .unwrap();
+    }
+    assert_eq!(cache.stats().entries, 0);
+
+    let cache = RewriteCache::new(8);
+    let failed = cache.get_or_try_insert("SELECT", 0, || Err("parse error"));
+    assert!(failed.is_err());
+    assert_eq!(cache.stats().entries, 0);
+}
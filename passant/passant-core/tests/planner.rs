@@ -1,4 +1,7 @@
-use passant_core::{AggregateDfcPolicy, PassantPlanner, PolicyIr, Resolution, parse_query_to_ir};
+use passant_core::{
+    AggregateDfcPolicy, PassantPlanner, PolicyIr, QueryIr, Resolution, RewriteStrategy,
+    parse_query_to_ir,
+};
 
 #[test]
 fn lowers_select_into_query_ir() {
@@ -40,3 +43,286 @@ fn planner_can_defer_aggregate_policy_finalize() {
     let result = PassantPlanner::new().plan_query(&ir, &policies);
     assert!(!result.chosen.finalize_metadata.is_empty());
 }
+
+fn remove_policy(constraint: &str, on_fail: Resolution) -> PolicyIr {
+    PolicyIr::CompatDfc {
+        sources: vec!["foo".to_string()],
+        sink: None,
+        sink_alias: None,
+        constraint: constraint.to_string(),
+        on_fail,
+        description: None,
+    }
+}
+
+#[test]
+fn root_filter_splices_lowered_constraint_into_where() {
+    let ir = parse_query_to_ir("SELECT f.id FROM foo AS f WHERE f.id < 10").unwrap();
+    let policies = vec![remove_policy("max(foo.id) > 1", Resolution::Remove)];
+
+    let chosen = PassantPlanner::new().plan_query(&ir, &policies).chosen;
+    assert_eq!(chosen.strategy, passant_core::RewriteStrategy::RootFilter);
+    assert!(
+        chosen
+            .rewritten_sql
+            .ends_with("SELECT f.id FROM foo AS f WHERE (f.id < 10) AND (f.id > 1)"),
+        "{}",
+        chosen.rewritten_sql
+    );
+}
+
+#[test]
+fn root_filter_lowers_count_aggregates_and_wraps_kill() {
+    let ir = parse_query_to_ir("SELECT id FROM foo").unwrap();
+    let policies = vec![remove_policy(
+        "count(*) > 0 AND count_if(foo.id > 1) = 1",
+        Resolution::Kill,
+    )];
+
+    let chosen = PassantPlanner::new().plan_query(&ir, &policies).chosen;
+    assert!(
+        chosen.rewritten_sql.ends_with(
+            "WHERE CASE WHEN 1 > 0 AND CASE WHEN foo.id > 1 THEN 1 ELSE 0 END = 1 \
+             THEN true ELSE kill() END"
+        ),
+        "{}",
+        chosen.rewritten_sql
+    );
+}
+
+#[test]
+fn aggregate_inline_splices_constraint_into_having() {
+    let artifact =
+        passant_core::ParseArtifact::from_sql("SELECT bar, count(*) FROM foo GROUP BY bar")
+            .unwrap();
+    let policies = vec![remove_policy("max(foo.id) > 1", Resolution::Remove)];
+
+    let chosen = PassantPlanner::new()
+        .plan_artifact(&artifact, &policies)
+        .chosen;
+    assert!(
+        chosen
+            .rewritten_sql
+            .ends_with("GROUP BY bar HAVING max(foo.id) > 1"),
+        "{}",
+        chosen.rewritten_sql
+    );
+}
+
+#[test]
+fn policies_on_joined_tables_are_enforced() {
+    let ir = parse_query_to_ir("SELECT b.id FROM bar AS b JOIN foo ON b.id = foo.id").unwrap();
+    let policies = vec![remove_policy("max(foo.id) > 1", Resolution::Remove)];
+
+    let chosen = PassantPlanner::new().plan_query(&ir, &policies).chosen;
+    assert!(chosen.rewritten_sql.ends_with("WHERE foo.id > 1"));
+}
+
+#[test]
+fn unspliceable_policies_are_refused() {
+    let ir = parse_query_to_ir("SELECT id FROM foo").unwrap();
+    let invalidate = vec![remove_policy("max(foo.id) > 1", Resolution::Invalidate)];
+    let chosen = PassantPlanner::new().plan_query(&ir, &invalidate).chosen;
+    assert_eq!(
+        chosen.strategy,
+        passant_core::RewriteStrategy::CompatibilityFallback
+    );
+    assert!(
+        chosen
+            .enforced_sql()
+            .unwrap_err()
+            .contains("Invalidate resolution is not spliced")
+    );
+
+    let malformed = vec![remove_policy("max(foo.id) >", Resolution::Remove)];
+    let chosen = PassantPlanner::new().plan_query(&ir, &malformed).chosen;
+    assert_eq!(
+        chosen.strategy,
+        passant_core::RewriteStrategy::CompatibilityFallback
+    );
+    assert!(
+        chosen
+            .fallback_reason
+            .unwrap()
+            .contains("invalid policy constraint")
+    );
+}
+
+#[test]
+fn policies_read_in_nested_scopes_are_refused() {
+    let policies = vec![remove_policy("max(foo.id) > 1", Resolution::Remove)];
+    let planner = PassantPlanner::new();
+    for sql in [
+        "SELECT s.id FROM (SELECT id FROM foo) AS s",
+        "WITH f AS (SELECT id FROM foo) SELECT id FROM f",
+        "SELECT id FROM bar WHERE id IN (SELECT id FROM foo)",
+        "SELECT id FROM foo WHERE EXISTS (SELECT 1 FROM foo AS g WHERE g.id > 3)",
+        "SELECT id FROM foo UNION ALL SELECT id FROM bar",
+        "UPDATE bar SET id = 1 FROM foo WHERE bar.id = foo.id",
+    ] {
+        let result = planner.plan_query(&parse_query_to_ir(sql).unwrap(), &policies);
+        assert_eq!(result.applicable_policies.len(), 1, "{sql}");
+        assert!(result.chosen.enforced_sql().is_err(), "{sql}");
+    }
+
+    let ddl = parse_query_to_ir("DROP TABLE foo").unwrap();
+    let result = planner.plan_query(&ddl, &policies);
+    assert!(result.applicable_policies.is_empty());
+    assert_eq!(
+        result.chosen.enforced_sql(),
+        Ok("-- passant: compatibility_fallback\nDROP TABLE foo")
+    );
+}
+
+#[test]
+fn quoted_and_schema_qualified_sources_match_policies() {
+    let policies = vec![remove_policy("max(foo.id) > 1", Resolution::Remove)];
+    let planner = PassantPlanner::new();
+    for sql in [
+        "SELECT id FROM \"foo\"",
+        "SELECT id FROM \"FOO\"",
+        "SELECT id FROM main.foo",
+        "SELECT id FROM memory.main.\"Foo\"",
+        // A schema-qualified name reads the table, not the CTE it shares a name with.
+        "WITH foo AS (SELECT 1 AS id) SELECT id FROM main.foo",
+    ] {
+        let result = planner.plan_query(&parse_query_to_ir(sql).unwrap(), &policies);
+        assert_eq!(result.applicable_policies.len(), 1, "{sql}");
+        assert_eq!(result.chosen.strategy, RewriteStrategy::RootFilter, "{sql}");
+        assert!(
+            result
+                .chosen
+                .enforced_sql()
+                .unwrap()
+                .ends_with("WHERE foo.id > 1"),
+            "{sql}"
+        );
+    }
+
+    let sink = vec![PolicyIr::CompatDfc {
+        sources: vec!["foo".to_string()],
+        sink: Some("reports".to_string()),
+        sink_alias: None,
+        constraint: "max(foo.id) > 1".to_string(),
+        on_fail: Resolution::Remove,
+        description: None,
+    }];
+    let ir = parse_query_to_ir("INSERT INTO main.\"Reports\" SELECT id FROM \"Foo\"").unwrap();
+    assert_eq!(planner.plan_query(&ir, &sink).applicable_policies.len(), 1);
+}
+
+#[test]
+fn scope_analysis_uses_the_ast() {
+    let policies = vec![remove_policy(
+        "max(foo.id) > 1 AND min(foo.id) < 5 AND bool_and(foo.ok)",
+        Resolution::Remove,
+    )];
+    let planner = PassantPlanner::new();
+
+    let literal = parse_query_to_ir("SELECT 'WITH ' AS w FROM foo").unwrap();
+    let scope = planner.plan_query(&literal, &policies).scope;
+    assert!(!scope.requires_projection_propagation);
+    assert_eq!(scope.propagated_column_count, 2);
+
+    for sql in [
+        "WITH f AS (SELECT * FROM foo) SELECT id FROM foo",
+        "SELECT id FROM foo JOIN (SELECT 1 AS id) AS s USING (id)",
+    ] {
+        let scope = planner
+            .plan_query(&parse_query_to_ir(sql).unwrap(), &policies)
+            .scope;
+        assert!(scope.requires_projection_propagation, "{sql}");
+    }
+}
+
+#[test]
+fn candidates_lead_with_the_enforcing_strategy() {
+    let ir = parse_query_to_ir(
+        "INSERT INTO reports SELECT foo.bar, max(foo.id) AS id FROM foo GROUP BY foo.bar",
+    )
+    .unwrap();
+    let planner = PassantPlanner::new();
+    let strategies = |resolution| {
+        planner
+            .plan_query(&ir, &[remove_policy("max(foo.id) > 1", resolution)])
+            .candidates
+            .into_iter()
+            .map(|candidate| candidate.strategy)
+            .collect::<Vec<_>>()
+    };
+
+    assert_eq!(
+        strategies(Resolution::Remove),
+        [
+            RewriteStrategy::AggregateInline,
+            RewriteStrategy::SinkMappedRewrite,
+            RewriteStrategy::CompatibilityFallback,
+        ]
+    );
+    assert_eq!(
+        strategies(Resolution::Invalidate),
+        [
+            RewriteStrategy::SinkMappedRewrite,
+            RewriteStrategy::FinalizeAggregate,
+            RewriteStrategy::CompatibilityFallback,
+        ]
+    );
+}
+
+#[test]
+fn ir_flags_come_from_the_ast() {
+    let select = |sql: &str| match parse_query_to_ir(sql).unwrap() {
+        QueryIr::Select(select) => select,
+        other => panic!("expected a SELECT, got {other:?}"),
+    };
+
+    for sql in [
+        "SELECT 'SUM(' AS s FROM foo",
+        "SELECT count(*) OVER () FROM foo",
+        "SELECT (SELECT max(bar.id) FROM bar) AS m FROM foo",
+    ] {
+        assert!(!select(sql).is_aggregation(), "{sql}");
+    }
+    assert!(select("SELECT 1 FROM foo HAVING count(*) > 1").is_aggregation());
+
+    let aggregate = select("SELECT sum(f.Amount) AS total FROM foo AS f WHERE id > 0");
+    assert!(aggregate.is_aggregation());
+    let total = &aggregate.projection[0].expr;
+    assert!(total.has_aggregate);
+    assert_eq!(total.columns, ["f.amount"]);
+    assert_eq!(total.tables, ["f"]);
+    assert_eq!(aggregate.referenced_columns(), ["f.amount", "id"]);
+
+    let subquery = &select("SELECT (SELECT max(bar.id) FROM bar) AS m FROM foo").projection[0].expr;
+    assert!(subquery.has_subquery);
+    assert!(!subquery.has_aggregate);
+    assert!(subquery.columns.is_empty());
+}
+
+#[test]
+fn nested_sources_resolve_ctes_and_subqueries() {
+    let sql = "WITH a AS (SELECT * FROM foo), b AS (SELECT * FROM a JOIN bar USING (id)) \
+               SELECT foo.id FROM foo, (SELECT * FROM b WHERE id IN (SELECT id FROM baz)) AS s";
+    let QueryIr::Select(select) = parse_query_to_ir(sql).unwrap() else {
+        panic!("expected a SELECT");
+    };
+    assert_eq!(select.ctes[1].name, "b");
+    assert_eq!(select.ctes[1].sources, ["foo", "bar"]);
+    assert_eq!(select.nested_sources(), ["foo", "bar", "baz"]);
+
+    let policies = vec![remove_policy("max(foo.id) > 1", Resolution::Remove)];
+    let scope = PassantPlanner::new()
+        .plan_query(&parse_query_to_ir(sql).unwrap(), &policies)
+        .scope;
+    assert!(scope.requires_projection_propagation);
+    assert_eq!(scope.propagation_tables, ["foo"]);
+
+    let scope = PassantPlanner::new()
+        .plan_query(
+            &parse_query_to_ir("SELECT foo.id FROM foo, (SELECT 1 AS one) AS s").unwrap(),
+            &policies,
+        )
+        .scope;
+    assert!(scope.requires_projection_propagation);
+    assert!(scope.propagation_tables.is_empty());
+}
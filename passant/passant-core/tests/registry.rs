@@ -0,0 +1,130 @@
+use passant_core::{ParseArtifact, PassantPlanner, PolicyIr, PolicyRegistry, Resolution};
+
+fn policy(sources: &[&str], sink: Option<&str>, constraint: &str) -> PolicyIr {
+    PolicyIr::CompatDfc {
+        sources: sources.iter().map(|source| source.to_string()).collect(),
+        sink: sink.map(str::to_string),
+        sink_alias: None,
+        constraint: constraint.to_string(),
+        on_fail: Resolution::Remove,
+        description: None,
+    }
+}
+
+#[test]
+fn registry_rejects_malformed_constraints() {
+    let mut registry = PolicyRegistry::new();
+    let err = registry
+        .register(policy(&["foo"], None, "max(foo.id) >"))
+        .unwrap_err();
+    assert!(err.to_string().contains("invalid policy constraint"));
+    assert!(registry.is_empty());
+}
+
+#[test]
+fn registry_matches_by_sources_and_sink() {
+    let mut registry = PolicyRegistry::new();
+    let foo = registry
+        .register(policy(&["foo"], None, "max(foo.id) > 1"))
+        .unwrap();
+    let joined = registry
+        .register(policy(&["foo", "bar"], None, "max(bar.id) > 1"))
+        .unwrap();
+    let sunk = registry
+        .register(policy(&["foo"], Some("Reports"), "max(foo.id) > 2"))
+        .unwrap();
+
+    let ids = |sources: &[&str], sink: Option<&str>| {
+        let sources = sources.iter().map(|s| s.to_string()).collect::<Vec<_>>();
+        registry
+            .matching(&sources, sink)
+            .iter()
+            .map(|registered| registered.id)
+            .collect::<Vec<_>>()
+    };
+    assert_eq!(ids(&["FOO"], None), vec![foo]);
+    assert_eq!(ids(&["bar", "foo"], None), vec![foo, joined]);
+    assert_eq!(ids(&["foo", "reports"], Some("reports")), vec![foo, sunk]);
+    assert!(ids(&["bar"], None).is_empty());
+
+    assert!(registry.delete(foo));
+    assert!(!registry.delete(foo));
+    assert_eq!(ids(&["foo"], Some("reports")), vec![sunk]);
+}
+
+#[test]
+fn plan_registered_applies_every_matching_policy() {
+    let mut registry = PolicyRegistry::new();
+    registry
+        .register(policy(&["foo"], None, "max(foo.id) > 1"))
+        .unwrap();
+    registry
+        .register(policy(&["foo"], None, "min(foo.id) < 10"))
+        .unwrap();
+    registry
+        .register(policy(&["bar"], None, "max(bar.id) > 1"))
+        .unwrap();
+
+    let artifact = ParseArtifact::from_sql("SELECT f.id FROM foo AS f").unwrap();
+    let result = PassantPlanner::new().plan_registered(&artifact, &registry);
+    assert_eq!(result.applicable_policies.len(), 2);
+    assert!(
+        result
+            .chosen
+            .rewritten_sql
+            .ends_with("SELECT f.id FROM foo AS f WHERE (f.id > 1) AND (f.id < 10)"),
+        "{}",
+        result.chosen.rewritten_sql
+    );
+}
+
+#[test]
+fn plan_registered_refuses_unspliceable_policies() {
+    let mut registry = PolicyRegistry::new();
+    registry
+        .register(PolicyIr::CompatDfc {
+            sources: vec!["foo".to_string()],
+            sink: Some("reports".to_string()),
+            sink_alias: None,
+            constraint: "max(reports.id) > 1".to_string(),
+            on_fail: Resolution::Remove,
+            description: None,
+        })
+        .unwrap();
+
+    let artifact = ParseArtifact::from_sql("INSERT INTO reports SELECT id FROM foo").unwrap();
+    let chosen = PassantPlanner::new()
+        .plan_registered(&artifact, &registry)
+        .chosen;
+    assert_eq!(
+        chosen.strategy,
+        passant_core::RewriteStrategy::CompatibilityFallback
+    );
+    assert!(
+        chosen
+            .enforced_sql()
+            .unwrap_err()
+            .contains("references sink")
+    );
+}
+
+#[test]
+fn plan_registered_matches_sources_read_in_ctes() {
+    let mut registry = PolicyRegistry::new();
+    registry
+        .register(policy(&["foo"], None, "max(foo.id) > 1"))
+        .unwrap();
+
+    let artifact =
+        ParseArtifact::from_sql("WITH f AS (SELECT id FROM foo) SELECT id FROM f").unwrap();
+    let result = PassantPlanner::new().plan_registered(&artifact, &registry);
+    assert_eq!(result.applicable_policies.len(), 1);
+    assert_eq!(result.scope.propagation_tables, ["foo"]);
+    assert!(
+        result
+            .chosen
+            .enforced_sql()
+            .unwrap_err()
+            .contains("CTE or subquery")
+    );
+}
@@ -0,0 +1,34 @@
+use std::io::Cursor;
+
+use passant_core::StatementReader;
+
+fn split(script: &str) -> Vec<String> {
+    StatementReader::new(Cursor::new(script))
+        .map(|statement| statement.unwrap())
+        .collect()
+}
+
+#[test]
+fn splits_on_semicolons_outside_literals_and_comments() {
+    let script = "SELECT 1; SELECT ';' AS s;\n\
+                  -- a; comment\n\
+                  SELECT 2 /* ; */ FROM \"x;y\";\n\
+                  -- trailing comment\n";
+    assert_eq!(
+        split(script),
+        vec![
+            "SELECT 1",
+            "SELECT ';' AS s",
+            "-- a; comment\nSELECT 2 /* ; */ FROM \"x;y\"",
+        ]
+    );
+}
+
+#[test]
+fn keeps_escaped_quotes_and_an_unterminated_final_statement() {
+    assert_eq!(
+        split("SELECT 'it''s; fine'\n;\n\n  SELECT 3"),
+        vec!["SELECT 'it''s; fine'", "SELECT 3"]
+    );
+    assert!(split("/* only a comment */ ; ;").is_empty());
+}
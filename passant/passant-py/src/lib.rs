@@ -1,4 +1,8 @@
-use passant_core::{PassantPlanner, PolicyIr, Resolution, parse_query_to_ir};
+use std::collections::HashMap;
+
+use passant_core::{
+    ParseArtifact, PolicyId, PolicyIr, Resolution, RewriteEngine, parse_query_to_ir,
+};
 use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
 
@@ -41,46 +45,132 @@ impl PyDfcPolicy {
 }
 
 #[pyclass(module = "passant._passant")]
-struct PyPlanner;
+struct PyPlanner {
+    engine: RewriteEngine,
+}
 
 #[pymethods]
 impl PyPlanner {
+    /// `cache_size` bounds the number of cached rewrites; 0 disables the cache.
     #[new]
-    fn new() -> Self {
-        Self
+    #[pyo3(signature = (cache_size=passant_core::DEFAULT_CACHE_SIZE))]
+    fn new(cache_size: usize) -> Self {
+        Self {
+            engine: RewriteEngine::new(cache_size),
+        }
+    }
+
+    /// Parse a policy once and keep it for every later query. Returns the policy's id.
+    #[pyo3(signature = (constraint, sources, on_fail="REMOVE".to_string(), sink=None, sink_alias=None, description=None))]
+    fn register_policy(
+        &mut self,
+        constraint: String,
+        sources: Vec<String>,
+        on_fail: String,
+        sink: Option<String>,
+        sink_alias: Option<String>,
+        description: Option<String>,
+    ) -> PyResult<PolicyId> {
+        let policy = PolicyIr::CompatDfc {
+            sources,
+            sink,
+            sink_alias,
+            constraint,
+            on_fail: parse_resolution(&on_fail)?,
+            description,
+        };
+        self.engine
+            .register_policy(policy)
+            .map_err(|err| PyValueError::new_err(err.to_string()))
+    }
+
+    fn delete_policy(&mut self, policy_id: PolicyId) -> bool {
+        self.engine.delete_policy(policy_id)
+    }
+
+    fn policy_count(&self) -> usize {
+        self.engine.registry().len()
+    }
+
+    fn cache_info(&self) -> HashMap<&'static str, u64> {
+        let stats = self.engine.cache_stats();
+        HashMap::from([
+            ("hits", stats.hits),
+            ("misses", stats.misses),
+            ("entries", stats.entries as u64),
+            ("capacity", stats.capacity as u64),
+        ])
+    }
+
+    fn clear_cache(&self) {
+        self.engine.clear_cache();
     }
 
+    /// Rewrite a query. Raises ValueError if it fails to parse or its applicable policies
+    /// cannot be enforced.
     fn transform_query(&self, query: String) -> PyResult<String> {
-        let ir = parse_query_to_ir(&query).map_err(|err| PyValueError::new_err(err.to_string()))?;
-        let result = PassantPlanner::new().plan_query(&ir, &[]);
-        Ok(result.chosen.rewritten_sql)
+        enforced_sql(&self.engine, &query).map_err(PyValueError::new_err)
+    }
+
+    /// Rewrite a batch of queries in parallel with the GIL released, preserving input order.
+    /// The batch is split into one contiguous chunk per available core.
+    /// Raises ValueError if any query fails to parse or cannot have its policies enforced.
+    fn transform_many(&self, py: Python<'_>, queries: Vec<String>) -> PyResult<Vec<String>> {
+        let workers = std::thread::available_parallelism().map_or(1, usize::from);
+        let chunk_size = queries.len().div_ceil(workers).max(1);
+        py.allow_threads(|| {
+            std::thread::scope(|scope| {
+                let handles: Vec<_> = queries
+                    .chunks(chunk_size)
+                    .map(|chunk| {
+                        scope.spawn(move || {
+                            chunk
+                                .iter()
+                                .map(|query| enforced_sql(&self.engine, query))
+                                .collect::<Result<Vec<_>, _>>()
+                        })
+                    })
+                    .collect();
+                let mut rewritten = Vec::with_capacity(queries.len());
+                for handle in handles {
+                    rewritten.extend(handle.join().expect("rewrite worker panicked")?);
+                }
+                Ok::<_, String>(rewritten)
+            })
+        })
+        .map_err(PyValueError::new_err)
     }
 
     fn explain_rewrite(&self, query: String) -> PyResult<String> {
-        let ir = parse_query_to_ir(&query).map_err(|err| PyValueError::new_err(err.to_string()))?;
-        let explanation = PassantPlanner::new().explain_rewrite(&ir, &[]);
-        serde_json::to_string_pretty(&explanation)
+        let explanation = self
+            .engine
+            .rewrite(&query)
+            .map_err(|err| PyValueError::new_err(err.to_string()))?;
+        serde_json::to_string_pretty(explanation.as_ref())
             .map_err(|err| PyValueError::new_err(err.to_string()))
     }
 
-    #[pyo3(signature = (query, sources, constraint, sink=None))]
+    #[pyo3(signature = (query, sources, constraint, sink=None, on_fail="REMOVE".to_string(), sink_alias=None))]
     fn plan_with_policy(
         &self,
         query: String,
         sources: Vec<String>,
         constraint: String,
         sink: Option<String>,
+        on_fail: String,
+        sink_alias: Option<String>,
     ) -> PyResult<String> {
-        let ir = parse_query_to_ir(&query).map_err(|err| PyValueError::new_err(err.to_string()))?;
+        let artifact = ParseArtifact::from_sql(&query)
+            .map_err(|err| PyValueError::new_err(err.to_string()))?;
         let policy = PolicyIr::CompatDfc {
             sources,
             sink,
-            sink_alias: None,
+            sink_alias,
             constraint,
-            on_fail: Resolution::Remove,
+            on_fail: parse_resolution(&on_fail)?,
             description: None,
         };
-        let result = PassantPlanner::new().plan_query(&ir, &[policy]);
+        let result = self.engine.planner().plan_artifact(&artifact, &[policy]);
         serde_json::to_string_pretty(&result).map_err(|err| PyValueError::new_err(err.to_string()))
     }
 }
@@ -99,13 +189,15 @@ fn _passant(_py: Python<'_>, module: &Bound<'_, PyModule>) -> PyResult<()> {
     Ok(())
 }
 
+fn enforced_sql(engine: &RewriteEngine, query: &str) -> Result<String, String> {
+    let explanation = engine.rewrite(query).map_err(|err| err.to_string())?;
+    explanation
+        .chosen
+        .enforced_sql()
+        .map(str::to_string)
+        .map_err(|reason| format!("cannot enforce policies: {reason}"))
+}
+
 fn parse_resolution(value: &str) -> PyResult<Resolution> {
-    match value.to_ascii_uppercase().as_str() {
-        "REMOVE" => Ok(Resolution::Remove),
-        "KILL" => Ok(Resolution::Kill),
-        "INVALIDATE" => Ok(Resolution::Invalidate),
-        "INVALIDATE_MESSAGE" => Ok(Resolution::InvalidateMessage),
-        "LLM" => Ok(Resolution::Llm),
-        _ => Err(PyValueError::new_err(format!("unknown resolution {value}"))),
-    }
+    value.parse().map_err(PyValueError::new_err)
 }
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from dataclasses import dataclass
 from enum import Enum
 import json
@@ -85,18 +86,53 @@ class FlowGuardPolicy:
         return cls(text=text)
 
 
+DEFAULT_PREPARED_CACHE_SIZE = 128
+
+
 class SQLRewriter:
-    def __init__(self, conn=None, stream_file_path=None, bedrock_client=None, bedrock_model_id=None, recorder=None):
+    def __init__(
+        self,
+        conn=None,
+        stream_file_path=None,
+        bedrock_client=None,
+        bedrock_model_id=None,
+        recorder=None,
+        prepared_cache_size: int = DEFAULT_PREPARED_CACHE_SIZE,
+    ):
         self.conn = conn or duckdb.connect()
         self.stream_file_path = stream_file_path
         self.bedrock_client = bedrock_client
         self.bedrock_model_id = bedrock_model_id
         self.recorder = recorder
         self._policies: list[DFCPolicy | AggregateDFCPolicy | FlowGuardPolicy] = []
+        self._policy_ids: list[int | None] = []
         self._planner = _passant.PyPlanner() if _passant is not None else None
+        self._prepared_cache_size = prepared_cache_size
+        # Rewritten SQL -> name of the DuckDB prepared statement, or None if DuckDB cannot
+        # PREPARE it; least recently used first.
+        self._prepared: OrderedDict[str, str | None] = OrderedDict()
+        self._prepared_counter = 0
+        self._register_kill_udf()
+
+    def _register_kill_udf(self) -> None:
+        def kill() -> bool:
+            raise ValueError("KILLing due to dfc policy violation")
+
+        self.conn.create_function("kill", kill, return_type="BOOLEAN")
 
     def register_policy(self, policy: DFCPolicy | AggregateDFCPolicy | FlowGuardPolicy) -> None:
+        policy_id = None
+        if self._planner is not None and isinstance(policy, DFCPolicy):
+            policy_id = self._planner.register_policy(
+                policy.constraint,
+                policy.sources,
+                policy.on_fail.value,
+                policy.sink,
+                policy.sink_alias,
+                policy.description,
+            )
         self._policies.append(policy)
+        self._policy_ids.append(policy_id)
 
     def get_dfc_policies(self) -> list[DFCPolicy]:
         return [policy for policy in self._policies if isinstance(policy, DFCPolicy)]
@@ -117,25 +153,34 @@ class SQLRewriter:
             if description is not None and getattr(policy, "description", None) != description:
                 continue
             del self._policies[idx]
+            policy_id = self._policy_ids.pop(idx)
+            if policy_id is not None:
+                self._planner.delete_policy(policy_id)
             return True
         return False
 
     def transform_query(self, query: str, use_two_phase: bool = False) -> str:
+        """Rewrite ``query`` to enforce the registered policies.
+
+        Raises ValueError if a matching policy cannot be enforced, or if policies are
+        registered but the passant extension is not built, rather than returning SQL that
+        would run unenforced.
+        """
         _ = use_two_phase
         if self._planner is None:
+            self._require_planner()
             return query
-        dfc_policies = self.get_dfc_policies()
-        if not dfc_policies:
-            return self._planner.transform_query(query)
-        first = dfc_policies[0]
-        plan_json = self._planner.plan_with_policy(
-            query,
-            first.sources,
-            first.constraint,
-            first.sink,
-        )
-        plan = json.loads(plan_json)
-        return plan["chosen"]["rewritten_sql"]
+        return self._planner.transform_query(query)
+
+    def transform_many(self, queries: list[str]) -> list[str]:
+        if self._planner is None:
+            self._require_planner()
+            return list(queries)
+        return self._planner.transform_many(queries)
+
+    def _require_planner(self) -> None:
+        if self.get_dfc_policies():
+            raise ValueError("passant extension is not built; registered policies cannot be enforced")
 
     def explain_rewrite(self, query: str) -> str:
         if self._planner is None:
@@ -147,6 +192,49 @@ class SQLRewriter:
         executable = _strip_passant_comment(rewritten)
         return self.conn.execute(executable)
 
+    def execute_arrow(self, query: str, use_two_phase: bool = False):
+        """Rewrite and run a query, returning the result as a ``pyarrow.Table``."""
+        return self._execute_prepared(query, use_two_phase=use_two_phase).fetch_arrow_table()
+
+    def stream_batches(self, query: str, batch_size: int = 1_000_000, use_two_phase: bool = False):
+        """Rewrite and run a query, returning a ``pyarrow.RecordBatchReader`` that yields
+        record batches of up to ``batch_size`` rows as DuckDB produces them."""
+        cursor = self._execute_prepared(query, use_two_phase=use_two_phase)
+        return cursor.fetch_record_batch(batch_size)
+
+    def _execute_prepared(self, query: str, use_two_phase: bool = False):
+        """Execute the rewrite of ``query`` through a DuckDB prepared statement.
+
+        The planner returns the same rewritten SQL for the same query and policy set, so the
+        rewritten SQL keys a bounded LRU of prepared statements and repeated queries skip
+        DuckDB's parse and plan. SQL DuckDB cannot PREPARE (such as DDL) is executed directly.
+        """
+        executable = _strip_passant_comment(self.transform_query(query, use_two_phase=use_two_phase))
+        if self._prepared_cache_size <= 0:
+            return self.conn.execute(executable)
+        if executable in self._prepared:
+            self._prepared.move_to_end(executable)
+            name = self._prepared[executable]
+        else:
+            name = self._prepare(executable)
+        if name is None:
+            return self.conn.execute(executable)
+        return self.conn.execute(f"EXECUTE {name}")
+
+    def _prepare(self, executable: str) -> str | None:
+        self._prepared_counter += 1
+        name = f"passant_prepared_{self._prepared_counter}"
+        try:
+            self.conn.execute(f"PREPARE {name} AS {executable}")
+        except duckdb.ParserException:
+            name = None
+        self._prepared[executable] = name
+        while len(self._prepared) > self._prepared_cache_size:
+            _, evicted = self._prepared.popitem(last=False)
+            if evicted is not None:
+                self.conn.execute(f"DEALLOCATE {evicted}")
+        return name
+
     def fetchall(self, query: str, use_two_phase: bool = False):
         return self.execute(query, use_two_phase=use_two_phase).fetchall()
 
@@ -1,4 +1,12 @@
-from passant.compat import AggregateDFCPolicy, DFCPolicy, Resolution, SQLRewriter
+import pytest
+from passant.compat import (
+    AggregateDFCPolicy,
+    DFCPolicy,
+    Resolution,
+    SQLRewriter,
+    _passant,
+    _strip_passant_comment,
+)
 
 
 def test_python_compat_rewriter_preserves_policy_registration():
@@ -38,3 +46,122 @@ def test_python_compat_finalize_aggregate_policies_returns_mapping():
     assert rewriter.finalize_aggregate_policies("reports") == {
         "aggregate::sum(reports.id) > 1": None
     }
+
+
+@pytest.mark.skipif(_passant is None, reason="passant extension is not built")
+def test_python_compat_remove_policy_filters_rows():
+    rewriter = SQLRewriter()
+    rewriter.execute("CREATE TABLE foo AS SELECT i AS id FROM range(5) t(i)")
+    rewriter.register_policy(
+        DFCPolicy(sources=["foo"], constraint="max(foo.id) > 2", on_fail=Resolution.REMOVE)
+    )
+    assert rewriter.fetchall("SELECT id FROM foo ORDER BY id") == [(3,), (4,)]
+
+
+@pytest.mark.skipif(_passant is None, reason="passant extension is not built")
+def test_python_compat_kill_policy_aborts_query():
+    rewriter = SQLRewriter()
+    rewriter.execute("CREATE TABLE foo AS SELECT i AS id FROM range(5) t(i)")
+    rewriter.register_policy(
+        DFCPolicy(sources=["foo"], constraint="max(foo.id) > 2", on_fail=Resolution.KILL)
+    )
+    with pytest.raises(Exception, match="KILLing due to dfc policy violation"):
+        rewriter.fetchall("SELECT id FROM foo")
+
+
+@pytest.mark.skipif(_passant is None, reason="passant extension is not built")
+def test_python_compat_applies_every_registered_policy_until_deleted():
+    rewriter = SQLRewriter()
+    rewriter.execute("CREATE TABLE foo AS SELECT i AS id FROM range(5) t(i)")
+    rewriter.register_policy(
+        DFCPolicy(sources=["foo"], constraint="max(foo.id) > 0", on_fail=Resolution.REMOVE)
+    )
+    rewriter.register_policy(
+        DFCPolicy(sources=["foo"], constraint="max(foo.id) < 4", on_fail=Resolution.REMOVE)
+    )
+    assert rewriter.fetchall("SELECT id FROM foo ORDER BY id") == [(1,), (2,), (3,)]
+
+    assert rewriter.delete_policy(constraint="max(foo.id) > 0")
+    assert rewriter.fetchall("SELECT id FROM foo ORDER BY id") == [(0,), (1,), (2,), (3,)]
+
+
+@pytest.mark.skipif(_passant is None, reason="passant extension is not built")
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT s.id FROM (SELECT id FROM foo) AS s",
+        "WITH f AS (SELECT id FROM foo) SELECT id FROM f",
+        "SELECT 1 AS one WHERE EXISTS (SELECT id FROM foo)",
+    ],
+)
+def test_python_compat_refuses_policy_sources_in_nested_scopes(query):
+    rewriter = SQLRewriter()
+    rewriter.execute("CREATE TABLE foo AS SELECT i AS id FROM range(5) t(i)")
+    rewriter.register_policy(
+        DFCPolicy(sources=["foo"], constraint="max(foo.id) > 2", on_fail=Resolution.REMOVE)
+    )
+    with pytest.raises(ValueError, match="cannot enforce policies"):
+        rewriter.fetchall(query)
+
+
+@pytest.mark.skipif(_passant is None, reason="passant extension is not built")
+def test_python_compat_refuses_unspliceable_resolutions():
+    rewriter = SQLRewriter()
+    rewriter.execute("CREATE TABLE foo AS SELECT i AS id FROM range(5) t(i)")
+    rewriter.register_policy(
+        DFCPolicy(sources=["foo"], constraint="max(foo.id) > 2", on_fail=Resolution.INVALIDATE)
+    )
+    with pytest.raises(ValueError, match="cannot enforce policies"):
+        rewriter.fetchall("SELECT id FROM foo")
+    assert rewriter.fetchall("SELECT 1 AS one") == [(1,)]
+
+
+def test_python_compat_refuses_policies_without_extension(monkeypatch):
+    rewriter = SQLRewriter()
+    monkeypatch.setattr(rewriter, "_planner", None)
+    rewriter.execute("CREATE TABLE foo (id INTEGER)")
+    rewriter.register_policy(
+        DFCPolicy(sources=["foo"], constraint="max(foo.id) > 2", on_fail=Resolution.REMOVE)
+    )
+    with pytest.raises(ValueError, match="extension is not built"):
+        rewriter.fetchall("SELECT id FROM foo")
+
+
+def test_python_compat_transform_many_preserves_order():
+    rewriter = SQLRewriter()
+    queries = ["SELECT id FROM foo", "SELECT id FROM bar"]
+    rewritten = rewriter.transform_many(queries)
+    assert len(rewritten) == 2
+    assert [_strip_passant_comment(sql) for sql in rewritten] == queries
+
+
+def test_python_compat_execute_arrow_and_stream_batches():
+    pytest.importorskip("pyarrow")
+    rewriter = SQLRewriter()
+    rewriter.execute("CREATE TABLE foo AS SELECT i AS id FROM range(5) t(i)")
+
+    table = rewriter.execute_arrow("SELECT id FROM foo ORDER BY id")
+    assert table.column("id").to_pylist() == [0, 1, 2, 3, 4]
+
+    reader = rewriter.stream_batches("SELECT id FROM foo ORDER BY id", batch_size=2)
+    assert [batch.num_rows for batch in reader] == [2, 2, 1]
+
+
+def test_python_compat_reuses_prepared_statements():
+    pytest.importorskip("pyarrow")
+    rewriter = SQLRewriter(prepared_cache_size=1)
+    rewriter.execute("CREATE TABLE foo AS SELECT 1 AS id")
+
+    for _ in range(2):
+        assert rewriter.execute_arrow("SELECT id FROM foo").num_rows == 1
+    assert list(rewriter._prepared.values()) == ["passant_prepared_1"]
+
+    # Prepared statements re-bind after the schema changes, and the LRU stays bounded.
+    rewriter.execute("CREATE OR REPLACE TABLE foo AS SELECT 2 AS id, 'x' AS name")
+    assert rewriter.execute_arrow("SELECT * FROM foo").column_names == ["id", "name"]
+    assert rewriter.execute_arrow("SELECT id FROM foo").to_pylist() == [{"id": 2}]
+    assert len(rewriter._prepared) == 1
+
+    # Statements DuckDB cannot PREPARE run directly.
+    rewriter.execute_arrow("CREATE TABLE bar (id INTEGER)")
+    assert rewriter.fetchall("SELECT count(*) FROM bar") == [(0,)]
@@ -15,7 +15,7 @@ import threading
 
 import duckdb
 import pandas as pd
-from sql_rewriter import AggregateDFCPolicy, DFCPolicy, SQLRewriter
+from sql_rewriter import SQLRewriter, load_policies
 
 from agent import BEDROCK_MODEL_ID, create_bedrock_client
 import use_local_duckdb  # Must be imported before duckdb to configure environment
@@ -309,6 +309,9 @@ def load_policies_from_file(rewriter, policies_path):
     Optionally, the CSV can have a separate 'description' column that will be used if DESCRIPTION
     is not present in the policy string.
 
+    All rows are parsed up front with sql_rewriter.load_policies, so every malformed policy is
+    reported in one error before anything is registered.
+
     Args:
         rewriter: SQLRewriter instance
         policies_path: Path to policies CSV file
@@ -318,54 +321,14 @@ def load_policies_from_file(rewriter, policies_path):
         ValueError: If the CSV format is invalid or policies cannot be parsed
         Exception: For any other loading or registration errors
     """
-    if not os.path.exists(policies_path):
-        raise FileNotFoundError(f"Policies file not found: {policies_path}")
-
-    try:
-        df = pd.read_csv(policies_path)
-
-        # Validate CSV has 'policy' column
-        if "policy" not in df.columns:
-            raise ValueError(f"CSV file {policies_path} must have a 'policy' column. Found columns: {', '.join(df.columns)}")
-
-        # Load and register each policy
-        for idx, row in df.iterrows():
-            policy_text = str(row["policy"]).strip()
+    policies = load_policies(policies_path)
 
-            if not policy_text or policy_text.lower() == "nan":
-                raise ValueError(f"Empty policy text at row {idx + 2} (1-indexed, including header) in {policies_path}")
-
-            try:
-                # Determine if this is an aggregate policy by checking for AGGREGATE keyword
-                normalized = policy_text.strip().upper()
-                is_aggregate = normalized.startswith("AGGREGATE") or " AGGREGATE " in normalized
-
-                # Parse and create the policy from string
-                if is_aggregate:
-                    policy = AggregateDFCPolicy.from_policy_str(policy_text)
-                else:
-                    policy = DFCPolicy.from_policy_str(policy_text)
-
-                # If description column exists and policy doesn't have a description, use CSV description
-                if "description" in df.columns and not policy.description:
-                    csv_description = str(row["description"]).strip()
-                    if csv_description and csv_description.lower() != "nan":
-                        policy.description = csv_description
-
-                # Register the policy (this will validate against database)
-                rewriter.register_policy(policy)
-
-            except ValueError as e:
-                raise ValueError(f"Failed to parse policy at row {idx + 2} in {policies_path}: {e!s}") from e
-            except Exception as e:
-                raise Exception(f"Failed to register policy at row {idx + 2} in {policies_path}: {e!s}") from e
-
-    except pd.errors.EmptyDataError as e:
-        raise ValueError(f"Policies file {policies_path} is empty") from e
-    except Exception as e:
-        if isinstance(e, (FileNotFoundError, ValueError)):
-            raise
-        raise Exception(f"Failed to load policies from {policies_path}: {e!s}") from e
+    for idx, policy in enumerate(policies):
+        try:
+            # Register the policy (this will validate against database)
+            rewriter.register_policy(policy)
+        except Exception as e:
+            raise Exception(f"Failed to register policy at row {idx + 2} in {policies_path}: {e!s}") from e
 
 
 def save_agent_logs(rewriter, txn_id, logs):
@@ -1,15 +1,23 @@
 """Shared SQL utility helpers."""
 
 from .constraints import (
+    CONSTRAINT_FORMS,
+    combine_constraints,
     combine_constraints_balanced,
     combine_constraints_balanced_expr,
     combine_expressions_balanced,
     combine_expressions_balanced_expr,
+    combine_expressions_flat_expr,
+    combine_expressions_list_bool_expr,
 )
 
 __all__ = [
+    "CONSTRAINT_FORMS",
+    "combine_constraints",
     "combine_constraints_balanced",
     "combine_constraints_balanced_expr",
     "combine_expressions_balanced",
     "combine_expressions_balanced_expr",
+    "combine_expressions_flat_expr",
+    "combine_expressions_list_bool_expr",
 ]
@@ -1,27 +1,65 @@
 """Constraint helpers for SQL expressions."""
 
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Union
+
 import sqlglot
 from sqlglot import exp
 
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+ExpressionInput = Union[str, exp.Expression]
+
+CONSTRAINT_FORMS = ("balanced", "flat", "list_bool")
+
+# AND is the minimum and OR the maximum of FALSE < NULL < TRUE, encoded as 0 < 1 < 2.
+_LIST_BOOL_FUNCTIONS = {exp.And: "list_min", exp.Or: "list_max"}
+
+
+def _prepare_expressions(
+    expressions: Sequence[ExpressionInput],
+    dialect: str,
+    dedupe: bool,
+) -> list[exp.Expression]:
+    """Parse string inputs, keep expression inputs as-is and optionally drop duplicates.
+
+    Duplicates are detected with sqlglot's structural hash, so expressions that differ
+    only in formatting (whitespace, keyword case) count as identical. The first
+    occurrence is kept.
+    """
+    parsed = [
+        expr if isinstance(expr, exp.Expression) else sqlglot.parse_one(expr, read=dialect)
+        for expr in expressions
+    ]
+    if dedupe:
+        parsed = list(dict.fromkeys(parsed))
+    return parsed
+
 
 def combine_expressions_balanced_expr(
-    expressions: list[str],
+    expressions: Sequence[ExpressionInput],
     operator: type[exp.Expression],
     dialect: str = "duckdb",
     empty_fallback: exp.Expression | None = None,
+    dedupe: bool = False,
 ) -> exp.Expression:
     """Combine expressions into a balanced tree using the provided operator.
 
     Args:
-        expressions: List of SQL expressions.
+        expressions: SQL expression strings or already-parsed sqlglot expressions.
+            Parsed expressions are used without copying, so they are re-parented into
+            the result.
         operator: sqlglot expression class (e.g., exp.And, exp.Or, exp.Add).
         dialect: SQL dialect for parsing/formatting.
         empty_fallback: Expression to use when expressions is empty.
+        dedupe: Drop structurally identical expressions before combining.
 
     Returns:
         Combined SQL expression.
     """
-    parsed = [sqlglot.parse_one(expr, read=dialect) for expr in expressions]
+    parsed = _prepare_expressions(expressions, dialect, dedupe)
     wrapped = [exp.Paren(this=expr) for expr in parsed]
 
     if not wrapped:
@@ -47,9 +85,109 @@ def combine_expressions_balanced_expr(
     return nodes[0]
 
 
+def combine_expressions_flat_expr(
+    expressions: Sequence[ExpressionInput],
+    operator: type[exp.Connector],
+    dialect: str = "duckdb",
+    empty_fallback: exp.Expression | None = None,
+    dedupe: bool = False,
+) -> exp.Expression:
+    """Combine expressions into a single n-ary AND/OR chain.
+
+    The result renders as ``a AND b AND c`` with parentheses only around inputs that are
+    themselves AND/OR expressions. It avoids the per-level ``Paren`` nodes of the balanced
+    form; sqlglot generates connector chains iteratively, so long chains do not recurse.
+
+    Args:
+        expressions: SQL expression strings or already-parsed sqlglot expressions.
+            Parsed expressions are used without copying.
+        operator: exp.And or exp.Or.
+        dialect: SQL dialect for parsing/formatting.
+        empty_fallback: Expression to use when expressions is empty.
+        dedupe: Drop structurally identical expressions before combining.
+
+    Returns:
+        Combined SQL expression.
+
+    Raises:
+        ValueError: If the operator is not exp.And or exp.Or, or expressions is empty
+            and no fallback is given.
+    """
+    if operator not in _LIST_BOOL_FUNCTIONS:
+        raise ValueError("operator must be exp.And or exp.Or")
+    parsed = _prepare_expressions(expressions, dialect, dedupe)
+    if not parsed:
+        if empty_fallback is not None:
+            return empty_fallback
+        raise ValueError("expressions must contain at least one element")
+    combine = exp.and_ if operator is exp.And else exp.or_
+    return combine(*parsed, dialect=dialect, copy=False)
+
+
+def combine_expressions_list_bool_expr(
+    expressions: Sequence[ExpressionInput],
+    operator: type[exp.Connector] = exp.And,
+    dialect: str = "duckdb",
+    empty_fallback: exp.Expression | None = None,
+    dedupe: bool = False,
+) -> exp.Expression:
+    """Combine boolean expressions as a single DuckDB list aggregate.
+
+    The list is a single flat node however many expressions it holds. DuckDB's
+    ``list_bool_and``/``list_bool_or`` skip NULL elements, so instead a lambda encodes each
+    element as FALSE=0, NULL=1, TRUE=2 and AND/OR become ``list_min``/``list_max`` of the
+    list, mapped back by ``CASE ... WHEN 2 THEN TRUE WHEN 0 THEN FALSE END``. The result
+    keeps SQL's three-valued logic, so it can be used anywhere the AND/OR could, not only
+    in WHERE/HAVING.
+
+    Args:
+        expressions: SQL expression strings or already-parsed sqlglot expressions.
+            Parsed expressions are used without copying.
+        operator: exp.And or exp.Or.
+        dialect: SQL dialect for parsing/formatting.
+        empty_fallback: Expression to use when expressions is empty.
+        dedupe: Drop structurally identical expressions before combining.
+
+    Returns:
+        Combined SQL expression.
+
+    Raises:
+        ValueError: If the operator is not exp.And or exp.Or, or expressions is empty
+            and no fallback is given.
+    """
+    function = _LIST_BOOL_FUNCTIONS.get(operator)
+    if function is None:
+        raise ValueError("operator must be exp.And or exp.Or")
+    parsed = _prepare_expressions(expressions, dialect, dedupe)
+    if not parsed:
+        if empty_fallback is not None:
+            return empty_fallback
+        raise ValueError("expressions must contain at least one element")
+    element = exp.to_identifier("x")
+    encode = exp.Lambda(
+        this=exp.Coalesce(
+            this=exp.Mul(
+                this=exp.Cast(this=element.copy(), to=exp.DataType(this=exp.DataType.Type.INT)),
+                expression=exp.Literal.number(2),
+            ),
+            expressions=[exp.Literal.number(1)],
+        ),
+        expressions=[element],
+    )
+    encoded = exp.Transform(this=exp.Array(expressions=parsed), expression=encode)
+    return exp.Case(
+        this=exp.Anonymous(this=function, expressions=[encoded]),
+        ifs=[
+            exp.If(this=exp.Literal.number(2), true=exp.true()),
+            exp.If(this=exp.Literal.number(0), true=exp.false()),
+        ],
+    )
+
+
 def combine_constraints_balanced_expr(
-    constraints: list[str],
+    constraints: Sequence[ExpressionInput],
     dialect: str = "duckdb",
+    dedupe: bool = False,
 ) -> exp.Expression:
     """Combine constraints into a balanced AND expression object."""
     return combine_expressions_balanced_expr(
@@ -57,29 +195,70 @@ def combine_constraints_balanced_expr(
         exp.And,
         dialect=dialect,
         empty_fallback=exp.Literal(this="true", is_string=False),
+        dedupe=dedupe,
     )
 
 
-def combine_constraints_balanced(constraints: list[str], dialect: str = "duckdb") -> str:
-    """Combine constraints into a balanced AND expression string.
+def combine_constraints(
+    constraints: Sequence[ExpressionInput],
+    form: str = "balanced",
+    dialect: str = "duckdb",
+    dedupe: bool = False,
+) -> str:
+    """Combine constraints into an AND expression string in the requested form.
 
     Args:
-        constraints: List of SQL constraint expressions.
+        constraints: SQL constraint strings or already-parsed sqlglot expressions.
+        form: "balanced" (balanced binary tree), "flat" (n-ary AND chain) or "list_bool"
+            (one DuckDB list aggregate, see ``combine_expressions_list_bool_expr``).
         dialect: SQL dialect for parsing/formatting.
+        dedupe: Drop structurally identical constraints before combining.
 
     Returns:
-        Combined SQL expression string.
+        Combined SQL expression string, or "TRUE" when there are no constraints.
+
+    Raises:
+        ValueError: If the form is unknown.
     """
+    if form not in CONSTRAINT_FORMS:
+        raise ValueError(f"Unknown constraint form: {form}. Expected one of {CONSTRAINT_FORMS}")
     if not constraints:
         return "TRUE"
-    return combine_constraints_balanced_expr(constraints, dialect=dialect).sql(dialect=dialect)
+    if form == "balanced":
+        expr = combine_constraints_balanced_expr(constraints, dialect=dialect, dedupe=dedupe)
+    elif form == "flat":
+        expr = combine_expressions_flat_expr(constraints, exp.And, dialect=dialect, dedupe=dedupe)
+    else:
+        expr = combine_expressions_list_bool_expr(
+            constraints, exp.And, dialect=dialect, dedupe=dedupe
+        )
+    return expr.sql(dialect=dialect)
+
+
+def combine_constraints_balanced(
+    constraints: Sequence[ExpressionInput],
+    dialect: str = "duckdb",
+    dedupe: bool = False,
+) -> str:
+    """Combine constraints into a balanced AND expression string.
+
+    Args:
+        constraints: SQL constraint strings or already-parsed sqlglot expressions.
+        dialect: SQL dialect for parsing/formatting.
+        dedupe: Drop structurally identical constraints before combining.
+
+    Returns:
+        Combined SQL expression string.
+    """
+    return combine_constraints(constraints, form="balanced", dialect=dialect, dedupe=dedupe)
 
 
 def combine_expressions_balanced(
-    expressions: list[str],
+    expressions: Sequence[ExpressionInput],
     operator: type[exp.Expression],
     dialect: str = "duckdb",
     empty_fallback: str | None = None,
+    dedupe: bool = False,
 ) -> str:
     """Combine expressions into a balanced tree and return SQL."""
     expr = combine_expressions_balanced_expr(
@@ -87,5 +266,6 @@ def combine_expressions_balanced(
         operator,
         dialect=dialect,
         empty_fallback=sqlglot.parse_one(empty_fallback, read=dialect) if empty_fallback else None,
+        dedupe=dedupe,
     )
     return expr.sql(dialect=dialect)
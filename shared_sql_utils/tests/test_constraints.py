@@ -1,15 +1,20 @@
 """Tests for constraint helpers."""
 
+import itertools
 import math
 
+import pytest
 import sqlglot
 from sqlglot import exp
 
 from shared_sql_utils import (
+    combine_constraints,
     combine_constraints_balanced,
     combine_constraints_balanced_expr,
     combine_expressions_balanced,
     combine_expressions_balanced_expr,
+    combine_expressions_flat_expr,
+    combine_expressions_list_bool_expr,
 )
 
 
@@ -101,3 +106,74 @@ def test_combine_expressions_balanced_add_contains_all_terms():
 def test_combine_expressions_balanced_empty_fallback():
     combined = combine_expressions_balanced([], exp.Or, dialect="duckdb", empty_fallback="FALSE")
     assert combined.upper() == "FALSE"
+
+
+def test_combine_accepts_pre_parsed_expressions():
+    parsed = [sqlglot.parse_one(expr, read="duckdb") for expr in ["a = 1", "b = 2", "c = 3"]]
+    from_strings = combine_expressions_balanced_expr(["a = 1", "b = 2", "c = 3"], exp.And)
+    from_parsed = combine_expressions_balanced_expr(parsed, exp.And)
+    assert from_parsed.sql(dialect="duckdb") == from_strings.sql(dialect="duckdb")
+    mixed = combine_constraints_balanced([parsed[0], "b = 2", parsed[2]])
+    assert mixed == from_strings.sql(dialect="duckdb")
+
+
+def test_combine_dedupe_uses_structural_equality():
+    constraints = ["a IS NULL", "a  is  null", "b = 2", sqlglot.parse_one("b = 2"), "a IS NULL"]
+    assert combine_constraints(constraints, form="flat", dedupe=True) == "a IS NULL AND b = 2"
+    assert combine_constraints(constraints, form="flat").count("a IS NULL") == 3
+
+
+def test_combine_expressions_flat_builds_n_ary_chain():
+    expr = combine_expressions_flat_expr(["a = 1", "b = 2 OR c = 3", "d = 4"], exp.And)
+    assert expr.sql(dialect="duckdb") == "a = 1 AND (b = 2 OR c = 3) AND d = 4"
+    assert not list(expr.find_all(exp.Paren))[1:]
+    assert combine_expressions_flat_expr(["a", "b"], exp.Or).sql() == "a OR b"
+    assert combine_expressions_flat_expr([], exp.Or, empty_fallback=exp.false()).sql() == "FALSE"
+    with pytest.raises(ValueError, match=r"exp\.And or exp\.Or"):
+        combine_expressions_flat_expr(["a", "b"], exp.Add)
+
+
+def test_combine_expressions_list_bool_matches_and_or_filtering():
+    duckdb = pytest.importorskip("duckdb")
+    conn = duckdb.connect()
+    conn.execute("CREATE TABLE t AS SELECT * FROM (VALUES (1, 2), (1, NULL), (3, 2)) v(a, b)")
+    for operator, sql_operator in [(exp.And, " AND "), (exp.Or, " OR ")]:
+        constraints = ["a = 1", "b = 2"]
+        combined = combine_expressions_list_bool_expr(constraints, operator).sql(dialect="duckdb")
+        expected = conn.execute(
+            f"SELECT a, b FROM t WHERE {sql_operator.join(constraints)} ORDER BY ALL"
+        ).fetchall()
+        actual = conn.execute(f"SELECT a, b FROM t WHERE {combined} ORDER BY ALL").fetchall()
+        assert actual == expected
+    assert combine_constraints(["a = 1"], form="list_bool") == (
+        "CASE LIST_MIN(LIST_TRANSFORM([a = 1], x -> COALESCE(CAST(x AS INT) * 2, 1))) "
+        "WHEN 2 THEN TRUE WHEN 0 THEN FALSE END"
+    )
+
+
+def test_combine_forms_preserve_null_semantics():
+    duckdb = pytest.importorskip("duckdb")
+    conn = duckdb.connect()
+    values = ["TRUE", "FALSE", "NULL"]
+    inputs = [
+        [f"CAST({value} AS BOOLEAN)" for value in combination]
+        for count in (1, 2, 3)
+        for combination in itertools.product(values, repeat=count)
+    ]
+    for operator, sql_operator in [(exp.And, " AND "), (exp.Or, " OR ")]:
+        for terms in inputs:
+            expected = conn.execute(f"SELECT {sql_operator.join(terms)}").fetchone()[0]
+            combined = [
+                combine_expressions_balanced_expr(terms, operator),
+                combine_expressions_flat_expr(terms, operator),
+                combine_expressions_list_bool_expr(terms, operator),
+            ]
+            for expr in combined:
+                actual = conn.execute(f"SELECT {expr.sql(dialect='duckdb')}").fetchone()[0]
+                assert actual is expected, (terms, expr.sql(dialect="duckdb"))
+
+
+def test_combine_constraints_rejects_unknown_form():
+    assert combine_constraints([], form="flat") == "TRUE"
+    with pytest.raises(ValueError, match="Unknown constraint form"):
+        combine_constraints(["a = 1"], form="nested")
@@ -1,6 +1,26 @@
 """SQL rewriter for intercepting and transforming queries."""
 
+from .explain import ExplainResult, PlanOperator
 from .policy import AggregateDFCPolicy, DFCPolicy, Resolution
+from .policy_loader import load_policies
+from .profiling import RewriteProfiler, RewriteStats, WorkloadStats
+from .removed_rows import CountedCursor
+from .result_cache import CacheStats
 from .rewriter import SQLRewriter
+from .tracked_connection import TrackedConnection
 
-__all__ = ["AggregateDFCPolicy", "DFCPolicy", "Resolution", "SQLRewriter"]
+__all__ = [
+    "AggregateDFCPolicy",
+    "CacheStats",
+    "CountedCursor",
+    "DFCPolicy",
+    "ExplainResult",
+    "PlanOperator",
+    "Resolution",
+    "RewriteProfiler",
+    "RewriteStats",
+    "SQLRewriter",
+    "TrackedConnection",
+    "WorkloadStats",
+    "load_policies",
+]
@@ -0,0 +1,269 @@
+"""EXPLAIN / EXPLAIN ANALYZE helpers that attribute operator cost to DFC enforcement.
+
+The plan-walking helpers follow duckdb_perf_comparer/compare_plans.py.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+import json
+from typing import Any, Optional
+
+import duckdb
+
+# Substrings in an operator's extra_info that only appear because of a policy rewrite.
+DFC_MARKERS = {
+    "kill(": "calls kill()",
+    "address_violating_rows(": "calls address_violating_rows()",
+    "__dfc_": "references a DFC helper column",
+    "policy_eval": "joins the two-phase policy_eval CTE",
+    "base_query": "joins the two-phase base_query CTE",
+}
+
+# Keys of extra_info that differ between otherwise identical operators.
+_UNSTABLE_EXTRA_KEYS = {"Estimated Cardinality"}
+
+
+@dataclass
+class PlanOperator:
+    """A single physical operator of a DuckDB plan.
+
+    Attributes:
+        name: DuckDB operator name, e.g. "HASH_JOIN" or "FILTER".
+        depth: Depth in the plan tree (0 for the root operator).
+        time_ms: Operator time in milliseconds (0.0 without ANALYZE).
+        rows: Rows produced by the operator (0 without ANALYZE).
+        extra_info: DuckDB's extra_info for the operator (expressions, tables, ...).
+        dfc: True if the operator exists only because of DFC policies.
+        dfc_reason: Why the operator was attributed to DFC, if it was.
+    """
+
+    name: str
+    depth: int
+    time_ms: float = 0.0
+    rows: int = 0
+    extra_info: dict[str, Any] = field(default_factory=dict)
+    dfc: bool = False
+    dfc_reason: Optional[str] = None
+
+
+@dataclass
+class ExplainResult:
+    """The plan of a rewritten query with DFC-attributed operators.
+
+    Attributes:
+        query: The original SQL query string.
+        rewritten_query: The SQL the rewriter produced and DuckDB planned.
+        analyzed: True if the query was executed (EXPLAIN ANALYZE) and timings are present.
+        operators: Operators of the rewritten plan in pre-order.
+        plan: The raw JSON plan returned by DuckDB.
+    """
+
+    query: str
+    rewritten_query: str
+    analyzed: bool
+    operators: list[PlanOperator]
+    plan: Any = None
+
+    @property
+    def total_ms(self) -> float:
+        """Sum of operator times."""
+        return sum(op.time_ms for op in self.operators)
+
+    @property
+    def dfc_ms(self) -> float:
+        """Sum of operator times for operators attributed to DFC."""
+        return sum(op.time_ms for op in self.operators if op.dfc)
+
+    @property
+    def dfc_fraction(self) -> float:
+        """Fraction of operator time attributable to DFC (0.0 when nothing was timed)."""
+        total = self.total_ms
+        if total == 0.0:
+            return 0.0
+        return self.dfc_ms / total
+
+    @property
+    def dfc_operators(self) -> list[PlanOperator]:
+        """Operators attributed to DFC."""
+        return [op for op in self.operators if op.dfc]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a summary of the result as a plain dictionary."""
+        return {
+            "query": self.query,
+            "analyzed": self.analyzed,
+            "total_ms": self.total_ms,
+            "dfc_ms": self.dfc_ms,
+            "dfc_fraction": self.dfc_fraction,
+            "num_operators": len(self.operators),
+            "num_dfc_operators": len(self.dfc_operators),
+        }
+
+    def format(self) -> str:
+        """Render the plan as an indented tree, marking DFC operators."""
+        lines = []
+        for op in self.operators:
+            marker = "[DFC] " if op.dfc else ""
+            line = f"{'  ' * op.depth}{marker}{op.name}"
+            if self.analyzed:
+                line += f" | {op.time_ms:.3f} ms | rows={op.rows}"
+            if op.dfc_reason:
+                line += f" | {op.dfc_reason}"
+            lines.append(line)
+        if self.analyzed:
+            lines.append(
+                f"DFC operators: {self.dfc_ms:.3f} of {self.total_ms:.3f} ms "
+                f"({self.dfc_fraction:.1%})"
+            )
+        return "\n".join(lines)
+
+
+def explain_json(conn: duckdb.DuckDBPyConnection, query: str, analyze: bool) -> Any:
+    """Run EXPLAIN (FORMAT JSON), optionally with ANALYZE, and return the parsed plan."""
+    options = "ANALYZE, FORMAT JSON" if analyze else "FORMAT JSON"
+    result = conn.execute(f"EXPLAIN ({options}) {query}").fetchone()
+    if not result:
+        raise RuntimeError("No EXPLAIN output returned.")
+    plan_json = result[1] if len(result) > 1 else result[0]
+    if isinstance(plan_json, str):
+        plan_json = json.loads(plan_json)
+    return plan_json
+
+
+def _node_name(node: dict[str, Any]) -> str:
+    return str(
+        node.get("operator_name")
+        or node.get("name")
+        or node.get("operator_type")
+        or "unknown"
+    ).strip()
+
+
+def _node_time_ms(node: dict[str, Any]) -> float:
+    try:
+        return float(node.get("operator_timing", 0.0)) * 1000.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _node_rows(node: dict[str, Any]) -> int:
+    for key in ("operator_cardinality", "cardinality"):
+        if key in node:
+            try:
+                return int(node[key])
+            except (TypeError, ValueError):
+                pass
+    return 0
+
+
+def _children(node: dict[str, Any]) -> list[dict[str, Any]]:
+    children = node.get("children")
+    if isinstance(children, list):
+        return children
+    return []
+
+
+def plan_roots(plan_json: Any) -> list[dict[str, Any]]:
+    """Return the operator roots of a JSON plan, skipping the EXPLAIN_ANALYZE wrapper."""
+    if isinstance(plan_json, list):
+        return [node for node in plan_json if isinstance(node, dict)]
+    if not isinstance(plan_json, dict):
+        raise TypeError(f"Unexpected EXPLAIN output type: {type(plan_json)}")
+    roots = [plan_json]
+    while len(roots) == 1 and _node_name(roots[0]) in ("unknown", "EXPLAIN_ANALYZE"):
+        children = _children(roots[0])
+        if not children:
+            return []
+        roots = children
+    return roots
+
+
+def _flatten(node: dict[str, Any], depth: int, out: list[PlanOperator]) -> None:
+    extra_info = node.get("extra_info")
+    out.append(
+        PlanOperator(
+            name=_node_name(node),
+            depth=depth,
+            time_ms=_node_time_ms(node),
+            rows=_node_rows(node),
+            extra_info=extra_info if isinstance(extra_info, dict) else {},
+        )
+    )
+    for child in _children(node):
+        _flatten(child, depth + 1, out)
+
+
+def _signature(op: PlanOperator) -> str:
+    stable = {k: v for k, v in op.extra_info.items() if k not in _UNSTABLE_EXTRA_KEYS}
+    return f"{op.name}:{json.dumps(stable, sort_keys=True, default=str)}"
+
+
+def _marker_reason(op: PlanOperator) -> Optional[str]:
+    text = json.dumps(op.extra_info, default=str).lower()
+    for marker, reason in DFC_MARKERS.items():
+        if marker in text:
+            return reason
+    return None
+
+
+def attribute_plan(rewritten_plan: Any, original_plan: Optional[Any] = None) -> list[PlanOperator]:
+    """Flatten the rewritten plan and tag operators that exist only because of DFC.
+
+    An operator is attributed to DFC if its expressions reference a DFC artifact (the kill
+    or LLM UDFs, DFC helper columns, the two-phase CTEs), or if it has no counterpart in the
+    plan of the original query. Counterparts are matched first on operator name plus
+    extra_info, then on operator name alone, bottom-up. The attribution is a heuristic:
+    DuckDB may push policy filters into operators the original query also needs (e.g. scan
+    filters), and that cost stays with the original operator.
+
+    Args:
+        rewritten_plan: JSON plan of the rewritten query.
+        original_plan: Optional JSON plan of the original query. If None, only marker-based
+            attribution is used.
+
+    Returns:
+        The rewritten plan's operators in pre-order.
+    """
+    operators: list[PlanOperator] = []
+    for root in plan_roots(rewritten_plan):
+        _flatten(root, 0, operators)
+
+    for op in operators:
+        reason = _marker_reason(op)
+        if reason is None:
+            continue
+        if op.name.endswith("SCAN"):
+            # A scan with a pushed-down policy filter still does the original query's work,
+            # so note the filter without attributing the scan's time to DFC.
+            op.dfc_reason = f"policy filter pushed into scan ({reason})"
+        else:
+            op.dfc = True
+            op.dfc_reason = reason
+
+    if original_plan is None:
+        return operators
+
+    original_operators: list[PlanOperator] = []
+    for root in plan_roots(original_plan):
+        _flatten(root, 0, original_operators)
+    available_signatures = Counter(_signature(op) for op in original_operators)
+    available_names = Counter(op.name for op in original_operators)
+
+    candidates = [op for op in operators if not op.dfc]
+    unmatched = []
+    for op in candidates:
+        signature = _signature(op)
+        if available_signatures[signature] > 0:
+            available_signatures[signature] -= 1
+            available_names[op.name] -= 1
+        else:
+            unmatched.append(op)
+    # Bottom-up so operators close to the data claim the remaining counterparts first.
+    for op in sorted(unmatched, key=lambda o: o.depth, reverse=True):
+        if available_names[op.name] > 0:
+            available_names[op.name] -= 1
+        else:
+            op.dfc = True
+            op.dfc_reason = "not in the original query's plan"
+    return operators
+
@@ -0,0 +1,47 @@
+"""Normalized query fingerprints for grouping queries that differ only in literals."""
+
+import hashlib
+
+from sqlglot import exp
+
+
+def _normalize_node(node: exp.Expression) -> exp.Expression:
+    if isinstance(node, (exp.Literal, exp.Boolean)):
+        return exp.Placeholder()
+    if isinstance(node, exp.Identifier):
+        # DuckDB resolves identifiers case-insensitively, quoted or not.
+        return exp.Identifier(this=node.name.lower(), quoted=node.quoted)
+    if isinstance(node, exp.In) and node.expressions:
+        if all(isinstance(e, (exp.Literal, exp.Boolean)) for e in node.expressions):
+            # x IN (1, 2) and x IN (1, 2, 3) have the same shape.
+            node.set("expressions", [exp.Placeholder()])
+    elif isinstance(node, exp.Values) and len(node.expressions) > 1:
+        # So do single- and multi-row VALUES lists.
+        node.set("expressions", node.expressions[:1])
+    return node
+
+
+def normalize_query(parsed: exp.Expression) -> str:
+    """Return the SQL of a statement with literals stripped and identifiers canonicalized.
+
+    Literals (including booleans) become ? placeholders, literal IN lists and multi-row
+    VALUES lists collapse to a single element, and identifiers are lowercased. NULL is kept,
+    since IS NULL and = ? are different shapes.
+
+    Args:
+        parsed: The parsed statement. It is not modified.
+
+    Returns:
+        The normalized SQL, on one line.
+    """
+    return parsed.transform(_normalize_node).sql(dialect="duckdb")
+
+
+def query_fingerprint(parsed: exp.Expression) -> tuple[str, str]:
+    """Return a short hash of a statement's normalized SQL, and the normalized SQL.
+
+    Statements that differ only in literal values, IN/VALUES list lengths, identifier case
+    or whitespace share a fingerprint.
+    """
+    normalized = normalize_query(parsed)
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16], normalized
@@ -1,8 +1,9 @@
 """Data Flow Control Policy definitions."""
 
 from enum import Enum
+from functools import lru_cache
 import re
-from typing import Optional
+from typing import Any, Optional, Union
 
 import sqlglot
 from sqlglot import exp
@@ -20,6 +21,221 @@ class Resolution(Enum):
     LLM = "LLM"
 
 
+# Keywords of the policy DSL; "ON FAIL" may span any whitespace.
+_POLICY_KEYWORD_RE = re.compile(
+    r"\b(SOURCES|SINK|CONSTRAINT|DESCRIPTION|ON\s+FAIL)\b", re.IGNORECASE
+)
+_AGGREGATE_PREFIX_RE = re.compile(r"\s*AGGREGATE\b", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=8192)
+def _parse_sql(sql: str) -> exp.Expression:
+    """Parse a policy SQL fragment, interning the result by its text.
+
+    Policies with identical constraints (common in large catalogs) share one parsed tree.
+    The returned expression is shared and must be treated as read-only; copy it before
+    transforming it.
+    """
+    return sqlglot.parse_one(sql, read="duckdb")
+
+
+def _parse_policy_fields(policy_str: str, aggregate: bool = False) -> dict[str, Any]:
+    """Split a policy string into DFCPolicy/AggregateDFCPolicy constructor arguments.
+
+    Scans the string once for the DSL keywords and collapses whitespace only within the
+    extracted values.
+
+    Args:
+        policy_str: The policy string to parse.
+        aggregate: If True, require and skip a leading AGGREGATE keyword.
+
+    Returns:
+        Dictionary with constraint, on_fail, sources, sink and description.
+
+    Raises:
+        ValueError: If the policy string cannot be parsed.
+    """
+    if not policy_str or not policy_str.strip():
+        raise ValueError("Policy text is empty")
+
+    start = 0
+    if aggregate:
+        match = _AGGREGATE_PREFIX_RE.match(policy_str)
+        if not match:
+            raise ValueError(
+                "AggregateDFCPolicy requires 'AGGREGATE' keyword at the start of the policy string"
+            )
+        start = match.end()
+
+    sources: list[str] = []
+    sink = None
+    constraint = None
+    on_fail = None
+    description = None
+
+    matches = list(_POLICY_KEYWORD_RE.finditer(policy_str, start))
+    for i, match in enumerate(matches):
+        value_end = matches[i + 1].start() if i + 1 < len(matches) else len(policy_str)
+        value = _WHITESPACE_RE.sub(" ", policy_str[match.end():value_end]).strip()
+        keyword = match.group(1).upper()
+
+        if keyword == "SOURCES":
+            if not value or value.upper() == "NONE":
+                sources = []
+            else:
+                sources = [item.strip() for item in value.split(",") if item.strip()]
+        elif keyword == "SINK":
+            sink = value if value and value.upper() != "NONE" else None
+        elif keyword == "CONSTRAINT":
+            constraint = value
+        elif keyword == "DESCRIPTION":
+            description = value if value else None
+        else:
+            try:
+                on_fail = Resolution(value.upper())
+            except ValueError as e:
+                raise ValueError(
+                    f"Invalid ON FAIL value '{value}'. Must be 'REMOVE', 'KILL', "
+                    f"'INVALIDATE', 'INVALIDATE_MESSAGE', or 'LLM'"
+                ) from e
+
+    if constraint is None:
+        raise ValueError("CONSTRAINT is required but not found in policy text")
+
+    if on_fail is None:
+        raise ValueError("ON FAIL is required but not found in policy text")
+
+    if not sources and sink is None:
+        raise ValueError("Either SOURCES or SINK must be provided")
+
+    return {
+        "constraint": constraint,
+        "on_fail": on_fail,
+        "sources": sources,
+        "sink": sink,
+        "description": description,
+    }
+
+
+def _parse_constraint_sql(constraint: str) -> exp.Expression:
+    """Parse a policy constraint expression (see DFCPolicy._parse_constraint)."""
+    try:
+        constraint_parsed = _parse_sql(constraint)
+        if isinstance(constraint_parsed, exp.Select):
+            raise ValueError("Constraint must be an expression, not a SELECT statement")
+
+        try:
+            parsed = _parse_sql(f"SELECT {constraint} AS test")
+            if not isinstance(parsed, exp.Select):
+                raise ValueError("Constraint must be a valid SQL expression")
+
+            # The first expression is an Alias, and we want the 'this' attribute
+            if parsed.expressions and hasattr(parsed.expressions[0], "this"):
+                return parsed.expressions[0].this
+            return constraint_parsed
+        except sqlglot.errors.ParseError:
+            return constraint_parsed
+    except sqlglot.errors.ParseError as e:
+        constraint_upper = constraint.strip().upper()
+        if constraint_upper.startswith("SELECT"):
+            raise ValueError("Constraint must be an expression, not a SELECT statement") from e
+        raise ValueError(f"Invalid constraint SQL expression '{constraint}': {e}") from e
+    except Exception as e:
+        if "Constraint" in str(e) or "must be an expression" in str(e):
+            raise
+        if "Invalid" not in str(e):
+            raise ValueError(f"Invalid constraint SQL expression '{constraint}': {e}") from e
+        raise
+
+
+# Nodes whose value depends on data even when no column is referenced.
+_DATA_DEPENDENT_NODES = (exp.Column, exp.AggFunc, exp.Star, exp.Subquery, exp.Select)
+
+
+def _fold_constant_branch(node: exp.Expression) -> exp.Expression:
+    """Fold TRUE/FALSE operands of AND/OR/NOT in an owned (mutable) expression tree."""
+    if isinstance(node, exp.Paren):
+        inner = _fold_constant_branch(node.this)
+        return inner if isinstance(inner, exp.Boolean) else node.replace(exp.Paren(this=inner))
+    if isinstance(node, (exp.And, exp.Or)):
+        left = _fold_constant_branch(node.left)
+        right = _fold_constant_branch(node.right)
+        # TRUE absorbs an OR and FALSE absorbs an AND; the other literal is the identity.
+        absorbing = isinstance(node, exp.Or)
+        for side in (left, right):
+            if isinstance(side, exp.Boolean) and side.this is absorbing:
+                return exp.Boolean(this=absorbing)
+        if isinstance(left, exp.Boolean):
+            return right
+        if isinstance(right, exp.Boolean):
+            return left
+        return type(node)(this=left, expression=right)
+    if isinstance(node, exp.Not):
+        inner = _fold_constant_branch(node.this)
+        if isinstance(inner, exp.Boolean):
+            return exp.Boolean(this=not inner.this)
+        return exp.Not(this=inner)
+    if isinstance(node, exp.Predicate) and not node.find(*_DATA_DEPENDENT_NODES):
+        # Imported lazily: the optimizer is only needed for constraints with constant terms.
+        from sqlglot.optimizer.simplify import simplify
+
+        simplified = simplify(node.copy(), dialect="duckdb")
+        if isinstance(simplified, exp.Boolean):
+            return simplified
+    return node
+
+
+def _fold_constant_branches(constraint: exp.Expression) -> exp.Expression:
+    """Drop constraint branches whose value does not depend on the data.
+
+    For example, ``max(foo.a) > 0 OR 1 = 1`` folds to ``TRUE`` and
+    ``max(foo.a) > 0 AND (max(foo.b) > 0 OR TRUE)`` folds to ``max(foo.a) > 0``.
+    The folded constraint is only used when it references fewer columns, so that
+    policies without dead branches keep their SQL unchanged while columns in dead
+    branches are never threaded through subqueries or CTEs.
+
+    Args:
+        constraint: The parsed constraint. It is not modified.
+
+    Returns:
+        The folded constraint, or ``constraint`` itself when folding removes no columns.
+    """
+    has_constant_term = any(
+        isinstance(node, exp.Boolean)
+        or (isinstance(node, exp.Predicate) and not node.find(*_DATA_DEPENDENT_NODES))
+        for node in constraint.walk()
+    )
+    if not has_constant_term:
+        return constraint
+    folded = _fold_constant_branch(constraint.copy())
+    original_columns = {column.sql() for column in constraint.find_all(exp.Column)}
+    folded_columns = {column.sql() for column in folded.find_all(exp.Column)}
+    return folded if folded_columns < original_columns else constraint
+
+
+def restore_policy(
+    cls: type, constraint_parsed: exp.Expression, **fields: Any
+) -> Union["DFCPolicy", "AggregateDFCPolicy"]:
+    """Build a policy around an already validated, parsed constraint.
+
+    The constructor's argument checks still run, but the constraint is neither parsed nor
+    validated again. Used to load saved policy registries.
+
+    Args:
+        cls: DFCPolicy or AggregateDFCPolicy.
+        constraint_parsed: The parsed constraint, as produced by the policy's constructor.
+        **fields: The constructor arguments.
+
+    Returns:
+        The policy.
+    """
+    policy = cls.__new__(cls)
+    policy._prepared_constraint = constraint_parsed
+    policy.__init__(**fields)
+    return policy
+
+
 class DFCPolicy:
     """Data Flow Control Policy.
 
@@ -94,8 +310,14 @@ class DFCPolicy:
                 raise ValueError("sink_alias must be a non-empty string")
             self._sink_reference_names.add(self.sink_alias.lower())
 
-        self._constraint_parsed = self._parse_constraint()
-        self._validate()
+        prepared = self.__dict__.pop("_prepared_constraint", None)
+        if prepared is not None:
+            # Restored by restore_policy: the constraint was validated before it was saved.
+            self._constraint_parsed = prepared
+        else:
+            self._constraint_parsed = self._parse_constraint()
+            self._validate()
+            self._constraint_parsed = _fold_constant_branches(self._constraint_parsed)
         self._source_columns_needed = self._calculate_source_columns_needed()
 
     @classmethod
@@ -118,92 +340,7 @@ class DFCPolicy:
         Raises:
             ValueError: If the policy string cannot be parsed or is invalid
         """
-        if not policy_str or not policy_str.strip():
-            raise ValueError("Policy text is empty")
-
-        # Normalize whitespace: replace all whitespace sequences with single spaces
-        normalized = re.sub(r"\s+", " ", policy_str.strip())
-
-        sources: list[str] = []
-        sink = None
-        constraint = None
-        on_fail = None
-        description = None
-
-        # Find positions of all keywords (case-insensitive)
-        # Handle "ON FAIL" as a special case since it's two words
-        keyword_positions = []
-
-        # Find single-word keywords
-        for keyword in ["SOURCES", "SINK", "CONSTRAINT", "DESCRIPTION"]:
-            pattern = r"\b" + re.escape(keyword) + r"\b"
-            for match in re.finditer(pattern, normalized, re.IGNORECASE):
-                keyword_positions.append((match.start(), keyword.upper()))
-
-        # Find "ON FAIL" (two words)
-        for match in re.finditer(r"\bON\s+FAIL\b", normalized, re.IGNORECASE):
-            keyword_positions.append((match.start(), "ON FAIL"))
-
-        # Sort by position
-        keyword_positions.sort()
-
-        # Extract values between keywords
-        for i, (pos, keyword) in enumerate(keyword_positions):
-            # Find the start of the value (after the keyword and whitespace)
-            value_start = pos + 7 if keyword == "ON FAIL" else pos + len(keyword)
-            # Skip whitespace after keyword
-            while value_start < len(normalized) and normalized[value_start] == " ":
-                value_start += 1
-
-            # Find the end of the value (start of next keyword or end of string)
-            if i + 1 < len(keyword_positions):
-                value_end = keyword_positions[i + 1][0]
-                # Back up to remove trailing whitespace
-                while value_end > value_start and normalized[value_end - 1] == " ":
-                    value_end -= 1
-            else:
-                value_end = len(normalized)
-
-            value = normalized[value_start:value_end].strip()
-
-            if keyword == "SOURCES":
-                if not value or value.upper() == "NONE":
-                    sources = []
-                else:
-                    sources = [item.strip() for item in value.split(",") if item.strip()]
-            elif keyword == "SINK":
-                sink = value if value and value.upper() != "NONE" else None
-            elif keyword == "CONSTRAINT":
-                constraint = value
-            elif keyword == "ON FAIL":
-                try:
-                    on_fail = Resolution(value.upper())
-                except ValueError as e:
-                    raise ValueError(
-                        f"Invalid ON FAIL value '{value}'. Must be 'REMOVE', 'KILL', "
-                        f"'INVALIDATE', 'INVALIDATE_MESSAGE', or 'LLM'"
-                    ) from e
-            elif keyword == "DESCRIPTION":
-                description = value if value else None
-
-        # Validate required fields
-        if constraint is None:
-            raise ValueError("CONSTRAINT is required but not found in policy text")
-
-        if on_fail is None:
-            raise ValueError("ON FAIL is required but not found in policy text")
-
-        if not sources and sink is None:
-            raise ValueError("Either SOURCES or SINK must be provided")
-
-        # Create and return the policy
-        return cls(
-            constraint=constraint,
-            on_fail=on_fail,
-            sources=sources,
-            sink=sink,
-            description=description
-        )
+        return cls(**_parse_policy_fields(policy_str))
 
     def _validate(self) -> None:
         """Validate that source, sink, and constraint are valid SQL syntax.
@@ -238,7 +375,7 @@ class DFCPolicy:
                     sink_ref = f"{self.sink} AS {self.sink_alias}"
                 test_query = f"SELECT ({self.constraint}) AS policy_check FROM {sink_ref}"
 
-            sqlglot.parse_one(test_query, read="duckdb")
+            _parse_sql(test_query)
         except sqlglot.errors.ParseError as e:
             raise ValueError(
                 f"Constraint '{self.constraint}' cannot be evaluated with "
@@ -259,8 +396,7 @@ class DFCPolicy:
             ValueError: If the table name is invalid.
         """
         try:
-            test_query = f"SELECT * FROM {table_name}"
-            parsed = sqlglot.parse_one(test_query, read="duckdb")
+            parsed = _parse_sql(f"SELECT * FROM {table_name}")
             if not isinstance(parsed, sqlglot.exp.Select):
                 raise ValueError(f"{table_type} '{table_name}' is not a valid table identifier")
             tables = list(parsed.find_all(sqlglot.exp.Table))
@@ -276,10 +412,7 @@ class DFCPolicy:
     def _validate_identifier_name(self, identifier: str, identifier_type: str) -> None:
         """Validate that an identifier is syntactically valid."""
         try:
-            sqlglot.parse_one(
-                f"SELECT 1 FROM dummy_table AS {identifier}",
-                read="duckdb",
-            )
+            _parse_sql(f"SELECT 1 FROM dummy_table AS {identifier}")
         except sqlglot.errors.ParseError as e:
             raise ValueError(f"Invalid {identifier_type.lower()} '{identifier}': {e}") from e
 
@@ -292,34 +425,7 @@ class DFCPolicy:
         Raises:
             ValueError: If the constraint is invalid or is a SELECT statement.
         """
-        try:
-            constraint_parsed = sqlglot.parse_one(self.constraint, read="duckdb")
-            if isinstance(constraint_parsed, exp.Select):
-                raise ValueError("Constraint must be an expression, not a SELECT statement")
-
-            try:
-                test_query = f"SELECT {self.constraint} AS test"
-                parsed = sqlglot.parse_one(test_query, read="duckdb")
-                if not isinstance(parsed, exp.Select):
-                    raise ValueError("Constraint must be a valid SQL expression")
-
-                # The first expression is an Alias, and we want the 'this' attribute
-                if parsed.expressions and hasattr(parsed.expressions[0], "this"):
-                    return parsed.expressions[0].this
-                return constraint_parsed
-            except sqlglot.errors.ParseError:
-                return constraint_parsed
-        except sqlglot.errors.ParseError as e:
-            constraint_upper = self.constraint.strip().upper()
-            if constraint_upper.startswith("SELECT"):
-                raise ValueError("Constraint must be an expression, not a SELECT statement") from e
-            raise ValueError(f"Invalid constraint SQL expression '{self.constraint}': {e}") from e
-        except Exception as e:
-            if "Constraint" in str(e) or "must be an expression" in str(e):
-                raise
-            if "Invalid" not in str(e):
-                raise ValueError(f"Invalid constraint SQL expression '{self.constraint}': {e}") from e
-            raise
+        return _parse_constraint_sql(self.constraint)
 
 
     def _validate_column_qualification(self) -> None:
@@ -527,8 +633,14 @@ class AggregateDFCPolicy:
         self.description = description
         self._sources_lower = {source.lower() for source in self.sources}
 
-        self._constraint_parsed = self._parse_constraint()
-        self._validate()
+        prepared = self.__dict__.pop("_prepared_constraint", None)
+        if prepared is not None:
+            # Restored by restore_policy: the constraint was validated before it was saved.
+            self._constraint_parsed = prepared
+        else:
+            self._constraint_parsed = self._parse_constraint()
+            self._validate()
+            self._constraint_parsed = _fold_constant_branches(self._constraint_parsed)
         self._source_columns_needed = self._calculate_source_columns_needed()
 
     @classmethod
@@ -551,100 +663,7 @@ class AggregateDFCPolicy:
         Raises:
             ValueError: If the policy string cannot be parsed or is invalid
         """
-        if not policy_str or not policy_str.strip():
-            raise ValueError("Policy text is empty")
-
-        # Normalize whitespace: replace all whitespace sequences with single spaces
-        normalized = re.sub(r"\s+", " ", policy_str.strip())
-
-        # Check for AGGREGATE keyword at the start (case-insensitive)
-        if not re.match(r"\bAGGREGATE\b", normalized, re.IGNORECASE):
-            raise ValueError(
-                "AggregateDFCPolicy requires 'AGGREGATE' keyword at the start of the policy string"
-            )
-
-        # Remove AGGREGATE keyword from the start only
-        normalized = re.sub(r"^\s*\bAGGREGATE\b\s+", "", normalized, flags=re.IGNORECASE).strip()
-
-        sources: list[str] = []
-        sink = None
-        constraint = None
-        on_fail = None
-        description = None
-
-        # Find positions of all keywords (case-insensitive)
-        keyword_positions = []
-
-        # Find single-word keywords
-        for keyword in ["SOURCES", "SINK", "CONSTRAINT", "DESCRIPTION"]:
-            pattern = r"\b" + re.escape(keyword) + r"\b"
-            for match in re.finditer(pattern, normalized, re.IGNORECASE):
-                keyword_positions.append((match.start(), keyword.upper()))
-
-        # Find "ON FAIL" (two words)
-        for match in re.finditer(r"\bON\s+FAIL\b", normalized, re.IGNORECASE):
-            keyword_positions.append((match.start(), "ON FAIL"))
-
-        # Sort by position
-        keyword_positions.sort()
-
-        # Extract values between keywords
-        for i, (pos, keyword) in enumerate(keyword_positions):
-            # Find the start of the value (after the keyword and whitespace)
-            value_start = pos + 7 if keyword == "ON FAIL" else pos + len(keyword)
-            # Skip whitespace after keyword
-            while value_start < len(normalized) and normalized[value_start] == " ":
-                value_start += 1
-
-            # Find the end of the value (start of next keyword or end of string)
-            if i + 1 < len(keyword_positions):
-                value_end = keyword_positions[i + 1][0]
-                # Back up to remove trailing whitespace
-                while value_end > value_start and normalized[value_end - 1] == " ":
-                    value_end -= 1
-            else:
-                value_end = len(normalized)
-
-            value = normalized[value_start:value_end].strip()
-
-            if keyword == "SOURCES":
-                if not value or value.upper() == "NONE":
-                    sources = []
-                else:
-                    sources = [item.strip() for item in value.split(",") if item.strip()]
-            elif keyword == "SINK":
-                sink = value if value and value.upper() != "NONE" else None
-            elif keyword == "CONSTRAINT":
-                constraint = value
-            elif keyword == "ON FAIL":
-                try:
-                    on_fail = Resolution(value.upper())
-                except ValueError as e:
-                    raise ValueError(
-                        f"Invalid ON FAIL value '{value}'. Must be 'REMOVE', 'KILL', "
-                        f"'INVALIDATE', 'INVALIDATE_MESSAGE', or 'LLM'"
-                    ) from e
-            elif keyword == "DESCRIPTION":
-                description = value if value else None
-
-        # Validate required fields
-        if constraint is None:
-            raise ValueError("CONSTRAINT is required but not found in policy text")
-
-        if on_fail is None:
-            raise ValueError("ON FAIL is required but not found in policy text")
-
-        if not sources and sink is None:
-            raise ValueError("Either SOURCES or SINK must be provided")
-
-        # Create and return the policy
-        return cls(
-            constraint=constraint,
-            on_fail=on_fail,
-            sources=sources,
-            sink=sink,
-            description=description
-        )
+        return cls(**_parse_policy_fields(policy_str, aggregate=True))
 
     def _validate(self) -> None:
         """Validate that source, sink, and constraint are valid SQL syntax.
@@ -671,7 +690,7 @@ class AggregateDFCPolicy:
             else:
                 test_query = f"SELECT ({self.constraint}) AS policy_check FROM {self.sink}"
 
-            sqlglot.parse_one(test_query, read="duckdb")
+            _parse_sql(test_query)
         except sqlglot.errors.ParseError as e:
             raise ValueError(
                 f"Constraint '{self.constraint}' cannot be evaluated with "
@@ -692,8 +711,7 @@ class AggregateDFCPolicy:
             ValueError: If the table name is invalid.
         """
         try:
-            test_query = f"SELECT * FROM {table_name}"
-            parsed = sqlglot.parse_one(test_query, read="duckdb")
+            parsed = _parse_sql(f"SELECT * FROM {table_name}")
             if not isinstance(parsed, sqlglot.exp.Select):
                 raise ValueError(f"{table_type} '{table_name}' is not a valid table identifier")
             tables = list(parsed.find_all(sqlglot.exp.Table))
@@ -715,34 +733,7 @@ class AggregateDFCPolicy:
         Raises:
             ValueError: If the constraint is invalid or is a SELECT statement.
         """
-        try:
-            constraint_parsed = sqlglot.parse_one(self.constraint, read="duckdb")
-            if isinstance(constraint_parsed, exp.Select):
-                raise ValueError("Constraint must be an expression, not a SELECT statement")
-
-            try:
-                test_query = f"SELECT {self.constraint} AS test"
-                parsed = sqlglot.parse_one(test_query, read="duckdb")
-                if not isinstance(parsed, exp.Select):
-                    raise ValueError("Constraint must be a valid SQL expression")
-
-                # The first expression is an Alias, and we want the 'this' attribute
-                if parsed.expressions and hasattr(parsed.expressions[0], "this"):
-                    return parsed.expressions[0].this
-                return constraint_parsed
-            except sqlglot.errors.ParseError:
-                return constraint_parsed
-        except sqlglot.errors.ParseError as e:
-            constraint_upper = self.constraint.strip().upper()
-            if constraint_upper.startswith("SELECT"):
-                raise ValueError("Constraint must be an expression, not a SELECT statement") from e
-            raise ValueError(f"Invalid constraint SQL expression '{self.constraint}': {e}") from e
-        except Exception as e:
-            if "Constraint" in str(e) or "must be an expression" in str(e):
-                raise
-            if "Invalid" not in str(e):
-                raise ValueError(f"Invalid constraint SQL expression '{self.constraint}': {e}") from e
-            raise
+        return _parse_constraint_sql(self.constraint)
 
     def _validate_column_qualification(self) -> None:
         """Validate that all columns in the constraint are qualified with table names.
@@ -0,0 +1,158 @@
+"""Bulk loading of DFC policy catalogs from CSV or JSONL files."""
+
+import csv
+import json
+import os
+from typing import Any, Union
+
+from .policy import AggregateDFCPolicy, DFCPolicy, Resolution
+
+Policy = Union[DFCPolicy, AggregateDFCPolicy]
+
+
+def _is_aggregate_policy_str(policy_text: str) -> bool:
+    return policy_text.lstrip()[:9].upper() == "AGGREGATE"
+
+
+def _policy_from_text(policy_text: str, description: str = "") -> Policy:
+    if _is_aggregate_policy_str(policy_text):
+        policy = AggregateDFCPolicy.from_policy_str(policy_text)
+    else:
+        policy = DFCPolicy.from_policy_str(policy_text)
+    if description and not policy.description:
+        policy.description = description
+    return policy
+
+
+def _policy_from_record(record: dict[str, Any]) -> Policy:
+    """Build a policy from a JSONL record.
+
+    A record either holds a policy string under "policy" (plus an optional "description"),
+    or the constructor fields: constraint, on_fail, sources, sink, sink_alias, description
+    and an optional boolean "aggregate".
+    """
+    if "policy" in record:
+        policy_text = record["policy"]
+        if not isinstance(policy_text, str) or not policy_text.strip():
+            raise ValueError("Empty policy text")
+        return _policy_from_text(policy_text, record.get("description") or "")
+
+    if "constraint" not in record or "on_fail" not in record:
+        raise ValueError("Record must have a 'policy' field or 'constraint' and 'on_fail' fields")
+    try:
+        on_fail = Resolution(str(record["on_fail"]).upper())
+    except ValueError as e:
+        raise ValueError(f"Invalid on_fail value '{record['on_fail']}'") from e
+    sources = record.get("sources") or []
+    if isinstance(sources, str):
+        sources = [source.strip() for source in sources.split(",") if source.strip()]
+
+    if record.get("aggregate"):
+        return AggregateDFCPolicy(
+            constraint=record["constraint"],
+            on_fail=on_fail,
+            sources=sources,
+            sink=record.get("sink"),
+            description=record.get("description"),
+        )
+    return DFCPolicy(
+        constraint=record["constraint"],
+        on_fail=on_fail,
+        sources=sources,
+        sink=record.get("sink"),
+        sink_alias=record.get("sink_alias"),
+        description=record.get("description"),
+    )
+
+
+def _load_csv(path: str, errors: list[str]) -> list[Policy]:
+    policies = []
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        if not reader.fieldnames:
+            raise ValueError(f"Policies file {path} is empty")
+        if "policy" not in reader.fieldnames:
+            found = ", ".join(reader.fieldnames)
+            raise ValueError(
+                f"CSV file {path} must have a 'policy' column. Found columns: {found}"
+            )
+        for row_number, row in enumerate(reader, start=2):
+            policy_text = (row.get("policy") or "").strip()
+            if not policy_text:
+                errors.append(f"row {row_number}: Empty policy text")
+                continue
+            try:
+                policies.append(
+                    _policy_from_text(policy_text, (row.get("description") or "").strip())
+                )
+            except ValueError as e:
+                errors.append(f"row {row_number}: {e}")
+    return policies
+
+
+def _load_jsonl(path: str, errors: list[str]) -> list[Policy]:
+    policies = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                errors.append(f"line {line_number}: Invalid JSON: {e}")
+                continue
+            if not isinstance(record, dict):
+                errors.append(f"line {line_number}: Expected a JSON object")
+                continue
+            try:
+                policies.append(_policy_from_record(record))
+            except ValueError as e:
+                errors.append(f"line {line_number}: {e}")
+    return policies
+
+
+def load_policies(path: str) -> list[Policy]:
+    """Load a policy catalog from a CSV or JSONL file.
+
+    CSV files need a 'policy' column holding policy strings (see DFCPolicy.from_policy_str;
+    strings starting with AGGREGATE create AggregateDFCPolicy objects) and may have a
+    'description' column used when the string has no DESCRIPTION. JSONL files hold one object
+    per line, either {"policy": ...} or the constructor fields (constraint, on_fail,
+    sources, sink, sink_alias, description, aggregate).
+
+    Identical constraint strings are parsed once and share their parsed expression. Every
+    row is parsed before any error is raised, so all problems are reported together.
+    Policies are only parsed and validated syntactically; register them with
+    SQLRewriter.register_policy to bind them to a database.
+
+    Args:
+        path: Path to a .csv, .jsonl or .ndjson file.
+
+    Returns:
+        The policies in file order.
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist.
+        ValueError: If the file type is unsupported or any policy fails to parse. The
+            message lists every failing row.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Policies file not found: {path}")
+
+    extension = os.path.splitext(path)[1].lower()
+    errors: list[str] = []
+    if extension == ".csv":
+        policies = _load_csv(path, errors)
+    elif extension in (".jsonl", ".ndjson"):
+        policies = _load_jsonl(path, errors)
+    else:
+        raise ValueError(
+            f"Unsupported policies file type '{extension}'. Expected .csv, .jsonl or .ndjson"
+        )
+
+    if errors:
+        raise ValueError(
+            f"Failed to load {len(errors)} policies from {path}:\n"
+            + "\n".join(f"  {error}" for error in errors)
+        )
+    return policies
@@ -0,0 +1,119 @@
+"""Saved policy registries: validated, pre-parsed policies plus a catalog fingerprint."""
+
+import hashlib
+from typing import Any, Union
+
+import duckdb
+from sqlglot import serde
+
+from .policy import AggregateDFCPolicy, DFCPolicy, Resolution, restore_policy
+
+Policy = Union[DFCPolicy, AggregateDFCPolicy]
+
+REGISTRY_FORMAT_VERSION = 1
+
+
+def policy_tables(policies: list[Policy]) -> set[str]:
+    """Return the lowercase names of the tables policies read from or write to."""
+    tables = set()
+    for policy in policies:
+        tables.update(policy._sources_lower)
+        if policy.sink:
+            tables.add(policy.sink.lower())
+    return tables
+
+
+def catalog_fingerprint(conn: duckdb.DuckDBPyConnection, tables: set[str]) -> str:
+    """Hash the columns and column types of tables in the main schema.
+
+    Registering a policy only depends on which of its tables exist and on their columns and
+    types, so two catalogs with the same fingerprint validate the same policies the same way.
+    """
+    rows = conn.execute(
+        """
+        SELECT lower(table_name), lower(column_name), data_type
+        FROM information_schema.columns
+        WHERE table_schema = 'main' AND list_contains(?, lower(table_name))
+        ORDER BY 1, 2
+        """,
+        [sorted(tables)],
+    ).fetchall()
+    digest = hashlib.sha256()
+    digest.update(repr(sorted(tables)).encode())
+    digest.update(repr(rows).encode())
+    return digest.hexdigest()
+
+
+def dump_registry(policies: list[Policy], fingerprint: str) -> dict[str, Any]:
+    """Serialize policies and the catalog fingerprint they were validated against.
+
+    Constraints are stored once per distinct constraint string, as sqlglot ASTs.
+    """
+    constraint_index: dict[str, int] = {}
+    constraints = []
+    records = []
+    for policy in policies:
+        if policy.constraint not in constraint_index:
+            constraint_index[policy.constraint] = len(constraints)
+            constraints.append(serde.dump(policy._constraint_parsed))
+        record = {
+            "aggregate": isinstance(policy, AggregateDFCPolicy),
+            "constraint": policy.constraint,
+            "constraint_ast": constraint_index[policy.constraint],
+            "on_fail": policy.on_fail.value,
+            "sources": policy.sources,
+            "sink": policy.sink,
+            "description": policy.description,
+        }
+        if not record["aggregate"]:
+            record["sink_alias"] = policy.sink_alias
+        records.append(record)
+    return {
+        "version": REGISTRY_FORMAT_VERSION,
+        "fingerprint": fingerprint,
+        "constraints": constraints,
+        "policies": records,
+    }
+
+
+def load_registry(data: dict[str, Any]) -> tuple[str, list[Policy]]:
+    """Rebuild the policies of a serialized registry without re-parsing their constraints.
+
+    Policies with the same constraint share one parsed expression, as they do when loaded
+    from a catalog file.
+
+    Args:
+        data: A dictionary produced by dump_registry.
+
+    Returns:
+        The catalog fingerprint and the policies, in registration order.
+
+    Raises:
+        ValueError: If the data is not a registry of a supported format version.
+    """
+    if not isinstance(data, dict) or data.get("version") != REGISTRY_FORMAT_VERSION:
+        version = data.get("version") if isinstance(data, dict) else None
+        raise ValueError(
+            f"Unsupported policy registry format version {version!r}, "
+            f"expected {REGISTRY_FORMAT_VERSION}"
+        )
+    try:
+        constraints = [serde.load(constraint) for constraint in data["constraints"]]
+        policies = []
+        for record in data["policies"]:
+            fields = {
+                "constraint": record["constraint"],
+                "on_fail": Resolution(record["on_fail"]),
+                "sources": list(record["sources"]),
+                "sink": record["sink"],
+                "description": record["description"],
+            }
+            if record["aggregate"]:
+                cls = AggregateDFCPolicy
+            else:
+                cls = DFCPolicy
+                fields["sink_alias"] = record["sink_alias"]
+            policies.append(restore_policy(cls, constraints[record["constraint_ast"]], **fields))
+    except (KeyError, IndexError, TypeError) as e:
+        raise ValueError(f"Malformed policy registry: {e!r}") from e
+    return data["fingerprint"], policies
@@ -0,0 +1,381 @@
+"""Rewrite-time profiling for SQLRewriter."""
+
+from collections import OrderedDict, deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import time
+from typing import Any, Optional
+
+
+@dataclass
+class RewriteStats:
+    """Timing breakdown for a single transform/execute call.
+
+    Attributes:
+        query: The original SQL query string.
+        phases_ms: Milliseconds spent per phase (parse, policy matching, each rewrite rule,
+            SQL generation, execution), in the order phases were first entered.
+        phase_calls: Number of times each phase was entered during the call.
+        counters: Per-call counters, e.g. the number of matching policies.
+        total_ms: Wall-clock milliseconds for the whole call.
+        error: Error message if the call raised, otherwise None.
+        fingerprint: Hash of the normalized query (see fingerprint.query_fingerprint).
+        normalized_query: The query with literals stripped and identifiers lowercased.
+        matched_policies: Identifiers of the policies matched during the call, sorted.
+        removed_rows: Rows each REMOVE policy filtered out of the executed query, by policy
+            identifier. Only recorded when the rewriter counts removed rows.
+    """
+
+    query: str
+    phases_ms: dict[str, float] = field(default_factory=dict)
+    phase_calls: dict[str, int] = field(default_factory=dict)
+    counters: dict[str, int] = field(default_factory=dict)
+    total_ms: float = 0.0
+    error: Optional[str] = None
+    fingerprint: Optional[str] = None
+    normalized_query: Optional[str] = None
+    matched_policies: tuple[str, ...] = ()
+    removed_rows: dict[str, int] = field(default_factory=dict)
+
+    def add_phase(self, name: str, elapsed_ms: float) -> None:
+        """Accumulate time spent in a phase."""
+        self.phases_ms[name] = self.phases_ms.get(name, 0.0) + elapsed_ms
+        self.phase_calls[name] = self.phase_calls.get(name, 0) + 1
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the stats as a plain dictionary (e.g. for logging or CSV export)."""
+        return {
+            "query": self.query,
+            "phases_ms": dict(self.phases_ms),
+            "phase_calls": dict(self.phase_calls),
+            "counters": dict(self.counters),
+            "total_ms": self.total_ms,
+            "error": self.error,
+            "fingerprint": self.fingerprint,
+            "normalized_query": self.normalized_query,
+            "matched_policies": list(self.matched_policies),
+            "removed_rows": dict(self.removed_rows),
+        }
+
+    @property
+    def execute_ms(self) -> float:
+        """Milliseconds spent executing the rewritten query (0.0 for transform-only calls)."""
+        return self.phases_ms.get("execute", 0.0)
+
+
+@dataclass
+class WorkloadStats:
+    """Aggregated stats for all calls sharing a query fingerprint.
+
+    Attributes:
+        fingerprint: Hash of the normalized query.
+        normalized_query: The query with literals stripped and identifiers lowercased.
+        calls: Number of recorded calls.
+        errors: Number of calls that raised.
+        total_ms: Wall-clock milliseconds across all calls.
+        rewrite_ms: Milliseconds not spent executing (parsing, matching, rewriting, ...).
+        execute_ms: Milliseconds spent executing rewritten queries.
+        max_ms: Slowest single call.
+        counters: Per-call counters summed across calls.
+        policy_sets: Number of calls per matched policy set (sorted policy identifiers).
+        removed_rows: Rows filtered out by each REMOVE policy, summed across calls.
+    """
+
+    fingerprint: str
+    normalized_query: str
+    calls: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    rewrite_ms: float = 0.0
+    execute_ms: float = 0.0
+    max_ms: float = 0.0
+    counters: dict[str, int] = field(default_factory=dict)
+    policy_sets: dict[tuple[str, ...], int] = field(default_factory=dict)
+    removed_rows: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def mean_ms(self) -> float:
+        """Mean wall-clock milliseconds per call."""
+        return self.total_ms / self.calls if self.calls else 0.0
+
+    def add(self, stats: RewriteStats) -> None:
+        """Fold one call into the aggregate."""
+        self.calls += 1
+        if stats.error is not None:
+            self.errors += 1
+        self.total_ms += stats.total_ms
+        self.execute_ms += stats.execute_ms
+        self.rewrite_ms += stats.total_ms - stats.execute_ms
+        self.max_ms = max(self.max_ms, stats.total_ms)
+        for name, value in stats.counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+        key = stats.matched_policies
+        self.policy_sets[key] = self.policy_sets.get(key, 0) + 1
+        for policy_id, rows in stats.removed_rows.items():
+            self.removed_rows[policy_id] = self.removed_rows.get(policy_id, 0) + rows
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the stats as a plain dictionary."""
+        return {
+            "fingerprint": self.fingerprint,
+            "normalized_query": self.normalized_query,
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_ms": self.total_ms,
+            "mean_ms": self.mean_ms,
+            "rewrite_ms": self.rewrite_ms,
+            "execute_ms": self.execute_ms,
+            "max_ms": self.max_ms,
+            "counters": dict(self.counters),
+            "policy_sets": [
+                {"policies": list(policies), "calls": calls}
+                for policies, calls in self.policy_sets.items()
+            ],
+            "removed_rows": dict(self.removed_rows),
+        }
+
+
+_WORKLOAD_SORT_KEYS = ("total_ms", "calls", "rewrite_ms", "execute_ms", "max_ms", "mean_ms")
+
+
+class RewriteProfiler:
+    """Collects per-call RewriteStats and aggregated per-phase counters.
+
+    Attach to a rewriter with SQLRewriter(profiler=RewriteProfiler()) or
+    SQLRewriter.set_profiler(). Every transform_query/execute/fetchall/fetchone call
+    then records one RewriteStats entry, and calls are grouped by query fingerprint into a
+    workload table (see workload()).
+    """
+
+    def __init__(self, max_history: int = 1000, max_fingerprints: int = 1000) -> None:
+        """Initialize the profiler.
+
+        Args:
+            max_history: Maximum number of per-call RewriteStats to keep (oldest are dropped).
+                Aggregated counters cover every call regardless of this limit.
+            max_fingerprints: Maximum number of query fingerprints in the workload table. The
+                least recently seen fingerprint is dropped to make room for a new one.
+        """
+        if max_history < 1:
+            raise ValueError("max_history must be at least 1")
+        if max_fingerprints < 1:
+            raise ValueError("max_fingerprints must be at least 1")
+        self.history: deque[RewriteStats] = deque(maxlen=max_history)
+        self.num_calls = 0
+        self.num_errors = 0
+        self.total_ms = 0.0
+        self._phase_total_ms: dict[str, float] = {}
+        self._phase_calls: dict[str, int] = {}
+        self._phase_max_ms: dict[str, float] = {}
+        self._counter_totals: dict[str, int] = {}
+        self.max_fingerprints = max_fingerprints
+        self._workload: OrderedDict[str, WorkloadStats] = OrderedDict()
+        self._policy_totals: dict[str, dict[str, Any]] = {}
+        self._active: Optional[RewriteStats] = None
+
+    @property
+    def active(self) -> Optional[RewriteStats]:
+        """The stats object for the call currently being recorded, if any."""
+        return self._active
+
+    @contextmanager
+    def record(self, query: str) -> Iterator[RewriteStats]:
+        """Record one top-level call. Nested calls are folded into the outer record.
+
+        Args:
+            query: The original SQL query string.
+
+        Yields:
+            The RewriteStats being populated for this call.
+        """
+        if self._active is not None:
+            yield self._active
+            return
+
+        stats = RewriteStats(query=query)
+        self._active = stats
+        start = time.perf_counter()
+        try:
+            yield stats
+        except Exception as e:
+            stats.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            stats.total_ms = (time.perf_counter() - start) * 1000
+            self._active = None
+            self._finish(stats)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a phase of the active call. A no-op when no call is being recorded.
+
+        Args:
+            name: The phase name, e.g. "parse" or "apply_constraints".
+        """
+        stats = self._active
+        if stats is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats.add_phase(name, (time.perf_counter() - start) * 1000)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Add to a per-call counter on the active call, if any."""
+        if self._active is not None:
+            self._active.counters[name] = self._active.counters.get(name, 0) + value
+
+    def needs_fingerprint(self) -> bool:
+        """Whether a call is being recorded and has no fingerprint yet."""
+        return self._active is not None and self._active.fingerprint is None
+
+    def set_fingerprint(self, fingerprint: str, normalized_query: str) -> None:
+        """Set the query fingerprint of the active call, if any."""
+        if self._active is not None:
+            self._active.fingerprint = fingerprint
+            self._active.normalized_query = normalized_query
+
+    def add_matched_policies(self, policy_ids: list[str]) -> None:
+        """Add policies to the matched policy set of the active call, if any."""
+        if self._active is not None and policy_ids:
+            self._active.matched_policies = tuple(
+                sorted(set(self._active.matched_policies).union(policy_ids))
+            )
+
+    def add_removed_rows(self, counts: dict[str, int]) -> None:
+        """Add rows removed per REMOVE policy to the active call, if any.
+
+        The total is also added to the call's removed_rows counter.
+        """
+        if self._active is None:
+            return
+        for policy_id, rows in counts.items():
+            self._active.removed_rows[policy_id] = (
+                self._active.removed_rows.get(policy_id, 0) + rows
+            )
+        self.count("removed_rows", sum(counts.values()))
+
+    def _finish(self, stats: RewriteStats) -> None:
+        self.history.append(stats)
+        self.num_calls += 1
+        self.total_ms += stats.total_ms
+        if stats.error is not None:
+            self.num_errors += 1
+        for name, elapsed_ms in stats.phases_ms.items():
+            self._phase_total_ms[name] = self._phase_total_ms.get(name, 0.0) + elapsed_ms
+            self._phase_calls[name] = self._phase_calls.get(name, 0) + stats.phase_calls[name]
+            self._phase_max_ms[name] = max(self._phase_max_ms.get(name, 0.0), elapsed_ms)
+        for name, value in stats.counters.items():
+            self._counter_totals[name] = self._counter_totals.get(name, 0) + value
+        if stats.fingerprint is not None:
+            entry = self._workload.get(stats.fingerprint)
+            if entry is None:
+                if len(self._workload) >= self.max_fingerprints:
+                    self._workload.popitem(last=False)
+                entry = WorkloadStats(stats.fingerprint, stats.normalized_query or "")
+                self._workload[stats.fingerprint] = entry
+            else:
+                self._workload.move_to_end(stats.fingerprint)
+            entry.add(stats)
+        for policy_id in stats.matched_policies:
+            totals = self._policy_totals.setdefault(
+                policy_id, {"calls": 0, "total_ms": 0.0, "execute_ms": 0.0, "removed_rows": 0}
+            )
+            totals["calls"] += 1
+            totals["total_ms"] += stats.total_ms
+            totals["execute_ms"] += stats.execute_ms
+            totals["removed_rows"] += stats.removed_rows.get(policy_id, 0)
+
+    def summary(self) -> dict[str, Any]:
+        """Return aggregated counters across all recorded calls.
+
+        Returns:
+            Dictionary with num_calls, num_errors, total_ms, counter totals, and a
+            per-phase breakdown of calls, total_ms, mean_ms (per recorded call that
+            entered the phase) and max_ms (worst single call).
+        """
+        phases = {}
+        for name, total in self._phase_total_ms.items():
+            phases[name] = {
+                "calls": self._phase_calls[name],
+                "total_ms": total,
+                "mean_ms": total / self._phase_calls[name],
+                "max_ms": self._phase_max_ms[name],
+            }
+        return {
+            "num_calls": self.num_calls,
+            "num_errors": self.num_errors,
+            "total_ms": self.total_ms,
+            "counters": dict(self._counter_totals),
+            "phases": phases,
+        }
+
+    def slowest(self, n: int = 10, phase: Optional[str] = None) -> list[RewriteStats]:
+        """Return the slowest recorded calls still in history.
+
+        Args:
+            n: Number of calls to return.
+            phase: If given, rank by time spent in this phase instead of total time.
+
+        Returns:
+            Up to n RewriteStats, slowest first.
+        """
+        if phase is None:
+            return sorted(self.history, key=lambda s: s.total_ms, reverse=True)[:n]
+        candidates = [s for s in self.history if phase in s.phases_ms]
+        return sorted(candidates, key=lambda s: s.phases_ms[phase], reverse=True)[:n]
+
+    def workload(self, n: Optional[int] = None, sort_by: str = "total_ms") -> list[WorkloadStats]:
+        """Return the workload table: one entry per query fingerprint, most expensive first.
+
+        Args:
+            n: If given, return at most this many entries.
+            sort_by: One of total_ms, calls, rewrite_ms, execute_ms, max_ms or mean_ms.
+
+        Returns:
+            WorkloadStats entries sorted by sort_by, descending.
+
+        Raises:
+            ValueError: If sort_by is not a supported key.
+        """
+        if sort_by not in _WORKLOAD_SORT_KEYS:
+            raise ValueError(
+                f"sort_by must be one of {', '.join(_WORKLOAD_SORT_KEYS)}, got '{sort_by}'"
+            )
+        entries = sorted(
+            self._workload.values(), key=lambda entry: getattr(entry, sort_by), reverse=True
+        )
+        return entries if n is None else entries[:n]
+
+    def policy_costs(self) -> list[dict[str, Any]]:
+        """Return per-policy totals over the calls that matched each policy, costliest first.
+
+        A call's time is counted in full for every policy it matched, so the totals are an
+        upper bound on each policy's cost and are meant for ranking policies. removed_rows is
+        the number of rows the policy itself filtered out (0 unless the rewriter counts
+        removed rows).
+
+        Returns:
+            Dictionaries with policy, calls, total_ms, execute_ms and removed_rows, by
+            total_ms descending.
+        """
+        costs = [
+            {"policy": policy_id, **totals} for policy_id, totals in self._policy_totals.items()
+        ]
+        return sorted(costs, key=lambda cost: cost["total_ms"], reverse=True)
+
+    def reset(self) -> None:
+        """Clear history, aggregated counters and the workload table."""
+        self.history.clear()
+        self.num_calls = 0
+        self.num_errors = 0
+        self.total_ms = 0.0
+        self._phase_total_ms.clear()
+        self._phase_calls.clear()
+        self._phase_max_ms.clear()
+        self._counter_totals.clear()
+        self._workload.clear()
+        self._policy_totals.clear()
@@ -0,0 +1,96 @@
+"""Policy-filtered materialized views that refresh incrementally from appended rows."""
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+import sqlglot
+from sqlglot import exp
+
+
+@dataclass
+class ProtectedView:
+    """A query whose rewritten (policy-enforced) result is stored as a DuckDB table.
+
+    Attributes:
+        name: Name of the table holding the result.
+        query: The original (unrewritten) SQL query.
+        use_two_phase: Whether the query is rewritten with the two-phase path.
+        source_tables: Lowercase names of the tables the query reads.
+        incremental_table: The single base table the query scans, if rows appended to it can
+            be filtered and appended to the view on their own; None if only full refreshes
+            are possible.
+        incremental_ref: Name (alias or table name) the query uses for incremental_table.
+        watermark: Largest rowid of incremental_table already reflected in the view.
+        stale: True if a source table was written since the last refresh.
+        needs_full_refresh: True if the writes since the last refresh were not appends to
+            incremental_table (or the table versions were invalidated).
+        policy_snapshot: Identities of the registered policies at the last refresh.
+    """
+
+    name: str
+    query: str
+    use_two_phase: bool = False
+    source_tables: set[str] = field(default_factory=set)
+    incremental_table: Optional[str] = None
+    incremental_ref: Optional[str] = None
+    watermark: int = -1
+    stale: bool = False
+    needs_full_refresh: bool = False
+    policy_snapshot: tuple[int, ...] = ()
+
+    def mark_written(self, table: Optional[str], append_only: bool) -> None:
+        """Record a write to one of the view's source tables (None for unknown tables)."""
+        if table is not None and table not in self.source_tables:
+            return
+        self.stale = True
+        if not append_only or table is None or table != self.incremental_table:
+            self.needs_full_refresh = True
+
+
+def view_source_tables(parsed: exp.Expression) -> set[str]:
+    """Return the lowercase names of the tables a query reads, excluding CTE names."""
+    cte_names = {cte.alias_or_name.lower() for cte in parsed.find_all(exp.CTE)}
+    return {
+        table.name.lower()
+        for table in parsed.find_all(exp.Table)
+        if table.name and table.name.lower() not in cte_names
+    }
+
+
+def incremental_source(parsed: exp.Expression) -> Optional[tuple[str, str]]:
+    """Return (table, reference name) if a query can be refreshed from appended rows.
+
+    This holds for a plain filter/projection over a single table: no joins, subqueries,
+    CTEs, aggregation, window functions, DISTINCT or LIMIT. Each output row then depends
+    only on one input row, so rows appended to the table can be rewritten and appended to
+    the view on their own.
+    """
+    if not isinstance(parsed, exp.Select):
+        return None
+    if any(
+        parsed.args.get(arg)
+        for arg in ("with", "joins", "group", "having", "qualify", "distinct", "limit", "offset")
+    ):
+        return None
+    if parsed.find(
+        exp.AggFunc, exp.Window, exp.Subquery, exp.Exists, exp.SetOperation, exp.Lateral
+    ):
+        return None
+    if any(select is not parsed for select in parsed.find_all(exp.Select)):
+        return None
+    from_clause = parsed.args.get("from_")
+    if from_clause is None or not isinstance(from_clause.this, exp.Table):
+        return None
+    table = from_clause.this
+    if not table.name or isinstance(table.this, exp.Func):
+        return None
+    return table.name.lower(), table.alias_or_name
+
+
+def delta_query(query: str, table_ref: str, watermark: int) -> str:
+    """Restrict an incremental view query to rows with rowid above the watermark."""
+    parsed = sqlglot.parse_one(query, read="duckdb")
+    rowid = exp.column("rowid", table=exp.to_identifier(table_ref))
+    new_rows = exp.GT(this=rowid, expression=exp.Literal.number(watermark))
+    parsed.where(new_rows, copy=False)
+    return parsed.sql(dialect="duckdb")
@@ -0,0 +1,221 @@
+"""Per-policy counts of rows removed by REMOVE policies, collected while the query runs."""
+
+import inspect
+import threading
+from typing import Any, Optional
+import weakref
+
+import duckdb
+from sqlglot import exp
+
+from .policy import DFCPolicy
+
+COUNT_REMOVED_FUNCTION_PREFIX = "__dfc_count_removed"
+
+
+class RemovedRowCounter:
+    """Counts, per REMOVE policy, the rows its constraint filters out of scan queries.
+
+    The REMOVE constraints of a query are combined into one WHERE condition,
+
+        CASE WHEN c1 AND c2 THEN TRUE ELSE __dfc_count_removed_2(slot, c1, c2) END
+
+    so rows that pass every policy never reach the counting function. DuckDB only evaluates
+    the ELSE branch for the rows of a vector that fail, and calls the Arrow UDF once per
+    vector with those rows, where each policy's failures are counted (a NULL constraint
+    counts as a failure, as it does in WHERE). The UDF returns FALSE, so the same rows are
+    removed as without counting. The slot argument identifies the statement and the
+    policies the checks belong to. Each rewritten statement gets its own slots and a
+    StatementRemovedRows that collects its counts, so statements rewritten or run later
+    never change an earlier statement's counts. Slots are released once their
+    StatementRemovedRows is garbage collected; rows removed through a released slot are
+    not counted.
+    """
+
+    def __init__(self, conn: duckdb.DuckDBPyConnection) -> None:
+        """Initialize the counter.
+
+        Args:
+            conn: The connection the counting functions are registered on.
+
+        Raises:
+            ImportError: If pyarrow is not installed.
+        """
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                "Counting removed rows requires pyarrow: pip install pyarrow"
+            ) from e
+        self._conn = conn
+        self._lock = threading.Lock()
+        self._next_slot = 0
+        # Slot -> (statement, its policies); entries are dropped with the statement.
+        self._slots: dict[int, tuple[weakref.ref, tuple[str, ...]]] = {}
+        self._registered_arities: set[int] = set()
+        self._current: Optional[StatementRemovedRows] = None
+        self._totals: dict[str, int] = {}
+
+    def begin_statement(self) -> "StatementRemovedRows":
+        """Start counting for a new statement.
+
+        Returns:
+            The StatementRemovedRows that check_expression() builds the statement's checks
+            against until the next call.
+        """
+        statement = StatementRemovedRows(self._lock)
+        weakref.finalize(statement, self._release_slots, statement._slots)
+        self._current = statement
+        return statement
+
+    def current_statement(self) -> Optional["StatementRemovedRows"]:
+        """Return the statement most recently started with begin_statement(), if any."""
+        return self._current
+
+    def check_expression(
+        self, policies: list[DFCPolicy], constraints: list[exp.Expression]
+    ) -> exp.Expression:
+        """Build the WHERE condition enforcing REMOVE constraints while counting failures.
+
+        Args:
+            policies: The REMOVE policies being applied.
+            constraints: Their rewritten constraints, in the same order.
+
+        Returns:
+            A condition that is true exactly when every constraint is true.
+        """
+        identifiers = tuple(policy.get_identifier() for policy in policies)
+        statement = self._current if self._current is not None else self.begin_statement()
+        with self._lock:
+            slot = self._next_slot
+            self._next_slot += 1
+            self._slots[slot] = (weakref.ref(statement), identifiers)
+            statement._slots.append(slot)
+            for identifier in identifiers:
+                statement._counts.setdefault(identifier, 0)
+                self._totals.setdefault(identifier, 0)
+        function_name = self._ensure_function(len(constraints))
+
+        checks = [exp.Paren(this=constraint) for constraint in constraints]
+        all_pass = checks[0].copy()
+        for check in checks[1:]:
+            all_pass = exp.And(this=all_pass, expression=check.copy())
+        counted = exp.Anonymous(
+            this=function_name,
+            expressions=[exp.Literal.number(slot), *checks],
+        )
+        return exp.Paren(
+            this=exp.Case(
+                ifs=[exp.If(this=all_pass, true=exp.true())],
+                default=counted,
+            )
+        )
+
+    def get_totals(self) -> dict[str, int]:
+        """Return removed-row counts by policy identifier since the counter was created."""
+        with self._lock:
+            return dict(self._totals)
+
+    def reset(self) -> None:
+        """Zero the totals; statements keep their own counts."""
+        with self._lock:
+            self._totals = {}
+
+    def _release_slots(self, slots: list[int]) -> None:
+        """Forget the slots of a statement that has been garbage collected."""
+        with self._lock:
+            for slot in slots:
+                self._slots.pop(slot, None)
+
+    def _ensure_function(self, arity: int) -> str:
+        """Register the counting UDF taking a slot and arity checks, if not yet registered."""
+        function_name = f"{COUNT_REMOVED_FUNCTION_PREFIX}_{arity}"
+        if arity in self._registered_arities:
+            return function_name
+
+        from duckdb.sqltypes import BIGINT, BOOLEAN
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        def count_removed(slot: Any, *checks: Any) -> Any:
+            rows = len(slot)
+            removed = []
+            for check in checks:
+                passed = pc.sum(pc.fill_null(check, False)).as_py() or 0
+                removed.append(rows - passed)
+            with self._lock:
+                statement_ref, identifiers = self._slots.get(slot[0].as_py(), (None, ()))
+                statement = statement_ref() if statement_ref is not None else None
+                for identifier, count in zip(identifiers, removed):
+                    self._totals[identifier] = self._totals.get(identifier, 0) + count
+                    if statement is not None:
+                        counts = statement._counts
+                        counts[identifier] = counts.get(identifier, 0) + count
+            return pa.repeat(False, rows)
+
+        # DuckDB checks the parameter count against the Python signature.
+        count_removed.__signature__ = inspect.Signature(
+            [
+                inspect.Parameter(f"arg{i}", inspect.Parameter.POSITIONAL_ONLY)
+                for i in range(arity + 1)
+            ]
+        )
+        self._conn.create_function(
+            function_name,
+            count_removed,
+            [BIGINT] + [BOOLEAN] * arity,
+            BOOLEAN,
+            type="arrow",
+            null_handling="special",
+            side_effects=True,
+        )
+        self._registered_arities.add(arity)
+        return function_name
+
+
+class StatementRemovedRows:
+    """The removed-row counts of one rewritten statement, filled in as it runs."""
+
+    def __init__(self, lock: threading.Lock) -> None:
+        """Initialize empty counts guarded by the counter's lock."""
+        self._lock = lock
+        self._counts: dict[str, int] = {}
+        self._slots: list[int] = []
+
+    def get_counts(self) -> dict[str, int]:
+        """Return removed-row counts by policy identifier.
+
+        Every REMOVE policy whose check was counted in the statement is present, with 0 if
+        it removed nothing. The counts are complete once the result has been fully fetched.
+        """
+        with self._lock:
+            return dict(self._counts)
+
+
+class CountedCursor:
+    """A DuckDB cursor returned with the removed-row counts of the statement it ran.
+
+    Attribute access is forwarded to the cursor, so fetchall(), fetch_arrow_table() and
+    the rest work unchanged.
+    """
+
+    def __init__(self, cursor: Any, removed_rows: StatementRemovedRows) -> None:
+        """Initialize the wrapper.
+
+        Args:
+            cursor: The DuckDB cursor or relation the statement ran on.
+            removed_rows: The statement's removed-row counts.
+        """
+        self._cursor = cursor
+        self._removed_rows = removed_rows
+
+    def get_removed_row_counts(self) -> dict[str, int]:
+        """Return how many rows each REMOVE policy removed from this statement.
+
+        See StatementRemovedRows.get_counts().
+        """
+        return self._removed_rows.get_counts()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+
@@ -0,0 +1,147 @@
+"""Bounded LRU cache of query results stored as Arrow tables."""
+
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+@dataclass
+class CacheStats:
+    """Counters describing a ResultCache.
+
+    Attributes:
+        hits: Lookups answered from the cache.
+        misses: Lookups that had to execute the query.
+        evictions: Entries dropped to stay under max_bytes.
+        invalidations: Entries dropped because a table they read was written.
+        uncacheable: Results not stored because they alone exceed max_bytes.
+        entries: Entries currently cached.
+        bytes: Bytes currently cached.
+        max_bytes: The cache's size limit.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    uncacheable: int = 0
+    entries: int = 0
+    bytes: int = 0
+    max_bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache (0.0 before the first lookup)."""
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0.0
+        return self.hits / lookups
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the counters as a plain dictionary."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "uncacheable": self.uncacheable,
+            "entries": self.entries,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class ResultCache:
+    """LRU cache of Arrow tables bounded by their total size in bytes.
+
+    Entries remember the tables they were computed from, so a write to one of those tables
+    can drop them eagerly. Callers include the table versions in the key, so entries are
+    never served stale even if an invalidation is missed.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_bytes: Upper bound on the total size of cached Arrow tables.
+
+        Raises:
+            ValueError: If max_bytes is not positive.
+            ImportError: If pyarrow is not installed.
+        """
+        if max_bytes <= 0:
+            raise ValueError(f"max_bytes must be positive, got {max_bytes}")
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError("The result cache requires pyarrow: pip install pyarrow") from e
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[Any, int, frozenset[str]]] = OrderedDict()
+        self._bytes = 0
+        self._stats = CacheStats(max_bytes=max_bytes)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached Arrow table for key, or None, updating hit/miss counters."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._stats.hits += 1
+        return entry[0]
+
+    def put(self, key: Hashable, table: Any, source_tables: set[str]) -> None:
+        """Cache an Arrow table, evicting least recently used entries to make room.
+
+        Args:
+            key: The cache key.
+            table: A pyarrow.Table.
+            source_tables: Lowercase names of the tables the result was computed from.
+        """
+        size = table.nbytes
+        if size > self.max_bytes:
+            self._stats.uncacheable += 1
+            return
+        self._remove(key)
+        while self._entries and self._bytes + size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._stats.evictions += 1
+        self._entries[key] = (table, size, frozenset(source_tables))
+        self._bytes += size
+
+    def invalidate(self, table: Optional[str] = None) -> None:
+        """Drop entries computed from a table, or all entries if table is None."""
+        table_lower = table.lower() if table is not None else None
+        stale = [
+            key for key, (_, _, sources) in self._entries.items()
+            if table_lower is None or table_lower in sources
+        ]
+        for key in stale:
+            self._remove(key)
+        self._stats.invalidations += len(stale)
+
+    def clear(self) -> None:
+        """Drop all entries without counting them as invalidations."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> CacheStats:
+        """Return a snapshot of the cache counters."""
+        return CacheStats(
+            hits=self._stats.hits,
+            misses=self._stats.misses,
+            evictions=self._stats.evictions,
+            invalidations=self._stats.invalidations,
+            uncacheable=self._stats.uncacheable,
+            entries=len(self._entries),
+            bytes=self._bytes,
+            max_bytes=self.max_bytes,
+        )
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
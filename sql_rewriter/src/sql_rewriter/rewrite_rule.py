@@ -1,5 +1,7 @@
 """Rewrite rules for applying DFC policies to SQL queries."""
 
+from collections.abc import Callable
+from functools import lru_cache
 import json
 import logging
 from typing import Optional
@@ -549,6 +551,105 @@ def _add_invalidate_message_column_to_select(
     parsed.expressions.append(invalid_string_alias)
 
 
+def _find_select_output_expr(parsed: exp.Select, name: str) -> Optional[exp.Expression]:
+    """Find the expression behind a named SELECT output (aliased or bare column)."""
+    target = name.lower()
+    for expr in parsed.expressions:
+        if isinstance(expr, exp.Alias) and expr.alias and expr.alias.lower() == target:
+            return expr.this
+        if isinstance(expr, exp.Column) and get_column_name(expr).lower() == target:
+            return expr
+    return None
+
+
+def _replace_select_output(parsed: exp.Select, name: str, new_expr: exp.Expression) -> None:
+    """Drop any SELECT outputs with the given name and append new_expr aliased to it."""
+    target = name.lower()
+    parsed.set(
+        "expressions",
+        [
+            expr
+            for expr in parsed.expressions
+            if not (
+                (isinstance(expr, exp.Alias) and expr.alias and expr.alias.lower() == target)
+                or (isinstance(expr, exp.Column) and get_column_name(expr).lower() == target)
+            )
+        ],
+    )
+    parsed.expressions.append(
+        exp.Alias(this=new_expr, alias=exp.Identifier(this=name, quoted=False))
+    )
+
+
+def _add_batched_invalidate_columns_to_select(
+    parsed: exp.Select,
+    valid_constraints: list[exp.Expression],
+    message_constraints: list[tuple[exp.Expression, str]],
+    replace_existing_valid: bool = False,
+    replace_existing_invalid_string: bool = False,
+    valid_last: bool = False,
+) -> None:
+    """Add 'valid' and 'invalid_string' columns for all INVALIDATE policies in one shot.
+
+    Equivalent to calling _add_invalidate_column_to_select and
+    _add_invalidate_message_column_to_select once per policy, but each constraint is
+    copied once and the columns are built directly: 'valid' as a balanced AND tree and
+    'invalid_string' as a single CONCAT_WS over one CASE arm per policy. This keeps
+    rewrite time linear and expression depth logarithmic in the number of policies.
+
+    Args:
+        parsed: The parsed SELECT statement to modify.
+        valid_constraints: Constraint expressions from INVALIDATE policies.
+        message_constraints: (constraint, message) pairs from INVALIDATE_MESSAGE policies.
+        replace_existing_valid: If True, replace an existing 'valid' output instead of
+            combining with it.
+        replace_existing_invalid_string: If True, replace an existing 'invalid_string'
+            output instead of combining with it.
+        valid_last: If True, emit 'valid' after 'invalid_string'. The per-policy path
+            re-appends a column each time a policy updates it, so callers set this when
+            the last batched policy is INVALIDATE to produce the same output order.
+    """
+    new_valid_expr = None
+    if valid_constraints:
+        valid_parts = [exp.Paren(this=constraint.copy()) for constraint in valid_constraints]
+        existing_valid_expr = _find_select_output_expr(parsed, "valid")
+        if existing_valid_expr is not None and not replace_existing_valid:
+            existing_copy = existing_valid_expr.copy()
+            if not isinstance(existing_copy, exp.Paren):
+                existing_copy = exp.Paren(this=existing_copy)
+            valid_parts.insert(0, existing_copy)
+        new_valid_expr = _combine_and_expressions(valid_parts)
+
+    new_invalid_string_expr = None
+    if message_constraints:
+        message_arms = [
+            exp.Case(
+                ifs=[exp.If(this=constraint.copy(), true=exp.null())],
+                default=exp.Literal.string(policy_message),
+            )
+            for constraint, policy_message in message_constraints
+        ]
+        existing_invalid_string_expr = _find_select_output_expr(parsed, "invalid_string")
+        if existing_invalid_string_expr is not None and not replace_existing_invalid_string:
+            message_arms.insert(
+                0,
+                exp.Nullif(
+                    this=existing_invalid_string_expr.copy(),
+                    expression=exp.Literal.string(""),
+                ),
+            )
+        new_invalid_string_expr = exp.ConcatWs(
+            expressions=[exp.Literal.string(" | "), *message_arms]
+        )
+
+    outputs = [("valid", new_valid_expr), ("invalid_string", new_invalid_string_expr)]
+    if valid_last:
+        outputs.reverse()
+    for name, new_expr in outputs:
+        if new_expr is not None:
+            _replace_select_output(parsed, name, new_expr)
+
+
 def apply_policy_constraints_to_aggregation(
     parsed: exp.Select,
     policies: list[DFCPolicy],
@@ -558,7 +659,8 @@ def apply_policy_constraints_to_aggregation(
     sink_to_output_mapping: Optional[dict[str, str]] = None,
     replace_existing_valid: bool = False,
     replace_existing_invalid_string: bool = False,
-    insert_columns: Optional[list[str]] = None
+    insert_columns: Optional[list[str]] = None,
+    batch_invalidate: bool = False
 ) -> None:
     """Apply policy constraints to an aggregation query.
 
@@ -572,9 +674,18 @@ def apply_policy_constraints_to_aggregation(
         stream_file_path: Optional path to stream file for LLM resolution.
         sink_table: Optional sink table name (for INSERT statements).
         sink_to_output_mapping: Optional mapping from sink column names to SELECT output column names.
+        batch_invalidate: If True, collect INVALIDATE/INVALIDATE_MESSAGE constraints and
+            build the 'valid'/'invalid_string' columns once after all policies are processed.
     """
     # Build mapping from source tables to subquery/CTE aliases
     table_mapping = _get_source_table_to_alias_mapping(parsed, source_tables)
+    # Adding constraints only touches WHERE/HAVING/SELECT, so the scopes stay valid.
+    from_scopes = _get_from_scopes(parsed)
+
+    valid_constraints: list[exp.Expression] = []
+    message_constraints: list[tuple[exp.Expression, str]] = []
+    # Whether the last batched policy is INVALIDATE (its column then comes last).
+    valid_last = False
 
     for policy in policies:
         # Check if policy requires sources but sources are not present
@@ -583,7 +694,7 @@ def apply_policy_constraints_to_aggregation(
             # Policy requires sources but they are not present - constraint fails
             constraint_expr = exp.Literal(this="false", is_string=False)
         else:
-            constraint_expr = sqlglot.parse_one(policy.constraint, read="duckdb")
+            constraint_expr = policy._constraint_parsed.copy()
 
             # Replace sink table references with SELECT output column references if needed
             if sink_table and sink_to_output_mapping:
@@ -604,7 +715,7 @@ def apply_policy_constraints_to_aggregation(
                 parsed, constraint_expr, policy_sources
             )
             constraint_expr = _replace_aggregations_from_from_subqueries(
-                parsed, constraint_expr, policy_sources
+                parsed, constraint_expr, policy_sources, scopes=from_scopes
             )
 
             ensure_columns_accessible(parsed, constraint_expr, source_tables)
@@ -616,11 +727,17 @@ def apply_policy_constraints_to_aggregation(
             constraint_expr = _wrap_llm_constraint(
                 constraint_expr, policy, source_tables, stream_file_path,
                 sink_table, sink_to_output_mapping, parsed=parsed,
-                insert_columns=insert_columns
+                _insert_columns=insert_columns
             )
             _add_clause_to_select(parsed, "having", constraint_expr, exp.Having)
+        elif policy.on_fail == Resolution.INVALIDATE and batch_invalidate:
+            valid_constraints.append(constraint_expr)
+            valid_last = True
         elif policy.on_fail == Resolution.INVALIDATE:
             _add_invalidate_column_to_select(parsed, constraint_expr, replace_existing=replace_existing_valid)
+        elif policy.on_fail == Resolution.INVALIDATE_MESSAGE and batch_invalidate:
+            message_constraints.append((constraint_expr, policy.description or policy.constraint))
+            valid_last = False
         elif policy.on_fail == Resolution.INVALIDATE_MESSAGE:
             policy_message = policy.description or policy.constraint
             _add_invalidate_message_column_to_select(
@@ -633,6 +750,16 @@ def apply_policy_constraints_to_aggregation(
             # REMOVE resolution - add HAVING clause
             _add_clause_to_select(parsed, "having", constraint_expr, exp.Having)
 
+    if valid_constraints or message_constraints:
+        _add_batched_invalidate_columns_to_select(
+            parsed,
+            valid_constraints,
+            message_constraints,
+            replace_existing_valid=replace_existing_valid,
+            replace_existing_invalid_string=replace_existing_invalid_string,
+            valid_last=valid_last,
+        )
+
 
 def ensure_columns_accessible(
     parsed: exp.Select,
@@ -702,6 +829,16 @@ def _get_subqueries_in_from(parsed: exp.Select) -> list[tuple[exp.Subquery, str]
                     if not alias and hasattr(from_table, "name") and from_table.name:
                         alias = from_table.name.lower()
 
+            # Subqueries JOIN-ed to a base table carry their alias on the Subquery itself.
+            # EXISTS subqueries rewritten as JOINs are resolved through their
+            # aggregation_aliases instead (see _replace_aggregations_from_join_subqueries).
+            if (
+                not alias
+                and subquery.alias
+                and "aggregation_aliases" not in subquery.meta
+            ):
+                alias = subquery.alias.lower()
+
             # Fallback: try finding via Table ancestor
             if not alias:
                 table_ancestor = subquery.find_ancestor(exp.Table)
@@ -1038,6 +1175,39 @@ def _replace_sink_table_references_in_constraint(
     return constraint_expr.transform(replace_sink_column, copy=True)
 
 
+def _get_main_query_tables(parsed: exp.Select) -> set[str]:
+    """Get the base tables referenced directly in the main query's FROM/JOIN clauses.
+
+    Tables that only appear inside subqueries or CTEs are excluded, as are references
+    to CTE aliases.
+
+    Args:
+        parsed: The parsed SELECT statement.
+
+    Returns:
+        Set of table names (lowercase) visible in the main query scope.
+    """
+    # Get CTE aliases to exclude them from main_query_tables
+    cte_aliases = {alias for _, alias in _get_ctes(parsed)}
+
+    # Check which source tables are in the main query's FROM/JOIN (not in subqueries/CTEs).
+    # A table belongs to the main query only if its nearest enclosing SELECT is the main
+    # query; this excludes tables inside FROM/JOIN subqueries, CTEs and EXISTS/IN predicates.
+    main_query_tables = set()
+    from_clause = parsed.args.get("from_")
+    if from_clause:
+        scopes = [from_clause, *(parsed.args.get("joins") or [])]
+        for scope in scopes:
+            for table in scope.find_all(exp.Table):
+                if (
+                    table.find_ancestor(exp.Select) is parsed
+                    and table.name.lower() not in cte_aliases
+                ):
+                    main_query_tables.add(table.name.lower())
+
+    return main_query_tables
+
+
 def _get_source_table_to_alias_mapping(
     parsed: exp.Select,
     source_tables: set[str]
@@ -1054,35 +1224,7 @@ def _get_source_table_to_alias_mapping(
     """
     mapping = {}
 
-    # Get CTE aliases to exclude them from main_query_tables
-    cte_aliases = {alias for _, alias in _get_ctes(parsed)}
-
-    # Check which source tables are in the main query's FROM/JOIN (not in subqueries/CTEs)
-    # We need to find actual table names, not subquery/CTE aliases
-    main_query_tables = set()
-    # Get the main query's FROM clause
-    if hasattr(parsed, "from") and parsed.from_:
-        # Find all tables directly in the main FROM clause
-        for table in parsed.from_.find_all(exp.Table):
-            # Exclude tables that are subqueries (they have Subquery as 'this')
-            if (
-                not (hasattr(table, "this") and isinstance(table.this, exp.Subquery))
-                and not table.find_ancestor(exp.Subquery)
-                and not table.find_ancestor(exp.CTE)
-                and table.name.lower() not in cte_aliases
-            ):
-                main_query_tables.add(table.name.lower())
-        # Also check JOINs directly in the main query
-        for join in parsed.find_all(exp.Join):
-            if (not join.find_ancestor(exp.Subquery) and
-                not join.find_ancestor(exp.CTE)):
-                for table in join.find_all(exp.Table):
-                    # Exclude subquery tables
-                    if (
-                        not (hasattr(table, "this") and isinstance(table.this, exp.Subquery))
-                        and table.name.lower() not in cte_aliases
-                    ):
-                        main_query_tables.add(table.name.lower())
+    main_query_tables = _get_main_query_tables(parsed)
 
     # Map source tables to their aliases in the main query when unambiguous.
     # This ensures constraints reference aliases that are actually visible.
@@ -1248,61 +1390,182 @@ def _replace_aggregations_from_join_subqueries(
     return constraint_expr.transform(replace_agg, copy=True)
 
 
+def _get_from_scopes(parsed: exp.Select) -> list[tuple[exp.Expression, str]]:
+    """Return the FROM/JOIN subqueries and CTEs of a query with their aliases."""
+    return list(_get_subqueries_in_from(parsed)) + list(_get_ctes(parsed))
+
+
 def _replace_aggregations_from_from_subqueries(
     parsed: exp.Select,
     constraint_expr: exp.Expression,
-    policy_sources: set[str]
+    policy_sources: set[str],
+    wrap_in_max: bool = True,
+    scopes: Optional[list[tuple[exp.Expression, str]]] = None
 ) -> exp.Expression:
-    """Replace aggregations in constraints that reference source tables in FROM subqueries.
+    """Replace aggregations in constraints that reference source tables in FROM subqueries or CTEs.
+
+    When a policy source table is only referenced inside a FROM subquery or CTE with GROUP BY,
+    we add the aggregate inside that scope and reference it here. To keep HAVING valid,
+    we wrap the scope column in MAX(). Scan queries see one row per inner group, so they
+    reference the pre-computed column directly (wrap_in_max=False).
 
-    When a policy source table is only referenced inside a FROM subquery with GROUP BY,
-    we add the aggregate inside the subquery and reference it here. To keep HAVING valid,
-    we wrap the subquery column in MAX().
+    Callers applying many policies to the same query pass the result of
+    _get_from_scopes(parsed) as scopes, so the query is only walked once.
     """
     if not policy_sources:
         return constraint_expr
 
-    subqueries = _get_subqueries_in_from(parsed)
-    if not subqueries:
+    if scopes is None:
+        scopes = _get_from_scopes(parsed)
+    if not scopes:
         return constraint_expr
 
     def replace_agg(node):
         if isinstance(node, exp.AggFunc):
             agg_sql = node.sql(dialect="duckdb")
-            for subquery, subquery_alias in subqueries:
-                agg_aliases = subquery.meta.get("policy_agg_aliases") if hasattr(subquery, "meta") else None
+            for scope, scope_alias in scopes:
+                agg_aliases = scope.meta.get("policy_agg_aliases") if hasattr(scope, "meta") else None
                 if not agg_aliases:
                     continue
                 if agg_sql in agg_aliases:
                     alias_name = agg_aliases[agg_sql][1]
-                    subquery_col = exp.Column(
+                    scope_col = exp.Column(
                         this=exp.Identifier(this=alias_name),
-                        table=exp.Identifier(this=subquery_alias),
+                        table=exp.Identifier(this=scope_alias),
                     )
-                    return exp.Max(this=subquery_col)
+                    if not wrap_in_max:
+                        return scope_col
+                    return exp.Max(this=scope_col)
         return node
 
     return constraint_expr.transform(replace_agg, copy=True)
 
 
+def _is_within_scopes(node: exp.Expression, scopes: list[exp.Expression]) -> bool:
+    """Check whether a node is one of the given scopes or nested inside one of them.
+
+    Args:
+        node: The node to check.
+        scopes: The subquery/CTE nodes to check against.
+
+    Returns:
+        True if the node is (or is nested inside) any of the scopes.
+    """
+    current = node
+    while current is not None:
+        if any(current is scope for scope in scopes):
+            return True
+        current = current.parent
+    return False
+
+
+def _add_policy_aggregates_to_scope(
+    scope: exp.Expression,
+    select_expr: exp.Select,
+    scope_alias: str,
+    policy: DFCPolicy,
+    source_table: str,
+    source_tables: set[str]
+) -> set[str]:
+    """Pre-aggregate a policy's source aggregates inside a grouped subquery or CTE.
+
+    The outer query only needs the aggregate values, so each source aggregate is computed
+    per group as a temp column instead of threading the raw columns out. The temp columns
+    are recorded in scope.meta["policy_agg_aliases"] so constraints can reference them.
+
+    Args:
+        scope: The Subquery or CTE node whose SELECT is grouped.
+        select_expr: The grouped SELECT statement inside the scope.
+        scope_alias: The alias the outer query uses for the scope (lowercase).
+        policy: The policy whose source aggregates should be pre-computed.
+        source_table: The policy source table referenced in the scope (lowercase).
+        source_tables: Set of source table names in the query.
+
+    Returns:
+        Set of source column names (lowercase) covered by the pre-computed aggregates.
+    """
+    agg_column_names: set[str] = set()
+    source_aggregates = _extract_source_aggregates_from_constraint(
+        policy._constraint_parsed, source_table
+    )
+    if not source_aggregates:
+        return agg_column_names
+
+    policy_id = get_policy_identifier(policy)
+    agg_aliases = scope.meta.get("policy_agg_aliases", {})
+    next_idx = len(agg_aliases) + 1
+    for agg_expr in source_aggregates:
+        temp_col_name = f"_{policy_id}_agg{next_idx}"
+        next_idx += 1
+        _add_temp_column_to_select(select_expr, agg_expr, temp_col_name, source_tables)
+        alias = scope.args.get("alias")
+        if isinstance(alias, exp.TableAlias) and alias.args.get("columns") is not None:
+            alias_columns = alias.args.get("columns")
+            if all(
+                not (
+                    isinstance(col, exp.Identifier)
+                    and col.name.lower() == temp_col_name.lower()
+                )
+                for col in alias_columns
+            ):
+                alias_columns.append(exp.Identifier(this=temp_col_name, quoted=False))
+        agg_sql = agg_expr.sql(dialect="duckdb")
+        mapped_agg = _replace_table_references_in_constraint(
+            agg_expr,
+            {source_table: scope_alias},
+        ).sql(dialect="duckdb")
+        agg_aliases[agg_sql] = (scope_alias, temp_col_name)
+        agg_aliases[mapped_agg] = (scope_alias, temp_col_name)
+        for col in agg_expr.find_all(exp.Column):
+            col_table = get_table_name_from_column(col)
+            if col_table and col_table.lower() == source_table:
+                agg_column_names.add(get_column_name(col).lower())
+    scope.meta["policy_agg_aliases"] = agg_aliases
+    scope.meta["policy_table"] = source_table
+    return agg_column_names
+
+
 def ensure_subqueries_have_constraint_columns(
     parsed: exp.Select,
     policies: list[DFCPolicy],
-    source_tables: set[str]
+    source_tables: set[str],
+    extra_columns: Optional[set[str]] = None
 ) -> None:
     """Ensure subqueries and CTEs that reference source tables include columns needed for constraints.
 
-    For each subquery or CTE that references a source table, this function ensures that
-    all columns needed to evaluate policy constraints are included in the SELECT list.
-    This allows the outer query to evaluate the constraints correctly.
+    Policy columns are only threaded into the subquery or CTE that the constraint is
+    resolved against (see _get_source_table_to_alias_mapping), plus any scopes nested
+    inside it. Source tables visible directly in the main query need no threading, and
+    other subqueries/CTEs that happen to read a source table are left untouched so
+    intermediate results stay as narrow as the original query.
+
+    When the target scope is grouped, the policy's source aggregates are pre-computed
+    inside it and only those temp columns are exposed; raw columns that are only needed
+    as aggregate inputs are not threaded.
 
     Args:
         parsed: The parsed SELECT statement.
         policies: List of policies that will be applied.
         source_tables: Set of source table names in the query.
+        extra_columns: Optional synthetic columns (e.g. __dfc_rowid) to thread alongside
+            each policy's constraint columns.
     """
-    # Find all subqueries in FROM clauses
+    table_mapping = _get_source_table_to_alias_mapping(parsed, source_tables)
+    main_query_tables = _get_main_query_tables(parsed)
+    target_aliases = {
+        source_table: alias
+        for source_table, alias in table_mapping.items()
+        if source_table not in main_query_tables
+    }
+
+    # Find all subqueries in FROM clauses and CTEs
     subqueries = _get_subqueries_in_from(parsed)
+    ctes = _get_ctes(parsed)
+    target_scopes: dict[str, list[exp.Expression]] = {}
+    for source_table, alias in target_aliases.items():
+        target_scopes[source_table] = [
+            subquery for subquery, subquery_alias in subqueries if subquery_alias == alias
+        ] + [cte for cte, cte_alias in ctes if cte_alias == alias]
 
     for subquery, subquery_alias in subqueries:
         if not isinstance(subquery.this, exp.Select):
@@ -1325,49 +1588,20 @@ def ensure_subqueries_have_constraint_columns(
                 source_table_lower = source_table.lower()
                 if source_table_lower not in subquery_tables:
                     continue
+                if not _is_within_scopes(subquery, target_scopes.get(source_table_lower, [])):
+                    continue
 
-                policy_id = get_policy_identifier(policy)
                 agg_column_names = set()
                 if subquery_has_group:
-                    source_aggregates = _extract_source_aggregates_from_constraint(
-                        policy._constraint_parsed, source_table
+                    agg_column_names = _add_policy_aggregates_to_scope(
+                        subquery, subquery.this, subquery_alias, policy,
+                        source_table_lower, source_tables
                     )
-                    if source_aggregates:
-                        agg_aliases = subquery.meta.get("policy_agg_aliases", {})
-                        next_idx = len(agg_aliases) + 1
-                        for agg_expr in source_aggregates:
-                            temp_col_name = f"_{policy_id}_agg{next_idx}"
-                            next_idx += 1
-                            _add_temp_column_to_select(subquery.this, agg_expr, temp_col_name, source_tables)
-                            alias = subquery.args.get("alias")
-                            if isinstance(alias, exp.TableAlias) and alias.args.get("columns") is not None:
-                                alias_columns = alias.args.get("columns")
-                                if all(
-                                    not (
-                                        isinstance(col, exp.Identifier)
-                                        and col.name.lower() == temp_col_name.lower()
-                                    )
-                                    for col in alias_columns
-                                ):
-                                    alias_columns.append(
-                                        exp.Identifier(this=temp_col_name, quoted=False)
-                                    )
-                            agg_sql = agg_expr.sql(dialect="duckdb")
-                            mapped_agg = _replace_table_references_in_constraint(
-                                agg_expr,
-                                {source_table: subquery_alias},
-                            ).sql(dialect="duckdb")
-                            agg_aliases[agg_sql] = (subquery_alias, temp_col_name)
-                            agg_aliases[mapped_agg] = (subquery_alias, temp_col_name)
-                            for col in agg_expr.find_all(exp.Column):
-                                col_table = get_table_name_from_column(col)
-                                if col_table and col_table.lower() == source_table_lower:
-                                    agg_column_names.add(get_column_name(col).lower())
-                        subquery.meta["policy_agg_aliases"] = agg_aliases
-                        subquery.meta["policy_table"] = source_table_lower
 
                 # Use pre-calculated columns needed from the policy for this source table
                 needed_columns = policy._source_columns_needed.get(source_table_lower, set())
+                if extra_columns:
+                    needed_columns = needed_columns | extra_columns
 
                 # Add missing columns to the subquery's SELECT list
                 for col_name in needed_columns:
@@ -1375,10 +1609,7 @@ def ensure_subqueries_have_constraint_columns(
                         continue
                     _add_column_to_subquery(subquery, source_table_lower, col_name)
 
-    # Find all CTEs
-    ctes = _get_ctes(parsed)
-
-    for cte, _cte_alias in ctes:
+    for cte, cte_alias in ctes:
         # Check if CTE has a SELECT expression
         cte_select = cte.this if hasattr(cte, "this") and isinstance(cte.this, exp.Select) else None
         if not cte_select:
@@ -1395,17 +1626,32 @@ def ensure_subqueries_have_constraint_columns(
         if not cte_tables:
             continue
 
+        cte_has_group = bool(cte_select.args.get("group"))
+
         # For each policy, walk sources in policy order for deterministic column insertion
         for policy in policies:
             for source_table in policy.sources:
                 source_table_lower = source_table.lower()
                 if source_table_lower not in cte_tables:
                     continue
+                if not _is_within_scopes(cte, target_scopes.get(source_table_lower, [])):
+                    continue
+
+                agg_column_names = set()
+                if cte_has_group:
+                    agg_column_names = _add_policy_aggregates_to_scope(
+                        cte, cte_select, cte_alias, policy, source_table_lower, source_tables
+                    )
+
                 # Use pre-calculated columns needed from the policy for this source table
                 needed_columns = policy._source_columns_needed.get(source_table_lower, set())
+                if extra_columns:
+                    needed_columns = needed_columns | extra_columns
 
                 # Add missing columns to the CTE's SELECT list
                 for col_name in needed_columns:
+                    if cte_has_group and col_name in agg_column_names:
+                        continue
                     _add_column_to_cte(cte, source_table_lower, col_name)
 
     # Propagate synthetic rowid keys across CTE dependency chains.
@@ -1668,7 +1914,11 @@ def apply_policy_constraints_to_scan(
     sink_to_output_mapping: Optional[dict[str, str]] = None,
     replace_existing_valid: bool = False,
     replace_existing_invalid_string: bool = False,
-    insert_columns: Optional[list[str]] = None
+    insert_columns: Optional[list[str]] = None,
+    batch_invalidate: bool = False,
+    count_removed: Optional[
+        Callable[[list[DFCPolicy], list[exp.Expression]], exp.Expression]
+    ] = None,
 ) -> None:
     """Apply policy constraints to a non-aggregation query (table scan).
 
@@ -1684,9 +1934,23 @@ def apply_policy_constraints_to_scan(
         stream_file_path: Optional path to stream file for LLM resolution.
         sink_table: Optional sink table name (for INSERT statements).
         sink_to_output_mapping: Optional mapping from sink column names to SELECT output column names.
+        batch_invalidate: If True, collect INVALIDATE/INVALIDATE_MESSAGE constraints and
+            build the 'valid'/'invalid_string' columns once after all policies are processed.
+        count_removed: Optional callback that turns the REMOVE policies and their rewritten
+            constraints into a single WHERE condition that also counts removed rows. If None,
+            each REMOVE constraint is added to the WHERE clause on its own.
     """
     # Build mapping from source tables to subquery/CTE aliases
     table_mapping = _get_source_table_to_alias_mapping(parsed, source_tables)
+    # Adding constraints only touches WHERE/HAVING/SELECT, so the scopes stay valid.
+    from_scopes = _get_from_scopes(parsed)
+
+    valid_constraints: list[exp.Expression] = []
+    message_constraints: list[tuple[exp.Expression, str]] = []
+    # Whether the last batched policy is INVALIDATE (its column then comes last).
+    valid_last = False
+    remove_policies: list[DFCPolicy] = []
+    remove_constraints: list[exp.Expression] = []
 
     for policy in policies:
         # Check if policy requires sources but sources are not present
@@ -1695,9 +1959,12 @@ def apply_policy_constraints_to_scan(
             # Policy requires sources but they are not present - constraint fails
             constraint_expr = exp.Literal(this="false", is_string=False)
         else:
-            constraint_expr = transform_aggregations_to_columns(
-                policy._constraint_parsed, source_tables
+            # Aggregates pre-computed inside grouped subqueries/CTEs are already per-row values
+            constraint_expr = _replace_aggregations_from_from_subqueries(
+                parsed, policy._constraint_parsed, policy_sources, wrap_in_max=False,
+                scopes=from_scopes,
             )
+            constraint_expr = transform_aggregations_to_columns(constraint_expr, source_tables)
 
             # Replace sink table references with SELECT output column references if needed
             if sink_table and sink_to_output_mapping:
@@ -1725,11 +1992,17 @@ def apply_policy_constraints_to_scan(
             constraint_expr = _wrap_llm_constraint(
                 constraint_expr, policy, source_tables, stream_file_path,
                 sink_table, sink_to_output_mapping, parsed=parsed,
-                insert_columns=insert_columns
+                _insert_columns=insert_columns
             )
             _add_clause_to_select(parsed, "where", constraint_expr, exp.Where)
+        elif policy.on_fail == Resolution.INVALIDATE and batch_invalidate:
+            valid_constraints.append(constraint_expr)
+            valid_last = True
         elif policy.on_fail == Resolution.INVALIDATE:
             _add_invalidate_column_to_select(parsed, constraint_expr, replace_existing=replace_existing_valid)
+        elif policy.on_fail == Resolution.INVALIDATE_MESSAGE and batch_invalidate:
+            message_constraints.append((constraint_expr, policy.description or policy.constraint))
+            valid_last = False
         elif policy.on_fail == Resolution.INVALIDATE_MESSAGE:
             policy_message = policy.description or policy.constraint
             _add_invalidate_message_column_to_select(
@@ -1738,10 +2011,28 @@ def apply_policy_constraints_to_scan(
                 policy_message=policy_message,
                 replace_existing=replace_existing_invalid_string,
             )
+        elif count_removed is not None:
+            remove_policies.append(policy)
+            remove_constraints.append(constraint_expr)
         else:
             # REMOVE resolution - add WHERE clause
             _add_clause_to_select(parsed, "where", constraint_expr, exp.Where)
 
+    if remove_policies:
+        _add_clause_to_select(
+            parsed, "where", count_removed(remove_policies, remove_constraints), exp.Where
+        )
+
+    if valid_constraints or message_constraints:
+        _add_batched_invalidate_columns_to_select(
+            parsed,
+            valid_constraints,
+            message_constraints,
+            replace_existing_valid=replace_existing_valid,
+            replace_existing_invalid_string=replace_existing_invalid_string,
+            valid_last=valid_last,
+        )
+
 
 def _replace_sink_table_references_in_update_constraint(
     constraint_expr: exp.Expression,
@@ -1811,7 +2102,7 @@ def apply_policy_constraints_to_update(
                             name
                             for name in [
                                 policy.sink.lower() if policy.sink else None,
-                                getattr(policy, "sink_alias", "").lower() or None,
+                                (getattr(policy, "sink_alias", None) or "").lower() or None,
                             ]
                             if name
                         },
@@ -1868,7 +2159,12 @@ def transform_aggregations_to_columns(
     Returns:
         A new expression with aggregations replaced by columns.
     """
-    constraint_sql = constraint_expr.sql()
+    return _transform_aggregations_to_columns_sql(constraint_expr.sql()).copy()
+
+
+@lru_cache(maxsize=4096)
+def _transform_aggregations_to_columns_sql(constraint_sql: str) -> exp.Expression:
+    """Cached body of transform_aggregations_to_columns. The result is shared; copy it."""
     transformed = sqlglot.parse_one(constraint_sql, read="duckdb")
 
     def replace_agg(node):
@@ -2348,7 +2644,7 @@ def apply_aggregate_policy_constraints_to_aggregation(
         # Extract and add sink expressions
         if policy.sink and sink_table and policy.sink.lower() == sink_table.lower():
             # Extract sink expressions BEFORE replacement (they need to reference the sink table)
-            constraint_expr_orig = sqlglot.parse_one(policy.constraint, read="duckdb")
+            constraint_expr_orig = policy._constraint_parsed.copy()
             sink_expressions = _extract_sink_expressions_from_constraint(
                 constraint_expr_orig,
                 sink_table,
@@ -3178,7 +3474,7 @@ def apply_aggregate_policy_constraints_to_scan(
         # Extract and add sink expressions
         if policy.sink and sink_table and policy.sink.lower() == sink_table.lower():
             # Extract sink expressions BEFORE replacement (they need to reference the sink table)
-            constraint_expr_orig = sqlglot.parse_one(policy.constraint, read="duckdb")
+            constraint_expr_orig = policy._constraint_parsed.copy()
             sink_expressions = _extract_sink_expressions_from_constraint(
                 constraint_expr_orig,
                 sink_table,
@@ -1,21 +1,32 @@
 """SQL rewriter that intercepts queries, transforms them, and executes against DuckDB."""
 
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
 from decimal import Decimal
 import json
 import os
 import tempfile
 from typing import Any, Optional, Union
 
-from botocore.exceptions import BotoCoreError, ClientError
 import duckdb
 import sqlglot
 from sqlglot import exp
 
+from .explain import ExplainResult, attribute_plan, explain_json
+from .fingerprint import query_fingerprint
 from .policy import AggregateDFCPolicy, DFCPolicy, Resolution
+from .policy_registry import catalog_fingerprint, dump_registry, load_registry, policy_tables
+from .profiling import RewriteProfiler
+from .protected_views import ProtectedView, delta_query, incremental_source, view_source_tables
+from .removed_rows import CountedCursor, RemovedRowCounter, StatementRemovedRows
+from .result_cache import CacheStats, ResultCache
 from .rewrite_rule import (
+    _add_clause_to_select,
+    _add_invalidate_column_to_select,
     _extract_sink_expressions_from_constraint,
     _extract_source_aggregates_from_constraint,
     _find_outer_aggregate_for_inner,
+    _get_main_query_tables,
     apply_aggregate_policy_constraints_to_aggregation,
     apply_aggregate_policy_constraints_to_scan,
     apply_policy_constraints_to_aggregation,
@@ -28,6 +39,28 @@ from .rewrite_rule import (
     wrap_query_with_limit_in_cte_for_remove_policy,
 )
 from .sqlglot_utils import get_column_name, get_table_name_from_column
+from .stats_elision import StatisticsProver
+from .tracked_connection import TrackedConnection
+from .verdict_cache import VerdictCache, is_cacheable_policy
+
+# Functions whose result can differ between executions of the same query.
+_VOLATILE_FUNCTION_TYPES = (
+    exp.Rand,
+    exp.Randn,
+    exp.Uuid,
+    exp.CurrentDate,
+    exp.CurrentTime,
+    exp.CurrentTimestamp,
+)
+_VOLATILE_FUNCTION_NAMES = {
+    "random", "uuid", "gen_random_uuid", "nextval", "currval", "now", "get_current_time",
+    "get_current_timestamp", "today", "setseed", "kill", "address_violating_rows",
+}
+
+# Names used by execute_bulk_update for the staged rows and the UPDATE target.
+_STAGED_UPDATES_TABLE = "__dfc_staged_updates"
+_UPDATE_ROUND_COLUMN = "__dfc_round"
+_UPDATE_TARGET_ALIAS = "__dfc_target"
 
 
 class SQLRewriter:
@@ -39,13 +72,22 @@ class SQLRewriter:
         stream_file_path: Optional[str] = None,
         bedrock_client: Optional[Any] = None,
         bedrock_model_id: Optional[str] = None,
-        recorder: Optional[Any] = None
+        recorder: Optional[Any] = None,
+        batch_invalidate: bool = False,
+        profiler: Optional[RewriteProfiler] = None,
+        elide_provable_policies: bool = False,
+        verdict_cache: bool = False,
+        result_cache_bytes: Optional[int] = None,
+        count_removed_rows: bool = False
     ) -> None:
         """Initialize the SQL rewriter with a DuckDB connection.
 
         Args:
             conn: Optional DuckDB connection. If None, creates a new in-memory database connection.
-            stream_file_path: Optional path for stream file (fixed rows from LLM). If None, creates a temp file.
+                The rewriter's conn attribute is a TrackedConnection over it: SQL run through
+                rewriter.conn is not rewritten, but its writes advance table versions.
+            stream_file_path: Optional path for stream file (fixed rows from LLM). If None, a temp file
+                is created the first time a query is rewritten with an LLM policy.
             bedrock_client: Optional boto3 Bedrock Runtime client for LLM resolution policies.
                            Required for LLM resolution policies to work. If None, LLM resolution
                            policies will not be able to fix violating rows.
@@ -54,11 +96,47 @@ class SQLRewriter:
             recorder: Optional LLMRecorder instance for recording LLM responses.
                     Use set_recorder() to set this after initialization if needed.
                     When set, all LLM requests and responses are recorded to files.
+            batch_invalidate: If True, build the 'valid' and 'invalid_string' columns for all
+                    INVALIDATE/INVALIDATE_MESSAGE policies in one pass (balanced AND and a single
+                    CONCAT_WS) instead of combining them one policy at a time. Recommended when
+                    many invalidate policies match the same query.
+            profiler: Optional RewriteProfiler. When set, every transform/execute call records
+                    a per-phase timing breakdown (parsing, policy matching, each rewrite rule,
+                    SQL generation and execution). Use set_profiler() to change it later.
+            elide_provable_policies: If True, skip REMOVE/KILL policies whose constraint the
+                    source tables' min/max statistics prove can never fail (e.g.
+                    max(t.x) >= 0 when every t.x is non-NULL and >= 0). Statistics are cached
+                    per table version; versions advance on every write statement executed
+                    through this rewriter, including through rewriter.conn. After writing
+                    through the connection passed in, or a cursor of it, call
+                    invalidate_table_versions().
+            verdict_cache: If True, materialize which rows of each source table fail which
+                    single-table REMOVE/INVALIDATE policies, and enforce those policies in
+                    scan queries with one anti-join on rowid instead of evaluating every
+                    constraint per row. Verdicts are rebuilt lazily after the table's version
+                    changes (see elide_provable_policies for how versions advance). Rows whose
+                    constraint is NULL are reported invalid (false) rather than NULL. The
+                    verdicts live in temporary tables of conn, built when the rewritten query
+                    is executed through this rewriter (execute, fetch*, explain, ...); SQL
+                    returned by transform_query() reads them, so it is bound to conn and
+                    must be run through the rewriter.
+            result_cache_bytes: If set, cache the results of fetchall/fetchone/fetch_arrow
+                    for read queries as Arrow tables, LRU-bounded to this many bytes. Entries
+                    are keyed on the rewritten SQL plus the versions of every table the query
+                    reads, so writes through this rewriter invalidate them. Requires pyarrow.
+            count_removed_rows: If True, count how many rows each REMOVE policy filters out
+                    of scan queries (SELECT and INSERT ... SELECT without aggregation) while
+                    they run; see get_removed_row_counts(). Rows that pass every policy are
+                    not counted individually, so the extra cost grows with the number of
+                    removed rows. Queries that count are never served from the result
+                    cache. Requires pyarrow.
         """
         if conn is not None:
-            self.conn = conn
+            self._conn = conn
         else:
-            self.conn = duckdb.connect()
+            self._conn = duckdb.connect()
+        # Writes made through self.conn bypass rewriting but still advance table versions.
+        self.conn = TrackedConnection(self._conn, self._record_direct_writes)
         self._policies: list[DFCPolicy] = []
         self._aggregate_policies: list[AggregateDFCPolicy] = []
 
@@ -69,15 +147,46 @@ class SQLRewriter:
         # Recorder for LLM responses
         self._recorder = recorder
 
+        self._batch_invalidate = batch_invalidate
+
+        # Optional rewrite-time profiler
+        self._profiler = profiler
+
+        # Per-table write versions, advanced by statements executed through the rewriter.
+        # _write_epoch advances for statements whose written tables are unknown.
+        self._table_versions: dict[str, int] = {}
+        self._write_epoch = 0
+
+        # Optional statistics-based policy elision
+        self._stats_prover = StatisticsProver(self._conn) if elide_provable_policies else None
+
+        # Optional per-table policy verdict cache
+        self._verdict_cache = VerdictCache(self._conn) if verdict_cache else None
+
+        # Policy-filtered materialized views, by lowercase name
+        self._protected_views: dict[str, ProtectedView] = {}
+
+        # Policy matches shared by the statements of one execute_script/execute_many batch,
+        # keyed on (kind, source tables, sink table). None outside of a batch.
+        self._batch_match_memo: Optional[dict[tuple, list]] = None
+        # Whether a transaction was opened through this rewriter (BEGIN without COMMIT/ROLLBACK)
+        self._in_transaction = False
+
+        # Optional result cache for repeated read queries
+        self._result_cache = (
+            ResultCache(result_cache_bytes) if result_cache_bytes is not None else None
+        )
+
+        # Optional per-policy removed-row counters
+        self._removed_rows = RemovedRowCounter(self._conn) if count_removed_rows else None
+        # Counts of the statement most recently executed through this rewriter.
+        self._last_removed_rows: Optional[StatementRemovedRows] = None
+
         # Replay manager for replaying recorded responses
         self._replay_manager = None
 
-        # Stream file for LLM-fixed rows
-        if stream_file_path is None:
-            with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".txt") as stream_file:
-                self._stream_file_path = stream_file.name
-        else:
-            self._stream_file_path = stream_file_path
+        # Stream file for LLM-fixed rows, created on first use if not provided
+        self._stream_file_path = stream_file_path
 
         self._register_kill_udf()
         self._register_address_violating_rows_udf()
@@ -107,6 +216,236 @@ class SQLRewriter:
         """
         self._replay_manager = replay_manager
 
+    def set_profiler(self, profiler: Optional[RewriteProfiler]) -> None:
+        """Set the rewrite-time profiler.
+
+        Args:
+            profiler: Optional RewriteProfiler instance. If None, profiling is disabled.
+        """
+        self._profiler = profiler
+
+    def get_profiler(self) -> Optional[RewriteProfiler]:
+        """Get the rewrite-time profiler, if one is set.
+
+        Returns:
+            The RewriteProfiler collecting stats for this rewriter, or None.
+        """
+        return self._profiler
+
+    def _profile_call(self, query: str) -> AbstractContextManager:
+        """Record a top-level call on the profiler (no-op when profiling is disabled)."""
+        if self._profiler is None:
+            return nullcontext()
+        return self._profiler.record(query)
+
+    def _profile_phase(self, name: str) -> AbstractContextManager:
+        """Time a rewrite phase on the profiler (no-op when profiling is disabled)."""
+        if self._profiler is None:
+            return nullcontext()
+        return self._profiler.phase(name)
+
+    def _profile_count(self, name: str, value: int) -> None:
+        if self._profiler is not None:
+            self._profiler.count(name, value)
+
+    def _profile_matched_policies(self, *policy_lists: list) -> None:
+        if self._profiler is not None:
+            self._profiler.add_matched_policies(
+                [policy.get_identifier() for policies in policy_lists for policy in policies]
+            )
+
+    def _materialize_verdicts(self) -> None:
+        """Build the cached verdicts the statement just transformed reads, if any.
+
+        Called by every path that runs rewritten SQL, right before running it, so that
+        transform_query() itself never writes to the database.
+        """
+        if self._verdict_cache is not None:
+            with self._profile_phase("verdict_cache"):
+                self._verdict_cache.materialize_pending()
+
+    def _profile_removed_rows(self, removed_rows: Optional[StatementRemovedRows]) -> None:
+        if self._profiler is not None and removed_rows is not None:
+            self._profiler.add_removed_rows(removed_rows.get_counts())
+
+    def get_table_version(self, table_name: str) -> tuple[int, int]:
+        """Get the write version of a table.
+
+        The version changes whenever a statement executed through this rewriter, or directly
+        through rewriter.conn, may have written the table (INSERT, UPDATE, DELETE, CREATE,
+        DROP, ...).
+
+        Args:
+            table_name: The table name (case-insensitive).
+
+        Returns:
+            An opaque, comparable version.
+        """
+        return (self._write_epoch, self._table_versions.get(table_name.lower(), 0))
+
+    def invalidate_table_versions(self, table_name: Optional[str] = None) -> None:
+        """Advance table versions after writes that bypassed the rewriter.
+
+        Args:
+            table_name: The table that was written, or None if unknown (advances all tables).
+        """
+        self._advance_table_versions(table_name, append_only=False)
+
+    def _advance_table_versions(self, table_name: Optional[str], append_only: bool) -> None:
+        """Advance table versions and mark dependent protected views stale.
+
+        Args:
+            table_name: The table that was written, or None if unknown (advances all tables).
+            append_only: True if the write only appended rows to the table.
+        """
+        if table_name is None:
+            self._write_epoch += 1
+        else:
+            table_lower = table_name.lower()
+            self._table_versions[table_lower] = self._table_versions.get(table_lower, 0) + 1
+        if self._stats_prover is not None:
+            self._stats_prover.invalidate(table_name)
+        if self._verdict_cache is not None:
+            self._verdict_cache.invalidate(table_name)
+        if self._result_cache is not None:
+            self._result_cache.invalidate(table_name)
+        written = table_name.lower() if table_name is not None else None
+        for view in self._protected_views.values():
+            view.mark_written(written, append_only)
+
+    def _record_table_writes(self, parsed: exp.Expression) -> None:
+        """Advance the versions of tables a statement may have written.
+
+        Called after the statement executed successfully; transforming a statement
+        (transform_query, explain) never advances versions.
+        """
+        if isinstance(parsed, exp.Transaction):
+            self._in_transaction = True
+            return
+        if isinstance(parsed, (exp.Commit, exp.Rollback)):
+            self._in_transaction = False
+            if isinstance(parsed, exp.Rollback):
+                self.invalidate_table_versions()
+            return
+        if isinstance(parsed, (exp.Query, exp.Describe, exp.Pragma, exp.Set)):
+            return
+        if isinstance(
+            parsed,
+            (
+                exp.Insert, exp.Update, exp.Delete, exp.Merge, exp.Create, exp.Drop,
+                exp.Alter, exp.Copy, exp.TruncateTable,
+            ),
+        ):
+            if isinstance(parsed, exp.TruncateTable):
+                tables = list(parsed.find_all(exp.Table))
+            elif isinstance(parsed.this, exp.Expression):
+                tables = list(parsed.this.find_all(exp.Table))
+            else:
+                tables = []
+            if tables:
+                append_only = isinstance(parsed, exp.Insert) and not (
+                    parsed.args.get("conflict") or parsed.args.get("alternative")
+                )
+                for table in tables:
+                    self._advance_table_versions(table.name, append_only)
+                return
+        self.invalidate_table_versions()
+
+    def _record_direct_writes(self, sql: str) -> None:
+        """Advance the versions of tables written by SQL run directly through self.conn."""
+        try:
+            statements = [s for s in sqlglot.parse(sql, read="duckdb") if s is not None]
+        except sqlglot.errors.SqlglotError:
+            statements = []
+        if not statements:
+            self.invalidate_table_versions()
+        for statement in statements:
+            self._record_table_writes(statement)
+
+    def _elide_provable_policies(
+        self,
+        parsed: exp.Expression,
+        policies: list[DFCPolicy],
+    ) -> list[DFCPolicy]:
+        """Drop policies that column statistics prove cannot fail for this query.
+
+        Elision is skipped when the query has outer or semi/anti joins (NULL-extended rows
+        would fail the constraint) or a global aggregation (its single group may be empty,
+        making the aggregate NULL).
+        """
+        if self._stats_prover is None or not policies:
+            return policies
+        for join in parsed.find_all(exp.Join):
+            kind = (join.args.get("kind") or "").upper()
+            if join.args.get("side") or kind not in ("", "INNER", "CROSS"):
+                return policies
+        for select in parsed.find_all(exp.Select):
+            if not select.args.get("group") and self._has_aggregations(select):
+                return policies
+
+        kept = [
+            policy for policy in policies
+            if not self._stats_prover.always_holds(policy, self.get_table_version)
+        ]
+        self._profile_count("elided_policies", len(policies) - len(kept))
+        return kept
+
+    def _apply_cached_verdicts(
+        self,
+        parsed: exp.Select,
+        policies: list[DFCPolicy],
+    ) -> list[DFCPolicy]:
+        """Enforce cacheable policies through the verdict cache and return the rest.
+
+        Only scan queries whose source table appears exactly once, directly in the main
+        FROM/JOIN, are served from the cache. Aggregations keep evaluating their constraints
+        per group, and outer joins are skipped because NULL-extended rows have no rowid.
+        """
+        if self._verdict_cache is None or not policies or self._has_aggregations(parsed):
+            return policies
+        for join in parsed.find_all(exp.Join):
+            kind = (join.args.get("kind") or "").upper()
+            if join.args.get("side") or kind not in ("", "INNER", "CROSS"):
+                return policies
+
+        references: dict[str, list[exp.Table]] = {}
+        for table in parsed.find_all(exp.Table):
+            references.setdefault(table.name.lower(), []).append(table)
+        main_tables = _get_main_query_tables(parsed)
+
+        by_table: dict[str, list[DFCPolicy]] = {}
+        for policy in policies:
+            if not is_cacheable_policy(policy):
+                continue
+            table = next(iter(policy._sources_lower))
+            if table in main_tables and len(references.get(table, [])) == 1:
+                by_table.setdefault(table, []).append(policy)
+
+        cached = []
+        for table, table_policies in by_table.items():
+            if not self._verdict_cache.is_base_table(table):
+                continue
+            table_ref = references[table][0].alias_or_name
+            version = self.get_table_version(table)
+            for resolution in (Resolution.REMOVE, Resolution.INVALIDATE):
+                group = [p for p in table_policies if p.on_fail == resolution]
+                if not group:
+                    continue
+                predicate = self._verdict_cache.passes_predicate(
+                    table, table_ref, group, version
+                )
+                if resolution == Resolution.REMOVE:
+                    _add_clause_to_select(parsed, "where", predicate, exp.Where)
+                else:
+                    _add_invalidate_column_to_select(parsed, predicate)
+                cached.extend(group)
+
+        if not cached:
+            return policies
+        self._profile_count("cached_policies", len(cached))
+        cached_ids = {id(policy) for policy in cached}
+        return [policy for policy in policies if id(policy) not in cached_ids]
+
     def transform_query(self, query: str, use_two_phase: bool = False) -> str:
         """Transform a SQL query according to the rewriter's rules.
 
@@ -117,6 +456,9 @@ class SQLRewriter:
         For INSERT statements, policies are matched based on sink table and source tables
         from the SELECT part (if present).
 
+        Transforming never writes to the database. With verdict_cache, the result may read
+        verdict tables that are only built when the query is executed through this rewriter.
+
         Args:
             query: The original SQL query string.
             use_two_phase: If True, route through the two-phase rewrite path.
@@ -127,12 +469,26 @@ class SQLRewriter:
         Returns:
             The transformed SQL query string.
         """
-        parsed = sqlglot.parse_one(query, read="duckdb")
+        with self._profile_call(query):
+            with self._profile_phase("parse"):
+                parsed = sqlglot.parse_one(query, read="duckdb")
+            return self._transform_parsed(parsed, use_two_phase)
+
+    def _transform_parsed(self, parsed: exp.Expression, use_two_phase: bool) -> str:
+        """Transform an already parsed statement and generate its SQL."""
+        if self._profiler is not None and self._profiler.needs_fingerprint():
+            with self._profile_phase("fingerprint"):
+                self._profiler.set_fingerprint(*query_fingerprint(parsed))
+        if self._removed_rows is not None:
+            self._removed_rows.begin_statement()
+        if self._verdict_cache is not None:
+            self._verdict_cache.discard_pending()
         if use_two_phase:
             transformed = self._transform_query_two_phase(parsed)
         else:
             transformed = self._transform_query_standard(parsed)
-        return transformed.sql(pretty=True, dialect="duckdb")
+        with self._profile_phase("generate_sql"):
+            return transformed.sql(pretty=True, dialect="duckdb")
 
     def _transform_query_standard(self, parsed: exp.Expression) -> exp.Expression:
         """Apply standard DFC rewriting rules to a parsed query."""
@@ -145,21 +501,36 @@ class SQLRewriter:
     def _transform_query_common(self, parsed: exp.Expression, use_two_phase: bool) -> exp.Expression:
         """Apply rewriting rules shared by standard DFC and two-phase paths."""
         if isinstance(parsed, exp.Select):
-            from_tables = self._get_source_tables(parsed)
+            with self._profile_phase("policy_matching"):
+                from_tables = self._get_source_tables(parsed)
 
             if from_tables:
-                matching_policies = self._find_matching_policies(
-                    source_tables=from_tables, sink_table=None
-                )
-                matching_aggregate_policies = self._find_matching_aggregate_policies(
-                    source_tables=from_tables, sink_table=None
-                )
+                with self._profile_phase("policy_matching"):
+                    matching_policies = self._find_matching_policies(
+                        source_tables=from_tables, sink_table=None
+                    )
+                    matching_aggregate_policies = self._find_matching_aggregate_policies(
+                        source_tables=from_tables, sink_table=None
+                    )
+                self._profile_count("matched_policies", len(matching_policies))
+                self._profile_count("matched_aggregate_policies", len(matching_aggregate_policies))
+                self._profile_matched_policies(matching_policies, matching_aggregate_policies)
+
+                with self._profile_phase("policy_elision"):
+                    matching_policies = self._elide_provable_policies(parsed, matching_policies)
+
+                if not use_two_phase:
+                    with self._profile_phase("verdict_cache"):
+                        matching_policies = self._apply_cached_verdicts(parsed, matching_policies)
 
                 if matching_policies:
                     if not use_two_phase:
-                        rewrite_in_subqueries_as_joins(parsed, matching_policies, from_tables)
-                        rewrite_exists_subqueries_as_joins(parsed, matching_policies, from_tables)
-                        from_tables = self._get_source_tables(parsed)
+                        with self._profile_phase("rewrite_in_subqueries"):
+                            rewrite_in_subqueries_as_joins(parsed, matching_policies, from_tables)
+                        with self._profile_phase("rewrite_exists_subqueries"):
+                            rewrite_exists_subqueries_as_joins(parsed, matching_policies, from_tables)
+                        with self._profile_phase("policy_matching"):
+                            from_tables = self._get_source_tables(parsed)
 
                     has_limit = parsed.args.get("limit") is not None
                     has_remove_policy = any(p.on_fail == Resolution.REMOVE for p in matching_policies)
@@ -168,68 +539,90 @@ class SQLRewriter:
                         remove_policy = next(p for p in matching_policies if p.on_fail == Resolution.REMOVE)
                         if use_two_phase:
                             if self._has_aggregations(parsed):
-                                parsed = self._rewrite_limit_aggregation_with_two_phase(
-                                    parsed,
-                                    matching_policies,
-                                    from_tables,
-                                    remove_policy,
-                                )
+                                with self._profile_phase("two_phase_rewrite"):
+                                    parsed = self._rewrite_limit_aggregation_with_two_phase(
+                                        parsed,
+                                        matching_policies,
+                                        from_tables,
+                                        remove_policy,
+                                    )
                             else:
-                                wrap_query_with_limit_in_cte_for_remove_policy(
-                                    parsed,
-                                    remove_policy,
-                                    from_tables,
-                                    is_aggregation=False,
-                                )
+                                with self._profile_phase("limit_wrap"):
+                                    wrap_query_with_limit_in_cte_for_remove_policy(
+                                        parsed,
+                                        remove_policy,
+                                        from_tables,
+                                        is_aggregation=False,
+                                    )
                         else:
                             is_aggregation = self._has_aggregations(parsed)
-                            wrap_query_with_limit_in_cte_for_remove_policy(
-                                parsed, remove_policy, from_tables, is_aggregation
-                            )
+                            with self._profile_phase("limit_wrap"):
+                                wrap_query_with_limit_in_cte_for_remove_policy(
+                                    parsed, remove_policy, from_tables, is_aggregation
+                                )
                     else:
                         if not (use_two_phase and self._has_aggregations(parsed)):
-                            ensure_subqueries_have_constraint_columns(parsed, matching_policies, from_tables)
+                            with self._profile_phase("thread_constraint_columns"):
+                                ensure_subqueries_have_constraint_columns(
+                                    parsed, matching_policies, from_tables
+                                )
 
                         if self._has_aggregations(parsed):
                             if use_two_phase:
-                                parsed = self._rewrite_aggregation_with_two_phase(
-                                    parsed,
-                                    matching_policies,
-                                    from_tables,
-                                )
+                                with self._profile_phase("two_phase_rewrite"):
+                                    parsed = self._rewrite_aggregation_with_two_phase(
+                                        parsed,
+                                        matching_policies,
+                                        from_tables,
+                                    )
                             else:
-                                apply_policy_constraints_to_aggregation(
+                                with self._profile_phase("apply_constraints"):
+                                    apply_policy_constraints_to_aggregation(
+                                        parsed, matching_policies, from_tables,
+                                        stream_file_path=self._llm_stream_file_path(matching_policies),
+                                        batch_invalidate=self._batch_invalidate
+                                    )
+                        else:
+                            with self._profile_phase("apply_constraints"):
+                                apply_policy_constraints_to_scan(
                                     parsed, matching_policies, from_tables,
-                                    stream_file_path=self._stream_file_path
+                                    stream_file_path=self._llm_stream_file_path(matching_policies),
+                                    batch_invalidate=self._batch_invalidate,
+                                    count_removed=self._count_removed_callback(),
                                 )
-                        else:
-                            apply_policy_constraints_to_scan(
-                                parsed, matching_policies, from_tables,
-                                stream_file_path=self._stream_file_path
-                            )
 
                 if matching_aggregate_policies:
-                    if self._has_aggregations(parsed):
-                        apply_aggregate_policy_constraints_to_aggregation(
-                            parsed, matching_aggregate_policies, from_tables
-                        )
-                    else:
-                        apply_aggregate_policy_constraints_to_scan(
-                            parsed, matching_aggregate_policies, from_tables
-                        )
+                    with self._profile_phase("apply_aggregate_policies"):
+                        if self._has_aggregations(parsed):
+                            apply_aggregate_policy_constraints_to_aggregation(
+                                parsed, matching_aggregate_policies, from_tables
+                            )
+                        else:
+                            apply_aggregate_policy_constraints_to_scan(
+                                parsed, matching_aggregate_policies, from_tables
+                            )
 
         elif isinstance(parsed, exp.Insert):
-            sink_table = self._get_sink_table(parsed)
-            source_tables = self._get_insert_source_tables(parsed)
+            with self._profile_phase("policy_matching"):
+                sink_table = self._get_sink_table(parsed)
+                source_tables = self._get_insert_source_tables(parsed)
 
-            matching_policies = self._find_matching_policies(
-                source_tables=source_tables, sink_table=sink_table
-            )
-            matching_aggregate_policies = self._find_matching_aggregate_policies(
-                source_tables=source_tables, sink_table=sink_table
-            )
+                matching_policies = self._find_matching_policies(
+                    source_tables=source_tables, sink_table=sink_table
+                )
+                matching_aggregate_policies = self._find_matching_aggregate_policies(
+                    source_tables=source_tables, sink_table=sink_table
+                )
+            self._profile_count("matched_policies", len(matching_policies))
+            self._profile_count("matched_aggregate_policies", len(matching_aggregate_policies))
+            self._profile_matched_policies(matching_policies, matching_aggregate_policies)
 
             select_expr = parsed.find(exp.Select)
+            if select_expr:
+                with self._profile_phase("policy_elision"):
+                    matching_policies = self._elide_provable_policies(
+                        select_expr, matching_policies
+                    )
 
             sink_to_output_mapping = None
             if select_expr and sink_table:
@@ -257,9 +650,10 @@ class SQLRewriter:
 
                     insert_columns = self._get_insert_column_list(parsed)
 
-                    ensure_subqueries_have_constraint_columns(
-                        select_expr, matching_policies, source_tables
-                    )
+                    with self._profile_phase("thread_constraint_columns"):
+                        ensure_subqueries_have_constraint_columns(
+                            select_expr, matching_policies, source_tables
+                        )
 
                     insert_has_valid = False
                     insert_has_invalid_string = False
@@ -284,68 +678,78 @@ class SQLRewriter:
                             if insert_has_valid and insert_has_invalid_string:
                                 break
 
-                    if self._has_aggregations(select_expr):
-                        apply_policy_constraints_to_aggregation(
-                            select_expr, matching_policies, source_tables,
-                            stream_file_path=self._stream_file_path,
+                    with self._profile_phase("apply_constraints"):
+                        if self._has_aggregations(select_expr):
+                            apply_policy_constraints_to_aggregation(
+                                select_expr, matching_policies, source_tables,
+                                stream_file_path=self._llm_stream_file_path(matching_policies),
+                                sink_table=sink_table,
+                                sink_to_output_mapping=sink_to_output_mapping,
+                                replace_existing_valid=insert_has_valid,
+                                replace_existing_invalid_string=insert_has_invalid_string,
+                                insert_columns=insert_columns,
+                                batch_invalidate=self._batch_invalidate
+                            )
+                        else:
+                            apply_policy_constraints_to_scan(
+                                select_expr, matching_policies, source_tables,
+                                stream_file_path=self._llm_stream_file_path(matching_policies),
+                                sink_table=sink_table,
+                                sink_to_output_mapping=sink_to_output_mapping,
+                                replace_existing_valid=insert_has_valid,
+                                replace_existing_invalid_string=insert_has_invalid_string,
+                                insert_columns=insert_columns,
+                                batch_invalidate=self._batch_invalidate,
+                                count_removed=self._count_removed_callback(),
+                            )
+
+            if matching_aggregate_policies and select_expr:
+                with self._profile_phase("apply_aggregate_policies"):
+                    has_aggs = self._has_aggregations(select_expr)
+                    if has_aggs:
+                        apply_aggregate_policy_constraints_to_aggregation(
+                            select_expr, matching_aggregate_policies, source_tables,
                             sink_table=sink_table,
-                            sink_to_output_mapping=sink_to_output_mapping,
-                            replace_existing_valid=insert_has_valid,
-                            replace_existing_invalid_string=insert_has_invalid_string,
-                            insert_columns=insert_columns
+                            sink_to_output_mapping=sink_to_output_mapping
                         )
                     else:
-                        apply_policy_constraints_to_scan(
-                            select_expr, matching_policies, source_tables,
-                            stream_file_path=self._stream_file_path,
+                        apply_aggregate_policy_constraints_to_scan(
+                            select_expr, matching_aggregate_policies, source_tables,
                             sink_table=sink_table,
-                            sink_to_output_mapping=sink_to_output_mapping,
-                            replace_existing_valid=insert_has_valid,
-                            replace_existing_invalid_string=insert_has_invalid_string,
-                            insert_columns=insert_columns
+                            sink_to_output_mapping=sink_to_output_mapping
                         )
 
-            if matching_aggregate_policies and select_expr:
-                has_aggs = self._has_aggregations(select_expr)
-                if has_aggs:
-                    apply_aggregate_policy_constraints_to_aggregation(
-                        select_expr, matching_aggregate_policies, source_tables,
-                        sink_table=sink_table,
-                        sink_to_output_mapping=sink_to_output_mapping
-                    )
-                else:
-                    apply_aggregate_policy_constraints_to_scan(
-                        select_expr, matching_aggregate_policies, source_tables,
-                        sink_table=sink_table,
-                        sink_to_output_mapping=sink_to_output_mapping
-                    )
-
                 # Add temp columns to INSERT column list so they're included in the table
                 self._add_aggregate_temp_columns_to_insert(parsed, matching_aggregate_policies, select_expr)
         elif isinstance(parsed, exp.Update):
-            sink_table = self._get_update_target_table(parsed)
-            source_tables = self._get_update_source_tables(parsed)
+            with self._profile_phase("policy_matching"):
+                sink_table = self._get_update_target_table(parsed)
+                source_tables = self._get_update_source_tables(parsed)
 
-            matching_policies = self._find_matching_policies(
-                source_tables=source_tables, sink_table=sink_table
-            )
-            matching_aggregate_policies = self._find_matching_aggregate_policies(
-                source_tables=source_tables, sink_table=sink_table
-            )
+                matching_policies = self._find_matching_policies(
+                    source_tables=source_tables, sink_table=sink_table
+                )
+                matching_aggregate_policies = self._find_matching_aggregate_policies(
+                    source_tables=source_tables, sink_table=sink_table
+                )
+            self._profile_count("matched_policies", len(matching_policies))
+            self._profile_count("matched_aggregate_policies", len(matching_aggregate_policies))
+            self._profile_matched_policies(matching_policies, matching_aggregate_policies)
 
             if matching_aggregate_policies:
                 raise ValueError("Aggregate policies are not supported for UPDATE statements")
 
             if matching_policies and sink_table:
-                apply_policy_constraints_to_update(
-                    parsed,
-                    matching_policies,
-                    source_tables,
-                    sink_table=sink_table,
-                    sink_assignments=self._get_update_assignment_mapping(parsed),
-                    target_reference_name=self._get_update_target_reference_name(parsed),
-                    stream_file_path=self._stream_file_path,
-                )
+                with self._profile_phase("apply_constraints"):
+                    apply_policy_constraints_to_update(
+                        parsed,
+                        matching_policies,
+                        source_tables,
+                        sink_table=sink_table,
+                        sink_assignments=self._get_update_assignment_mapping(parsed),
+                        target_reference_name=self._get_update_target_reference_name(parsed),
+                        stream_file_path=self._llm_stream_file_path(matching_policies),
+                    )
         return parsed
 
     def _extract_policy_comparison(
@@ -699,7 +1103,8 @@ class SQLRewriter:
             policy_eval,
             policies,
             source_tables,
-            stream_file_path=self._stream_file_path,
+            stream_file_path=self._llm_stream_file_path(policies),
+            batch_invalidate=self._batch_invalidate,
         )
 
         select_list = "base_query.*"
@@ -847,13 +1252,12 @@ class SQLRewriter:
                 rowid_expr = exp.Column(this=exp.Identifier(this="rowid", quoted=False))
             else:
                 # For non-base-table sources (subqueries/CTEs), propagate __dfc_rowid.
-                for policy in policies:
-                    for source in policy.sources:
-                        source_lower = source.lower()
-                        if source_lower in policy._source_columns_needed:
-                            policy._source_columns_needed[source_lower].add("__dfc_rowid")
-                ensure_subqueries_have_constraint_columns(policy_eval, policies, source_tables)
-                ensure_subqueries_have_constraint_columns(base_query, policies, source_tables)
+                ensure_subqueries_have_constraint_columns(
+                    policy_eval, policies, source_tables, extra_columns={"__dfc_rowid"}
+                )
+                ensure_subqueries_have_constraint_columns(
+                    base_query, policies, source_tables, extra_columns={"__dfc_rowid"}
+                )
                 rowid_expr = exp.Column(this=exp.Identifier(this="__dfc_rowid", quoted=False))
 
             rowid_alias = "__dfc_rowid"
@@ -898,7 +1302,9 @@ class SQLRewriter:
             policy_eval,
             policies,
             source_tables,
-            stream_file_path=self._stream_file_path,
+            stream_file_path=self._llm_stream_file_path(policies),
+            batch_invalidate=self._batch_invalidate,
+            count_removed=self._count_removed_callback(),
         )
 
         if use_rowid_join:
@@ -941,18 +1347,86 @@ class SQLRewriter:
         )
         return rewritten
 
-    def _execute_transformed(self, query: str, use_two_phase: bool = False):
+    def _execute_transformed(
+        self,
+        query: str,
+        use_two_phase: bool = False,
+        use_result_cache: bool = False,
+    ):
         """Execute a transformed query and return the cursor.
 
         Args:
             query: The SQL query string to execute.
             use_two_phase: If True, use the two-phase rewrite path.
+            use_result_cache: If True and the result cache is enabled, serve cacheable read
+                queries from it. The result is then a relation over the cached Arrow table.
 
         Returns:
-            The DuckDB cursor from executing the transformed query.
+            The DuckDB cursor from executing the transformed query, or a relation over the
+            cached result. With count_removed_rows, it is wrapped in a CountedCursor.
         """
-        transformed_query = self.transform_query(query, use_two_phase=use_two_phase)
-        return self.conn.execute(transformed_query)
+        with self._profile_call(query):
+            with self._profile_phase("parse"):
+                parsed = sqlglot.parse_one(query, read="duckdb")
+            self._refresh_stale_views(parsed)
+            cache_tables = None
+            if use_result_cache and self._result_cache is not None:
+                cache_tables = self._result_cache_tables(parsed)
+            transformed_query = self._transform_parsed(parsed, use_two_phase)
+            removed_rows = self._executed_removed_rows()
+            if (
+                cache_tables is None
+                or "address_violating_rows(" in transformed_query
+                or (removed_rows is not None and removed_rows.get_counts())
+            ):
+                self._materialize_verdicts()
+                with self._profile_phase("execute"):
+                    cursor = self._conn.execute(transformed_query)
+                self._profile_removed_rows(removed_rows)
+                self._record_table_writes(parsed)
+                return self._with_removed_rows(cursor, removed_rows)
+
+            # Versions are read after refreshing protected views.
+            key = (
+                transformed_query,
+                tuple(sorted((table, self.get_table_version(table)) for table in cache_tables)),
+            )
+            table = self._result_cache.get(key)
+            if table is None:
+                self._materialize_verdicts()
+                with self._profile_phase("execute"):
+                    table = self._conn.execute(transformed_query).fetch_arrow_table()
+                self._result_cache.put(key, table, cache_tables)
+            else:
+                self._profile_count("result_cache_hits", 1)
+            return self._with_removed_rows(self._conn.from_arrow(table), removed_rows)
+
+    def _result_cache_tables(self, parsed: exp.Expression) -> Optional[set[str]]:
+        """Return the tables a cacheable read query depends on, or None if uncacheable.
+
+        Only queries whose result is determined by the contents of base tables are cached:
+        no volatile functions and no table functions, DuckDB views or other catalog objects
+        whose contents the table versions don't track.
+        """
+        if not isinstance(parsed, exp.Query):
+            return None
+        for func in parsed.find_all(exp.Func):
+            if isinstance(func, _VOLATILE_FUNCTION_TYPES):
+                return None
+            if isinstance(func, exp.Anonymous) and func.name.lower() in _VOLATILE_FUNCTION_NAMES:
+                return None
+        tables = set()
+        cte_names = {cte.alias_or_name.lower() for cte in parsed.find_all(exp.CTE)}
+        for table in parsed.find_all(exp.Table):
+            name = table.name.lower()
+            if name in cte_names:
+                continue
+            if not name or not isinstance(table.this, exp.Identifier):
+                return None
+            tables.add(name)
+        if any(not self._is_base_table(name) for name in tables):
+            return None
+        return tables
 
     def execute(self, query: str, use_two_phase: bool = False) -> Any:
         """Execute a SQL query after transforming it.
@@ -962,10 +1436,217 @@ class SQLRewriter:
             use_two_phase: If True, use the two-phase rewrite path.
 
         Returns:
-            The result of executing the query.
+            The result of executing the query. With count_removed_rows, a CountedCursor
+            whose get_removed_row_counts() reports this statement's removed rows.
         """
         return self._execute_transformed(query, use_two_phase=use_two_phase)
 
+    def execute_script(self, sql_text: str, use_two_phase: bool = False) -> list[list[tuple]]:
+        """Execute a script of semicolon-separated statements in a single transaction.
+
+        All statements are parsed with one sqlglot.parse call. Each statement is rewritten
+        and executed in order (later statements see the effects of earlier ones), and policy
+        matching is done once per distinct set of source and sink tables. If any statement
+        fails, the transaction is rolled back and the error is re-raised. Scripts that
+        manage their own transactions (BEGIN/COMMIT/ROLLBACK), or calls made while a
+        transaction opened through this rewriter is active, run without the enclosing
+        transaction. Transactions opened on the connection passed in, rather than through
+        the rewriter or rewriter.conn, are not detected.
+
+        Args:
+            sql_text: The SQL script.
+            use_two_phase: If True, use the two-phase rewrite path.
+
+        Returns:
+            The fetched result rows of each statement, in order.
+        """
+        statements = [s for s in sqlglot.parse(sql_text, read="duckdb") if s is not None]
+        return self._execute_statements(statements, use_two_phase)
+
+    def execute_many(self, queries: list[str], use_two_phase: bool = False) -> list[list[tuple]]:
+        """Execute a list of single-statement queries in a single transaction.
+
+        See execute_script for parsing, policy matching and transaction semantics.
+
+        Args:
+            queries: The SQL queries, one statement each.
+            use_two_phase: If True, use the two-phase rewrite path.
+
+        Returns:
+            The fetched result rows of each query, in order.
+
+        Raises:
+            ValueError: If a query is empty or contains more than one statement.
+        """
+        sql_text = ";\n".join(query.strip().rstrip(";") for query in queries)
+        statements = [s for s in sqlglot.parse(sql_text, read="duckdb") if s is not None]
+        if len(statements) != len(queries):
+            raise ValueError(
+                f"Expected one statement per query, got {len(statements)} statements "
+                f"for {len(queries)} queries"
+            )
+        return self._execute_statements(statements, use_two_phase)
+
+    def _execute_statements(
+        self,
+        statements: list[exp.Expression],
+        use_two_phase: bool,
+    ) -> list[list[tuple]]:
+        """Rewrite and execute parsed statements in order, inside one transaction."""
+        manage_transaction = not self._in_transaction and not any(
+            isinstance(statement, (exp.Transaction, exp.Commit, exp.Rollback))
+            for statement in statements
+        )
+        self._batch_match_memo = {}
+        results = []
+        try:
+            with self._batch_transaction(manage_transaction):
+                for statement in statements:
+                    label = statement.sql(dialect="duckdb") if self._profiler is not None else ""
+                    with self._profile_call(label):
+                        self._refresh_stale_views(statement)
+                        transformed_query = self._transform_parsed(statement, use_two_phase)
+                        removed_rows = self._executed_removed_rows()
+                        self._materialize_verdicts()
+                        with self._profile_phase("execute"):
+                            results.append(self._conn.execute(transformed_query).fetchall())
+                        self._profile_removed_rows(removed_rows)
+                        self._record_table_writes(statement)
+        finally:
+            self._batch_match_memo = None
+        return results
+
+    @contextmanager
+    def _batch_transaction(self, manage_transaction: bool) -> Iterator[None]:
+        """Wrap a batch in BEGIN/COMMIT, rolling back and invalidating caches on error."""
+        if not manage_transaction:
+            yield
+            return
+        self._conn.execute("BEGIN TRANSACTION")
+        try:
+            yield
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            # Cached verdicts, protected views and results may reflect rolled-back writes.
+            self.invalidate_table_versions()
+            raise
+        self._conn.execute("COMMIT")
+
+    def execute_bulk_update(
+        self,
+        table_name: str,
+        key_columns: list[str],
+        updates: list[dict[str, Any]],
+    ) -> int:
+        """Apply many keyed single-row updates with one policy-checked UPDATE per round.
+
+        The updates are staged in a temporary table and applied with a single statement of
+        the form::
+
+            UPDATE t AS __dfc_target SET c = s.c FROM t, __dfc_staged_updates AS s
+            WHERE t.k = __dfc_target.k AND t.k = s.k
+
+        which is rewritten once, so policy constraints are evaluated over the whole batch
+        instead of once per statement. As in the equivalent single-row UPDATE ... FROM t,
+        references to the target table as a source see the row before the update and sink
+        references see the assigned values. Updates that fail a REMOVE policy are skipped.
+
+        Updates to the same key are applied in list order: the n-th update of every key is
+        applied in round n, so the result matches running the single-row updates one by one
+        as long as the policies only relate a row to its own old and new values. The batch
+        runs in one transaction (unless one opened through this rewriter is active) and is
+        rolled back if any round fails.
+
+        Args:
+            table_name: The table to update. It is also the UPDATE's only source table.
+            key_columns: Columns identifying a row of the table uniquely.
+            updates: One dictionary per update mapping every key column and the columns to
+                set to their values. All dictionaries must have the same keys.
+
+        Returns:
+            The number of rows updated.
+
+        Raises:
+            ValueError: If the table or a column does not exist, or if the updates have no
+                columns to set or inconsistent keys.
+        """
+        if not updates:
+            return 0
+        if not key_columns:
+            raise ValueError("execute_bulk_update requires at least one key column")
+        columns = list(updates[0])
+        set_columns = [column for column in columns if column not in key_columns]
+        if not set_columns:
+            raise ValueError("Updates must set at least one non-key column")
+        expected = set(columns)
+        if not set(key_columns).issubset(expected):
+            raise ValueError(f"Updates must include every key column: {key_columns}")
+        for update in updates:
+            if set(update) != expected:
+                raise ValueError(
+                    f"All updates must have the same columns, got {sorted(update)} "
+                    f"and {sorted(expected)}"
+                )
+        table_columns = self._get_table_columns(table_name)
+        for column in columns:
+            if column.lower() not in table_columns:
+                raise ValueError(f"Column '{column}' does not exist in table '{table_name}'")
+
+        staged_columns = list(key_columns) + set_columns
+        rounds = []
+        seen: dict[tuple, int] = {}
+        for update in updates:
+            key = tuple(update[column] for column in key_columns)
+            rounds.append(seen.get(key, 0))
+            seen[key] = rounds[-1] + 1
+
+        def quote(name: str) -> str:
+            return exp.to_identifier(name).sql(dialect="duckdb")
+
+        table_sql = quote(table_name)
+        staged_sql = ", ".join(quote(column) for column in staged_columns)
+        update_sql = (
+            f"UPDATE {table_sql} AS {_UPDATE_TARGET_ALIAS} SET "
+            + ", ".join(
+                f"{quote(column)} = {_STAGED_UPDATES_TABLE}.{quote(column)}"
+                for column in set_columns
+            )
+            + f" FROM {table_sql}, {_STAGED_UPDATES_TABLE} WHERE "
+            + " AND ".join(
+                f"{table_sql}.{quote(column)} = {_UPDATE_TARGET_ALIAS}.{quote(column)} "
+                f"AND {table_sql}.{quote(column)} = {_STAGED_UPDATES_TABLE}.{quote(column)}"
+                for column in key_columns
+            )
+            + f" AND {_STAGED_UPDATES_TABLE}.{_UPDATE_ROUND_COLUMN} = ?"
+        )
+
+        updated = 0
+        try:
+            with self._batch_transaction(not self._in_transaction):
+                # LIMIT 0 gives the staged columns the types of the target's columns.
+                self._conn.execute(
+                    f"CREATE OR REPLACE TEMP TABLE {_STAGED_UPDATES_TABLE} AS "
+                    f"SELECT {staged_sql}, 0 AS {_UPDATE_ROUND_COLUMN} "
+                    f"FROM {table_sql} LIMIT 0"
+                )
+                # One list parameter per column: binding each value separately is much slower.
+                self._conn.execute(
+                    f"INSERT INTO {_STAGED_UPDATES_TABLE} SELECT "
+                    + ", ".join(["unnest(?)"] * (len(staged_columns) + 1)),
+                    [[update[column] for update in updates] for column in staged_columns]
+                    + [rounds],
+                )
+
+                transformed_query = self.transform_query(update_sql)
+                self._materialize_verdicts()
+                for round_number in range(max(rounds) + 1):
+                    result = self._conn.execute(transformed_query, [round_number]).fetchone()
+                    updated += result[0] if result else 0
+                self._advance_table_versions(table_name, append_only=False)
+        finally:
+            self._conn.execute(f"DROP TABLE IF EXISTS {_STAGED_UPDATES_TABLE}")
+        return updated
+
     def fetchall(self, query: str, use_two_phase: bool = False) -> list[tuple]:
         """Execute a query and fetch all results.
 
@@ -979,6 +1660,7 @@ class SQLRewriter:
         return self._execute_transformed(
             query,
             use_two_phase=use_two_phase,
+            use_result_cache=True,
         ).fetchall()
 
     def fetchone(self, query: str, use_two_phase: bool = False) -> Optional[tuple]:
@@ -994,7 +1676,290 @@ class SQLRewriter:
         return self._execute_transformed(
             query,
             use_two_phase=use_two_phase,
+            use_result_cache=True,
+        ).fetchone()
+
+    def fetch_arrow(self, query: str, use_two_phase: bool = False) -> Any:
+        """Execute a query and fetch all results as an Arrow table.
+
+        Args:
+            query: The SQL query string to execute.
+            use_two_phase: If True, use the two-phase rewrite path.
+
+        Returns:
+            A pyarrow.Table containing the query results.
+        """
+        return self._execute_transformed(
+            query,
+            use_two_phase=use_two_phase,
+            use_result_cache=True,
+        ).fetch_arrow_table()
+
+    def get_result_cache_stats(self) -> Optional[CacheStats]:
+        """Get hit/miss/eviction counters and the size of the result cache.
+
+        Returns:
+            A CacheStats snapshot, or None if the result cache is disabled.
+        """
+        if self._result_cache is None:
+            return None
+        return self._result_cache.stats()
+
+    def clear_result_cache(self) -> None:
+        """Drop all cached results (a no-op when the result cache is disabled)."""
+        if self._result_cache is not None:
+            self._result_cache.clear()
+
+    def _count_removed_callback(self) -> Optional[Any]:
+        """Return the REMOVE-constraint builder that counts removed rows, if enabled."""
+        if self._removed_rows is None:
+            return None
+        return self._removed_rows.check_expression
+
+    def _executed_removed_rows(self) -> Optional[StatementRemovedRows]:
+        """Record the statement just transformed as the one being executed.
+
+        Returns:
+            Its removed-row counts, or None if count_removed_rows is disabled.
+        """
+        if self._removed_rows is None:
+            return None
+        self._last_removed_rows = self._removed_rows.current_statement()
+        return self._last_removed_rows
+
+    def _with_removed_rows(
+        self, cursor: Any, removed_rows: Optional[StatementRemovedRows]
+    ) -> Any:
+        """Attach a statement's removed-row counts to its cursor, when counting."""
+        if removed_rows is None:
+            return cursor
+        return CountedCursor(cursor, removed_rows)
+
+    def get_removed_row_counts(self) -> Optional[dict[str, int]]:
+        """Get how many rows each REMOVE policy removed from the most recent statement.
+
+        Counts are keyed by policy identifier (see DFCPolicy.get_identifier()). A row that
+        fails several policies is counted once for each of them. The counts are complete
+        once the statement's result has been fully fetched. The cursor returned by execute()
+        carries the counts of its own statement (see CountedCursor), which later statements
+        do not change.
+
+        Returns:
+            The counts of the statement most recently executed through this rewriter, or
+            None if count_removed_rows is disabled. transform_query() and explain() do not
+            change them. Policies that did not apply to the statement, or were enforced
+            through the verdict cache, are absent.
+        """
+        if self._removed_rows is None:
+            return None
+        if self._last_removed_rows is None:
+            return {}
+        return self._last_removed_rows.get_counts()
+
+    def get_removed_row_totals(self) -> Optional[dict[str, int]]:
+        """Get removed-row counts per REMOVE policy, summed over every statement.
+
+        Returns:
+            The totals keyed by policy identifier since the rewriter was created or
+            reset_removed_row_counts() was called, or None if count_removed_rows is disabled.
+        """
+        if self._removed_rows is None:
+            return None
+        return self._removed_rows.get_totals()
+
+    def reset_removed_row_counts(self) -> None:
+        """Zero the removed-row counts (a no-op when count_removed_rows is disabled).
+
+        Cursors already returned keep the counts of their statements.
+        """
+        if self._removed_rows is not None:
+            self._removed_rows.reset()
+            self._last_removed_rows = None
+
+    def explain(
+        self,
+        query: str,
+        analyze: bool = True,
+        use_two_phase: bool = False,
+    ) -> ExplainResult:
+        """Explain the rewritten query and attribute operators to DFC enforcement.
+
+        Runs DuckDB's JSON profiler (EXPLAIN (ANALYZE, FORMAT JSON)) on the rewritten SQL and
+        tags operators that exist only because of policies: extra filters, policy joins,
+        two-phase CTE joins and UDF calls. Operators are matched against the plan of the
+        original query, which is only planned, never executed.
+
+        Args:
+            query: The SQL query string to explain.
+            analyze: If True, execute the rewritten query to collect operator timings.
+                Note that this runs the statement, so INSERT/UPDATE statements are applied.
+            use_two_phase: If True, use the two-phase rewrite path.
+
+        Returns:
+            ExplainResult with per-operator timings, DFC attribution, and the fraction of
+            operator time attributable to DFC.
+        """
+        parsed = None
+        if analyze:
+            # EXPLAIN ANALYZE executes the statement, so treat it like execute().
+            parsed = sqlglot.parse_one(query, read="duckdb")
+            self._refresh_stale_views(parsed)
+        rewritten_query = self.transform_query(query, use_two_phase=use_two_phase)
+        # The rewritten query can only be planned once the verdict tables it reads exist.
+        self._materialize_verdicts()
+        plan = explain_json(self._conn, rewritten_query, analyze=analyze)
+        if parsed is not None:
+            self._record_table_writes(parsed)
+        try:
+            original_plan = explain_json(self._conn, query, analyze=False)
+        except duckdb.Error:
+            # Fall back to marker-based attribution only.
+            original_plan = None
+        return ExplainResult(
+            query=query,
+            rewritten_query=rewritten_query,
+            analyzed=analyze,
+            operators=attribute_plan(plan, original_plan),
+            plan=plan,
+        )
+
+    def create_protected_view(self, name: str, query: str, use_two_phase: bool = False) -> None:
+        """Store the policy-enforced result of a query as a DuckDB table.
+
+        Reading the table skips policy evaluation. When a source table is written through
+        this rewriter, the view is refreshed the next time a statement reads it. For plain
+        filters/projections over a single base table, rows appended by INSERT are rewritten
+        and appended on their own; any other write, a change to the registered policies, or
+        invalidate_table_versions() recomputes the whole view. Appended rows are not
+        re-sorted, so read with ORDER BY if the order matters.
+
+        Args:
+            name: Name of the table to create.
+            query: The SELECT query whose rewritten result the view stores.
+            use_two_phase: If True, rewrite the query with the two-phase path.
+
+        Raises:
+            ValueError: If the query is not a SELECT, reads the view itself, or a table
+                with the name already exists.
+        """
+        parsed = sqlglot.parse_one(query, read="duckdb")
+        if not isinstance(parsed, exp.Query):
+            raise ValueError(f"Protected view query must be a SELECT query, got: {query}")
+        name_lower = name.lower()
+        source_tables = view_source_tables(parsed)
+        if name_lower in source_tables:
+            raise ValueError(f"Protected view {name} cannot read from itself")
+        if name_lower in self._protected_views or self._table_exists(name_lower):
+            raise ValueError(f"Table {name} already exists")
+
+        view = ProtectedView(
+            name=name,
+            query=query,
+            use_two_phase=use_two_phase,
+            source_tables=source_tables,
+        )
+        incremental = incremental_source(parsed)
+        if incremental is not None and self._is_base_table(incremental[0]):
+            view.incremental_table, view.incremental_ref = incremental
+        self._protected_views[name_lower] = view
+        try:
+            self.refresh_protected_view(name, full=True)
+        except Exception:
+            del self._protected_views[name_lower]
+            raise
+
+    def refresh_protected_view(self, name: str, full: bool = False) -> int:
+        """Bring a protected view up to date with its source tables and policies.
+
+        Args:
+            name: Name of the protected view.
+            full: If True, recompute the whole view even if an incremental refresh is possible.
+
+        Returns:
+            The number of rows written to the view.
+
+        Raises:
+            ValueError: If no protected view has the given name.
+        """
+        view = self._protected_views.get(name.lower())
+        if view is None:
+            raise ValueError(f"No protected view named {name}")
+
+        policy_snapshot = tuple(id(p) for p in self._policies + self._aggregate_policies)
+        full = (
+            full
+            or view.needs_full_refresh
+            or view.incremental_table is None
+            or policy_snapshot != view.policy_snapshot
+        )
+        view_table = exp.to_table(view.name, quoted=True).sql(dialect="duckdb")
+        if full:
+            rewritten = self.transform_query(view.query, use_two_phase=view.use_two_phase)
+            self._materialize_verdicts()
+            self._conn.execute(f"CREATE OR REPLACE TABLE {view_table} AS {rewritten}")
+            rows = self._conn.execute(f"SELECT count(*) FROM {view_table}").fetchone()[0]
+        else:
+            rewritten = self.transform_query(
+                delta_query(view.query, view.incremental_ref, view.watermark),
+                use_two_phase=view.use_two_phase,
+            )
+            self._materialize_verdicts()
+            rows = self._conn.execute(f"INSERT INTO {view_table} {rewritten}").fetchone()[0]
+
+        if view.incremental_table is not None:
+            source_table = exp.to_table(view.incremental_table, quoted=True).sql(dialect="duckdb")
+            watermark = self._conn.execute(f"SELECT max(rowid) FROM {source_table}").fetchone()[0]
+            view.watermark = -1 if watermark is None else watermark
+        view.stale = False
+        view.needs_full_refresh = False
+        view.policy_snapshot = policy_snapshot
+        self._advance_table_versions(view.name, append_only=not full)
+        return rows
+
+    def drop_protected_view(self, name: str) -> None:
+        """Drop a protected view and its table.
+
+        Args:
+            name: Name of the protected view.
+
+        Raises:
+            ValueError: If no protected view has the given name.
+        """
+        view = self._protected_views.pop(name.lower(), None)
+        if view is None:
+            raise ValueError(f"No protected view named {name}")
+        view_table = exp.to_table(view.name, quoted=True).sql(dialect="duckdb")
+        self._conn.execute(f"DROP TABLE IF EXISTS {view_table}")
+        self._advance_table_versions(view.name, append_only=False)
+
+    def get_protected_views(self) -> list[str]:
+        """Get the names of all protected views."""
+        return [view.name for view in self._protected_views.values()]
+
+    def _refresh_stale_views(self, parsed: exp.Expression) -> None:
+        """Refresh the stale protected views a statement reads, before executing it.
+
+        Only the execute paths call this: transform_query and explain must not write to
+        the database.
+        """
+        if not self._protected_views or not isinstance(parsed, (exp.Query, exp.Insert)):
+            return
+        with self._profile_phase("refresh_protected_views"):
+            for table in parsed.find_all(exp.Table):
+                view = self._protected_views.get(table.name.lower())
+                if view is None:
+                    continue
+                policy_snapshot = tuple(id(p) for p in self._policies + self._aggregate_policies)
+                if view.stale or policy_snapshot != view.policy_snapshot:
+                    self.refresh_protected_view(view.name)
+
+    def _is_base_table(self, table_name: str) -> bool:
+        """Check whether a name refers to exactly one base table (not a view)."""
+        result = self._conn.execute(
+            "SELECT count(*) FROM duckdb_tables() WHERE lower(table_name) = ?",
+            [table_name.lower()],
         ).fetchone()
+        return result[0] == 1
 
     def _table_exists(self, table_name: str) -> bool:
         """Check if a table exists in the database.
@@ -1006,7 +1971,7 @@ class SQLRewriter:
             True if the table exists, False otherwise.
         """
         try:
-            result = self.conn.execute(
+            result = self._conn.execute(
                 """
                 SELECT table_name
                 FROM information_schema.tables
@@ -1034,7 +1999,7 @@ class SQLRewriter:
             raise ValueError(f"Table '{table_name}' does not exist in the database")
 
         try:
-            result = self.conn.execute(
+            result = self._conn.execute(
                 """
                 SELECT column_name
                 FROM information_schema.columns
@@ -1111,7 +2076,7 @@ class SQLRewriter:
             ValueError: If query fails.
         """
         try:
-            result = self.conn.execute(
+            result = self._conn.execute(
                 """
                 SELECT data_type
                 FROM information_schema.columns
@@ -1299,12 +2264,78 @@ class SQLRewriter:
                     f"({policy.sources}) or sink ('{policy.sink}')"
                 )
 
-        # Store aggregate policies separately
+        self._add_registered_policy(policy)
+
+    def _add_registered_policy(self, policy: Union[DFCPolicy, AggregateDFCPolicy]) -> None:
+        """Store a validated policy, keeping aggregate policies separately."""
         if isinstance(policy, AggregateDFCPolicy):
             self._aggregate_policies.append(policy)
         else:
             self._policies.append(policy)
 
+    def save_policies(self, path: str) -> None:
+        """Save the registered policies with their parsed constraints to a JSON file.
+
+        The file also records a fingerprint of the columns and types of the policies'
+        tables, so load_policies can skip catalog validation when nothing changed.
+
+        Args:
+            path: The file to write. It is replaced atomically.
+        """
+        policies = [*self._policies, *self._aggregate_policies]
+        fingerprint = catalog_fingerprint(self._conn, policy_tables(policies))
+        registry = dump_registry(policies, fingerprint)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(registry, f, separators=(",", ":"))
+        os.replace(temp_path, path)
+
+    def load_policies(self, path: str) -> int:
+        """Register the policies saved by save_policies.
+
+        Constraints are restored from their saved ASTs instead of being parsed and validated
+        again. If the catalog fingerprint of the policies' tables matches the saved one, the
+        database validation done by register_policy is skipped too; otherwise every policy
+        is validated against the current catalog as register_policy would, and nothing is
+        registered if any policy fails.
+
+        Unlike the module-level load_policies, which parses CSV/JSONL catalogs, this only
+        reads files written by save_policies.
+
+        Args:
+            path: A file written by save_policies.
+
+        Returns:
+            The number of policies registered.
+
+        Raises:
+            FileNotFoundError: If the file doesn't exist.
+            ValueError: If the file is not a saved registry, or a policy no longer validates.
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Policy registry not found: {path}")
+        with open(path) as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Policy registry {path} is not valid JSON: {e}") from e
+        fingerprint, policies = load_registry(data)
+
+        if catalog_fingerprint(self._conn, policy_tables(policies)) != fingerprint:
+            policy_count = len(self._policies)
+            aggregate_count = len(self._aggregate_policies)
+            try:
+                for policy in policies:
+                    self.register_policy(policy)
+            except ValueError:
+                del self._policies[policy_count:]
+                del self._aggregate_policies[aggregate_count:]
+                raise
+        else:
+            for policy in policies:
+                self._add_registered_policy(policy)
+        return len(policies)
+
     def get_dfc_policies(self) -> list[DFCPolicy]:
         """Get all registered DFC policies.
 
@@ -1396,7 +2427,7 @@ class SQLRewriter:
                 # Build query to evaluate constraint with outer aggregates
                 # Replace source aggregates with outer aggregates over temp columns
                 # Replace sink expressions with aggregates over temp columns
-                constraint_expr = sqlglot.parse_one(policy.constraint, read="duckdb")
+                constraint_expr = policy._constraint_parsed.copy()
 
                 # Create a mapping from original expressions to temp column aggregates
                 replacement_map = {}
@@ -1475,7 +2506,7 @@ class SQLRewriter:
 
                 # Replace expressions in constraint using expression tree transformation
                 # This is more robust than string replacement as it handles case differences
-                constraint_expr = sqlglot.parse_one(policy.constraint, read="duckdb")
+                constraint_expr = policy._constraint_parsed.copy()
 
                 # Build a mapping from expression objects to replacement expressions
                 expr_replacement_map = {}
@@ -1516,7 +2547,7 @@ class SQLRewriter:
                 eval_query = f"SELECT ({constraint_sql}) AS constraint_result FROM {sink_table}"
 
                 # Execute and check result
-                result = self.conn.execute(eval_query).fetchone()
+                result = self._conn.execute(eval_query).fetchone()
                 if result and len(result) > 0:
                     constraint_passed = result[0]
                     if not constraint_passed:
@@ -2137,6 +3168,10 @@ class SQLRewriter:
         Returns:
             List of policies that match the query's source and sink tables.
         """
+        memo_key = ("dfc", frozenset(source_tables), sink_table)
+        if self._batch_match_memo is not None and memo_key in self._batch_match_memo:
+            return list(self._batch_match_memo[memo_key])
+
         matching = []
         for policy in self._policies:
             policy_sources = policy._sources_lower
@@ -2154,6 +3189,8 @@ class SQLRewriter:
                 # Policy has only sources: query must include all sources
                 matching.append(policy)
 
+        if self._batch_match_memo is not None:
+            self._batch_match_memo[memo_key] = list(matching)
         return matching
 
     def _find_matching_aggregate_policies(
@@ -2172,6 +3209,10 @@ class SQLRewriter:
         Returns:
             List of aggregate policies that match the query's source and sink tables.
         """
+        memo_key = ("aggregate", frozenset(source_tables), sink_table)
+        if self._batch_match_memo is not None and memo_key in self._batch_match_memo:
+            return list(self._batch_match_memo[memo_key])
+
         matching = []
         for policy in self._aggregate_policies:
             policy_sources = policy._sources_lower
@@ -2189,6 +3230,8 @@ class SQLRewriter:
                 # Policy has only sources: query must include all sources
                 matching.append(policy)
 
+        if self._batch_match_memo is not None:
+            self._batch_match_memo[memo_key] = list(matching)
         return matching
 
     def _register_kill_udf(self) -> None:
@@ -2208,7 +3251,7 @@ class SQLRewriter:
             """
             raise ValueError("KILLing due to dfc policy violation")
 
-        self.conn.create_function("kill", kill, return_type="BOOLEAN")
+        self._conn.create_function("kill", kill, return_type="BOOLEAN")
 
 
     def _call_llm_to_fix_row(
@@ -2255,6 +3298,8 @@ class SQLRewriter:
         """
         if not self._bedrock_client:
             return None
+        # Imported here so that rewriters without LLM policies don't pay for botocore.
+        from botocore.exceptions import BotoCoreError, ClientError
 
         bedrock_client = self._bedrock_client
 
@@ -2482,16 +3527,24 @@ Return only the JSON object (or null), no additional text or explanation."""
 
         # Register with a flexible signature - DuckDB will handle the variable arguments
         # We use a generic signature that accepts any number of arguments
-        self.conn.create_function("address_violating_rows", address_violating_rows, return_type="BOOLEAN")
+        self._conn.create_function("address_violating_rows", address_violating_rows, return_type="BOOLEAN")
 
     def get_stream_file_path(self) -> Optional[str]:
-        """Get the path to the stream file for LLM-fixed rows.
+        """Get the path to the stream file for LLM-fixed rows, creating it if needed.
 
         Returns:
             Path to stream file.
         """
+        if self._stream_file_path is None:
+            self.reset_stream_file_path()
         return self._stream_file_path
 
+    def _llm_stream_file_path(self, policies: list[DFCPolicy]) -> Optional[str]:
+        """Return the stream file path if any policy has LLM resolution, else None."""
+        if any(policy.on_fail == Resolution.LLM for policy in policies):
+            return self.get_stream_file_path()
+        return None
+
     def reset_stream_file_path(self) -> None:
         """Reset the stream file path by creating a new temporary file.
 
@@ -2502,7 +3555,7 @@ Return only the JSON object (or null), no additional text or explanation."""
 
     def close(self) -> None:
         """Close the DuckDB connection."""
-        self.conn.close()
+        self._conn.close()
 
     def __enter__(self) -> "SQLRewriter":
         """Context manager entry."""
@@ -0,0 +1,226 @@
+"""Statistics-based elision of policies that provably cannot fail."""
+
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Optional, Union
+
+import duckdb
+from sqlglot import exp
+
+from .policy import DFCPolicy, Resolution
+from .sqlglot_utils import get_column_name, get_table_name_from_column
+
+# Aggregates whose result over any non-empty set of non-NULL values lies in [min, max].
+_BOUNDED_AGGREGATES = (exp.Max, exp.Min)
+
+# Resolutions whose rewrite only filters or aborts; INVALIDATE(_MESSAGE) and LLM change the
+# output schema or rows, so they are always applied.
+_ELIDABLE_RESOLUTIONS = {Resolution.REMOVE, Resolution.KILL}
+
+# (table, column, comparison operator, literal) with the aggregate on the left-hand side.
+Comparison = tuple[str, str, type, Decimal]
+# A constraint reduced to nested ("and" | "or", children) over comparisons.
+ProofTree = Union[Comparison, tuple[str, list[Any]]]
+
+_FLIPPED = {exp.GT: exp.LT, exp.GTE: exp.LTE, exp.LT: exp.GT, exp.LTE: exp.GTE}
+
+
+@dataclass(frozen=True)
+class ColumnStats:
+    """Exact statistics for one column of a base table."""
+
+    min_value: Any
+    max_value: Any
+    null_count: int
+    row_count: int
+
+
+def _literal_value(node: exp.Expression) -> Optional[Decimal]:
+    negate = False
+    if isinstance(node, exp.Neg):
+        negate = True
+        node = node.this
+    if not isinstance(node, exp.Literal) or node.is_string:
+        return None
+    try:
+        value = Decimal(node.this)
+    except InvalidOperation:
+        return None
+    return -value if negate else value
+
+
+def _to_decimal(value: Any) -> Optional[Decimal]:
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, Decimal)):
+        return Decimal(value)
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    return None
+
+
+def _analyze(node: exp.Expression, sources: set[str]) -> Optional[ProofTree]:
+    """Reduce a constraint to a proof tree, or None if it contains unsupported parts."""
+    while isinstance(node, exp.Paren):
+        node = node.this
+    if isinstance(node, (exp.And, exp.Or)):
+        left = _analyze(node.left, sources)
+        right = _analyze(node.right, sources)
+        if left is None or right is None:
+            return None
+        return ("and" if isinstance(node, exp.And) else "or", [left, right])
+
+    op = type(node)
+    if op not in (exp.GT, exp.GTE, exp.LT, exp.LTE, exp.EQ, exp.NEQ):
+        return None
+    left, right = node.left, node.right
+    literal = _literal_value(right)
+    if literal is None:
+        literal = _literal_value(left)
+        if literal is None:
+            return None
+        left = right
+        op = _FLIPPED.get(op, op)
+    if not isinstance(left, _BOUNDED_AGGREGATES) or not isinstance(left.this, exp.Column):
+        return None
+    column = left.this
+    table = get_table_name_from_column(column)
+    if not table or table.lower() not in sources:
+        return None
+    return (table.lower(), get_column_name(column).lower(), op, literal)
+
+
+def _comparison_holds(op: type, literal: Decimal, low: Decimal, high: Decimal) -> bool:
+    """Whether `x op literal` holds for every x in [low, high]."""
+    if op is exp.GT:
+        return low > literal
+    if op is exp.GTE:
+        return low >= literal
+    if op is exp.LT:
+        return high < literal
+    if op is exp.LTE:
+        return high <= literal
+    if op is exp.EQ:
+        return low == high == literal
+    return literal < low or literal > high
+
+
+class StatisticsProver:
+    """Proves from column statistics that a policy's constraint cannot fail.
+
+    Supported constraints are AND/OR combinations of min(table.col) or max(table.col)
+    compared against a numeric literal. If every value of the column is non-NULL and lies
+    in a range where the comparison holds, then the aggregate of any non-empty group, and
+    the per-row predicate of the scan rewrite, also satisfy it.
+
+    Statistics are exact (min/max/NULL count over the table) and cached per table version,
+    as reported by the version callback passed to always_holds().
+    """
+
+    def __init__(self, conn: duckdb.DuckDBPyConnection) -> None:
+        """Initialize the prover.
+
+        Args:
+            conn: The DuckDB connection holding the source tables.
+        """
+        self.conn = conn
+        self._trees: dict[tuple[str, tuple[str, ...]], Optional[ProofTree]] = {}
+        self._stats: dict[tuple[str, str], tuple[Any, Optional[ColumnStats]]] = {}
+
+    def invalidate(self, table: Optional[str] = None) -> None:
+        """Drop cached statistics for a table, or for all tables if table is None."""
+        if table is None:
+            self._stats.clear()
+            return
+        table_lower = table.lower()
+        for key in [key for key in self._stats if key[0] == table_lower]:
+            del self._stats[key]
+
+    def _proof_tree(self, policy: DFCPolicy) -> Optional[ProofTree]:
+        key = (policy.constraint, tuple(sorted(policy._sources_lower)))
+        if key not in self._trees:
+            self._trees[key] = _analyze(policy._constraint_parsed, policy._sources_lower)
+        return self._trees[key]
+
+    def _base_table_size(self, table: str) -> Optional[int]:
+        rows = self.conn.execute(
+            "SELECT estimated_size FROM duckdb_tables() WHERE lower(table_name) = ?",
+            [table],
+        ).fetchall()
+        if len(rows) != 1:
+            return None
+        return rows[0][0]
+
+    def column_stats(self, table: str, column: str, version: Any) -> Optional[ColumnStats]:
+        """Return statistics for a base-table column, cached per table version.
+
+        Args:
+            table: Lowercase table name.
+            column: Lowercase column name.
+            version: Opaque table version; statistics are recomputed when it changes.
+
+        Returns:
+            ColumnStats, or None if the table is not a base table or the column is missing.
+        """
+        size = self._base_table_size(table)
+        if size is None:
+            return None
+        cache_key = (table, column)
+        version_key = (version, size)
+        cached = self._stats.get(cache_key)
+        if cached is not None and cached[0] == version_key:
+            return cached[1]
+
+        column_expr = exp.column(column, quoted=True)
+        stats_query = exp.select(
+            exp.Min(this=column_expr.copy()),
+            exp.Max(this=column_expr.copy()),
+            exp.Count(this=exp.Star()),
+            exp.Count(this=column_expr.copy()),
+        ).from_(exp.to_table(table, quoted=True))
+        try:
+            row = self.conn.execute(stats_query.sql(dialect="duckdb")).fetchone()
+        except duckdb.Error:
+            row = None
+        stats = None
+        if row is not None:
+            stats = ColumnStats(
+                min_value=row[0],
+                max_value=row[1],
+                null_count=row[2] - row[3],
+                row_count=row[2],
+            )
+        self._stats[cache_key] = (version_key, stats)
+        return stats
+
+    def _holds(self, tree: ProofTree, version_fn: Callable[[str], Any]) -> bool:
+        if len(tree) == 2:
+            combine = all if tree[0] == "and" else any
+            return combine(self._holds(child, version_fn) for child in tree[1])
+        table, column, op, literal = tree
+        stats = self.column_stats(table, column, version_fn(table))
+        if stats is None or stats.null_count:
+            return False
+        low = _to_decimal(stats.min_value)
+        high = _to_decimal(stats.max_value)
+        if low is None or high is None:
+            # Empty table (no rows to check) or a non-numeric column.
+            return stats.row_count == 0
+        return _comparison_holds(op, literal, low, high)
+
+    def always_holds(self, policy: DFCPolicy, version_fn: Callable[[str], Any]) -> bool:
+        """Whether the policy's constraint provably holds for every row and non-empty group.
+
+        Args:
+            policy: A source-only REMOVE or KILL policy; other policies never qualify.
+            version_fn: Returns the current version of a (lowercase) table name.
+
+        Returns:
+            True if the policy's rewrite cannot filter or abort anything.
+        """
+        if policy.sink or policy.on_fail not in _ELIDABLE_RESOLUTIONS:
+            return False
+        tree = self._proof_tree(policy)
+        if tree is None:
+            return False
+        return self._holds(tree, version_fn)
@@ -0,0 +1,62 @@
+"""A DuckDB connection wrapper that reports statements which may write tables."""
+
+from typing import Any, Callable
+
+import duckdb
+
+# Statement types that never write a table.
+_READ_STATEMENT_TYPES = {duckdb.StatementType.SELECT, duckdb.StatementType.EXPLAIN}
+
+
+class TrackedConnection:
+    """Forwards to a DuckDB connection and reports the writes made through it.
+
+    SQL run with execute(), executemany(), sql() or query() is executed as-is, without
+    policy rewriting. After it succeeds, any statement that is not a SELECT or EXPLAIN is
+    passed to the write callback, so caches keyed on table versions see the write. Every
+    other attribute is forwarded to the connection unchanged; writes made through its
+    cursors, or through another reference to the same connection, are not reported.
+    """
+
+    def __init__(self, conn: duckdb.DuckDBPyConnection, on_write: Callable[[str], None]) -> None:
+        """Initialize the wrapper.
+
+        Args:
+            conn: The DuckDB connection to forward to.
+            on_write: Called with the SQL text of each executed call that may have written.
+        """
+        self._conn = conn
+        self._on_write = on_write
+
+    def execute(self, query: Any, *args: Any, **kwargs: Any) -> Any:
+        """Execute SQL on the connection, then report it if it may have written."""
+        return self._run(self._conn.execute, query, args, kwargs)
+
+    def executemany(self, query: Any, *args: Any, **kwargs: Any) -> Any:
+        """Execute SQL once per parameter set, then report it if it may have written."""
+        return self._run(self._conn.executemany, query, args, kwargs)
+
+    def sql(self, query: Any, *args: Any, **kwargs: Any) -> Any:
+        """Run SQL as DuckDB's sql() does, then report it if it may have written."""
+        return self._run(self._conn.sql, query, args, kwargs)
+
+    def query(self, query: Any, *args: Any, **kwargs: Any) -> Any:
+        """Run SQL as DuckDB's query() does, then report it if it may have written."""
+        return self._run(self._conn.query, query, args, kwargs)
+
+    def _run(self, method: Callable[..., Any], query: Any, args: tuple, kwargs: dict) -> Any:
+        result = method(query, *args, **kwargs)
+        sql = query if isinstance(query, str) else getattr(query, "query", None)
+        if sql is None:
+            # A statement object we cannot inspect; assume it wrote.
+            self._on_write("")
+        elif any(
+            statement.type not in _READ_STATEMENT_TYPES
+            for statement in self._conn.extract_statements(sql)
+        ):
+            self._on_write(sql)
+        # execute() returns the connection itself; keep further chained calls tracked.
+        return self if result is self._conn else result
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
@@ -0,0 +1,179 @@
+"""Per-table cache of policy verdicts, reused across queries until the table is written."""
+
+import re
+from typing import Any, Optional
+
+import duckdb
+from sqlglot import exp
+
+from .policy import DFCPolicy, Resolution
+from .rewrite_rule import transform_aggregations_to_columns
+
+# Temporary tables holding the cached verdicts are named VERDICT_TABLE_PREFIX + <table>.
+VERDICT_TABLE_PREFIX = "__dfc_verdicts_"
+ROWID_COLUMN = "__dfc_rowid"
+POLICY_COLUMN = "__dfc_policy"
+
+# Resolutions whose scan rewrite only needs a per-row pass/fail bit.
+_CACHEABLE_RESOLUTIONS = {Resolution.REMOVE, Resolution.INVALIDATE}
+
+
+def is_cacheable_policy(policy: DFCPolicy) -> bool:
+    """Whether a policy's per-row verdict depends only on one source table's row."""
+    return (
+        isinstance(policy, DFCPolicy)
+        and not policy.sink
+        and len(policy._sources_lower) == 1
+        and policy.on_fail in _CACHEABLE_RESOLUTIONS
+    )
+
+
+class VerdictCache:
+    """Materializes which rows of a source table fail which policies.
+
+    For each source table, a temporary table __dfc_verdicts_<table>(__dfc_rowid,
+    __dfc_policy) lists the (rowid, policy) pairs whose row fails the policy's per-row
+    constraint, i.e. the predicate the scan rewrite would otherwise evaluate. Queries then
+    check all cached policies of a table with one anti-join on rowid.
+
+    Verdicts are keyed on the table version reported by the caller plus DuckDB's row count
+    estimate. When the key changes the table's verdicts are dropped; each policy is
+    re-evaluated lazily, the first time a query needs it. Policies with the same constraint
+    share their verdicts.
+
+    Rewriting a query only builds the predicate over the verdict table; the verdicts it
+    reads are built by materialize_pending() just before the query is executed, so a
+    rewrite alone never writes to the database.
+    """
+
+    def __init__(self, conn: duckdb.DuckDBPyConnection) -> None:
+        """Initialize the cache.
+
+        Args:
+            conn: The DuckDB connection holding the source tables.
+        """
+        self.conn = conn
+        self._constraint_keys: dict[str, int] = {}
+        # table -> (version key, constraint keys with materialized verdicts)
+        self._state: dict[str, tuple[Any, set[int]]] = {}
+        # (table, policies, version) read by the most recently rewritten statement.
+        self._pending: list[tuple[str, list[DFCPolicy], Any]] = []
+
+    def invalidate(self, table: Optional[str] = None) -> None:
+        """Forget the verdicts of a table, or of all tables if table is None."""
+        if table is None:
+            self._state.clear()
+        else:
+            self._state.pop(table.lower(), None)
+
+    def discard_pending(self) -> None:
+        """Forget the verdicts requested by the previously rewritten statement."""
+        self._pending = []
+
+    def materialize_pending(self) -> None:
+        """Make sure the verdicts read by the most recently rewritten statement are current.
+
+        Creates or refills the temporary verdict tables; call it right before executing the
+        statement.
+        """
+        pending, self._pending = self._pending, []
+        for table, policies, version in pending:
+            self._materialize(table, policies, version)
+
+    def is_base_table(self, table: str) -> bool:
+        """Whether table names exactly one base table (views and CTEs have no rowid)."""
+        return self._base_table_size(table) is not None
+
+    def _base_table_size(self, table: str) -> Optional[int]:
+        rows = self.conn.execute(
+            "SELECT estimated_size FROM duckdb_tables() WHERE lower(table_name) = ?",
+            [table],
+        ).fetchall()
+        if len(rows) != 1:
+            return None
+        return rows[0][0]
+
+    def verdict_table(self, table: str) -> str:
+        """Return the name of the temporary table holding a table's verdicts."""
+        return VERDICT_TABLE_PREFIX + re.sub(r"\W", "_", table.lower())
+
+    def _constraint_key(self, policy: DFCPolicy) -> int:
+        constraint = policy._constraint_parsed.sql(dialect="duckdb")
+        if constraint not in self._constraint_keys:
+            self._constraint_keys[constraint] = len(self._constraint_keys)
+        return self._constraint_keys[constraint]
+
+    def _materialize(self, table: str, policies: list[DFCPolicy], version: Any) -> None:
+        """Make sure the verdicts of policies over table are current."""
+        table = table.lower()
+        verdict_table = exp.to_identifier(self.verdict_table(table), quoted=True).sql()
+        version_key = (version, self._base_table_size(table))
+        state = self._state.get(table)
+        if state is None or state[0] != version_key:
+            self.conn.execute(
+                f"CREATE OR REPLACE TEMP TABLE {verdict_table} "
+                f"({ROWID_COLUMN} BIGINT, {POLICY_COLUMN} INTEGER)"
+            )
+            state = (version_key, set())
+            self._state[table] = state
+
+        missing: dict[int, DFCPolicy] = {}
+        for policy in policies:
+            key = self._constraint_key(policy)
+            if key not in state[1]:
+                missing[key] = policy
+
+        if missing:
+            source = exp.to_table(table, quoted=True)
+            selects = []
+            for key, policy in missing.items():
+                predicate = transform_aggregations_to_columns(policy._constraint_parsed, {table})
+                failing = exp.not_(
+                    exp.func("coalesce", exp.paren(predicate), exp.false()), copy=False
+                )
+                selects.append(
+                    exp.select(
+                        exp.column("rowid"),
+                        exp.cast(exp.Literal.number(key), exp.DataType.Type.INT),
+                    ).from_(source.copy()).where(failing)
+                )
+            build = selects[0]
+            for select in selects[1:]:
+                build = exp.union(build, select, distinct=False)
+            self.conn.execute(f"INSERT INTO {verdict_table} {build.sql(dialect='duckdb')}")
+            state[1].update(missing)
+
+    def passes_predicate(
+        self,
+        table: str,
+        table_ref: str,
+        policies: list[DFCPolicy],
+        version: Any,
+    ) -> exp.Expression:
+        """Build a predicate that is true for rows of table passing all the given policies.
+
+        The verdicts are not built here; see materialize_pending().
+
+        Args:
+            table: Source table name.
+            table_ref: Name (alias or table name) the query uses for the table.
+            policies: Cacheable policies over table (see is_cacheable_policy).
+            version: Opaque table version; verdicts are recomputed when it changes.
+
+        Returns:
+            NOT <table_ref>.rowid IN (SELECT __dfc_rowid FROM __dfc_verdicts_<table> ...).
+        """
+        keys = sorted({self._constraint_key(policy) for policy in policies})
+        self._pending.append((table, policies, version))
+        policy_column = exp.column(POLICY_COLUMN)
+        if len(keys) == 1:
+            key_filter = exp.EQ(this=policy_column, expression=exp.Literal.number(keys[0]))
+        else:
+            key_filter = policy_column.isin(*[exp.Literal.number(key) for key in keys])
+        failing_rows = (
+            exp.select(exp.column(ROWID_COLUMN))
+            .from_(exp.to_table(self.verdict_table(table), quoted=True))
+            .where(key_filter)
+        )
+        rowid = exp.column("rowid", table=exp.to_identifier(table_ref))
+        return exp.not_(rowid.isin(query=failing_rows), copy=False)
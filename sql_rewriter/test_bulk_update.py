@@ -0,0 +1,112 @@
+"""Tests for set-based bulk updates."""
+
+import pytest
+
+from sql_rewriter import DFCPolicy, Resolution, SQLRewriter
+
+STATE_POLICY = DFCPolicy(
+    sources=["t"],
+    sink="t",
+    sink_alias="t2",
+    constraint=(
+        "max(t.id) = t2.id AND "
+        "case "
+        "when max(t.state) = 'A' then t2.state = 'B' "
+        "when max(t.state) = 'B' then t2.state in ('A', 'C') "
+        "else false "
+        "end"
+    ),
+    on_fail=Resolution.REMOVE,
+)
+
+
+@pytest.fixture
+def rewriter():
+    """Create a rewriter with a state table and a state-transition policy."""
+    rewriter = SQLRewriter()
+    rewriter.execute("CREATE TABLE t AS SELECT i AS id, 'A' AS state FROM range(1, 6) t(i)")
+    rewriter.register_policy(STATE_POLICY)
+    yield rewriter
+    rewriter.close()
+
+
+def _states(rewriter):
+    return dict(rewriter.conn.execute("SELECT id, state FROM t").fetchall())
+
+
+def test_bulk_update_matches_single_row_updates(rewriter):
+    """Test that bulk updates enforce policies like the equivalent single-row UPDATEs."""
+    updates = [
+        {"id": 1, "state": "B"},
+        {"id": 2, "state": "C"},
+        {"id": 1, "state": "C"},
+        {"id": 3, "state": "B"},
+        {"id": 1, "state": "A"},
+        {"id": 3, "state": "A"},
+    ]
+    expected = SQLRewriter()
+    expected.execute("CREATE TABLE t AS SELECT i AS id, 'A' AS state FROM range(1, 6) t(i)")
+    expected.register_policy(STATE_POLICY)
+    for update in updates:
+        expected.execute(
+            f"UPDATE t AS t2 SET state = '{update['state']}' FROM t "
+            f"WHERE t.id = t2.id AND t.id = {update['id']}"
+        )
+
+    updated = rewriter.execute_bulk_update("t", ["id"], updates)
+
+    assert _states(rewriter) == _states(expected) == {1: "C", 2: "A", 3: "A", 4: "A", 5: "A"}
+    assert updated == 4
+    expected.close()
+
+
+def test_bulk_update_drops_staging_table(rewriter):
+    """Test that the staged rows do not outlive the call."""
+    rewriter.execute_bulk_update("t", ["id"], [{"id": 4, "state": "B"}])
+
+    assert _states(rewriter)[4] == "B"
+    assert not rewriter.conn.execute(
+        "SELECT * FROM duckdb_tables() WHERE table_name LIKE '__dfc_staged%'"
+    ).fetchall()
+
+
+def test_bulk_update_rolls_back_on_kill():
+    """Test that a KILL policy aborts the whole batch."""
+    with SQLRewriter() as rewriter:
+        rewriter.execute("CREATE TABLE t AS SELECT i AS id, i AS amount FROM range(3) t(i)")
+        rewriter.register_policy(
+            DFCPolicy(sources=[], sink="t", constraint="t.amount < 100", on_fail=Resolution.KILL)
+        )
+
+        with pytest.raises(Exception, match="KILLing due to dfc policy violation"):
+            rewriter.execute_bulk_update(
+                "t", ["id"], [{"id": 0, "amount": 5}, {"id": 1, "amount": 500}]
+            )
+
+        assert rewriter.conn.execute("SELECT amount FROM t ORDER BY id").fetchall() == [
+            (0,), (1,), (2,)
+        ]
+
+
+def test_bulk_update_bumps_table_version(rewriter):
+    """Test that bulk updates count as writes to the target table."""
+    before = rewriter.get_table_version("t")
+    rewriter.execute_bulk_update("t", ["id"], [{"id": 5, "state": "B"}])
+
+    assert rewriter.get_table_version("t") != before
+    assert rewriter.execute_bulk_update("t", ["id"], []) == 0
+
+
+@pytest.mark.parametrize(
+    ("updates", "match"),
+    [
+        ([{"id": 1}], "at least one non-key column"),
+        ([{"state": "B"}], "every key column"),
+        ([{"id": 1, "state": "B"}, {"id": 2}], "same columns"),
+        ([{"id": 1, "missing": 1}], "does not exist"),
+    ],
+)
+def test_bulk_update_validation(rewriter, updates, match):
+    """Test that malformed batches are rejected before anything is written."""
+    with pytest.raises(ValueError, match=match):
+        rewriter.execute_bulk_update("t", ["id"], updates)
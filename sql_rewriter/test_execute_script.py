@@ -0,0 +1,103 @@
+"""Tests for SQLRewriter.execute_script and execute_many."""
+
+import duckdb
+import pytest
+
+from sql_rewriter import DFCPolicy, Resolution, SQLRewriter
+
+
+@pytest.fixture
+def rewriter():
+    """Create a rewriter with a source table, a sink table and a REMOVE policy."""
+    rewriter = SQLRewriter()
+    rewriter.execute("CREATE TABLE src AS SELECT i AS id, i % 10 AS v FROM range(100) t(i)")
+    rewriter.execute("CREATE TABLE dst (id INTEGER, v INTEGER)")
+    rewriter.register_policy(
+        DFCPolicy(sources=["src"], constraint="max(src.v) > 4", on_fail=Resolution.REMOVE)
+    )
+    yield rewriter
+    rewriter.close()
+
+
+def test_execute_script_rewrites_each_statement(rewriter):
+    """Test that every statement of a script is rewritten and executed in order."""
+    results = rewriter.execute_script(
+        """
+        INSERT INTO dst SELECT id, v FROM src WHERE id < 10;
+        INSERT INTO dst SELECT id, v FROM src WHERE id >= 90;
+        SELECT count(*) FROM dst;
+        """
+    )
+
+    assert results == [[(5,)], [(5,)], [(10,)]]
+    assert rewriter.fetchall("SELECT min(v) FROM dst") == [(5,)]
+
+
+def test_execute_many_matches_sequential_execution(rewriter):
+    """Test that execute_many gives the same results as executing one query at a time."""
+    queries = [f"INSERT INTO dst SELECT id, v FROM src WHERE id % 7 = {i};" for i in range(7)]
+    queries.append("SELECT id FROM src WHERE id < 8 ORDER BY id")
+
+    results = rewriter.execute_many(queries)
+
+    expected = [
+        rewriter.conn.execute(
+            f"SELECT count(*) FROM src WHERE id % 7 = {i} AND v > 4"
+        ).fetchone()[0]
+        for i in range(7)
+    ]
+    assert [result[0][0] for result in results[:-1]] == expected
+    assert results[-1] == [(5,), (6,), (7,)]
+    assert rewriter.fetchone("SELECT count(*) FROM dst") == (50,)
+
+
+def test_failed_statement_rolls_back_batch(rewriter):
+    """Test that an error rolls back the statements already executed in the batch."""
+    with pytest.raises(duckdb.CatalogException):
+        rewriter.execute_script(
+            "INSERT INTO dst VALUES (1, 1); INSERT INTO missing_table VALUES (1)"
+        )
+
+    assert rewriter.fetchone("SELECT count(*) FROM dst") == (0,)
+    # The connection is usable again after the rollback.
+    rewriter.execute_many(["INSERT INTO dst VALUES (1, 1)"])
+    assert rewriter.fetchone("SELECT count(*) FROM dst") == (1,)
+
+
+def test_scripts_with_own_transactions_are_not_wrapped(rewriter):
+    """Test that scripts managing their own transactions run as written."""
+    rewriter.execute_script("BEGIN; INSERT INTO dst VALUES (1, 1); ROLLBACK;")
+    assert rewriter.fetchone("SELECT count(*) FROM dst") == (0,)
+
+    rewriter.execute("BEGIN TRANSACTION")
+    rewriter.execute_many(["INSERT INTO dst VALUES (2, 2)"])
+    rewriter.execute("ROLLBACK")
+    assert rewriter.fetchone("SELECT count(*) FROM dst") == (0,)
+
+
+def test_execute_many_requires_one_statement_per_query(rewriter):
+    """Test that multi-statement or empty queries are rejected."""
+    with pytest.raises(ValueError, match="one statement per query"):
+        rewriter.execute_many(["SELECT 1; SELECT 2"])
+    with pytest.raises(ValueError, match="one statement per query"):
+        rewriter.execute_many(["SELECT 1", ""])
+
+
+def test_policy_matches_are_shared_within_a_batch(rewriter):
+    """Test that policy matching runs once per distinct table set in a batch."""
+    calls = []
+    original = rewriter._find_matching_policies
+
+    def counting_find(source_tables, sink_table=None):
+        memoized = (
+            rewriter._batch_match_memo is not None
+            and ("dfc", frozenset(source_tables), sink_table) in rewriter._batch_match_memo
+        )
+        calls.append(memoized)
+        return original(source_tables, sink_table)
+
+    rewriter._find_matching_policies = counting_find
+    rewriter.execute_many([f"SELECT id FROM src WHERE id = {i}" for i in range(5)])
+
+    assert calls == [False, True, True, True, True]
+    assert rewriter._batch_match_memo is None
@@ -0,0 +1,127 @@
+"""Tests for SQLRewriter.explain and DFC operator attribution."""
+
+import pytest
+
+from sql_rewriter import DFCPolicy, Resolution, SQLRewriter
+from sql_rewriter.explain import attribute_plan, plan_roots
+
+
+def _op(name, children=(), timing=0.001, **extra_info):
+    return {
+        "operator_name": name,
+        "operator_timing": timing,
+        "operator_cardinality": 10,
+        "extra_info": extra_info,
+        "children": list(children),
+    }
+
+
+@pytest.fixture
+def rewriter():
+    """Create a rewriter with a foo table and no policies."""
+    rewriter = SQLRewriter()
+    rewriter.execute("CREATE TABLE foo AS SELECT i AS id, i % 10 AS bar FROM range(1000) t(i)")
+    yield rewriter
+    rewriter.close()
+
+
+def test_plan_roots_skips_explain_analyze_wrapper():
+    """Test that the profiler's wrapper and EXPLAIN_ANALYZE nodes are skipped."""
+    scan = _op("SEQ_SCAN ", Table="foo")
+    wrapped = {"extra_info": {}, "children": [_op("EXPLAIN_ANALYZE", [scan])]}
+    assert plan_roots(wrapped) == [scan]
+    assert plan_roots([scan]) == [scan]
+
+
+def test_attribute_plan_tags_operators_missing_from_original():
+    """Test that operators without a counterpart in the original plan are attributed to DFC."""
+    original = [_op("PROJECTION", [_op("SEQ_SCAN", Table="foo")], Projections="bar")]
+    rewritten = _op(
+        "PROJECTION",
+        [_op("FILTER", [_op("SEQ_SCAN", Table="foo")], Expression="(max(id) > 5)")],
+        Projections="bar",
+    )
+
+    operators = attribute_plan(rewritten, original)
+
+    assert [(op.name, op.dfc) for op in operators] == [
+        ("PROJECTION", False),
+        ("FILTER", True),
+        ("SEQ_SCAN", False),
+    ]
+    assert operators[1].dfc_reason == "not in the original query's plan"
+
+
+def test_attribute_plan_tags_dfc_markers():
+    """Test marker-based attribution, and that pushed-down scan filters are only noted."""
+    rewritten = _op(
+        "FILTER",
+        [_op("SEQ_SCAN", Table="foo", Filters="CASE WHEN x THEN true ELSE kill() END")],
+        Expression="CASE WHEN (x > 1) THEN true ELSE kill() END",
+    )
+
+    operators = attribute_plan(rewritten)
+
+    assert operators[0].dfc
+    assert operators[0].dfc_reason == "calls kill()"
+    assert not operators[1].dfc
+    assert "pushed into scan" in operators[1].dfc_reason
+
+
+def test_explain_without_policies_has_no_dfc_operators(rewriter):
+    """Test that an unprotected query attributes nothing to DFC."""
+    result = rewriter.explain("SELECT bar, count(*) FROM foo GROUP BY bar")
+
+    assert result.analyzed
+    assert result.operators
+    assert not result.dfc_operators
+    assert result.dfc_fraction == 0.0
+    assert result.total_ms > 0.0
+
+
+def test_explain_attributes_policy_filter(rewriter):
+    """Test that the HAVING filter added by a REMOVE policy is attributed to DFC."""
+    rewriter.register_policy(
+        DFCPolicy(sources=["foo"], constraint="max(foo.id) > 5", on_fail=Resolution.REMOVE)
+    )
+
+    result = rewriter.explain("SELECT bar, count(*) FROM foo GROUP BY bar")
+
+    assert "HAVING" in result.rewritten_query
+    assert "FILTER" in [op.name for op in result.dfc_operators]
+    assert all(not op.dfc for op in result.operators if op.name.endswith(("GROUP_BY", "SCAN")))
+    assert 0.0 < result.dfc_fraction < 1.0
+    assert "[DFC] FILTER" in result.format()
+    summary = result.to_dict()
+    assert summary["num_dfc_operators"] == len(result.dfc_operators)
+    assert summary["dfc_ms"] == pytest.approx(sum(op.time_ms for op in result.dfc_operators))
+
+
+def test_explain_attributes_two_phase_join(rewriter):
+    """Test that the two-phase rewrite's policy branch and join are attributed to DFC."""
+    rewriter.register_policy(
+        DFCPolicy(sources=["foo"], constraint="max(foo.id) > 5", on_fail=Resolution.REMOVE)
+    )
+
+    result = rewriter.explain("SELECT bar, sum(id) FROM foo GROUP BY bar", use_two_phase=True)
+
+    dfc_names = [op.name for op in result.dfc_operators]
+    assert "HASH_JOIN" in dfc_names
+    assert "FILTER" in dfc_names
+    # The original aggregation is still attributed to the query itself.
+    assert any(
+        op.name == "PERFECT_HASH_GROUP_BY" and not op.dfc for op in result.operators
+    )
+
+
+def test_explain_without_analyze_does_not_time(rewriter):
+    """Test that analyze=False plans without executing."""
+    rewriter.register_policy(
+        DFCPolicy(sources=["foo"], constraint="max(foo.id) > 5", on_fail=Resolution.REMOVE)
+    )
+
+    result = rewriter.explain("SELECT bar, count(*) FROM foo GROUP BY bar", analyze=False)
+
+    assert not result.analyzed
+    assert result.total_ms == 0.0
+    assert "FILTER" in [op.name for op in result.dfc_operators]
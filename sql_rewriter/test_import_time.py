@@ -0,0 +1,59 @@
+"""Import-time and constructor-time budgets for the sql_rewriter package.
+
+Each check runs in a fresh interpreter so modules imported by other tests don't hide
+regressions. The budgets are deliberately loose (several times the typical cost) so they
+only catch large regressions such as eagerly importing boto3 or pyarrow.
+"""
+
+import json
+import subprocess
+import sys
+
+IMPORT_BUDGET_SECONDS = 2.0
+CONSTRUCTOR_BUDGET_SECONDS = 1.0
+OPTIONAL_MODULES = ("boto3", "botocore", "pyarrow")
+
+
+def _run_python(*args):
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, check=True, timeout=60
+    )
+
+
+def _cumulative_import_seconds(importtime_output, module):
+    """Return the cumulative import time of a module from `python -X importtime` output."""
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.strip() == module:
+            return int(cumulative) / 1_000_000
+    raise AssertionError(f"{module} not found in importtime output")
+
+
+def test_import_time_budget():
+    """Test that importing sql_rewriter stays within its budget."""
+    result = _run_python("-X", "importtime", "-c", "import sql_rewriter")
+
+    assert _cumulative_import_seconds(result.stderr, "sql_rewriter") < IMPORT_BUDGET_SECONDS
+
+
+def test_constructor_is_lazy_and_within_budget():
+    """Test that constructing a rewriter loads no optional modules and creates no files."""
+    script = f"""
+import json, sys, time
+from sql_rewriter import SQLRewriter
+start = time.perf_counter()
+rewriter = SQLRewriter()
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "elapsed": elapsed,
+    "loaded": [name for name in {OPTIONAL_MODULES!r} if name in sys.modules],
+    "stream_file": rewriter._stream_file_path,
+}}))
+"""
+    report = json.loads(_run_python("-c", script).stdout)
+
+    assert report["loaded"] == []
+    assert report["stream_file"] is None
+    assert report["elapsed"] < CONSTRUCTOR_BUDGET_SECONDS
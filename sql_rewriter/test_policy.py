@@ -757,3 +757,38 @@ def test_get_table_name_from_column_handles_all_types():
     # This would cause silent validation skips
     assert table_name1 is not None
     assert table_name2 is not None
+
+
+def test_policy_folds_constant_branches_that_drop_columns():
+    """Test that constraint branches with a constant value are folded away."""
+    policy = DFCPolicy(
+        sources=["foo"],
+        constraint="max(foo.id) > 1 AND (max(foo.name) > 'a' OR 1 = 1)",
+        on_fail=Resolution.REMOVE,
+    )
+
+    assert policy._constraint_parsed.sql() == "MAX(foo.id) > 1"
+    assert policy._source_columns_needed == {"foo": {"id"}}
+    assert policy.constraint == "max(foo.id) > 1 AND (max(foo.name) > 'a' OR 1 = 1)"
+
+
+def test_policy_keeps_constraint_when_folding_drops_no_columns():
+    """Test that constant terms are kept when folding would not prune any column."""
+    policy = DFCPolicy(
+        sources=["foo"],
+        constraint="max(foo.id) > 1 AND NOT (1 = 2)",
+        on_fail=Resolution.REMOVE,
+    )
+
+    assert policy._constraint_parsed.sql() == "MAX(foo.id) > 1 AND NOT (1 = 2)"
+
+
+def test_policy_validates_constraint_before_folding():
+    """Test that unaggregated columns in constant branches are still rejected."""
+    with pytest.raises(ValueError, match="must be aggregated"):
+        DFCPolicy(
+            sources=["foo"],
+            constraint="max(foo.id) > 1 OR (foo.name = 'a' AND FALSE)",
+            on_fail=Resolution.REMOVE,
+        )
+
@@ -0,0 +1,123 @@
+"""Tests for bulk policy loading."""
+
+import json
+
+import pytest
+
+from sql_rewriter import AggregateDFCPolicy, DFCPolicy, Resolution, SQLRewriter, load_policies
+
+
+def test_load_policies_from_csv(tmp_path):
+    """Test loading DFC and aggregate policies from a CSV catalog."""
+    path = tmp_path / "policies.csv"
+    path.write_text(
+        "policy,description\n"
+        '"SOURCES foo CONSTRAINT max(foo.id) > 1 ON FAIL REMOVE",csv description\n'
+        '"SOURCES foo\n CONSTRAINT max(foo.id) > 1\n ON   FAIL KILL DESCRIPTION inline",ignored\n'
+        '"AGGREGATE SOURCES foo SINK bar CONSTRAINT sum(foo.id) > 1 ON FAIL INVALIDATE",\n'
+    )
+
+    policies = load_policies(str(path))
+
+    assert [type(p) for p in policies] == [DFCPolicy, DFCPolicy, AggregateDFCPolicy]
+    assert policies[0].description == "csv description"
+    assert policies[1].on_fail == Resolution.KILL
+    assert policies[1].description == "inline"
+    assert policies[2].sink == "bar"
+
+
+def test_load_policies_from_jsonl(tmp_path):
+    """Test loading policies from JSONL, as policy strings or constructor fields."""
+    path = tmp_path / "policies.jsonl"
+    records = [
+        {"policy": "SOURCES foo CONSTRAINT max(foo.id) > 1 ON FAIL REMOVE"},
+        {
+            "sources": ["foo"],
+            "sink": "bar",
+            "constraint": "max(foo.id) > 1",
+            "on_fail": "invalidate",
+            "description": "fields",
+        },
+        {
+            "aggregate": True,
+            "sources": "foo",
+            "sink": "bar",
+            "constraint": "sum(foo.id) > 1",
+            "on_fail": "INVALIDATE",
+        },
+    ]
+    path.write_text("\n".join(json.dumps(r) for r in records) + "\n\n")
+
+    policies = load_policies(str(path))
+
+    assert len(policies) == 3
+    assert policies[1].on_fail == Resolution.INVALIDATE
+    assert policies[1].description == "fields"
+    assert isinstance(policies[2], AggregateDFCPolicy)
+    assert policies[2].sources == ["foo"]
+
+
+def test_load_policies_reports_all_errors(tmp_path):
+    """Test that every failing row is reported in a single error."""
+    path = tmp_path / "policies.jsonl"
+    path.write_text(
+        '{"policy": "SOURCES foo CONSTRAINT max(foo.id) > 1 ON FAIL REMOVE"}\n'
+        "not json\n"
+        '{"policy": "SOURCES foo CONSTRAINT foo.id > 1 ON FAIL REMOVE"}\n'
+        '{"policy": "SOURCES foo CONSTRAINT max(foo.id) > 1 ON FAIL EXPLODE"}\n'
+    )
+
+    with pytest.raises(ValueError, match="Failed to load 3 policies") as exc_info:
+        load_policies(str(path))
+
+    message = str(exc_info.value)
+    assert "line 2: Invalid JSON" in message
+    assert "line 3:" in message
+    assert "line 4: Invalid ON FAIL value 'EXPLODE'" in message
+    assert "line 1:" not in message
+
+
+def test_load_policies_shares_parsed_constraints(tmp_path):
+    """Test that identical constraint strings are parsed once."""
+    path = tmp_path / "policies.csv"
+    path.write_text(
+        "policy\n"
+        + "".join(
+            f'"SOURCES foo CONSTRAINT max(foo.id) > 1 ON FAIL REMOVE DESCRIPTION p{i}"\n'
+            for i in range(3)
+        )
+    )
+
+    policies = load_policies(str(path))
+
+    assert policies[0]._constraint_parsed is policies[1]._constraint_parsed
+    assert policies[1]._constraint_parsed is policies[2]._constraint_parsed
+
+
+def test_load_policies_rejects_bad_files(tmp_path):
+    """Test missing files, unsupported extensions and CSVs without a policy column."""
+    with pytest.raises(FileNotFoundError):
+        load_policies(str(tmp_path / "missing.csv"))
+
+    txt_path = tmp_path / "policies.txt"
+    txt_path.write_text("SOURCES foo CONSTRAINT max(foo.id) > 1 ON FAIL REMOVE\n")
+    with pytest.raises(ValueError, match="Unsupported policies file type"):
+        load_policies(str(txt_path))
+
+    csv_path = tmp_path / "policies.csv"
+    csv_path.write_text("rule\nx\n")
+    with pytest.raises(ValueError, match="must have a 'policy' column"):
+        load_policies(str(csv_path))
+
+
+def test_loaded_policies_register_and_apply(tmp_path):
+    """Test that loaded policies can be registered and enforced."""
+    path = tmp_path / "policies.csv"
+    path.write_text('policy\n"SOURCES foo CONSTRAINT max(foo.id) > 1 ON FAIL REMOVE"\n')
+
+    with SQLRewriter() as rewriter:
+        rewriter.execute("CREATE TABLE foo (id INTEGER)")
+        rewriter.execute("INSERT INTO foo VALUES (1), (2), (3)")
+        for policy in load_policies(str(path)):
+            rewriter.register_policy(policy)
+        assert sorted(rewriter.fetchall("SELECT id FROM foo")) == [(2,), (3,)]
@@ -0,0 +1,121 @@
+"""Tests for saving and loading pre-parsed policy registries."""
+
+import json
+
+import pytest
+
+from sql_rewriter import AggregateDFCPolicy, DFCPolicy, Resolution, SQLRewriter
+
+POLICIES = [
+    DFCPolicy(
+        sources=["foo"],
+        constraint="max(foo.id) > 1",
+        on_fail=Resolution.REMOVE,
+        description="ids above one",
+    ),
+    DFCPolicy(
+        sources=["foo"],
+        sink="bar",
+        sink_alias="b",
+        constraint="max(foo.id) = b.id",
+        on_fail=Resolution.KILL,
+    ),
+    AggregateDFCPolicy(
+        sources=["foo"],
+        sink="bar",
+        constraint="sum(foo.id) > 0",
+        on_fail=Resolution.INVALIDATE,
+    ),
+]
+
+
+def _make_rewriter():
+    rewriter = SQLRewriter()
+    rewriter.execute("CREATE TABLE foo AS SELECT i AS id FROM range(4) t(i)")
+    rewriter.execute("CREATE TABLE bar (id BIGINT)")
+    return rewriter
+
+
+@pytest.fixture
+def registry_path(tmp_path):
+    """Save POLICIES to a registry file and return its path."""
+    path = str(tmp_path / "policies.json")
+    with _make_rewriter() as rewriter:
+        for policy in POLICIES:
+            rewriter.register_policy(policy)
+        rewriter.save_policies(path)
+    return path
+
+
+def test_round_trip_skips_validation(registry_path, monkeypatch):
+    """Test that loading into an unchanged catalog restores policies without revalidating."""
+    with _make_rewriter() as rewriter:
+        monkeypatch.setattr(
+            rewriter, "register_policy", lambda _policy: pytest.fail("revalidated")
+        )
+
+        assert rewriter.load_policies(registry_path) == 3
+
+        assert rewriter.get_dfc_policies() == POLICIES[:2]
+        assert rewriter.get_aggregate_policies() == POLICIES[2:]
+        loaded = rewriter.get_dfc_policies()[0]
+        assert loaded._constraint_parsed == POLICIES[0]._constraint_parsed
+        assert loaded._source_columns_needed == POLICIES[0]._source_columns_needed
+        assert rewriter.fetchall("SELECT id FROM foo ORDER BY id") == [(2,), (3,)]
+
+
+def test_changed_catalog_revalidates(registry_path):
+    """Test that a schema change falls back to validating every policy."""
+    with _make_rewriter() as rewriter:
+        rewriter.execute("ALTER TABLE foo ADD COLUMN extra INTEGER")
+        assert rewriter.load_policies(registry_path) == 3
+        assert len(rewriter.get_dfc_policies()) == 2
+
+    with SQLRewriter() as rewriter:
+        rewriter.execute("CREATE TABLE foo (id BIGINT)")
+        rewriter.register_policy(POLICIES[0])
+
+        with pytest.raises(ValueError, match="does not exist"):
+            rewriter.load_policies(registry_path)
+
+        # A failed load registers none of the saved policies.
+        assert rewriter.get_dfc_policies() == POLICIES[:1]
+        assert rewriter.get_aggregate_policies() == []
+
+
+def test_shared_constraints_are_stored_once(tmp_path):
+    """Test that identical constraints are serialized once and share a parsed tree."""
+    path = str(tmp_path / "policies.json")
+    with _make_rewriter() as rewriter:
+        for resolution in (Resolution.REMOVE, Resolution.KILL):
+            rewriter.register_policy(
+                DFCPolicy(sources=["foo"], constraint="max(foo.id) > 1", on_fail=resolution)
+            )
+        rewriter.save_policies(path)
+
+    with open(path) as f:
+        assert len(json.load(f)["constraints"]) == 1
+    with _make_rewriter() as rewriter:
+        rewriter.load_policies(path)
+        first, second = rewriter.get_dfc_policies()
+        assert first._constraint_parsed is second._constraint_parsed
+
+
+def test_invalid_registry_files(tmp_path):
+    """Test errors for missing, malformed and unsupported registry files."""
+    path = tmp_path / "policies.json"
+    with _make_rewriter() as rewriter:
+        with pytest.raises(FileNotFoundError):
+            rewriter.load_policies(str(path))
+
+        path.write_text("not json")
+        with pytest.raises(ValueError, match="not valid JSON"):
+            rewriter.load_policies(str(path))
+
+        path.write_text(json.dumps({"version": 99}))
+        with pytest.raises(ValueError, match="format version 99"):
+            rewriter.load_policies(str(path))
+
+        path.write_text(json.dumps({"version": 1, "fingerprint": "", "constraints": []}))
+        with pytest.raises(ValueError, match="Malformed"):
+            rewriter.load_policies(str(path))
@@ -0,0 +1,214 @@
+"""Tests for RewriteProfiler."""
+
+import duckdb
+import pytest
+import sqlglot
+
+from sql_rewriter import DFCPolicy, Resolution, RewriteProfiler, SQLRewriter
+from sql_rewriter.fingerprint import normalize_query, query_fingerprint
+
+
+@pytest.fixture
+def rewriter():
+    """Create a rewriter with a profiler attached and a policy registered."""
+    profiler = RewriteProfiler()
+    rewriter = SQLRewriter(profiler=profiler)
+    rewriter.execute("CREATE TABLE foo (id INTEGER, bar INTEGER)")
+    rewriter.execute("INSERT INTO foo VALUES (1, 10), (2, 20), (3, 30)")
+    rewriter.register_policy(
+        DFCPolicy(
+            sources=["foo"],
+            constraint="max(foo.id) > 1",
+            on_fail=Resolution.REMOVE,
+        )
+    )
+    profiler.reset()
+    yield rewriter
+    rewriter.close()
+
+
+def test_profiler_records_rewrite_phases(rewriter):
+    """Test that transform_query records parse, matching, rewrite and generation phases."""
+    profiler = rewriter.get_profiler()
+    rewriter.transform_query("SELECT bar FROM foo")
+
+    assert profiler.num_calls == 1
+    stats = profiler.history[-1]
+    assert stats.query == "SELECT bar FROM foo"
+    assert stats.error is None
+    for phase in ("parse", "policy_matching", "apply_constraints", "generate_sql"):
+        assert phase in stats.phases_ms
+    assert "execute" not in stats.phases_ms
+    assert stats.counters["matched_policies"] == 1
+    assert stats.total_ms >= sum(stats.phases_ms.values()) - 1e-6
+
+
+def test_profiler_folds_execution_into_same_call(rewriter):
+    """Test that fetchall records a single call that includes the execute phase."""
+    profiler = rewriter.get_profiler()
+    result = rewriter.fetchall("SELECT bar FROM foo")
+
+    assert sorted(result) == [(20,), (30,)]
+    assert profiler.num_calls == 1
+    assert "parse" in profiler.history[-1].phases_ms
+    assert "execute" in profiler.history[-1].phases_ms
+
+
+def test_profiler_records_limit_wrap(rewriter):
+    """Test that the REMOVE + LIMIT rewrite is timed as its own phase."""
+    profiler = rewriter.get_profiler()
+    rewriter.transform_query("SELECT bar FROM foo LIMIT 1")
+    assert "limit_wrap" in profiler.history[-1].phases_ms
+
+
+def test_profiler_summary_aggregates_calls(rewriter):
+    """Test aggregated per-phase counters across calls."""
+    profiler = rewriter.get_profiler()
+    for _ in range(3):
+        rewriter.transform_query("SELECT bar FROM foo")
+
+    summary = profiler.summary()
+    assert summary["num_calls"] == 3
+    assert summary["num_errors"] == 0
+    assert summary["counters"]["matched_policies"] == 3
+    parse = summary["phases"]["parse"]
+    assert parse["calls"] == 3
+    assert parse["mean_ms"] == pytest.approx(parse["total_ms"] / 3)
+    assert parse["max_ms"] <= parse["total_ms"]
+    assert len(profiler.slowest(2)) == 2
+    assert len(profiler.slowest(5, phase="parse")) == 3
+
+
+def test_profiler_records_errors(rewriter):
+    """Test that failed calls are recorded with their error."""
+    profiler = rewriter.get_profiler()
+    with pytest.raises(duckdb.BinderException):
+        rewriter.fetchall("SELECT missing_column FROM foo")
+
+    assert profiler.num_errors == 1
+    assert profiler.history[-1].error is not None
+
+
+def test_profiler_history_limit_and_reset():
+    """Test that history is bounded while aggregated counters cover every call."""
+    profiler = RewriteProfiler(max_history=2)
+    with SQLRewriter(profiler=profiler) as rewriter:
+        for _ in range(5):
+            rewriter.transform_query("SELECT 1")
+    assert len(profiler.history) == 2
+    assert profiler.num_calls == 5
+
+    profiler.reset()
+    assert profiler.num_calls == 0
+    assert not profiler.history
+    assert profiler.summary()["phases"] == {}
+
+
+def test_profiler_rejects_invalid_history():
+    """Test that max_history must be positive."""
+    with pytest.raises(ValueError, match="max_history"):
+        RewriteProfiler(max_history=0)
+
+
+def test_set_profiler_disables_profiling(rewriter):
+    """Test that set_profiler(None) stops recording."""
+    profiler = rewriter.get_profiler()
+    rewriter.set_profiler(None)
+    rewriter.transform_query("SELECT bar FROM foo")
+    assert rewriter.get_profiler() is None
+    assert profiler.num_calls == 0
+
+
+def test_workload_groups_queries_by_fingerprint(rewriter):
+    """Test that queries differing only in literals and case share a workload entry."""
+    profiler = rewriter.get_profiler()
+    rewriter.fetchall("SELECT bar FROM foo WHERE id IN (1, 2)")
+    rewriter.fetchall("select BAR from FOO where ID in (3)")
+    rewriter.transform_query("SELECT 1")
+
+    top = profiler.workload(1, sort_by="calls")[0]
+    assert top.calls == 2
+    assert top.normalized_query == "SELECT bar FROM foo WHERE id IN (?)"
+    assert top.execute_ms > 0
+    assert top.rewrite_ms + top.execute_ms == pytest.approx(top.total_ms)
+    assert top.policy_sets == {(rewriter.get_dfc_policies()[0].get_identifier(),): 2}
+    assert profiler.history[-2].fingerprint == top.fingerprint
+    assert len(profiler.workload()) == 2
+
+
+def test_policy_costs_rank_matched_policies(rewriter):
+    """Test per-policy totals over the calls that matched each policy."""
+    profiler = rewriter.get_profiler()
+    rewriter.execute("CREATE TABLE other (id INTEGER)")
+    rewriter.register_policy(
+        DFCPolicy(sources=["other"], constraint="max(other.id) > 0", on_fail=Resolution.REMOVE)
+    )
+    profiler.reset()
+    rewriter.fetchall("SELECT bar FROM foo")
+    rewriter.fetchall("SELECT bar FROM foo")
+    rewriter.fetchall("SELECT id FROM other")
+
+    costs = profiler.policy_costs()
+    assert [cost["calls"] for cost in sorted(costs, key=lambda c: c["policy"])] == [2, 1]
+    assert costs[0]["total_ms"] >= costs[1]["total_ms"]
+
+
+
+def test_workload_and_policy_costs_count_removed_rows():
+    """Test that rows filtered by each REMOVE policy are summed per fingerprint and policy."""
+    profiler = RewriteProfiler()
+    with SQLRewriter(profiler=profiler, count_removed_rows=True) as rewriter:
+        rewriter.execute("CREATE TABLE foo AS SELECT i AS id FROM range(10) t(i)")
+        small = DFCPolicy(sources=["foo"], constraint="max(foo.id) < 8", on_fail=Resolution.REMOVE)
+        odd = DFCPolicy(sources=["foo"], constraint="max(foo.id) % 2 = 1", on_fail=Resolution.REMOVE)
+        rewriter.register_policy(small)
+        rewriter.register_policy(odd)
+        profiler.reset()
+        rewriter.fetchall("SELECT id FROM foo WHERE id > 1")
+        rewriter.execute_many(["SELECT id FROM foo WHERE id > 5"])
+
+    # ids 8 and 9 fail small; evens fail odd.
+    assert profiler.history[0].removed_rows == {small.get_identifier(): 2, odd.get_identifier(): 4}
+    assert profiler.history[0].counters["removed_rows"] == 6
+    entry = profiler.workload(1)[0]
+    assert entry.calls == 2
+    assert entry.removed_rows == {small.get_identifier(): 4, odd.get_identifier(): 6}
+    removed = {cost["policy"]: cost["removed_rows"] for cost in profiler.policy_costs()}
+    assert removed == {small.get_identifier(): 4, odd.get_identifier(): 6}
+
+
+def test_workload_is_bounded():
+    """Test that the least recently seen fingerprint is dropped when the table is full."""
+    profiler = RewriteProfiler(max_fingerprints=2)
+    with SQLRewriter(profiler=profiler) as rewriter:
+        rewriter.transform_query("SELECT 1")
+        rewriter.transform_query("SELECT 1 AS a")
+        rewriter.transform_query("SELECT 2")
+        rewriter.transform_query("SELECT 1 AS b")
+
+    assert {entry.normalized_query for entry in profiler.workload()} == {
+        "SELECT ?", "SELECT ? AS b"
+    }
+    with pytest.raises(ValueError, match="sort_by"):
+        profiler.workload(sort_by="rows")
+    with pytest.raises(ValueError, match="max_fingerprints"):
+        RewriteProfiler(max_fingerprints=0)
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("SELECT a FROM T WHERE x = 5 LIMIT 10", "SELECT a FROM t WHERE x = ? LIMIT ?"),
+        ("SELECT * FROM t WHERE x IS NULL AND b = true", "SELECT * FROM t WHERE x IS NULL AND b = ?"),
+        ("INSERT INTO t VALUES (1, 'a'), (2, 'b')", "INSERT INTO t VALUES (?, ?)"),
+        ("SELECT a FROM t WHERE a IN (SELECT 1)", "SELECT a FROM t WHERE a IN (SELECT ?)"),
+    ],
+)
+def test_normalize_query(query, expected):
+    """Test literal stripping, list collapsing and identifier canonicalization."""
+    parsed = sqlglot.parse_one(query, read="duckdb")
+    original = parsed.sql(dialect="duckdb")
+
+    assert normalize_query(parsed) == expected
+    assert parsed.sql(dialect="duckdb") == original
+    assert query_fingerprint(parsed)[1] == expected
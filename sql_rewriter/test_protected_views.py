@@ -0,0 +1,139 @@
+"""Tests for policy-filtered materialized views."""
+
+import pytest
+import sqlglot
+
+from sql_rewriter import DFCPolicy, Resolution, SQLRewriter
+from sql_rewriter.protected_views import incremental_source
+
+VIEW_QUERY = "SELECT * FROM bank_txn ORDER BY txn_id"
+
+
+@pytest.fixture
+def rewriter():
+    """Create a rewriter with a bank_txn table, two policies and a protected view."""
+    rewriter = SQLRewriter()
+    rewriter.execute(
+        "CREATE TABLE bank_txn AS SELECT i AS txn_id, i * 10 AS amount FROM range(10) t(i)"
+    )
+    rewriter.register_policy(
+        DFCPolicy(
+            sources=["bank_txn"],
+            constraint="max(bank_txn.amount) > 20",
+            on_fail=Resolution.REMOVE,
+        )
+    )
+    rewriter.register_policy(
+        DFCPolicy(
+            sources=["bank_txn"],
+            constraint="max(bank_txn.amount) < 80",
+            on_fail=Resolution.INVALIDATE,
+        )
+    )
+    rewriter.create_protected_view("txn_view", VIEW_QUERY)
+    yield rewriter
+    rewriter.close()
+
+
+def _read_view(rewriter):
+    return rewriter.fetchall("SELECT * FROM txn_view ORDER BY txn_id")
+
+
+def test_view_stores_rewritten_result(rewriter):
+    """Test that the view holds the policy-enforced rows and reads skip policies."""
+    assert _read_view(rewriter) == rewriter.fetchall(VIEW_QUERY)
+    assert rewriter.get_protected_views() == ["txn_view"]
+    assert "amount" not in rewriter.transform_query("SELECT * FROM txn_view")
+
+
+def test_inserts_refresh_incrementally(rewriter):
+    """Test that appended rows are checked and appended without recomputing the view."""
+    rewriter.conn.execute("INSERT INTO txn_view VALUES (-1, -1, true)")
+    rewriter.execute("INSERT INTO bank_txn VALUES (10, 5), (11, 50)")
+
+    rows = _read_view(rewriter)
+
+    # The marker row survives, so the view was appended to rather than rebuilt.
+    assert rows[0] == (-1, -1, True)
+    assert rows[1:] == rewriter.fetchall(VIEW_QUERY)
+    assert (11, 50, True) in rows
+
+
+def test_updates_and_policy_changes_recompute_view(rewriter):
+    """Test that non-append writes and policy changes trigger a full refresh."""
+    rewriter.execute("UPDATE bank_txn SET amount = 0 WHERE txn_id = 5")
+    assert _read_view(rewriter) == rewriter.fetchall(VIEW_QUERY)
+
+    rewriter.register_policy(
+        DFCPolicy(
+            sources=["bank_txn"],
+            constraint="max(bank_txn.amount) < 90",
+            on_fail=Resolution.REMOVE,
+        )
+    )
+    assert _read_view(rewriter) == rewriter.fetchall(VIEW_QUERY)
+    assert 9 not in [row[0] for row in _read_view(rewriter)]
+
+
+def test_direct_writes_refresh_view(rewriter):
+    """Test that writes through rewriter.conn mark the view stale."""
+    rewriter.conn.execute("DELETE FROM bank_txn WHERE txn_id = 3")
+    assert _read_view(rewriter)[0][0] == 4
+
+
+
+def test_transform_does_not_refresh_stale_view(rewriter):
+    """Test that transform_query and explain leave a stale view untouched."""
+    rewriter.execute("UPDATE bank_txn SET amount = 0 WHERE txn_id = 5")
+    before = rewriter.conn.execute("SELECT * FROM txn_view ORDER BY txn_id").fetchall()
+    version = rewriter.get_table_version("txn_view")
+
+    rewriter.transform_query("SELECT * FROM txn_view")
+    rewriter.explain("SELECT * FROM txn_view", analyze=False)
+
+    assert rewriter.conn.execute("SELECT * FROM txn_view ORDER BY txn_id").fetchall() == before
+    assert rewriter.get_table_version("txn_view") == version
+    assert _read_view(rewriter) == rewriter.fetchall(VIEW_QUERY)
+
+def test_aggregation_view_refreshes_fully(rewriter):
+    """Test that views that cannot be refreshed incrementally are recomputed."""
+    query = "SELECT txn_id % 2 AS parity, sum(amount) AS total FROM bank_txn GROUP BY parity"
+    rewriter.create_protected_view("totals", query)
+    rewriter.execute("INSERT INTO bank_txn VALUES (12, 70)")
+
+    assert rewriter.fetchall("SELECT * FROM totals ORDER BY parity") == rewriter.fetchall(
+        query + " ORDER BY parity"
+    )
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("SELECT a FROM t AS x WHERE b > 1", ("t", "x")),
+        ("SELECT a FROM t JOIN u ON t.a = u.a", None),
+        ("SELECT count(*) FROM t", None),
+        ("SELECT DISTINCT a FROM t", None),
+        ("SELECT a FROM t WHERE a IN (SELECT a FROM u)", None),
+        ("SELECT a FROM t LIMIT 5", None),
+    ],
+)
+def test_incremental_source(query, expected):
+    """Test which view queries can be refreshed from appended rows."""
+    assert incremental_source(sqlglot.parse_one(query, read="duckdb")) == expected
+
+
+def test_create_and_drop_validation(rewriter):
+    """Test name validation and dropping views."""
+    with pytest.raises(ValueError, match="already exists"):
+        rewriter.create_protected_view("bank_txn", "SELECT 1")
+    with pytest.raises(ValueError, match="must be a SELECT"):
+        rewriter.create_protected_view("v", "DELETE FROM bank_txn")
+    with pytest.raises(ValueError, match="No protected view"):
+        rewriter.refresh_protected_view("missing")
+
+    rewriter.drop_protected_view("txn_view")
+
+    assert rewriter.get_protected_views() == []
+    assert not rewriter.conn.execute(
+        "SELECT * FROM duckdb_tables() WHERE table_name = 'txn_view'"
+    ).fetchall()
@@ -0,0 +1,111 @@
+"""Tests for per-policy removed-row counters."""
+
+import pytest
+
+from sql_rewriter import DFCPolicy, Resolution, SQLRewriter
+
+POSITIVE = DFCPolicy(sources=["foo"], constraint="max(foo.bar) > 0", on_fail=Resolution.REMOVE)
+SMALL = DFCPolicy(sources=["foo"], constraint="max(foo.id) < 90", on_fail=Resolution.REMOVE)
+INVALIDATE = DFCPolicy(
+    sources=["foo"], constraint="max(foo.id) > 5", on_fail=Resolution.INVALIDATE
+)
+
+
+def _make_rewriter(**kwargs):
+    rewriter = SQLRewriter(**kwargs)
+    # bar is 0 for every tenth id and NULL for every seventh.
+    rewriter.execute(
+        "CREATE TABLE foo AS SELECT i AS id, "
+        "CASE WHEN i % 7 = 0 THEN NULL ELSE i % 10 END AS bar FROM range(100) t(i)"
+    )
+    for policy in (POSITIVE, SMALL):
+        rewriter.register_policy(policy)
+    return rewriter
+
+
+@pytest.fixture
+def rewriter():
+    """Create a counting rewriter with a foo table and two REMOVE policies."""
+    rewriter = _make_rewriter(count_removed_rows=True)
+    yield rewriter
+    rewriter.close()
+
+
+def test_counts_match_rows_removed_by_each_policy(rewriter):
+    """Test that each policy's failures are counted, NULL included, without changing results."""
+    query = "SELECT id, bar FROM foo ORDER BY id"
+    with _make_rewriter() as plain:
+        expected = plain.fetchall(query)
+
+    assert rewriter.fetchall(query) == expected
+    # 15 NULLs and 8 other zeros; ids 90 to 99.
+    assert rewriter.get_removed_row_counts() == {
+        POSITIVE.get_identifier(): 23,
+        SMALL.get_identifier(): 10,
+    }
+    assert "__dfc_count_removed" in rewriter.transform_query(query).lower()
+
+
+def test_last_counts_reset_per_statement_and_totals_accumulate(rewriter):
+    """Test that last-statement counts reset, totals add up and reset() zeroes both."""
+    rewriter.fetchall("SELECT id FROM foo WHERE id >= 95")
+    rewriter.fetchall("SELECT id FROM foo WHERE id BETWEEN 51 AND 55")
+
+    assert rewriter.get_removed_row_counts() == {
+        POSITIVE.get_identifier(): 0,
+        SMALL.get_identifier(): 0,
+    }
+    assert rewriter.get_removed_row_totals() == {
+        POSITIVE.get_identifier(): 1,
+        SMALL.get_identifier(): 5,
+    }
+
+    rewriter.reset_removed_row_counts()
+    assert rewriter.get_removed_row_totals() == {}
+
+
+def test_insert_select_counts_and_other_resolutions_are_not_counted(rewriter):
+    """Test that INSERT ... SELECT counts its removed rows and only REMOVE policies count."""
+    rewriter.execute("CREATE TABLE sink (id BIGINT)")
+    rewriter.execute("INSERT INTO sink SELECT id FROM foo WHERE id < 20")
+
+    # ids 0, 7, 10 and 14 fail the positive-bar policy.
+    assert rewriter.get_removed_row_counts()[POSITIVE.get_identifier()] == 4
+    assert rewriter.fetchone("SELECT count(*) FROM sink") == (16,)
+
+    rewriter.register_policy(INVALIDATE)
+    rewriter.fetchall("SELECT id FROM foo")
+    assert INVALIDATE.get_identifier() not in rewriter.get_removed_row_counts()
+    # Aggregations filter groups, not rows, and are not counted.
+    rewriter.fetchall("SELECT max(id) FROM foo")
+    assert rewriter.get_removed_row_counts() == {}
+
+
+def test_counting_disabled_and_result_cache_bypassed():
+    """Test the disabled default and that counting queries are never served from the cache."""
+    with _make_rewriter() as rewriter:
+        assert rewriter.get_removed_row_counts() is None
+        assert rewriter.get_removed_row_totals() is None
+        assert "count_removed" not in rewriter.transform_query("SELECT id FROM foo").lower()
+
+    with _make_rewriter(count_removed_rows=True, result_cache_bytes=1 << 20) as rewriter:
+        for _ in range(2):
+            rewriter.fetchall("SELECT id FROM foo")
+        assert rewriter.get_result_cache_stats().hits == 0
+        assert rewriter.get_removed_row_totals()[SMALL.get_identifier()] == 20
+
+
+
+def test_cursor_keeps_its_statement_counts(rewriter):
+    """Test that a cursor's counts are not changed by later transforms or statements."""
+    cursor = rewriter.execute("SELECT id FROM foo")
+    rewriter.transform_query("SELECT id FROM foo WHERE id < 50")
+
+    assert len(cursor.fetchall()) == 70
+    expected = {POSITIVE.get_identifier(): 23, SMALL.get_identifier(): 10}
+    assert cursor.get_removed_row_counts() == expected
+    assert rewriter.get_removed_row_counts() == expected
+
+    rewriter.fetchall("SELECT id FROM foo WHERE id >= 95")
+    assert cursor.get_removed_row_counts() == expected
+    assert rewriter.get_removed_row_counts()[SMALL.get_identifier()] == 5
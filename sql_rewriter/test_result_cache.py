@@ -0,0 +1,111 @@
+"""Tests for the query result cache."""
+
+import pytest
+
+from sql_rewriter import DFCPolicy, Resolution, SQLRewriter
+from sql_rewriter.result_cache import ResultCache
+
+QUERY = "SELECT id, bar FROM foo WHERE bar > 5 ORDER BY id"
+
+
+@pytest.fixture
+def rewriter():
+    """Create a caching rewriter with a foo table and a REMOVE policy."""
+    rewriter = SQLRewriter(result_cache_bytes=1 << 20)
+    rewriter.execute("CREATE TABLE foo AS SELECT i AS id, i % 10 AS bar FROM range(100) t(i)")
+    rewriter.register_policy(
+        DFCPolicy(sources=["foo"], constraint="max(foo.id) > 50", on_fail=Resolution.REMOVE)
+    )
+    yield rewriter
+    rewriter.close()
+
+
+def test_repeated_queries_are_served_from_cache(rewriter):
+    """Test that an identical read query hits the cache and returns the same rows."""
+    first = rewriter.fetchall(QUERY)
+    second = rewriter.fetchall(QUERY)
+
+    stats = rewriter.get_result_cache_stats()
+    assert first == second
+    assert first[0] == (56, 6)
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+    assert stats.bytes > 0
+    assert rewriter.fetchone(QUERY) == first[0]
+    assert rewriter.fetch_arrow(QUERY).num_rows == len(first)
+
+
+def test_writes_through_rewriter_invalidate_entries(rewriter):
+    """Test that a write to a referenced table drops and bypasses cached results."""
+    rewriter.fetchall(QUERY)
+    rewriter.execute("INSERT INTO foo VALUES (200, 9)")
+
+    rows = rewriter.fetchall(QUERY)
+
+    assert rows[-1] == (200, 9)
+    stats = rewriter.get_result_cache_stats()
+    assert stats.invalidations == 1
+    assert stats.misses == 2
+
+
+def test_direct_writes_invalidate(rewriter):
+    """Test that writes through rewriter.conn invalidate cached results, reads do not."""
+    before = rewriter.fetchall(QUERY)
+    rewriter.conn.execute("SELECT count(*) FROM foo").fetchall()
+    assert rewriter.fetchall(QUERY) == before
+    assert rewriter.get_result_cache_stats().invalidations == 0
+
+    rewriter.conn.execute("DELETE FROM foo WHERE id = 56")
+    assert rewriter.fetchall(QUERY) == before[1:]
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT random()",
+        "SELECT CAST(now() AS VARCHAR)",
+        "SELECT * FROM range(3)",
+        "SELECT * FROM foo_view",
+    ],
+)
+def test_uncacheable_queries_bypass_cache(rewriter, query):
+    """Test that volatile functions, table functions and DuckDB views are not cached."""
+    rewriter.execute("CREATE VIEW foo_view AS SELECT * FROM foo")
+
+    rewriter.fetchall(query)
+    rewriter.fetchall(query)
+
+    stats = rewriter.get_result_cache_stats()
+    assert (stats.hits, stats.misses, stats.entries) == (0, 0, 0)
+
+
+def test_lru_eviction_respects_byte_budget():
+    """Test that least recently used entries are evicted to stay under max_bytes."""
+    pa = pytest.importorskip("pyarrow")
+    table = pa.table({"x": list(range(100))})
+    cache = ResultCache(max_bytes=table.nbytes * 2)
+
+    cache.put("a", table, {"t"})
+    cache.put("b", table, {"t"})
+    assert cache.get("a") is table
+    cache.put("c", table, {"u"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is table
+    stats = cache.stats()
+    assert stats.evictions == 1
+    assert stats.bytes <= stats.max_bytes
+    assert stats.hit_rate == pytest.approx(2 / 3)
+
+    cache.invalidate("T")
+    assert cache.stats().entries == 1
+    cache.put("huge", pa.concat_tables([table] * 3), {"t"})
+    assert cache.stats().uncacheable == 1
+
+
+def test_result_cache_is_opt_in():
+    """Test that the cache is disabled by default and validates its size."""
+    with SQLRewriter() as rewriter:
+        assert rewriter.get_result_cache_stats() is None
+        rewriter.clear_result_cache()
+    with pytest.raises(ValueError, match="max_bytes"):
+        ResultCache(0)
@@ -919,3 +919,83 @@ def test_ensure_subqueries_have_constraint_columns_multiple_sources():
         "    ON TRUE\n"
         ") AS sub"
     )
+
+
+def test_ensure_subqueries_skips_subquery_when_source_in_main_query():
+    """Test that policy columns are not threaded into subqueries the constraint never reads."""
+    query = "SELECT sub.id FROM (SELECT foo.id FROM foo) AS sub, foo WHERE foo.id = sub.id"
+    parsed = sqlglot.parse_one(query, read="duckdb")
+
+    policy = DFCPolicy(
+        sources=["foo"],
+        constraint="max(foo.name) > 'a'",
+        on_fail=Resolution.REMOVE,
+    )
+
+    ensure_subqueries_have_constraint_columns(parsed, [policy], {"foo"})
+    assert parsed.sql() == (
+        "SELECT sub.id FROM (SELECT foo.id FROM foo) AS sub, foo WHERE foo.id = sub.id"
+    )
+
+
+def test_ensure_subqueries_threads_only_into_resolved_cte():
+    """Test that only the CTE the constraint resolves against is widened."""
+    query = (
+        "WITH a AS (SELECT foo.id FROM foo), b AS (SELECT foo.id FROM foo) "
+        "SELECT b.id FROM b"
+    )
+    parsed = sqlglot.parse_one(query, read="duckdb")
+
+    policy = DFCPolicy(
+        sources=["foo"],
+        constraint="max(foo.name) > 'a'",
+        on_fail=Resolution.REMOVE,
+    )
+
+    ensure_subqueries_have_constraint_columns(parsed, [policy], {"foo"})
+    assert parsed.sql() == (
+        "WITH a AS (SELECT foo.id FROM foo), b AS (SELECT foo.id, foo.name FROM foo) "
+        "SELECT b.id FROM b"
+    )
+
+
+def test_ensure_subqueries_pre_aggregates_in_grouped_cte():
+    """Test that grouped CTEs expose pre-computed aggregates instead of raw columns."""
+    query = "WITH c AS (SELECT foo.id, SUM(foo.id) AS s FROM foo GROUP BY foo.id) SELECT COUNT(*) FROM c"
+    parsed = sqlglot.parse_one(query, read="duckdb")
+
+    policy = DFCPolicy(
+        sources=["foo"],
+        constraint="max(foo.name) > 'a'",
+        on_fail=Resolution.REMOVE,
+    )
+    policy_id = get_policy_identifier(policy)
+
+    ensure_subqueries_have_constraint_columns(parsed, [policy], {"foo"})
+    apply_policy_constraints_to_aggregation(parsed, [policy], {"foo"})
+    assert parsed.sql() == (
+        "WITH c AS (SELECT foo.id, SUM(foo.id) AS s, "
+        f"MAX(foo.name) AS _{policy_id}_agg1 FROM foo GROUP BY foo.id) "
+        f"SELECT COUNT(*) FROM c HAVING (MAX(c._{policy_id}_agg1) > 'a')"
+    )
+
+
+def test_scan_over_grouped_subquery_uses_pre_aggregated_column():
+    """Test that scans over grouped subqueries compare the pre-computed aggregate per row."""
+    query = "SELECT sub.id FROM (SELECT foo.id, SUM(foo.id) AS s FROM foo GROUP BY foo.id) AS sub"
+    parsed = sqlglot.parse_one(query, read="duckdb")
+
+    policy = DFCPolicy(
+        sources=["foo"],
+        constraint="max(foo.name) > 'a'",
+        on_fail=Resolution.REMOVE,
+    )
+    policy_id = get_policy_identifier(policy)
+
+    ensure_subqueries_have_constraint_columns(parsed, [policy], {"foo"})
+    apply_policy_constraints_to_scan(parsed, [policy], {"foo"})
+    assert parsed.sql() == (
+        "SELECT sub.id FROM (SELECT foo.id, SUM(foo.id) AS s, "
+        f"MAX(foo.name) AS _{policy_id}_agg1 FROM foo GROUP BY foo.id) AS sub "
+        f"WHERE (sub._{policy_id}_agg1 > 'a')"
+    )
@@ -36,6 +36,25 @@ def test_kill_udf_registered(rewriter):
         rewriter.conn.execute("SELECT kill()").fetchone()
     assert "KILLing due to dfc policy violation" in str(exc_info.value)
 
+def test_stream_file_created_on_first_llm_rewrite(rewriter):
+    """Test that the LLM stream file is only created once an LLM policy is applied."""
+    rewriter.register_policy(
+        DFCPolicy(sources=["foo"], constraint="max(foo.id) > 1", on_fail=Resolution.REMOVE)
+    )
+    rewriter.transform_query("SELECT id FROM foo")
+    assert rewriter._stream_file_path is None
+
+    rewriter.register_policy(
+        DFCPolicy(sources=["foo"], constraint="max(foo.id) < 3", on_fail=Resolution.LLM)
+    )
+    transformed = rewriter.transform_query("SELECT id FROM foo")
+
+    stream_file_path = rewriter.get_stream_file_path()
+    assert stream_file_path is not None
+    assert os.path.exists(stream_file_path)
+    assert stream_file_path in transformed
+
+
 def test_execute_method_works(rewriter):
     """Test that the execute method works correctly."""
     cursor = rewriter.execute("SELECT id FROM foo LIMIT 1")
@@ -771,6 +790,109 @@ def test_policy_invalidate_message_resolution_combines_multiple_messages(rewrite
     assert result[0][1] == "fail_a"
 
 
+def test_batch_invalidate_builds_columns_in_one_pass():
+    """Test that batch_invalidate builds a balanced 'valid' AND and a flat invalid_string."""
+    with SQLRewriter(batch_invalidate=True) as rw:
+        rw.execute("CREATE TABLE foo (id INTEGER, name VARCHAR)")
+        rw.execute("INSERT INTO foo VALUES (1, 'Alice'), (2, 'Bob'), (3, 'Charlie')")
+        for bound in (1, 2, 4):
+            rw.register_policy(
+                DFCPolicy(
+                    sources=["foo"],
+                    constraint=f"max(foo.id) > {bound}",
+                    on_fail=Resolution.INVALIDATE,
+                )
+            )
+        for bound, message in ((10, "fail_a"), (1, "fail_b"), (20, "fail_c")):
+            rw.register_policy(
+                DFCPolicy(
+                    sources=["foo"],
+                    constraint=f"max(foo.id) > {bound}",
+                    on_fail=Resolution.INVALIDATE_MESSAGE,
+                    description=message,
+                )
+            )
+
+        transformed = rw.transform_query("SELECT max(foo.id) FROM foo")
+
+        parsed = parse_one(transformed, read="duckdb")
+        valid_expr = next(e.this for e in parsed.expressions if e.alias == "valid")
+        assert isinstance(valid_expr, exp.And)
+        assert isinstance(valid_expr.this, exp.And)
+        invalid_string_expr = next(
+            e.this for e in parsed.expressions if e.alias == "invalid_string"
+        )
+        assert isinstance(invalid_string_expr, exp.ConcatWs)
+        assert len(invalid_string_expr.expressions) == 4
+        assert not any(
+            isinstance(arg, exp.ConcatWs) for arg in invalid_string_expr.expressions
+        )
+
+        assert rw.conn.execute(transformed).fetchall() == [(3, False, "fail_a | fail_c")]
+
+
+def test_batch_invalidate_matches_incremental_results(rewriter):
+    """Test that batched and incremental INVALIDATE rewrites return the same rows."""
+    batched = SQLRewriter(batch_invalidate=True)
+    batched.execute("CREATE TABLE foo (id INTEGER, name VARCHAR)")
+    batched.execute("INSERT INTO foo VALUES (1, 'Alice'), (2, 'Bob'), (3, 'Charlie')")
+    policies = [
+        DFCPolicy(sources=["foo"], constraint="max(foo.id) > 1", on_fail=Resolution.INVALIDATE),
+        DFCPolicy(sources=["foo"], constraint="max(foo.id) < 3", on_fail=Resolution.INVALIDATE),
+        DFCPolicy(
+            sources=["foo"],
+            constraint="max(foo.id) > 2",
+            on_fail=Resolution.INVALIDATE_MESSAGE,
+            description="too_small",
+        ),
+    ]
+    for policy in policies:
+        rewriter.register_policy(policy)
+        batched.register_policy(policy)
+
+    for query in (
+        "SELECT id, name FROM foo ORDER BY id",
+        "SELECT name, max(foo.id) FROM foo GROUP BY name ORDER BY name",
+    ):
+        assert batched.fetchall(query) == rewriter.fetchall(query)
+    batched.close()
+
+
+
+@pytest.mark.parametrize("last_resolution", [Resolution.INVALIDATE, Resolution.INVALIDATE_MESSAGE])
+def test_batch_invalidate_matches_incremental_schema(rewriter, last_resolution):
+    """Test that batch_invalidate emits 'valid' and 'invalid_string' in the incremental order."""
+    batched = SQLRewriter(batch_invalidate=True)
+    batched.execute("CREATE TABLE foo (id INTEGER, name VARCHAR)")
+    batched.execute("INSERT INTO foo VALUES (1, 'Alice'), (2, 'Bob'), (3, 'Charlie')")
+    invalidate = DFCPolicy(
+        sources=["foo"], constraint="max(foo.id) > 1", on_fail=Resolution.INVALIDATE
+    )
+    message = DFCPolicy(
+        sources=["foo"],
+        constraint="max(foo.id) > 2",
+        on_fail=Resolution.INVALIDATE_MESSAGE,
+        description="too_small",
+    )
+    policies = [message, invalidate]
+    if last_resolution == Resolution.INVALIDATE_MESSAGE:
+        policies.reverse()
+    for policy in policies:
+        rewriter.register_policy(policy)
+        batched.register_policy(policy)
+
+    for query in (
+        "SELECT id, name FROM foo ORDER BY id",
+        "SELECT name, max(foo.id) AS m FROM foo GROUP BY name ORDER BY name",
+    ):
+        incremental_cursor = rewriter.execute(query)
+        batched_cursor = batched.execute(query)
+        assert [column[0] for column in batched_cursor.description] == [
+            column[0] for column in incremental_cursor.description
+        ]
+        assert batched_cursor.fetchall() == incremental_cursor.fetchall()
+    batched.close()
+
 def test_invalidate_message_policy_with_sink_requires_invalid_string_column(rewriter):
     """Test INVALIDATE_MESSAGE with sink requires invalid_string column."""
     rewriter.execute("CREATE TABLE reports (id INTEGER, status VARCHAR)")
@@ -1549,6 +1671,94 @@ def test_policy_scan_with_complex_constraint(rewriter):
     assert all(1 < row[0] < 10 for row in result)
 
 
+def test_policy_pre_aggregates_inside_grouped_cte(rewriter):
+    """Test that grouped CTEs compute policy aggregates instead of exposing raw columns."""
+    policy = DFCPolicy(
+        sources=["foo"],
+        constraint="max(foo.id) > 1",
+        on_fail=Resolution.REMOVE,
+    )
+    rewriter.register_policy(policy)
+
+    query = (
+        "WITH c AS (SELECT name, COUNT(*) AS n FROM foo GROUP BY name) "
+        "SELECT c.name FROM c ORDER BY c.name"
+    )
+    transformed = rewriter.transform_query(query)
+
+    assert "foo.id\n" not in transformed
+    assert rewriter.conn.execute(transformed).fetchall() == [("Bob",), ("Charlie",)]
+
+
+def test_two_phase_scan_does_not_persist_rowid_column(rewriter):
+    """Test that threading __dfc_rowid for a two-phase rewrite doesn't leak into later rewrites."""
+    policy = DFCPolicy(
+        sources=["foo"],
+        constraint="max(foo.id) > 1",
+        on_fail=Resolution.REMOVE,
+    )
+    rewriter.register_policy(policy)
+
+    query = "SELECT sub.name, sub.id FROM (SELECT name, id FROM foo) AS sub"
+    two_phase = rewriter._rewrite_scan_with_two_phase(parse_one(query), [policy], {"foo"})
+
+    assert "__dfc_rowid" in two_phase.sql()
+    assert "__dfc_rowid" not in policy._source_columns_needed["foo"]
+    assert "__dfc_rowid" not in rewriter.transform_query(query)
+
+
+
+def test_policy_resolves_against_self_joined_subqueries(rewriter):
+    """Test that tables inside JOIN-ed subqueries are not treated as main-query tables."""
+    policy = DFCPolicy(
+        sources=["foo"],
+        constraint="max(foo.id) > 1",
+        on_fail=Resolution.REMOVE,
+    )
+    rewriter.register_policy(policy)
+
+    query = (
+        "SELECT a.name, b.name FROM (SELECT id, name FROM foo) a "
+        "JOIN (SELECT id, name FROM foo) b ON a.id = b.id ORDER BY a.name"
+    )
+    transformed = rewriter.transform_query(query)
+
+    assert "foo.id > 1" not in transformed
+    assert rewriter.execute(query).fetchall() == [("Bob", "Bob"), ("Charlie", "Charlie")]
+
+
+def test_policy_resolves_against_self_joined_cte_and_subquery(rewriter):
+    """Test that a main-query JOIN on a subquery over the source table is resolved."""
+    policy = DFCPolicy(
+        sources=["foo"],
+        constraint="max(foo.id) > 2",
+        on_fail=Resolution.REMOVE,
+    )
+    rewriter.register_policy(policy)
+
+    query = (
+        "WITH c AS (SELECT id, name FROM foo) "
+        "SELECT c.name FROM c JOIN (SELECT id FROM foo) s ON c.id = s.id"
+    )
+
+    assert rewriter.execute(query).fetchall() == [("Charlie",)]
+
+
+def test_policy_columns_in_constant_branches_are_not_threaded(rewriter):
+    """Test that columns only referenced by branches that fold to a constant are pruned."""
+    policy = DFCPolicy(
+        sources=["foo"],
+        constraint="max(foo.id) > 1 AND (max(foo.bar) > 'z' OR 1 = 1)",
+        on_fail=Resolution.REMOVE,
+    )
+    rewriter.register_policy(policy)
+
+    query = "SELECT sub.name FROM (SELECT name, id FROM foo) AS sub ORDER BY sub.name"
+    transformed = rewriter.transform_query(query)
+
+    assert "bar" not in transformed
+    assert rewriter.execute(query).fetchall() == [("Bob",), ("Charlie",)]
+
 class TestPolicyRowDropping:
     """Tests that verify specific rows are dropped when policies fail."""
 
@@ -0,0 +1,162 @@
+"""Tests for statistics-based policy elision."""
+
+import duckdb
+import pytest
+
+from sql_rewriter import DFCPolicy, Resolution, SQLRewriter
+
+
+@pytest.fixture
+def rewriter():
+    """Create an eliding rewriter over a table whose values are all in [1, 50]."""
+    rewriter = SQLRewriter(elide_provable_policies=True)
+    rewriter.execute(
+        "CREATE TABLE lineitem AS "
+        "SELECT i AS id, (i % 50) + 1 AS qty, i % 7 AS grp FROM range(1000) t(i)"
+    )
+    rewriter.execute("CREATE TABLE orders (id INTEGER, total INTEGER)")
+    rewriter.execute("INSERT INTO orders VALUES (1, 10), (2000, 20)")
+    yield rewriter
+    rewriter.close()
+
+
+def _register(rewriter, constraint, on_fail=Resolution.KILL, sources=("lineitem",)):
+    rewriter.register_policy(
+        DFCPolicy(sources=list(sources), constraint=constraint, on_fail=on_fail)
+    )
+
+
+def test_provable_policy_is_elided(rewriter):
+    """Test that a policy proven by min/max statistics is not applied."""
+    _register(rewriter, "max(lineitem.qty) >= 0")
+    _register(rewriter, "min(lineitem.qty) > 0 AND max(lineitem.qty) <= 50", Resolution.REMOVE)
+
+    scan = rewriter.transform_query("SELECT id FROM lineitem WHERE grp = 3")
+    aggregation = rewriter.transform_query("SELECT grp, sum(qty) FROM lineitem GROUP BY grp")
+
+    assert "KILL" not in scan
+    assert "qty" not in scan
+    assert "HAVING" not in aggregation
+    assert len(rewriter.fetchall("SELECT id FROM lineitem")) == 1000
+
+
+def test_unprovable_policy_is_applied(rewriter):
+    """Test that policies the statistics cannot prove are still applied."""
+    _register(rewriter, "max(lineitem.qty) > 10", Resolution.REMOVE)
+    _register(rewriter, "count(lineitem.qty) > 10", Resolution.REMOVE)
+    _register(rewriter, "max(lineitem.qty) >= 0", Resolution.INVALIDATE)
+
+    transformed = rewriter.transform_query("SELECT id FROM lineitem")
+
+    assert "qty > 10" in transformed
+    assert "valid" in transformed
+
+
+def test_writes_through_rewriter_invalidate_proof(rewriter):
+    """Test that a write through the rewriter advances the version and revokes the proof."""
+    _register(rewriter, "max(lineitem.qty) <= 50", Resolution.REMOVE)
+    version = rewriter.get_table_version("lineitem")
+    assert "qty" not in rewriter.transform_query("SELECT id FROM lineitem")
+
+    rewriter.execute("UPDATE lineitem SET qty = 51 WHERE id = 0")
+
+    assert rewriter.get_table_version("LINEITEM") != version
+    assert "qty <= 50" in rewriter.transform_query("SELECT id FROM lineitem")
+    assert len(rewriter.fetchall("SELECT id FROM lineitem")) == 999
+
+
+
+def test_only_executed_writes_advance_versions(rewriter):
+    """Test that transforming, explaining or failing a write leaves versions unchanged."""
+    _register(rewriter, "max(lineitem.qty) <= 50", Resolution.REMOVE)
+    version = rewriter.get_table_version("lineitem")
+    update = "UPDATE lineitem SET qty = 51 WHERE id = 0"
+
+    rewriter.transform_query(update)
+    rewriter.explain(update, analyze=False)
+    with pytest.raises(duckdb.Error):
+        rewriter.execute("INSERT INTO lineitem VALUES ('not a number', 1, 1)")
+
+    assert rewriter.get_table_version("lineitem") == version
+    assert "qty" not in rewriter.transform_query("SELECT id FROM lineitem")
+
+    rewriter.execute(update)
+    assert rewriter.get_table_version("lineitem") != version
+
+def test_direct_writes_advance_versions(rewriter):
+    """Test that writes through rewriter.conn are seen without manual invalidation."""
+    _register(rewriter, "max(lineitem.qty) <= 50", Resolution.REMOVE)
+    assert "qty" not in rewriter.transform_query("SELECT id FROM lineitem")
+
+    rewriter.conn.execute("UPDATE lineitem SET qty = 99 WHERE id = 0")
+    assert "qty <= 50" in rewriter.transform_query("SELECT id FROM lineitem")
+    assert rewriter.fetchall("SELECT id FROM lineitem WHERE id < 2") == [(1,)]
+
+    rewriter.conn.execute("UPDATE lineitem SET qty = 50 WHERE id = 0")
+    assert "qty" not in rewriter.transform_query("SELECT id FROM lineitem")
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{"elide_provable_policies": True}, {"verdict_cache": True}],
+)
+def test_direct_update_is_not_served_stale(options):
+    """Test that an UPDATE through rewriter.conn reaches elision and the verdict cache."""
+    query = "SELECT id, v FROM t ORDER BY id"
+    with SQLRewriter(**options) as rewriter:
+        rewriter.execute("CREATE TABLE t AS SELECT i AS id, i + 1 AS v FROM range(5) t(i)")
+        _register(rewriter, "min(t.v) > 0", Resolution.REMOVE, sources=("t",))
+        assert len(rewriter.fetchall(query)) == 5
+
+        rewriter.conn.execute("UPDATE t SET v = -1 WHERE id = 2")
+        assert (2, -1) not in rewriter.fetchall(query)
+        assert len(rewriter.fetchall(query)) == 4
+
+
+def test_writes_through_passed_connection_need_invalidation():
+    """Test that writes bypassing rewriter.conn are only seen after invalidation."""
+    conn = duckdb.connect()
+    conn.execute("CREATE TABLE t AS SELECT i AS id, i + 1 AS v FROM range(5) t(i)")
+    with SQLRewriter(conn=conn, elide_provable_policies=True) as rewriter:
+        _register(rewriter, "min(t.v) > 0", Resolution.REMOVE, sources=("t",))
+        assert "t.v" not in rewriter.transform_query("SELECT id FROM t")
+
+        conn.execute("UPDATE t SET v = -1 WHERE id = 2")
+        assert "t.v" not in rewriter.transform_query("SELECT id FROM t")
+        rewriter.invalidate_table_versions("t")
+        assert "t.v > 0" in rewriter.transform_query("SELECT id FROM t")
+
+
+def test_nulls_prevent_elision(rewriter):
+    """Test that a column with NULLs is never proven (NULL rows fail the constraint)."""
+    _register(rewriter, "max(lineitem.qty) >= 0", Resolution.REMOVE)
+    rewriter.execute("INSERT INTO lineitem VALUES (5000, NULL, 0)")
+
+    assert "qty >= 0" in rewriter.transform_query("SELECT id FROM lineitem")
+    assert len(rewriter.fetchall("SELECT id FROM lineitem")) == 1000
+
+
+def test_outer_joins_and_global_aggregates_prevent_elision(rewriter):
+    """Test that queries which can produce NULL or empty inputs keep their policies."""
+    _register(rewriter, "max(lineitem.qty) >= 0", Resolution.REMOVE)
+
+    left_join = rewriter.transform_query(
+        "SELECT orders.id FROM orders LEFT JOIN lineitem ON orders.id = lineitem.id"
+    )
+    global_aggregate = rewriter.transform_query("SELECT count(*) FROM lineitem WHERE id < 0")
+    inner_join = rewriter.transform_query(
+        "SELECT orders.id FROM orders JOIN lineitem ON orders.id = lineitem.id"
+    )
+
+    assert "qty >= 0" in left_join
+    assert "qty) >= 0" in global_aggregate
+    assert rewriter.fetchall("SELECT count(*) FROM lineitem WHERE id < 0") == []
+    assert "qty" not in inner_join
+
+
+def test_elision_is_opt_in():
+    """Test that the default rewriter always applies policies."""
+    with SQLRewriter() as rewriter:
+        rewriter.execute("CREATE TABLE t AS SELECT 1 AS x")
+        _register(rewriter, "max(t.x) >= 0", Resolution.REMOVE, sources=("t",))
+        assert "x >= 0" in rewriter.transform_query("SELECT x FROM t")
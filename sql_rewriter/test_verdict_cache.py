@@ -0,0 +1,140 @@
+"""Tests for the per-table policy verdict cache."""
+
+import pytest
+
+from sql_rewriter import DFCPolicy, Resolution, SQLRewriter
+
+
+def _create_tables(rewriter):
+    rewriter.execute(
+        "CREATE TABLE foo AS SELECT i AS id, i % 10 AS bar, 'v' || i AS baz FROM range(100) t(i)"
+    )
+    rewriter.execute("CREATE TABLE other AS SELECT i AS id FROM range(20) t(i)")
+
+
+def _register_policies(rewriter):
+    rewriter.register_policy(
+        DFCPolicy(sources=["foo"], constraint="max(foo.bar) > 2", on_fail=Resolution.REMOVE)
+    )
+    rewriter.register_policy(
+        DFCPolicy(
+            sources=["foo"], constraint="max(foo.baz) LIKE '%5%'", on_fail=Resolution.INVALIDATE
+        )
+    )
+
+
+@pytest.fixture
+def rewriter():
+    """Create a caching rewriter with a REMOVE and an INVALIDATE policy on foo."""
+    rewriter = SQLRewriter(verdict_cache=True)
+    _create_tables(rewriter)
+    _register_policies(rewriter)
+    yield rewriter
+    rewriter.close()
+
+
+@pytest.fixture
+def uncached():
+    """Create a default rewriter with the same tables and policies."""
+    rewriter = SQLRewriter()
+    _create_tables(rewriter)
+    _register_policies(rewriter)
+    yield rewriter
+    rewriter.close()
+
+
+def test_cached_policies_use_rowid_lookup(rewriter):
+    """Test that cached policies are enforced through the verdict table, not per row."""
+    transformed = rewriter.transform_query("SELECT id FROM foo WHERE id < 50")
+
+    assert "__dfc_verdicts_foo" in transformed
+    assert "rowid" in transformed
+    assert "bar > 2" not in transformed
+    assert "LIKE" not in transformed
+    assert "AS valid" in transformed
+
+
+def test_transform_does_not_materialize_verdicts(rewriter):
+    """Test that verdict tables are built when the rewritten query runs, not when rewriting."""
+    verdict_tables = "SELECT count(*) FROM duckdb_tables() WHERE table_name LIKE '__dfc_verdicts%'"
+    rewriter.transform_query("SELECT id FROM foo")
+    assert rewriter.conn.execute(verdict_tables).fetchone() == (0,)
+
+    assert len(rewriter.fetchall("SELECT id FROM foo")) == 70
+    assert rewriter.conn.execute(verdict_tables).fetchone() == (1,)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT id, bar FROM foo WHERE id < 50 ORDER BY id",
+        "SELECT f.id, other.id FROM foo AS f JOIN other ON f.id = other.id * 3 ORDER BY f.id",
+        "SELECT DISTINCT bar FROM foo ORDER BY bar",
+        "SELECT other.id, s.bar FROM other JOIN (SELECT id, bar FROM foo) AS s "
+        "ON other.id = s.id ORDER BY other.id",
+    ],
+)
+def test_cached_results_match_uncached(rewriter, uncached, query):
+    """Test that the cache returns the same rows and valid flags as per-row evaluation."""
+    assert rewriter.fetchall(query) == uncached.fetchall(query)
+
+
+def test_writes_through_rewriter_refresh_verdicts(rewriter):
+    """Test that verdicts are rebuilt after a write executed through the rewriter."""
+    query = "SELECT id FROM foo WHERE id < 10 ORDER BY id"
+    assert rewriter.fetchall(query)[0] == (3, False)
+
+    rewriter.execute("UPDATE foo SET bar = 0 WHERE id = 3")
+    rewriter.execute("INSERT INTO foo VALUES (-5, 9, 'v-5')")
+
+    rows = rewriter.fetchall(query)
+    assert rows[0] == (-5, True)
+    assert 3 not in [row[0] for row in rows]
+
+
+def test_direct_writes_refresh_verdicts(rewriter):
+    """Test that updates through rewriter.conn rebuild the verdicts they change."""
+    query = "SELECT id FROM foo WHERE id = 3"
+    assert rewriter.fetchall(query) == [(3, False)]
+
+    rewriter.conn.execute("UPDATE foo SET bar = 0 WHERE id = 3")
+    assert rewriter.fetchall(query) == []
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT bar, count(*) FROM foo GROUP BY bar",
+        "SELECT other.id FROM other LEFT JOIN foo ON other.id = foo.id",
+        "SELECT id FROM foo WHERE id IN (SELECT id FROM foo WHERE bar = 1)",
+        "SELECT id FROM (SELECT * FROM foo) AS sub",
+    ],
+)
+def test_ineligible_queries_evaluate_per_row(rewriter, query):
+    """Test that aggregations, outer joins and repeated or nested scans are not cached."""
+    transformed = rewriter.transform_query(query)
+
+    assert "__dfc_verdicts" not in transformed
+    assert "bar" in transformed
+    assert "> 2" in transformed
+
+
+def test_uncacheable_policies_are_still_applied(rewriter):
+    """Test that KILL policies are applied per row next to the cached lookup."""
+    rewriter.register_policy(
+        DFCPolicy(sources=["foo"], constraint="max(foo.id) < 1000", on_fail=Resolution.KILL)
+    )
+
+    transformed = rewriter.transform_query("SELECT id FROM foo")
+
+    assert "__dfc_verdicts_foo" in transformed
+    assert "KILL" in transformed
+    assert len(rewriter.fetchall("SELECT id FROM foo")) == 70
+
+
+def test_verdict_cache_is_opt_in(uncached):
+    """Test that the default rewriter evaluates every constraint per row."""
+    transformed = uncached.transform_query("SELECT id FROM foo")
+
+    assert "__dfc_verdicts" not in transformed
+    assert "bar > 2" in transformed
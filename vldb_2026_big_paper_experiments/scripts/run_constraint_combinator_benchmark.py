@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""Benchmark shared_sql_utils constraint combinators up to 1M constraints.
+
+Compares the balanced, flat and list_bool forms when combining either SQL strings
+(parsed by sqlglot) or pre-built sqlglot expressions, using the MAX(...) > -i
+constraints of the optimized TPC-H Q01 policy-count queries. Optionally runs each
+combined constraint as a HAVING clause in DuckDB.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+from pathlib import Path
+import statistics
+import time
+
+import duckdb
+from shared_sql_utils import (
+    CONSTRAINT_FORMS,
+    combine_constraints_balanced_expr,
+    combine_expressions_flat_expr,
+    combine_expressions_list_bool_expr,
+)
+from sqlglot import exp
+
+DEFAULT_CONSTRAINT_COUNTS = [1_000, 10_000, 100_000, 1_000_000]
+DEFAULT_RUNS_PER_SETTING = 3
+DEFAULT_MAX_STRING_COUNT = 100_000
+DEFAULT_NUM_ROWS = 10_000
+INPUT_KINDS = ("string", "expression")
+
+EXECUTE_QUERY = "SELECT category, SUM(value) AS total FROM test_data GROUP BY category HAVING {}"
+
+
+def build_string_constraints(count: int) -> list[str]:
+    """Build `count` distinct constraint strings over test_data."""
+    return [f"MAX(test_data.value) > {-i}" for i in range(count)]
+
+
+def build_expression_constraints(count: int) -> list[exp.Expression]:
+    """Build the same constraints as `build_string_constraints` without parsing."""
+    column = exp.column("value", table="test_data")
+    return [
+        exp.GT(this=exp.Max(this=column.copy()), expression=exp.Literal.number(-i))
+        for i in range(count)
+    ]
+
+
+def combine(constraints: list, form: str) -> exp.Expression:
+    """Combine constraints into an AND expression of the given form."""
+    if form == "balanced":
+        return combine_constraints_balanced_expr(constraints)
+    if form == "flat":
+        return combine_expressions_flat_expr(constraints, exp.And)
+    return combine_expressions_list_bool_expr(constraints, exp.And)
+
+
+def run_setting(
+    count: int,
+    form: str,
+    input_kind: str,
+    runs: int,
+    conn: duckdb.DuckDBPyConnection | None,
+) -> dict:
+    """Return median build/SQL/execute ms, SQL length and any execution error."""
+    build_times = []
+    sql_times = []
+    sql = ""
+    for _ in range(runs):
+        # Expression inputs are re-parented into the result, so build fresh ones per run.
+        if input_kind == "string":
+            constraints = build_string_constraints(count)
+        else:
+            constraints = build_expression_constraints(count)
+        start = time.perf_counter()
+        combined = combine(constraints, form)
+        build_times.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        sql = combined.sql(dialect="duckdb")
+        sql_times.append((time.perf_counter() - start) * 1000)
+
+    execute_times = []
+    error = ""
+    if conn is not None:
+        query = EXECUTE_QUERY.format(sql)
+        for _ in range(runs):
+            start = time.perf_counter()
+            try:
+                conn.execute(query).fetchall()
+            except duckdb.Error as e:
+                # e.g. the balanced tree exceeding max_expression_depth
+                error = str(e).splitlines()[0]
+                break
+            execute_times.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "build_ms": statistics.median(build_times),
+        "sql_ms": statistics.median(sql_times),
+        "execute_ms": statistics.median(execute_times) if execute_times else 0.0,
+        "sql_length": len(sql),
+        "error": error,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark balanced, flat and list_bool constraint combinators."
+    )
+    parser.add_argument(
+        "--constraint-counts",
+        type=int,
+        nargs="+",
+        default=DEFAULT_CONSTRAINT_COUNTS,
+        help="Constraint counts to test (default: 1000 10000 100000 1000000)",
+    )
+    parser.add_argument(
+        "--forms",
+        nargs="+",
+        choices=CONSTRAINT_FORMS,
+        default=list(CONSTRAINT_FORMS),
+        help="Combinator forms to test (default: balanced flat list_bool)",
+    )
+    parser.add_argument(
+        "--runs-per-setting",
+        type=int,
+        default=DEFAULT_RUNS_PER_SETTING,
+        help="Measured runs per setting (default: 3)",
+    )
+    parser.add_argument(
+        "--max-string-count",
+        type=int,
+        default=DEFAULT_MAX_STRING_COUNT,
+        help="Skip string inputs above this count, since parsing dominates (default: 100000)",
+    )
+    parser.add_argument(
+        "--execute",
+        action="store_true",
+        help="Also run each combined constraint as a HAVING clause in DuckDB",
+    )
+    parser.add_argument(
+        "--num-rows",
+        type=int,
+        default=DEFAULT_NUM_ROWS,
+        help="Row count for test_data when executing (default: 10000)",
+    )
+    parser.add_argument(
+        "--output",
+        default="./results/constraint_combinator_benchmark.csv",
+        help="CSV output path (default: ./results/constraint_combinator_benchmark.csv)",
+    )
+    args = parser.parse_args()
+
+    conn = None
+    if args.execute:
+        conn = duckdb.connect()
+        conn.execute(
+            "CREATE TABLE test_data AS "
+            "SELECT i AS id, (i * 7919) % 1000 AS value, i % 10 AS category "
+            f"FROM range({args.num_rows}) t(i)"
+        )
+
+    rows = []
+    for count in args.constraint_counts:
+        for input_kind in INPUT_KINDS:
+            if input_kind == "string" and count > args.max_string_count:
+                print(f"  [{count:>8} constraints] {input_kind:<10} skipped (--max-string-count)")
+                continue
+            for form in args.forms:
+                result = run_setting(count, form, input_kind, args.runs_per_setting, conn)
+                execute_label = ""
+                if conn is not None:
+                    execute_label = (
+                        f" execute={result['execute_ms']:10.2f}ms"
+                        if not result["error"]
+                        else f" execute=ERROR ({result['error']})"
+                    )
+                print(
+                    f"  [{count:>8} constraints] {input_kind:<10} {form:<9} "
+                    f"build={result['build_ms']:10.2f}ms sql={result['sql_ms']:10.2f}ms"
+                    f"{execute_label}",
+                    flush=True,
+                )
+                rows.append(
+                    {
+                        "constraint_count": count,
+                        "input": input_kind,
+                        "form": form,
+                        "build_ms": f"{result['build_ms']:.3f}",
+                        "sql_ms": f"{result['sql_ms']:.3f}",
+                        "execute_ms": f"{result['execute_ms']:.3f}",
+                        "sql_length": result["sql_length"],
+                        "error": result["error"],
+                    }
+                )
+
+    if conn is not None:
+        conn.close()
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with output_path.open("w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()) if rows else [])
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"\nResults saved to: {output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
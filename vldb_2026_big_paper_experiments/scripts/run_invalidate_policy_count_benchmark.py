@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""Benchmark rewrite and execution time for many INVALIDATE policies.
+
+Compares the incremental rewrite (the 'valid' column is re-combined once per
+policy) against SQLRewriter(batch_invalidate=True), which builds 'valid' as a
+single balanced AND and 'invalid_string' as a single CONCAT_WS.
+"""
+
+import argparse
+import csv
+from pathlib import Path
+import statistics
+import sys
+import time
+
+import duckdb
+from sql_rewriter import DFCPolicy, Resolution, SQLRewriter
+
+DEFAULT_POLICY_COUNTS = [1, 10, 100, 1000, 10000]
+DEFAULT_RUNS_PER_SETTING = 3
+DEFAULT_NUM_ROWS = 10_000
+DEFAULT_MAX_INCREMENTAL = 100
+
+QUERIES = {
+    "scan": "SELECT id, value FROM test_data",
+    "aggregation": "SELECT category, SUM(value) AS total FROM test_data GROUP BY category",
+}
+
+
+def build_policies(num_policies: int, message_ratio: float) -> list[DFCPolicy]:
+    """Build distinct INVALIDATE/INVALIDATE_MESSAGE policies over test_data."""
+    num_message = int(num_policies * message_ratio)
+    policies = []
+    for i in range(num_policies):
+        on_fail = Resolution.INVALIDATE_MESSAGE if i < num_message else Resolution.INVALIDATE
+        policies.append(
+            DFCPolicy(
+                sources=["test_data"],
+                constraint=f"max(test_data.value) > {i % 997} - {i}",
+                on_fail=on_fail,
+                description=f"invalidate_policy_{i + 1}",
+            )
+        )
+    return policies
+
+
+def make_rewriter(num_rows: int, batch_invalidate: bool) -> SQLRewriter:
+    """Create a rewriter with a small synthetic test_data table."""
+    rewriter = SQLRewriter(batch_invalidate=batch_invalidate)
+    rewriter.execute(
+        "CREATE TABLE test_data AS "
+        "SELECT i AS id, (i * 7919) % 1000 AS value, i % 10 AS category "
+        f"FROM range({num_rows}) t(i)"
+    )
+    return rewriter
+
+
+def run_setting(
+    rewriter: SQLRewriter,
+    query: str,
+    runs: int,
+    execute: bool,
+) -> tuple[float, float, int, str]:
+    """Return median rewrite ms, median execution ms, rewritten SQL length and any error."""
+    rewrite_times = []
+    execute_times = []
+    transformed = ""
+    error = ""
+    for _ in range(runs):
+        start = time.perf_counter()
+        transformed = rewriter.transform_query(query)
+        rewrite_times.append((time.perf_counter() - start) * 1000)
+        if execute and not error:
+            start = time.perf_counter()
+            try:
+                rewriter.conn.execute(transformed).fetchall()
+            except duckdb.Error as e:
+                # e.g. the incremental 'valid' tree exceeding max_expression_depth
+                error = str(e).splitlines()[0]
+                continue
+            execute_times.append((time.perf_counter() - start) * 1000)
+    execute_ms = statistics.median(execute_times) if execute_times else 0.0
+    return statistics.median(rewrite_times), execute_ms, len(transformed), error
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark incremental vs batched INVALIDATE rewrites by policy count."
+    )
+    parser.add_argument(
+        "--policy-counts",
+        type=int,
+        nargs="+",
+        default=DEFAULT_POLICY_COUNTS,
+        help="Policy counts to test (default: 1 10 100 1000 10000)",
+    )
+    parser.add_argument(
+        "--runs-per-setting",
+        type=int,
+        default=DEFAULT_RUNS_PER_SETTING,
+        help="Measured runs per setting (default: 3)",
+    )
+    parser.add_argument(
+        "--num-rows",
+        type=int,
+        default=DEFAULT_NUM_ROWS,
+        help="Row count for test_data (default: 10000)",
+    )
+    parser.add_argument(
+        "--message-ratio",
+        type=float,
+        default=0.5,
+        help="Fraction of policies using INVALIDATE_MESSAGE (default: 0.5)",
+    )
+    parser.add_argument(
+        "--max-incremental",
+        type=int,
+        default=DEFAULT_MAX_INCREMENTAL,
+        help="Skip the quadratic incremental mode above this policy count (default: 100)",
+    )
+    parser.add_argument(
+        "--no-execute",
+        action="store_true",
+        help="Only measure rewrite time",
+    )
+    parser.add_argument(
+        "--output",
+        default="./results/invalidate_policy_count_benchmark.csv",
+        help="CSV output path (default: ./results/invalidate_policy_count_benchmark.csv)",
+    )
+    args = parser.parse_args()
+
+    # Deep incremental 'valid' trees need headroom when sqlglot walks them.
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 100_000))
+
+    rows = []
+    for policy_count in args.policy_counts:
+        policies = build_policies(policy_count, args.message_ratio)
+        for mode in ("incremental", "batched"):
+            if mode == "incremental" and policy_count > args.max_incremental:
+                print(f"  [{policy_count:>6} policies] {mode:<11} skipped (--max-incremental)")
+                continue
+            rewriter = make_rewriter(args.num_rows, batch_invalidate=mode == "batched")
+            for policy in policies:
+                rewriter.register_policy(policy)
+            for query_name, query in QUERIES.items():
+                rewrite_ms, execute_ms, sql_length, error = run_setting(
+                    rewriter, query, args.runs_per_setting, not args.no_execute
+                )
+                execute_label = f"{execute_ms:10.2f}ms" if not error else f"ERROR ({error})"
+                print(
+                    f"  [{policy_count:>6} policies] {mode:<11} {query_name:<11} "
+                    f"rewrite={rewrite_ms:10.2f}ms execute={execute_label}",
+                    flush=True,
+                )
+                rows.append(
+                    {
+                        "policy_count": policy_count,
+                        "mode": mode,
+                        "query": query_name,
+                        "rewrite_ms": f"{rewrite_ms:.3f}",
+                        "execute_ms": f"{execute_ms:.3f}",
+                        "rewritten_sql_length": sql_length,
+                        "error": error,
+                    }
+                )
+            rewriter.close()
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with output_path.open("w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()) if rows else [])
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"\nResults saved to: {output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
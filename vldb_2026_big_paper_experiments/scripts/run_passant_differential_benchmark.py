@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Run the passant vs sql_rewriter differential benchmark on TPC-H."""
+
+import argparse
+from pathlib import Path
+import sys
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from experiment_harness import ExperimentConfig, ExperimentRunner  # noqa: E402
+
+from vldb_experiments import PassantDifferentialStrategy  # noqa: E402
+from vldb_experiments.strategies.passant_differential_strategy import (  # noqa: E402
+    DEFAULT_POLICY_LEVELS,
+    DEFAULT_REWRITE_ITERATIONS,
+    DEFAULT_RUNS_PER_SETTING,
+    DEFAULT_WARMUP_PER_SETTING,
+    build_differential_settings,
+)
+from vldb_experiments.strategies.tpch_strategy import TPCH_QUERIES  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare passant and sql_rewriter rewrite latency, runtime and results."
+    )
+    parser.add_argument(
+        "--sf",
+        type=float,
+        default=1,
+        help="TPC-H scale factor to run (default: 1)",
+    )
+    parser.add_argument(
+        "--queries",
+        type=int,
+        nargs="+",
+        default=TPCH_QUERIES,
+        help="TPC-H query numbers to run (default: supported TPC-H queries)",
+    )
+    parser.add_argument(
+        "--policy-counts",
+        type=int,
+        nargs="*",
+        default=DEFAULT_POLICY_LEVELS["count"],
+        help="Policy counts from the policy count experiment (default: 1 10 100)",
+    )
+    parser.add_argument(
+        "--complexity-terms",
+        type=int,
+        nargs="*",
+        default=DEFAULT_POLICY_LEVELS["complexity"],
+        help="Predicate term counts from the policy complexity experiment (default: 1 10 100)",
+    )
+    parser.add_argument(
+        "--rewrite-iterations",
+        type=int,
+        default=DEFAULT_REWRITE_ITERATIONS,
+        help="Rewrites per engine per execution used for latency percentiles (default: 20)",
+    )
+    parser.add_argument(
+        "--runs-per-setting",
+        type=int,
+        default=DEFAULT_RUNS_PER_SETTING,
+        help="Number of measured runs per setting (default: 3)",
+    )
+    parser.add_argument(
+        "--warmup-per-setting",
+        type=int,
+        default=DEFAULT_WARMUP_PER_SETTING,
+        help="Number of warmup runs per setting (default: 1)",
+    )
+    args = parser.parse_args()
+
+    policy_levels = {"count": args.policy_counts, "complexity": args.complexity_terms}
+    settings = build_differential_settings(args.queries, policy_levels)
+    num_executions = len(settings) * args.runs_per_setting
+
+    print("Running passant differential benchmark:")
+    print(f"  Scale factor: {args.sf}")
+    print(f"  Queries: {args.queries}")
+    print(f"  Policy counts: {args.policy_counts}")
+    print(f"  Complexity terms: {args.complexity_terms}")
+    print(f"  Rewrite iterations: {args.rewrite_iterations}")
+    print(f"  Warmup runs per setting: {args.warmup_per_setting}")
+    print(f"  Measured runs: {num_executions} ({args.runs_per_setting} per setting)")
+    print("  Engines: sql_rewriter, passant")
+
+    db_path = f"./results/tpch_passant_differential_sf{args.sf}.db"
+    output_filename = f"tpch_passant_differential_sf{args.sf}.csv"
+
+    config = ExperimentConfig(
+        num_executions=num_executions,
+        num_warmup_runs=0,
+        warmup_mode="per_setting",
+        warmup_runs_per_setting=args.warmup_per_setting,
+        database_config={
+            "database": ":memory:",
+        },
+        strategy_config={
+            "tpch_sf": args.sf,
+            "tpch_db_path": db_path,
+            "tpch_queries": args.queries,
+            "policy_levels": policy_levels,
+            "rewrite_iterations": args.rewrite_iterations,
+            "runs_per_setting": args.runs_per_setting,
+        },
+        output_dir="./results",
+        output_filename=output_filename,
+        verbose=True,
+    )
+
+    strategy = PassantDifferentialStrategy()
+    runner = ExperimentRunner(strategy, config)
+
+    print("Starting experiments...", flush=True)
+    runner.run()
+
+    print("\nExperiments completed!")
+    print(f"Results saved to: {config.output_dir}/{config.output_filename}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,6 +17,7 @@ from .strategies.microbenchmark_phase_competition_strategy import (
 from .strategies.microbenchmark_strategy import MicrobenchmarkStrategy
 from .strategies.multi_source_strategy import MultiSourceStrategy
 from .strategies.multi_source_tpch_strategy import MultiSourceTPCHStrategy
+from .strategies.passant_differential_strategy import PassantDifferentialStrategy
 from .strategies.synthetic_llm_validation_grid_strategy import SyntheticLLMValidationGridStrategy
 from .strategies.tax_agent_strategy import TaxAgentStrategy
 from .strategies.tpch_multi_db_strategy import TPCHMultiDBStrategy
@@ -34,6 +35,7 @@ __all__ = [
     "MicrobenchmarkTableWidthStrategy",
     "MultiSourceStrategy",
     "MultiSourceTPCHStrategy",
+    "PassantDifferentialStrategy",
     "SyntheticLLMValidationGridStrategy",
     "TPCHMultiDBStrategy",
     "TPCHPolicyComplexityStrategy",
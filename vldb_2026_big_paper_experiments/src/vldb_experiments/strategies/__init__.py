@@ -10,6 +10,7 @@ from .microbenchmark_phase_competition_strategy import (
 from .microbenchmark_strategy import MicrobenchmarkStrategy
 from .multi_source_strategy import MultiSourceStrategy
 from .multi_source_tpch_strategy import MultiSourceTPCHStrategy
+from .passant_differential_strategy import PassantDifferentialStrategy
 from .state_transition_llm_strategy import StateTransitionLLMStrategy
 from .synthetic_llm_validation_grid_strategy import SyntheticLLMValidationGridStrategy
 from .tax_agent_strategy import TaxAgentStrategy
@@ -28,6 +29,7 @@ __all__ = [
     "MicrobenchmarkTableWidthStrategy",
     "MultiSourceStrategy",
     "MultiSourceTPCHStrategy",
+    "PassantDifferentialStrategy",
     "StateTransitionLLMStrategy",
     "SyntheticLLMValidationGridStrategy",
     "TPCHMultiDBStrategy",
@@ -0,0 +1,331 @@
+"""Differential benchmark of the passant native rewriter against sql_rewriter on TPC-H."""
+
+import contextlib
+import pathlib
+import time
+
+from experiment_harness import ExperimentContext, ExperimentResult, ExperimentStrategy
+import numpy as np
+from passant import compat as passant_compat
+from sql_rewriter import DFCPolicy, SQLRewriter
+
+from vldb_experiments.correctness import compare_results_exact
+from vldb_experiments.strategies.tpch_policy_complexity_strategy import (
+    build_tpch_q01_complexity_policy,
+)
+from vldb_experiments.strategies.tpch_policy_count_strategy import build_tpch_q01_policies
+from vldb_experiments.strategies.tpch_strategy import (
+    TPCH_QUERIES,
+    _ensure_smokedduck,
+    load_tpch_query,
+)
+
+POLICY_FAMILIES = ("count", "complexity")
+DEFAULT_POLICY_LEVELS = {"count": [1, 10, 100], "complexity": [1, 10, 100]}
+DEFAULT_REWRITE_ITERATIONS = 20
+DEFAULT_WARMUP_PER_SETTING = 1
+DEFAULT_RUNS_PER_SETTING = 3
+LATENCY_PERCENTILES = (50, 95, 99)
+ENGINES = ("sql_rewriter", "passant")
+
+
+def build_differential_policies(family: str, level: int) -> list[DFCPolicy]:
+    """Build the sql_rewriter policies for one benchmark setting.
+
+    Args:
+        family: ``"count"`` for ``level`` distinct policies from the policy count
+            experiment, or ``"complexity"`` for one policy with ``level`` predicate terms
+            from the policy complexity experiment.
+        level: Policy count or predicate term count.
+
+    Returns:
+        List of sql_rewriter policies.
+
+    Raises:
+        ValueError: If the family is unknown.
+    """
+    if family == "count":
+        return build_tpch_q01_policies(level)
+    if family == "complexity":
+        return [build_tpch_q01_complexity_policy(level)]
+    raise ValueError(f"Unknown policy family: {family}. Expected one of {POLICY_FAMILIES}")
+
+
+def to_passant_policy(policy: DFCPolicy) -> passant_compat.DFCPolicy:
+    """Convert a sql_rewriter policy to the equivalent passant.compat policy."""
+    return passant_compat.DFCPolicy(
+        constraint=policy.constraint,
+        on_fail=passant_compat.Resolution(policy.on_fail.value),
+        sources=list(policy.sources),
+        sink=policy.sink,
+        sink_alias=policy.sink_alias,
+        description=policy.description,
+    )
+
+
+def build_differential_settings(
+    queries: list[int],
+    policy_levels: dict[str, list[int]],
+) -> list[tuple[int, str, int]]:
+    """Expand queries and policy levels into ``(query_num, family, level)`` settings.
+
+    Settings are ordered by query, then family, then level, so consecutive executions
+    reuse the loaded query and only re-register policies when the setting changes.
+    """
+    return [
+        (query_num, family, level)
+        for query_num in queries
+        for family in POLICY_FAMILIES
+        for level in policy_levels.get(family, [])
+    ]
+
+
+def summarize_latencies(prefix: str, samples_ms: list[float]) -> dict[str, float]:
+    """Summarize rewrite latency samples as ``{prefix}_p50_ms``-style percentiles.
+
+    Empty sample lists (for example when an engine failed) summarize to zeros.
+    """
+    summary = {}
+    for percentile in LATENCY_PERCENTILES:
+        value = float(np.percentile(samples_ms, percentile)) if samples_ms else 0.0
+        summary[f"{prefix}_p{percentile}_ms"] = value
+    summary[f"{prefix}_mean_ms"] = float(np.mean(samples_ms)) if samples_ms else 0.0
+    return summary
+
+
+def _connect_tpch(local_duckdb, db_path: str, scale_factor: float):
+    conn = local_duckdb.connect(db_path)
+    with contextlib.suppress(Exception):
+        conn.execute("INSTALL tpch")
+    conn.execute("LOAD tpch")
+    table_exists = conn.execute(
+        "SELECT COUNT(*) FROM information_schema.tables WHERE table_name = 'lineitem'"
+    ).fetchone()[0]
+    if table_exists == 0:
+        conn.execute(f"CALL dbgen(sf={scale_factor})")
+    try:
+        conn.execute("COMMIT")
+    except Exception:
+        try:
+            conn.commit()
+        except Exception:
+            with contextlib.suppress(Exception):
+                conn.execute("ROLLBACK")
+    return conn
+
+
+class PassantDifferentialStrategy(ExperimentStrategy):
+    """Strategy comparing passant and sql_rewriter on TPC-H queries.
+
+    For every (query, policy family, policy level) setting, each execution:
+    1. Rewrites the query ``rewrite_iterations`` times with each engine and records
+       rewrite latency percentiles
+    2. Executes each engine's rewritten query once in DuckDB and records the runtime
+    3. Checks that both engines return the same rows
+
+    The two engines run on separate database files because both register a ``kill``
+    UDF on their connection. When the passant extension is not built, passant metrics
+    are left empty and ``passant_available`` is False rather than timing the
+    pass-through fallback.
+    """
+
+    def setup(self, context: ExperimentContext) -> None:
+        self.scale_factor = float(context.strategy_config.get("tpch_sf", 1))
+        db_path = context.strategy_config.get("tpch_db_path")
+        if not db_path:
+            db_path = f"./results/tpch_passant_differential_sf{self.scale_factor}.db"
+        pathlib.Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.passant_db_path = f"{db_path}_passant"
+
+        queries = context.strategy_config.get("tpch_queries", TPCH_QUERIES)
+        policy_levels = context.strategy_config.get("policy_levels", DEFAULT_POLICY_LEVELS)
+        self.settings = build_differential_settings(list(queries), policy_levels)
+        if not self.settings:
+            raise ValueError("Differential benchmark needs at least one query and policy level")
+        self.runs_per_setting = int(
+            context.strategy_config.get("runs_per_setting", DEFAULT_RUNS_PER_SETTING)
+        )
+        self.rewrite_iterations = int(
+            context.strategy_config.get("rewrite_iterations", DEFAULT_REWRITE_ITERATIONS)
+        )
+        if self.rewrite_iterations <= 0:
+            raise ValueError("rewrite_iterations must be positive")
+
+        self.local_duckdb = _ensure_smokedduck()
+        self.sql_rewriter_conn = _connect_tpch(self.local_duckdb, self.db_path, self.scale_factor)
+        self.passant_conn = _connect_tpch(
+            self.local_duckdb, self.passant_db_path, self.scale_factor
+        )
+        self.sql_rewriter = SQLRewriter(conn=self.sql_rewriter_conn)
+        self.passant_rewriter = passant_compat.SQLRewriter(conn=self.passant_conn)
+        self.passant_available = passant_compat._passant is not None
+        if self.passant_available:
+            self.passant_rewriter.refresh_statistics()
+
+        self.registered_policies: tuple[str, int] | None = None
+        context.shared_state["tpch_queries"] = {
+            query_num: load_tpch_query(query_num)
+            for query_num in sorted({setting[0] for setting in self.settings})
+        }
+
+    def _setting_and_run_for_execution(
+        self, execution_number: int
+    ) -> tuple[tuple[int, str, int], int]:
+        setting_index = (execution_number - 1) // self.runs_per_setting
+        run_num = ((execution_number - 1) % self.runs_per_setting) + 1
+        return self.settings[setting_index], run_num
+
+    def _register_policies(self, family: str, level: int) -> None:
+        if self.registered_policies == (family, level):
+            return
+        for old_policy in self.sql_rewriter.get_dfc_policies():
+            self.sql_rewriter.delete_policy(
+                sources=old_policy.sources,
+                constraint=old_policy.constraint,
+                on_fail=old_policy.on_fail,
+            )
+        for old_policy in self.passant_rewriter.get_dfc_policies():
+            self.passant_rewriter.delete_policy(
+                sources=old_policy.sources,
+                constraint=old_policy.constraint,
+                on_fail=old_policy.on_fail,
+            )
+        for policy in build_differential_policies(family, level):
+            self.sql_rewriter.register_policy(policy)
+            self.passant_rewriter.register_policy(to_passant_policy(policy))
+        self.registered_policies = (family, level)
+
+    def _measure(self, rewriter, conn, query: str) -> dict:
+        latencies = []
+        rewritten = query
+        for _ in range(self.rewrite_iterations):
+            rewrite_start = time.perf_counter()
+            rewritten = rewriter.transform_query(query)
+            latencies.append((time.perf_counter() - rewrite_start) * 1000.0)
+        exec_start = time.perf_counter()
+        results = conn.execute(rewritten).fetchall()
+        exec_time = (time.perf_counter() - exec_start) * 1000.0
+        return {
+            "latencies": latencies,
+            "exec_time": exec_time,
+            "results": results,
+            "error": None,
+        }
+
+    def _measure_safely(self, rewriter, conn, query: str) -> dict:
+        try:
+            return self._measure(rewriter, conn, query)
+        except Exception as e:
+            return {"latencies": [], "exec_time": 0.0, "results": [], "error": str(e)}
+
+    def execute(self, context: ExperimentContext) -> ExperimentResult:
+        (query_num, family, level), run_num = self._setting_and_run_for_execution(
+            context.execution_number
+        )
+        query = context.shared_state["tpch_queries"][query_num]
+
+        phase_label = "warmup" if context.is_warmup else f"run {run_num}"
+        print(
+            f"[Execution {context.execution_number}] "
+            f"TPC-H Q{query_num:02d} (sf={self.scale_factor}) "
+            f"policy_{family}={level} ({phase_label})"
+        )
+
+        self._register_policies(family, level)
+
+        measurements = {
+            "sql_rewriter": self._measure_safely(
+                self.sql_rewriter, self.sql_rewriter_conn, query
+            )
+        }
+        if self.passant_available:
+            measurements["passant"] = self._measure_safely(
+                self.passant_rewriter, self.passant_conn, query
+            )
+        else:
+            measurements["passant"] = {
+                "latencies": [],
+                "exec_time": 0.0,
+                "results": [],
+                "error": "passant extension is not built",
+            }
+
+        results_match = None
+        match_error = None
+        if all(measurements[engine]["error"] is None for engine in ENGINES):
+            results_match, match_error = compare_results_exact(
+                measurements["sql_rewriter"]["results"], measurements["passant"]["results"]
+            )
+
+        custom_metrics = {
+            "query_num": query_num,
+            "query_name": f"q{query_num:02d}",
+            "tpch_sf": self.scale_factor,
+            "policy_family": family,
+            "policy_level": level,
+            "run_num": run_num,
+            "rewrite_iterations": self.rewrite_iterations,
+            "passant_available": self.passant_available,
+        }
+        for engine in ENGINES:
+            measurement = measurements[engine]
+            custom_metrics.update(
+                summarize_latencies(f"{engine}_rewrite", measurement["latencies"])
+            )
+            custom_metrics[f"{engine}_exec_time_ms"] = measurement["exec_time"]
+            custom_metrics[f"{engine}_rows"] = len(measurement["results"])
+            custom_metrics[f"{engine}_error"] = measurement["error"] or ""
+
+        passant_p50 = custom_metrics["passant_rewrite_p50_ms"]
+        custom_metrics["rewrite_speedup_p50"] = (
+            custom_metrics["sql_rewriter_rewrite_p50_ms"] / passant_p50 if passant_p50 > 0 else ""
+        )
+        custom_metrics["results_match"] = results_match if results_match is not None else ""
+        custom_metrics["results_match_error"] = match_error or ""
+
+        total_time = sum(
+            sum(measurements[engine]["latencies"]) + measurements[engine]["exec_time"]
+            for engine in ENGINES
+        )
+        return ExperimentResult(duration_ms=total_time, custom_metrics=custom_metrics)
+
+    def teardown(self, _context: ExperimentContext) -> None:
+        if hasattr(self, "sql_rewriter"):
+            with contextlib.suppress(Exception):
+                self.sql_rewriter.close()
+        if hasattr(self, "passant_rewriter"):
+            with contextlib.suppress(Exception):
+                self.passant_rewriter.close()
+
+    def get_metrics(self) -> list:
+        metrics = [
+            "query_num",
+            "query_name",
+            "tpch_sf",
+            "policy_family",
+            "policy_level",
+            "run_num",
+            "rewrite_iterations",
+            "passant_available",
+        ]
+        for engine in ENGINES:
+            metrics.extend(
+                f"{engine}_rewrite_p{percentile}_ms" for percentile in LATENCY_PERCENTILES
+            )
+            metrics.extend(
+                [
+                    f"{engine}_rewrite_mean_ms",
+                    f"{engine}_exec_time_ms",
+                    f"{engine}_rows",
+                    f"{engine}_error",
+                ]
+            )
+        metrics.extend(["rewrite_speedup_p50", "results_match", "results_match_error"])
+        return metrics
+
+    def get_setting_key(self, context: ExperimentContext) -> tuple[str, int, str, int]:
+        (query_num, family, level), _ = self._setting_and_run_for_execution(
+            context.execution_number
+        )
+        return ("query", query_num, family, level)
@@ -300,6 +300,14 @@ class StateTransitionStrategy(ExperimentStrategy):
         total_ms = rewrite_ms + exec_ms
         return total_ms, rewrite_ms, exec_ms, self._state_counts(self.dfc_conn)
 
+    def _run_dfc_bulk(self) -> tuple[float, dict[str, int]]:
+        self._reset_table(self.dfc_conn)
+        updates = [{"id": step["row_id"], "state": step["next_state"]} for step in self.workload]
+        start = time.perf_counter()
+        self.dfc_rewriter.execute_bulk_update("t", ["id"], updates)
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        return elapsed_ms, self._state_counts(self.dfc_conn)
+
     def execute(self, context: ExperimentContext) -> ExperimentResult:
         phase_label = "warmup" if context.is_warmup else f"run {context.execution_number}"
         print(
@@ -314,6 +322,7 @@ class StateTransitionStrategy(ExperimentStrategy):
             dfc_1phase_exec_time_ms,
             dfc_1phase_counts,
         ) = self._run_dfc_1phase()
+        dfc_bulk_time_ms, dfc_bulk_counts = self._run_dfc_bulk()
 
         custom_metrics = {
             "num_rows": self.num_rows,
@@ -333,6 +342,11 @@ class StateTransitionStrategy(ExperimentStrategy):
             "dfc_1phase_b_count": dfc_1phase_counts["B"],
             "dfc_1phase_c_count": dfc_1phase_counts["C"],
             "dfc_1phase_matches_expected": dfc_1phase_counts == self.expected_dfc,
+            "dfc_bulk_time_ms": dfc_bulk_time_ms,
+            "dfc_bulk_a_count": dfc_bulk_counts["A"],
+            "dfc_bulk_b_count": dfc_bulk_counts["B"],
+            "dfc_bulk_c_count": dfc_bulk_counts["C"],
+            "dfc_bulk_matches_expected": dfc_bulk_counts == self.expected_dfc,
         }
         return ExperimentResult(
             duration_ms=no_policy_time_ms + dfc_1phase_time_ms,
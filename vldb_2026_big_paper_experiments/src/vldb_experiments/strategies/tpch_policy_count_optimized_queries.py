@@ -5,6 +5,7 @@ from __future__ import annotations
 from functools import cache
 
 from shared_sql_utils import combine_constraints_balanced
+from sqlglot import exp
 
 SUPPORTED_POLICY_COUNTS = (
     1,
@@ -107,8 +108,20 @@ def _having_chain(policy_count: int, column_ref: str) -> str:
     return "\n  AND ".join(clauses)
 
 
+def _policy_constraint_expressions(policy_count: int) -> list[exp.Expression]:
+    """Build the `_policy_constraints` clauses as expressions, skipping the SQL parser.
+
+    Parsing dominates combination at 100k+ policies; the rendered SQL is identical.
+    """
+    column = exp.column("l_quantity", table="lineitem")
+    return [
+        exp.GT(this=exp.Max(this=column.copy()), expression=exp.Literal.number(-i))
+        for i in range(policy_count)
+    ]
+
+
 def _logical_constraint(policy_count: int) -> str:
-    return combine_constraints_balanced(_policy_constraints(policy_count, "lineitem.l_quantity"))
+    return combine_constraints_balanced(_policy_constraint_expressions(policy_count))
 
 
 def _logical_projection() -> str:
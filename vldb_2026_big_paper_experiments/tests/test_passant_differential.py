@@ -0,0 +1,72 @@
+"""Tests for the passant differential benchmark helpers."""
+
+import pytest
+from sql_rewriter import DFCPolicy, Resolution
+
+from vldb_experiments.strategies.passant_differential_strategy import (
+    build_differential_policies,
+    build_differential_settings,
+    summarize_latencies,
+    to_passant_policy,
+)
+
+
+def test_build_differential_settings_orders_by_query_then_family() -> None:
+    settings = build_differential_settings([1, 6], {"count": [1, 10], "complexity": [5]})
+
+    assert settings == [
+        (1, "count", 1),
+        (1, "count", 10),
+        (1, "complexity", 5),
+        (6, "count", 1),
+        (6, "count", 10),
+        (6, "complexity", 5),
+    ]
+
+
+def test_build_differential_policies_reuses_vldb_policy_builders() -> None:
+    count_policies = build_differential_policies("count", 3)
+    complexity_policies = build_differential_policies("complexity", 4)
+
+    assert [policy.description for policy in count_policies] == [
+        "q01_policy_1",
+        "q01_policy_2",
+        "q01_policy_3",
+    ]
+    assert len(complexity_policies) == 1
+    assert complexity_policies[0].description == "q01_complexity_terms_4"
+
+    with pytest.raises(ValueError, match="Unknown policy family"):
+        build_differential_policies("width", 1)
+
+
+def test_to_passant_policy_preserves_fields() -> None:
+    policy = DFCPolicy(
+        sources=["lineitem"],
+        constraint="max(lineitem.l_quantity) >= 1",
+        on_fail=Resolution.KILL,
+        description="kill_policy",
+    )
+
+    converted = to_passant_policy(policy)
+
+    assert converted.sources == ["lineitem"]
+    assert converted.constraint == "max(lineitem.l_quantity) >= 1"
+    assert converted.on_fail.value == "KILL"
+    assert converted.sink is None
+    assert converted.description == "kill_policy"
+
+
+def test_summarize_latencies_reports_percentiles() -> None:
+    summary = summarize_latencies("passant_rewrite", [float(i) for i in range(1, 101)])
+
+    assert summary["passant_rewrite_p50_ms"] == pytest.approx(50.5)
+    assert summary["passant_rewrite_p95_ms"] == pytest.approx(95.05)
+    assert summary["passant_rewrite_p99_ms"] == pytest.approx(99.01)
+    assert summary["passant_rewrite_mean_ms"] == pytest.approx(50.5)
+    assert summarize_latencies("failed", []) == {
+        "failed_p50_ms": 0.0,
+        "failed_p95_ms": 0.0,
+        "failed_p99_ms": 0.0,
+        "failed_mean_ms": 0.0,
+    }